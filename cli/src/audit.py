@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from enum import Enum
+from typing import Any
 
 import typer
 
@@ -26,6 +27,7 @@ class AuditTable(str, Enum):
 
 class ExportFormat(str, Enum):
     CSV = "csv"
+    NDJSON = "ndjson"
 
 
 class OrderStatusFilter(str, Enum):
@@ -35,22 +37,46 @@ class OrderStatusFilter(str, Enum):
     ALL = "all"
 
 
+def _page_params(
+    since: str | None,
+    until: str | None,
+    limit: int | None,
+    before_id: int | None,
+    after_id: int | None,
+) -> dict[str, object]:
+    params: dict[str, object] = {}
+    for key, value in (("since", since), ("until", until), ("limit", limit), ("before_id", before_id), ("after_id", after_id)):
+        if value is not None:
+            params[key] = value
+    return params
+
+
+def _print_page(data: dict[str, Any], key: str, *, json_output: bool, title: str) -> None:
+    print_output(data.get(key, []), json_output=json_output, title=title)
+    cursor = data.get("next_cursor")
+    if cursor:
+        flag, value = next(iter(cursor.items()))
+        typer.echo(f"More rows available: rerun with --{flag.replace('_', '-')} {value}", err=True)
+
+
 @app.command("orders", help="Query order lifecycle records from audit storage.")
 def orders(
     ctx: typer.Context,
     since: str | None = typer.Option(None, "--since", help="YYYY-MM-DD"),
+    until: str | None = typer.Option(None, "--until", help="Exclusive upper bound, YYYY-MM-DD."),
     status: OrderStatusFilter | None = typer.Option(None, "--status", case_sensitive=False),
+    limit: int | None = typer.Option(None, "--limit", min=1, help="Max rows per page (daemon default 500)."),
+    before_id: int | None = typer.Option(None, "--before-id", help="Page cursor: rows older than this id."),
+    after_id: int | None = typer.Option(None, "--after-id", help="Page cursor: rows newer than this id."),
 ) -> None:
     state = get_state(ctx)
-    params: dict[str, object] = {}
-    if since:
-        params["since"] = since
+    params = _page_params(since, until, limit, before_id, after_id)
     if status:
         params["status"] = status.value
 
     try:
         data = run_async(daemon_request(state, "audit.orders", params))
-        print_output(data.get("orders", []), json_output=state.json_output, title="Audit Orders")
+        _print_page(data, "orders", json_output=state.json_output, title="Audit Orders")
     except BrokerError as exc:
         handle_error(exc, json_output=state.json_output)
 
@@ -60,17 +86,19 @@ def commands(
     ctx: typer.Context,
     source: AuditSource | None = typer.Option(None, "--source", case_sensitive=False),
     since: str | None = typer.Option(None, "--since", help="YYYY-MM-DD"),
+    until: str | None = typer.Option(None, "--until", help="Exclusive upper bound, YYYY-MM-DD."),
+    limit: int | None = typer.Option(None, "--limit", min=1, help="Max rows per page (daemon default 500)."),
+    before_id: int | None = typer.Option(None, "--before-id", help="Page cursor: rows older than this id."),
+    after_id: int | None = typer.Option(None, "--after-id", help="Page cursor: rows newer than this id."),
 ) -> None:
     state = get_state(ctx)
-    params: dict[str, object] = {}
+    params = _page_params(since, until, limit, before_id, after_id)
     if source:
         params["source"] = source.value
-    if since:
-        params["since"] = since
 
     try:
         data = run_async(daemon_request(state, "audit.commands", params))
-        print_output(data.get("commands", []), json_output=state.json_output, title="Audit Commands")
+        _print_page(data, "commands", json_output=state.json_output, title="Audit Commands")
     except BrokerError as exc:
         handle_error(exc, json_output=state.json_output)
 
@@ -79,34 +107,45 @@ def commands(
 def risk(
     ctx: typer.Context,
     event_type: str | None = typer.Option(None, "--type"),
+    since: str | None = typer.Option(None, "--since", help="YYYY-MM-DD"),
+    until: str | None = typer.Option(None, "--until", help="Exclusive upper bound, YYYY-MM-DD."),
+    limit: int | None = typer.Option(None, "--limit", min=1, help="Max rows per page (daemon default 500)."),
+    before_id: int | None = typer.Option(None, "--before-id", help="Page cursor: rows older than this id."),
+    after_id: int | None = typer.Option(None, "--after-id", help="Page cursor: rows newer than this id."),
 ) -> None:
     state = get_state(ctx)
-    params: dict[str, object] = {}
+    params = _page_params(since, until, limit, before_id, after_id)
     if event_type:
         params["type"] = event_type
 
     try:
         data = run_async(daemon_request(state, "audit.risk", params))
-        print_output(data.get("risk_events", []), json_output=state.json_output, title="Audit Risk")
+        _print_page(data, "risk_events", json_output=state.json_output, title="Audit Risk")
     except BrokerError as exc:
         handle_error(exc, json_output=state.json_output)
 
 
-@app.command("export", help="Export audit rows to CSV.")
+@app.command("export", help="Stream audit rows to a CSV or NDJSON file, optionally gzipped.")
 def export(
     ctx: typer.Context,
     output: str = typer.Option(..., "--output", help="Output file path."),
     fmt: ExportFormat = typer.Option(ExportFormat.CSV, "--format", case_sensitive=False),
     table: AuditTable = typer.Option(AuditTable.ORDERS, "--table", case_sensitive=False),
     since: str | None = typer.Option(None, "--since", help="YYYY-MM-DD"),
+    until: str | None = typer.Option(None, "--until", help="Exclusive upper bound, YYYY-MM-DD."),
     status: OrderStatusFilter | None = typer.Option(None, "--status", case_sensitive=False, help="Order status filter."),
     source: AuditSource | None = typer.Option(None, "--source", case_sensitive=False),
     event_type: str | None = typer.Option(None, "--type", help="Risk event type filter."),
+    gzip_output: bool = typer.Option(False, "--gzip", help="Gzip-compress the output file."),
 ) -> None:
     state = get_state(ctx)
     params: dict[str, object] = {"output": output, "format": fmt.value, "table": table.value}
+    if gzip_output:
+        params["gzip"] = True
     if since:
         params["since"] = since
+    if until:
+        params["until"] = until
     if status:
         params["status"] = status.value
     if source:
@@ -0,0 +1,71 @@
+"""Batch command: run several daemon commands in one round trip."""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+import typer
+
+from _common import daemon_request, get_state, handle_error, print_output, run_async
+from broker_daemon.exceptions import BrokerError
+
+
+def batch(
+    ctx: typer.Context,
+    request: list[str] = typer.Option(
+        [],
+        "--request",
+        "-r",
+        help='Repeatable. COMMAND or COMMAND followed by JSON params, e.g. \'quote.snapshot {"symbols":["AAPL"]}\'.',
+    ),
+    file: str | None = typer.Option(
+        None,
+        "--file",
+        "-f",
+        help='JSON array of {"command", "params"} objects; use - for stdin.',
+    ),
+) -> None:
+    state = get_state(ctx)
+    items = [_parse_request(raw) for raw in request]
+    if file:
+        items.extend(_read_file(file))
+    if not items:
+        raise typer.BadParameter("provide at least one --request or a --file")
+
+    try:
+        data = run_async(daemon_request(state, "batch", {"requests": items}))
+    except BrokerError as exc:
+        handle_error(exc, json_output=state.json_output)
+        return
+    print_output(data, json_output=state.json_output)
+    if data.get("failed"):
+        raise typer.Exit(code=1)
+
+
+def _parse_request(raw: str) -> dict[str, Any]:
+    command, _, params_text = raw.strip().partition(" ")
+    if not command:
+        raise typer.BadParameter("--request must start with a command name")
+    params: Any = {}
+    if params_text.strip():
+        try:
+            params = json.loads(params_text)
+        except json.JSONDecodeError as exc:
+            raise typer.BadParameter(f"invalid JSON params for '{command}': {exc.msg}") from exc
+        if not isinstance(params, dict):
+            raise typer.BadParameter(f"params for '{command}' must be a JSON object")
+    return {"command": command, "params": params}
+
+
+def _read_file(path: str) -> list[dict[str, Any]]:
+    try:
+        text = sys.stdin.read() if path == "-" else Path(path).expanduser().read_text(encoding="utf-8")
+        loaded = json.loads(text)
+    except (OSError, json.JSONDecodeError) as exc:
+        raise typer.BadParameter(f"unable to read batch file '{path}': {exc}") from exc
+    if not isinstance(loaded, list) or not all(isinstance(item, dict) and item.get("command") for item in loaded):
+        raise typer.BadParameter('batch file must be a JSON array of {"command", "params"} objects')
+    return loaded
@@ -7,7 +7,7 @@ import typer
 from _common import build_typer, daemon_request, get_state, handle_error, print_output, run_async, start_daemon_process
 from broker_daemon.exceptions import BrokerError
 
-app = build_typer("Daemon lifecycle commands (`start`, `stop`, `status`, `restart`).")
+app = build_typer("Daemon lifecycle commands (`start`, `stop`, `status`, `metrics`, `restart`).")
 
 
 @app.command("start", help="Start broker-daemon and wait for socket readiness.")
@@ -58,6 +58,20 @@ def status(ctx: typer.Context) -> None:
         handle_error(exc, json_output=state.json_output)
 
 
+@app.command("metrics", help="Show per-command latency percentiles by stage and request/error counters.")
+def metrics(
+    ctx: typer.Context,
+    command: str | None = typer.Option(None, "--command", help="Only show one daemon command, e.g. quote.snapshot."),
+) -> None:
+    state = get_state(ctx)
+    params = {"command": command} if command else {}
+    try:
+        data = run_async(daemon_request(state, "daemon.metrics", params))
+        print_output(data, json_output=state.json_output)
+    except BrokerError as exc:
+        handle_error(exc, json_output=state.json_output)
+
+
 @app.command("restart", help="Stop then start the daemon.")
 def restart(
     ctx: typer.Context,
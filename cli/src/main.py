@@ -6,6 +6,7 @@ import typer
 
 import auth
 import audit
+import batch
 import daemon
 import market
 import orders
@@ -35,6 +36,7 @@ app.add_typer(audit.app, name="audit")
 app.command("orders", help="List orders with optional filters.")(orders.orders)
 app.command("cancel", help="Cancel one order, or all open orders with --all.")(orders.cancel)
 app.command("fills", help="List fills/execution history.")(orders.fills)
+app.command("batch", help="Run several daemon commands in one round trip.")(batch.batch)
 
 
 @app.callback()
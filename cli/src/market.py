@@ -4,11 +4,11 @@ from __future__ import annotations
 
 from enum import Enum
 import json
-import time
 
 import typer
 
 from _common import (
+    CLIState,
     build_typer,
     daemon_request,
     get_state,
@@ -19,6 +19,7 @@ from _common import (
     validate_allowed_values,
 )
 from broker_daemon.exceptions import BrokerError
+from broker_sdk import Client
 
 app = build_typer("Market data commands (`quote`, `watch`, `chain`, `history`).")
 
@@ -44,6 +45,12 @@ class OptionType(str, Enum):
     PUT = "put"
 
 
+class GreeksMode(str, Enum):
+    AUTO = "auto"
+    LOCAL = "local"
+    PROVIDER = "provider"
+
+
 WATCH_FIELDS = {"symbol", "bid", "ask", "last", "volume", "timestamp", "exchange", "currency"}
 
 
@@ -55,10 +62,19 @@ def quote(
         metavar="SYMBOL...",
         help="One or more symbols. Example: AAPL MSFT GOOG",
     ),
+    max_age_ms: int | None = typer.Option(
+        None,
+        "--max-age-ms",
+        min=0,
+        help="Accept cached quotes up to this age instead of the daemon's cache TTL.",
+    ),
 ) -> None:
     state = get_state(ctx)
+    params: dict[str, object] = {"symbols": symbols}
+    if max_age_ms is not None:
+        params["max_age_ms"] = max_age_ms
     try:
-        data = run_async(daemon_request(state, "quote.snapshot", {"symbols": symbols}))
+        data = run_async(daemon_request(state, "quote.snapshot", params))
         print_output(data.get("quotes", []), json_output=state.json_output, title="Quotes")
     except BrokerError as exc:
         handle_error(exc, json_output=state.json_output)
@@ -80,18 +96,29 @@ def watch(
     chosen_fields = _parse_fields(fields)
 
     try:
-        while True:
-            data = run_async(daemon_request(state, "quote.snapshot", {"symbols": [symbol], "force": True}))
-            quote = (data.get("quotes") or [{}])[0]
-            row = {field: quote.get(field, "") for field in chosen_fields}
-            print(json.dumps(row, default=str, separators=(",", ":")))
-            time.sleep(interval_seconds)
+        run_async(_watch(state, symbol, chosen_fields, interval_seconds))
     except KeyboardInterrupt:
         return
     except BrokerError as exc:
         handle_error(exc, json_output=state.json_output)
 
 
+async def _watch(state: CLIState, symbol: str, fields: list[str], interval_seconds: float) -> None:
+    # One subscription for the whole session; the daemon pushes at most one quote per interval.
+    async with Client(
+        socket_path=state.config.runtime.socket_path,
+        timeout_seconds=state.config.runtime.request_timeout_seconds,
+    ) as client:
+        stream = await client.subscribe(["quotes"], symbols=[symbol], max_rate=1.0 / interval_seconds)
+        try:
+            async for event in stream:
+                quote = event.get("data", {}).get("payload", {})
+                row = {field: quote.get(field, "") for field in fields}
+                print(json.dumps(row, default=str, separators=(",", ":")), flush=True)
+        finally:
+            await stream.close()
+
+
 @app.command("chain", help="Fetch an option chain with optional expiry/strike filters.")
 def chain(
     ctx: typer.Context,
@@ -99,15 +126,32 @@ def chain(
     expiry: str | None = typer.Option(None, "--expiry", help="YYYY-MM"),
     strike_range: str | None = typer.Option(None, "--strike-range", help="0.8:1.2"),
     option_type: OptionType | None = typer.Option(None, "--type", case_sensitive=False, help="call|put"),
+    greeks: GreeksMode = typer.Option(
+        GreeksMode.AUTO,
+        "--greeks",
+        case_sensitive=False,
+        help="auto fills greeks the broker left empty, local recomputes all, provider returns them as sent.",
+    ),
+    rate: float | None = typer.Option(None, "--rate", help="Risk-free rate for local greeks (e.g. 0.04)."),
+    dividend_yield: float | None = typer.Option(None, "--dividend-yield", help="Dividend yield for local greeks."),
+    vol: float | None = typer.Option(
+        None, "--vol", help="Annualized vol (e.g. 0.25) for contracts without quotes or broker IV, such as IB chains."
+    ),
 ) -> None:
     state = get_state(ctx)
-    params: dict[str, object] = {"symbol": symbol}
+    params: dict[str, object] = {"symbol": symbol, "greeks": greeks.value}
     if expiry:
         params["expiry"] = expiry
     if strike_range:
         params["strike_range"] = strike_range
     if option_type:
         params["type"] = option_type.value
+    if rate is not None:
+        params["rate"] = rate
+    if dividend_yield is not None:
+        params["dividend_yield"] = dividend_yield
+    if vol is not None:
+        params["vol"] = vol
 
     try:
         data = run_async(daemon_request(state, "market.chain", params))
@@ -120,24 +164,27 @@ def chain(
 def history(
     ctx: typer.Context,
     symbol: str,
-    period: HistoryPeriod = typer.Option(..., "--period", case_sensitive=False, help="1d, 5d, 30d, 90d, 1y"),
+    period: HistoryPeriod = typer.Option(
+        HistoryPeriod.D30, "--period", case_sensitive=False, help="1d, 5d, 30d, 90d, 1y (ignored with --start)"
+    ),
     bar: BarSize = typer.Option(..., "--bar", case_sensitive=False, help="1m, 5m, 15m, 1h, 1d"),
     rth_only: bool = typer.Option(False, "--rth-only", help="Restrict to regular trading hours."),
+    start: str | None = typer.Option(None, "--start", help="Range start, ISO date or datetime (UTC unless offset given)."),
+    end: str | None = typer.Option(None, "--end", help="Range end, ISO date or datetime; defaults to now."),
 ) -> None:
     state = get_state(ctx)
+    params: dict[str, object] = {
+        "symbol": symbol,
+        "period": period.value,
+        "bar": bar.value,
+        "rth_only": rth_only,
+    }
+    if start is not None:
+        params["start"] = start
+    if end is not None:
+        params["end"] = end
     try:
-        data = run_async(
-            daemon_request(
-                state,
-                "market.history",
-                {
-                    "symbol": symbol,
-                    "period": period.value,
-                    "bar": bar.value,
-                    "rth_only": rth_only,
-                },
-            )
-        )
+        data = run_async(daemon_request(state, "market.history", params))
         print_output(data.get("bars", []), json_output=state.json_output, title="History")
     except BrokerError as exc:
         handle_error(exc, json_output=state.json_output)
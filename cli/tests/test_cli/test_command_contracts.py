@@ -8,6 +8,7 @@ from typer.testing import CliRunner
 
 import auth
 import audit
+import batch
 import daemon
 import market
 import orders
@@ -59,6 +60,7 @@ def rpc(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, dict[str, Any]]]:
         responses: dict[str, dict[str, Any]] = {
             "daemon.status": {"ok": True, "socket": "/tmp/broker.sock"},
             "daemon.stop": {"stopping": True},
+            "daemon.metrics": {"requests_total": 0, "in_flight": 0, "errors": {}, "commands": {}},
             "quote.snapshot": {"quotes": [{"symbol": "AAPL", "last": 180.0}]},
             "market.history": {"bars": []},
             "market.chain": {"symbol": "AAPL", "contracts": []},
@@ -83,10 +85,11 @@ def rpc(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, dict[str, Any]]]:
             "audit.orders": {"orders": []},
             "audit.risk": {"risk_events": []},
             "audit.export": {"output": "/tmp/audit.csv", "rows": 0},
+            "batch": {"results": [], "count": 0, "failed": 0},
         }
         return responses.get(command, {"ok": True})
 
-    for mod in (audit, daemon, market, orders, portfolio, risk):
+    for mod in (audit, batch, daemon, market, orders, portfolio, risk):
         monkeypatch.setattr(mod, "daemon_request", fake_daemon_request)
 
     return calls
@@ -101,6 +104,7 @@ def test_root_command_surface_contract(runner: CliRunner) -> None:
         "orders",
         "cancel",
         "fills",
+        "batch",
         "daemon",
         "auth",
         "quote",
@@ -125,7 +129,7 @@ def test_root_command_surface_contract(runner: CliRunner) -> None:
 @pytest.mark.parametrize(
     ("args", "expected"),
     [
-        (["daemon", "--help"], {"start", "stop", "status", "restart"}),
+        (["daemon", "--help"], {"start", "stop", "status", "metrics", "restart"}),
         (["auth", "--help"], {"etrade"}),
         (["order", "--help"], {"buy", "sell", "bracket", "status"}),
         (["audit", "--help"], {"orders", "commands", "risk", "export"}),
@@ -146,6 +150,8 @@ def test_subcommand_surface_contract(
     [
         (["quote", "AAPL"], "quote.snapshot"),
         (["chain", "AAPL"], "market.chain"),
+        (["chain", "AAPL", "--greeks", "local", "--rate", "0.05"], "market.chain"),
+        (["chain", "AAPL", "--vol", "0.25"], "market.chain"),
         (["history", "AAPL", "--period", "1d", "--bar", "1m"], "market.history"),
         (["order", "buy", "AAPL", "1"], "order.place"),
         (["order", "sell", "AAPL", "1"], "order.place"),
@@ -169,8 +175,10 @@ def test_subcommand_surface_contract(
         (["audit", "commands"], "audit.commands"),
         (["audit", "risk"], "audit.risk"),
         (["audit", "export", "--output", "/tmp/audit.csv"], "audit.export"),
+        (["batch", "-r", "portfolio.balance", "-r", 'quote.snapshot {"symbols":["AAPL"]}'], "batch"),
         (["daemon", "status"], "daemon.status"),
         (["daemon", "stop"], "daemon.stop"),
+        (["daemon", "metrics"], "daemon.metrics"),
     ],
 )
 def test_commands_are_usable_and_mapped_to_expected_rpc(
@@ -185,14 +193,57 @@ def test_commands_are_usable_and_mapped_to_expected_rpc(
     assert rpc[-1][0] == expected_rpc
 
 
-def test_watch_is_usable(monkeypatch: pytest.MonkeyPatch, runner: CliRunner, rpc: list[tuple[str, dict[str, Any]]]) -> None:
-    def stop_loop(_: float) -> None:
-        raise KeyboardInterrupt
+def test_watch_is_usable(monkeypatch: pytest.MonkeyPatch, runner: CliRunner) -> None:
+    subscribed: dict[str, Any] = {}
 
-    monkeypatch.setattr(market.time, "sleep", stop_loop)
-    result = runner.invoke(app, ["watch", "AAPL", "--interval", "1ms"])
-    assert result.exit_code == 0
-    assert rpc[-1][0] == "quote.snapshot"
+    class _FakeStream:
+        def __init__(self) -> None:
+            self.events = [{"topic": "quotes", "data": {"payload": {"symbol": "AAPL", "bid": 1.0, "ask": 1.1}}}]
+
+        def __aiter__(self) -> "_FakeStream":
+            return self
+
+        async def __anext__(self) -> dict[str, Any]:
+            if not self.events:
+                raise StopAsyncIteration
+            return self.events.pop(0)
+
+        async def close(self) -> None:
+            return None
+
+    class _FakeClient:
+        def __init__(self, **_: Any) -> None:
+            pass
+
+        async def __aenter__(self) -> "_FakeClient":
+            return self
+
+        async def __aexit__(self, *_: object) -> None:
+            return None
+
+        async def subscribe(self, topics: list[str], **kwargs: Any) -> _FakeStream:
+            subscribed.update(topics=topics, **kwargs)
+            return _FakeStream()
+
+    monkeypatch.setattr(market, "Client", _FakeClient)
+    result = runner.invoke(app, ["watch", "AAPL", "--fields", "bid,ask", "--interval", "250ms"])
+    assert result.exit_code == 0, result.stdout
+    assert subscribed == {"topics": ["quotes"], "symbols": ["AAPL"], "max_rate": 4.0}
+    assert result.stdout.strip() == '{"bid":1.0,"ask":1.1}'
+
+
+def test_batch_parses_requests(runner: CliRunner, rpc: list[tuple[str, dict[str, Any]]]) -> None:
+    result = runner.invoke(app, ["batch", "-r", "portfolio.balance", "-r", 'quote.snapshot {"symbols":["AAPL"]}'])
+    assert result.exit_code == 0, result.stdout
+    assert rpc[-1] == (
+        "batch",
+        {
+            "requests": [
+                {"command": "portfolio.balance", "params": {}},
+                {"command": "quote.snapshot", "params": {"symbols": ["AAPL"]}},
+            ]
+        },
+    )
 
 
 def test_daemon_start_uses_start_helper(monkeypatch: pytest.MonkeyPatch, runner: CliRunner) -> None:
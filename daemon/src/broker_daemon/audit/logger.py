@@ -2,44 +2,188 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
+import logging
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
+from itertools import groupby
 from pathlib import Path
 from typing import Any
 
 import aiosqlite
 
-from broker_daemon.audit.schema import SCHEMA_STATEMENTS
+from broker_daemon.audit.schema import MIGRATIONS, SCHEMA_STATEMENTS
 from broker_daemon.models.orders import FillRecord, OrderRecord
 
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PendingWrite:
+    query: str | None
+    params: tuple[Any, ...] = ()
+    done: asyncio.Future[None] | None = field(default=None)
+
 
 class AuditLogger:
-    def __init__(self, db_path: Path) -> None:
+    """Write-behind audit log.
+
+    Rows are queued and committed in groups with `executemany`; a batch is flushed when it
+    reaches `flush_size` rows or `flush_interval_seconds` after its first row. Writes marked
+    `durable=True` (and `flush()`) wait until their row is committed.
+
+    The database runs in WAL mode; queries go through a small pool of read-only connections
+    so long scans never hold up the writer.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        flush_size: int = 256,
+        flush_interval_seconds: float = 0.05,
+        queue_size: int = 10_000,
+        synchronous: str = "NORMAL",
+        cache_size: int = -8000,
+        mmap_size: int = 64 * 1024 * 1024,
+        readers: int = 2,
+    ) -> None:
         self._db_path = db_path
         self._conn: aiosqlite.Connection | None = None
+        self._synchronous = synchronous
+        self._cache_size = int(cache_size)
+        self._mmap_size = int(mmap_size)
+        self._reader_count = max(0, readers)
+        self._readers: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+        self._reader_conns: list[aiosqlite.Connection] = []
+        self._flush_size = max(1, flush_size)
+        self._flush_interval = max(0.0, flush_interval_seconds)
+        self._queue: asyncio.Queue[_PendingWrite] = asyncio.Queue(maxsize=max(1, queue_size))
+        self._writer_task: asyncio.Task[None] | None = None
 
     @property
     def db_path(self) -> Path:
         return self._db_path
 
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
     async def start(self) -> None:
         self._db_path.parent.mkdir(parents=True, exist_ok=True)
         self._conn = await aiosqlite.connect(self._db_path)
         self._conn.row_factory = aiosqlite.Row
+        await self._conn.execute("PRAGMA journal_mode=WAL")
+        await self._conn.execute(f"PRAGMA synchronous={self._synchronous}")
+        await self._apply_cache_pragmas(self._conn)
         for statement in SCHEMA_STATEMENTS:
             await self._conn.execute(statement)
         await self._conn.commit()
+        await self._migrate(self._conn)
+        for _ in range(self._reader_count):
+            reader = await aiosqlite.connect(f"{self._db_path.resolve().as_uri()}?mode=ro", uri=True)
+            reader.row_factory = aiosqlite.Row
+            await reader.execute("PRAGMA query_only=ON")
+            await self._apply_cache_pragmas(reader)
+            self._reader_conns.append(reader)
+            self._readers.put_nowait(reader)
+        self._writer_task = asyncio.create_task(self._write_loop())
+
+    async def _migrate(self, conn: aiosqlite.Connection) -> None:
+        async with conn.execute("PRAGMA user_version") as cursor:
+            row = await cursor.fetchone()
+        current = int(row[0]) if row else 0
+        for version, statements in MIGRATIONS:
+            if version <= current:
+                continue
+            for statement in statements:
+                await conn.execute(statement)
+            await conn.execute(f"PRAGMA user_version={version}")
+            await conn.commit()
+
+    async def _apply_cache_pragmas(self, conn: aiosqlite.Connection) -> None:
+        await conn.execute(f"PRAGMA cache_size={self._cache_size}")
+        await conn.execute(f"PRAGMA mmap_size={self._mmap_size}")
 
     async def close(self) -> None:
+        if self._writer_task:
+            await self.flush()
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+        for reader in self._reader_conns:
+            await reader.close()
+        self._reader_conns.clear()
+        self._readers = asyncio.Queue()
         if self._conn:
             await self._conn.close()
             self._conn = None
 
-    async def _execute(self, query: str, params: tuple[Any, ...]) -> None:
-        if not self._conn:
+    async def flush(self) -> None:
+        """Wait until every row queued so far is committed."""
+        if not self._writer_task:
+            return
+        done = asyncio.get_running_loop().create_future()
+        await self._queue.put(_PendingWrite(query=None, done=done))
+        await done
+
+    async def _execute(self, query: str, params: tuple[Any, ...], *, durable: bool = False) -> None:
+        if not self._conn or not self._writer_task:
             raise RuntimeError("AuditLogger has not been started")
-        await self._conn.execute(query, params)
-        await self._conn.commit()
+        done = asyncio.get_running_loop().create_future() if durable else None
+        # Blocks when the queue is full, pushing back on producers instead of growing unbounded.
+        await self._queue.put(_PendingWrite(query=query, params=params, done=done))
+        if done is not None:
+            await done
+
+    async def _write_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            urgent = batch[0].done is not None
+            deadline = loop.time() + self._flush_interval
+            while len(batch) < self._flush_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if urgent or timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+                    except asyncio.TimeoutError:
+                        break
+                batch.append(item)
+                urgent = urgent or item.done is not None
+            await self._commit_batch(batch)
+
+    async def _commit_batch(self, batch: list[_PendingWrite]) -> None:
+        error: BaseException | None = None
+        rows = [item for item in batch if item.query is not None]
+        if rows and self._conn:
+            try:
+                # Consecutive rows for the same statement go out in one executemany, keeping order.
+                for query, group in groupby(rows, key=lambda item: item.query):
+                    await self._conn.executemany(query, [item.params for item in group])
+                await self._conn.commit()
+            except Exception as exc:
+                logger.exception("failed to commit %d audit rows", len(rows))
+                error = exc
+                # Groups that ran before the failure must not ride along with the next batch's commit.
+                try:
+                    await self._conn.rollback()
+                except Exception:
+                    logger.exception("failed to roll back audit batch")
+        for item in batch:
+            if item.done is not None and not item.done.done():
+                if error is None:
+                    item.done.set_result(None)
+                else:
+                    item.done.set_exception(error)
 
     async def log_command(self, source: str, command: str, arguments: dict[str, Any], result_code: int) -> None:
         await self._execute(
@@ -53,7 +197,7 @@ class AuditLogger:
             ),
         )
 
-    async def upsert_order(self, record: OrderRecord) -> None:
+    async def upsert_order(self, record: OrderRecord, *, durable: bool = False) -> None:
         await self._execute(
             """
             INSERT INTO orders (
@@ -88,6 +232,7 @@ class AuditLogger:
                 record.commission,
                 json.dumps(record.risk_check_result, sort_keys=True),
             ),
+            durable=durable,
         )
 
     async def log_fill(self, fill: FillRecord) -> None:
@@ -109,10 +254,11 @@ class AuditLogger:
             ),
         )
 
-    async def log_risk_event(self, event_type: str, details: dict[str, Any]) -> None:
+    async def log_risk_event(self, event_type: str, details: dict[str, Any], *, durable: bool = False) -> None:
         await self._execute(
             "INSERT INTO risk_events (timestamp, event_type, details) VALUES (?, ?, ?)",
             (datetime.now(UTC).isoformat(), event_type, json.dumps(details, sort_keys=True)),
+            durable=durable,
         )
 
     async def log_connection_event(self, event: str, details: dict[str, Any]) -> None:
@@ -124,6 +270,16 @@ class AuditLogger:
     async def fetch_all(self, query: str, params: tuple[Any, ...] = ()) -> list[dict[str, Any]]:
         if not self._conn:
             raise RuntimeError("AuditLogger has not been started")
-        async with self._conn.execute(query, params) as cursor:
-            rows = await cursor.fetchall()
+        # Read-your-writes: queries see every row logged before them.
+        await self.flush()
+        if not self._reader_conns:
+            async with self._conn.execute(query, params) as cursor:
+                rows = await cursor.fetchall()
+            return [dict(row) for row in rows]
+        reader = await self._readers.get()
+        try:
+            async with reader.execute(query, params) as cursor:
+                rows = await cursor.fetchall()
+        finally:
+            self._readers.put_nowait(reader)
         return [dict(row) for row in rows]
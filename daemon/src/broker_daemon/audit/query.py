@@ -2,7 +2,13 @@
 
 from __future__ import annotations
 
+import asyncio
 import csv
+import gzip
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
@@ -22,19 +28,121 @@ def _where_clause(filters: dict[str, Any]) -> tuple[str, list[Any]]:
     return "WHERE " + " AND ".join(clauses), values
 
 
+def _keyset(
+    where: str,
+    values: list[Any],
+    *,
+    time_column: str | None,
+    since: str | None,
+    until: str | None,
+    before_id: int | None,
+    after_id: int | None,
+) -> tuple[str, list[Any]]:
+    bounds: list[tuple[str, Any]] = []
+    if time_column and since:
+        bounds.append((f"{time_column} >= ?", since))
+    if time_column and until:
+        bounds.append((f"{time_column} < ?", until))
+    if before_id is not None:
+        bounds.append(("id < ?", before_id))
+    if after_id is not None:
+        bounds.append(("id > ?", after_id))
+    for clause, value in bounds:
+        where = f"{where} {'AND' if where else 'WHERE'} {clause}"
+        values.append(value)
+    return where, values
+
+
+def _build_select(
+    *,
+    columns: str,
+    table: str,
+    filters: dict[str, Any],
+    time_column: str | None,
+    since: str | None,
+    until: str | None,
+    before_id: int | None = None,
+    after_id: int | None = None,
+    ascending: bool = False,
+) -> tuple[str, list[Any]]:
+    where, values = _where_clause(filters)
+    where, values = _keyset(
+        where,
+        values,
+        time_column=time_column,
+        since=since,
+        until=until,
+        before_id=before_id,
+        after_id=after_id,
+    )
+    return f"SELECT {columns} FROM {table} {where} ORDER BY id {'ASC' if ascending else 'DESC'}", values
+
+
+async def _select_page(
+    logger: AuditLogger,
+    *,
+    columns: str,
+    table: str,
+    filters: dict[str, Any],
+    time_column: str | None,
+    since: str | None,
+    until: str | None,
+    limit: int | None,
+    before_id: int | None,
+    after_id: int | None,
+) -> list[dict[str, Any]]:
+    # Paging forward from after_id takes the rows just above the cursor, then returns them newest first.
+    ascending = after_id is not None and before_id is None
+    query, values = _build_select(
+        columns=columns,
+        table=table,
+        filters=filters,
+        time_column=time_column,
+        since=since,
+        until=until,
+        before_id=before_id,
+        after_id=after_id,
+        ascending=ascending,
+    )
+    if limit is not None:
+        query += " LIMIT ?"
+        values.append(limit)
+    rows = await logger.fetch_all(query, tuple(values))
+    if ascending:
+        rows.reverse()
+    return rows
+
+
+def next_cursor(rows: list[dict[str, Any]], *, limit: int | None, after_id: int | None = None) -> dict[str, int] | None:
+    """Cursor for the page after `rows`, or None when the result was not truncated by `limit`."""
+    if limit is None or len(rows) < limit or not rows:
+        return None
+    if after_id is not None:
+        return {"after_id": int(rows[0]["id"])}
+    return {"before_id": int(rows[-1]["id"])}
+
+
 async def query_commands(
     logger: AuditLogger,
     *,
     source: str | None = None,
     since: str | None = None,
+    until: str | None = None,
+    limit: int | None = None,
+    before_id: int | None = None,
+    after_id: int | None = None,
 ) -> list[dict[str, Any]]:
-    where, values = _where_clause({"source": source})
-    if since:
-        where = f"{where} {'AND' if where else 'WHERE'} timestamp >= ?"
-        values.append(since)
-    return await logger.fetch_all(
-        f"SELECT timestamp, source, command, arguments, result_code FROM commands {where} ORDER BY id DESC",
-        tuple(values),
+    return await _select_page(
+        logger,
+        columns="id, timestamp, source, command, arguments, result_code",
+        table="commands",
+        filters={"source": source},
+        time_column="timestamp",
+        since=since,
+        until=until,
+        limit=limit,
+        before_id=before_id,
+        after_id=after_id,
     )
 
 
@@ -43,14 +151,22 @@ async def query_orders(
     *,
     status: str | None = None,
     since: str | None = None,
+    until: str | None = None,
+    limit: int | None = None,
+    before_id: int | None = None,
+    after_id: int | None = None,
 ) -> list[dict[str, Any]]:
-    where, values = _where_clause({"status": status})
-    if since:
-        where = f"{where} {'AND' if where else 'WHERE'} submitted_at >= ?"
-        values.append(since)
-    return await logger.fetch_all(
-        f"SELECT * FROM orders {where} ORDER BY id DESC",
-        tuple(values),
+    return await _select_page(
+        logger,
+        columns="*",
+        table="orders",
+        filters={"status": status},
+        time_column="submitted_at",
+        since=since,
+        until=until,
+        limit=limit,
+        before_id=before_id,
+        after_id=after_id,
     )
 
 
@@ -58,20 +174,120 @@ async def query_risk_events(
     logger: AuditLogger,
     *,
     event_type: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    limit: int | None = None,
+    before_id: int | None = None,
+    after_id: int | None = None,
 ) -> list[dict[str, Any]]:
-    where, values = _where_clause({"event_type": event_type})
-    return await logger.fetch_all(
-        f"SELECT timestamp, event_type, details FROM risk_events {where} ORDER BY id DESC",
+    return await _select_page(
+        logger,
+        columns="id, timestamp, event_type, details",
+        table="risk_events",
+        filters={"event_type": event_type},
+        time_column="timestamp",
+        since=since,
+        until=until,
+        limit=limit,
+        before_id=before_id,
+        after_id=after_id,
+    )
+
+
+@dataclass(frozen=True)
+class _ExportTable:
+    table: str
+    columns: str
+    filter_column: str
+    time_column: str
+
+
+EXPORT_TABLES = {
+    "commands": _ExportTable("commands", "id, timestamp, source, command, arguments, result_code", "source", "timestamp"),
+    "orders": _ExportTable("orders", "*", "status", "submitted_at"),
+    "risk": _ExportTable("risk_events", "id, timestamp, event_type, details", "event_type", "timestamp"),
+}
+EXPORT_FORMATS = ("csv", "ndjson")
+
+
+async def export_table(
+    logger: AuditLogger,
+    *,
+    table: str,
+    output: Path,
+    fmt: str = "csv",
+    gzip_output: bool = False,
+    filter_value: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    chunk_size: int = 5000,
+) -> dict[str, Any]:
+    """Stream matching rows to `output` in constant memory, off the event loop.
+
+    Rows are read from a dedicated read-only connection in `chunk_size` batches and written as
+    they arrive; the file is written under a temporary name and renamed into place when done.
+    """
+    spec = EXPORT_TABLES[table]
+    query, values = _build_select(
+        columns=spec.columns,
+        table=spec.table,
+        filters={spec.filter_column: filter_value},
+        time_column=spec.time_column,
+        since=since,
+        until=until,
+    )
+    # Include rows logged before the export started.
+    await logger.flush()
+    started = time.monotonic()
+    rows = await asyncio.to_thread(
+        _write_export,
+        logger.db_path,
+        query,
         tuple(values),
+        output,
+        fmt,
+        gzip_output,
+        chunk_size,
     )
+    return {
+        "output": str(output),
+        "rows": rows,
+        "format": fmt,
+        "gzip": gzip_output,
+        "bytes": output.stat().st_size,
+        "elapsed_ms": round((time.monotonic() - started) * 1000.0, 3),
+    }
 
 
-def export_rows_to_csv(rows: list[dict[str, Any]], path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    if not rows:
-        path.write_text("", encoding="utf-8")
-        return
-    with path.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
-        writer.writeheader()
-        writer.writerows(rows)
+def _write_export(
+    db_path: Path,
+    query: str,
+    params: tuple[Any, ...],
+    output: Path,
+    fmt: str,
+    gzip_output: bool,
+    chunk_size: int,
+) -> int:
+    output.parent.mkdir(parents=True, exist_ok=True)
+    partial = output.with_name(f".{output.name}.partial")
+    conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+    rows = 0
+    try:
+        cursor = conn.execute(query, params)
+        fieldnames = [col[0] for col in cursor.description or ()]
+        opener = gzip.open if gzip_output else open
+        with opener(partial, "wt", newline="", encoding="utf-8") as f:
+            csv_writer = csv.writer(f) if fmt == "csv" else None
+            while chunk := cursor.fetchmany(chunk_size):
+                if csv_writer is not None:
+                    if rows == 0:
+                        csv_writer.writerow(fieldnames)
+                    csv_writer.writerows(chunk)
+                else:
+                    f.writelines(json.dumps(dict(zip(fieldnames, row))) + "\n" for row in chunk)
+                rows += len(chunk)
+        partial.replace(output)
+    finally:
+        conn.close()
+        partial.unlink(missing_ok=True)
+    return rows
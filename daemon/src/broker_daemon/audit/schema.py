@@ -64,3 +64,22 @@ SCHEMA_STATEMENTS = [
     )
     """,
 ]
+
+# Versioned migrations applied on top of SCHEMA_STATEMENTS; PRAGMA user_version records the last one run.
+MIGRATIONS: list[tuple[int, list[str]]] = [
+    (
+        1,
+        [
+            "CREATE INDEX IF NOT EXISTS idx_commands_timestamp ON commands (timestamp)",
+            "CREATE INDEX IF NOT EXISTS idx_commands_source ON commands (source, id)",
+            "CREATE INDEX IF NOT EXISTS idx_orders_status ON orders (status, id)",
+            "CREATE INDEX IF NOT EXISTS idx_orders_submitted_at ON orders (submitted_at)",
+            "CREATE INDEX IF NOT EXISTS idx_orders_symbol ON orders (symbol, id)",
+            "CREATE INDEX IF NOT EXISTS idx_fills_symbol ON fills (symbol, id)",
+            "CREATE INDEX IF NOT EXISTS idx_fills_timestamp ON fills (timestamp)",
+            "CREATE INDEX IF NOT EXISTS idx_risk_events_type ON risk_events (event_type, id)",
+            "CREATE INDEX IF NOT EXISTS idx_risk_events_timestamp ON risk_events (timestamp)",
+            "CREATE INDEX IF NOT EXISTS idx_connection_events_timestamp ON connection_events (timestamp)",
+        ],
+    ),
+]
@@ -29,6 +29,14 @@ class GatewayConfig(BaseModel):
     client_id: int = 1
     auto_reconnect: bool = True
     reconnect_backoff_max: int = 30
+    # Qualified contracts (conIds) survive restarts here; None keeps them in memory only.
+    contract_cache_path: Path | None = DEFAULT_STATE_HOME / "ib-contracts.json"
+    # IB allows 60 historical-data requests per 10 minutes and flags identical ones within 15 seconds.
+    history_pacing_requests: int = 60
+    history_pacing_window_seconds: float = 600.0
+    history_dedupe_seconds: float = 15.0
+    # Requests queued longer than this fail fast with RATE_LIMITED and an ETA instead of waiting.
+    history_max_wait_seconds: float = 10.0
 
 
 class ETradeConfig(BaseModel):
@@ -60,6 +68,22 @@ class LoggingConfig(BaseModel):
     audit_db: Path = DEFAULT_STATE_HOME / "audit.db"
     log_file: Path = DEFAULT_STATE_HOME / "broker.log"
     max_log_size_mb: int = 100
+    audit_flush_size: int = 256
+    audit_flush_interval_ms: int = 50
+    audit_queue_size: int = 10_000
+    audit_sync_orders: bool = False
+    audit_synchronous: str = "NORMAL"
+    audit_cache_size: int = -8000
+    audit_mmap_size: int = 64 * 1024 * 1024
+    audit_readers: int = 2
+
+    @field_validator("audit_synchronous")
+    @classmethod
+    def _validate_synchronous(cls, value: str) -> str:
+        mode = value.strip().upper()
+        if mode not in {"OFF", "NORMAL", "FULL", "EXTRA"}:
+            raise ValueError("audit_synchronous must be OFF, NORMAL, FULL or EXTRA")
+        return mode
 
 
 class AgentConfig(BaseModel):
@@ -73,10 +97,46 @@ class OutputConfig(BaseModel):
     timezone: str = "America/New_York"
 
 
+class MarketConfig(BaseModel):
+    quote_cache_ttl_seconds: float = 2.0
+    quote_cache_size: int = 5000
+    # How long past its TTL a cached quote is still served (marked stale) while it refreshes in the background.
+    quote_stale_seconds: float = 30.0
+    # Live streams held at once; IB's default market-data line allowance is 100.
+    stream_lines: int = 90
+    # Snapshot requests for a symbol within stream_idle_seconds before it is streamed; 0 disables.
+    stream_after_requests: int = 3
+    stream_idle_seconds: float = 300.0
+    # Refresh interval for watched symbols that cannot be streamed.
+    quote_poll_seconds: float = 1.0
+    # Historical bars fetched so far; None keeps them in memory for this run only.
+    bar_store_path: Path | None = DEFAULT_STATE_HOME / "bars.db"
+    # Continuous annual rates used when option greeks are computed locally.
+    option_rate: float = 0.04
+    option_dividend_yield: float = 0.0
+
+
 class RuntimeConfig(BaseModel):
     socket_path: Path = DEFAULT_STATE_HOME / "broker.sock"
     pid_file: Path = DEFAULT_STATE_HOME / "broker-daemon.pid"
     request_timeout_seconds: int = 15
+    session_max_inflight: int = 64
+    # Full balance/positions/PnL reconcile. Providers without account push (E*Trade) have no other
+    # drawdown source, so it also runs after every fill and finished order there.
+    portfolio_reconcile_seconds: float = 30.0
+    # Breakers run from broker events; this sweep of cached state only backstops missed ones.
+    risk_monitor_fallback_seconds: float = 60.0
+    portfolio_max_age_seconds: float = 120.0
+    subscriber_queue_size: int = 1000
+    subscriber_overflow: str = "drop_oldest"
+    event_buffer_size: int = 1000
+    event_spill_path: Path | None = None
+    event_spill_max_bytes: int = 64 * 1024 * 1024
+    # Halt flag, runtime limit changes, overrides and order windows kept across restarts; None disables.
+    risk_state_path: Path | None = DEFAULT_STATE_HOME / "risk-state.ndjson"
+    # CSV of symbol,sector,asset_class driving sector exposure and sector risk limits; re-read when it changes.
+    classification_path: Path | None = DEFAULT_STATE_HOME / "classifications.csv"
+    classification_refresh_seconds: float = 30.0
 
 
 class AppConfig(BaseModel):
@@ -87,6 +147,7 @@ class AppConfig(BaseModel):
     logging: LoggingConfig = Field(default_factory=LoggingConfig)
     agent: AgentConfig = Field(default_factory=AgentConfig)
     output: OutputConfig = Field(default_factory=OutputConfig)
+    market: MarketConfig = Field(default_factory=MarketConfig)
     runtime: RuntimeConfig = Field(default_factory=RuntimeConfig)
 
     @field_validator("provider")
@@ -100,10 +161,20 @@ class AppConfig(BaseModel):
     def expanded(self) -> "AppConfig":
         clone = self.model_copy(deep=True)
         clone.etrade.token_path = clone.etrade.token_path.expanduser()
+        if clone.market.bar_store_path is not None:
+            clone.market.bar_store_path = clone.market.bar_store_path.expanduser()
+        if clone.gateway.contract_cache_path is not None:
+            clone.gateway.contract_cache_path = clone.gateway.contract_cache_path.expanduser()
         clone.logging.audit_db = clone.logging.audit_db.expanduser()
         clone.logging.log_file = clone.logging.log_file.expanduser()
         clone.runtime.socket_path = clone.runtime.socket_path.expanduser()
         clone.runtime.pid_file = clone.runtime.pid_file.expanduser()
+        if clone.runtime.event_spill_path is not None:
+            clone.runtime.event_spill_path = clone.runtime.event_spill_path.expanduser()
+        if clone.runtime.risk_state_path is not None:
+            clone.runtime.risk_state_path = clone.runtime.risk_state_path.expanduser()
+        if clone.runtime.classification_path is not None:
+            clone.runtime.classification_path = clone.runtime.classification_path.expanduser()
         return clone
 
     def ensure_dirs(self) -> None:
@@ -113,6 +184,8 @@ class AppConfig(BaseModel):
         expanded.logging.audit_db.parent.mkdir(parents=True, exist_ok=True)
         expanded.logging.log_file.parent.mkdir(parents=True, exist_ok=True)
         expanded.etrade.token_path.parent.mkdir(parents=True, exist_ok=True)
+        if expanded.runtime.event_spill_path is not None:
+            expanded.runtime.event_spill_path.parent.mkdir(parents=True, exist_ok=True)
 
 
 def _coerce_env_value(value: str) -> Any:
@@ -152,7 +225,7 @@ def _read_broker_json(path: Path) -> dict[str, Any]:
 def _extract_broker_config(data: dict[str, Any]) -> dict[str, Any]:
     out: dict[str, Any] = {}
     raw_broker = data.get("broker")
-    sections = {"gateway", "etrade", "risk", "logging", "agent", "output", "runtime"}
+    sections = {"gateway", "etrade", "risk", "logging", "agent", "output", "market", "runtime"}
 
     if isinstance(raw_broker, dict):
         provider = raw_broker.get("provider")
@@ -175,7 +248,7 @@ def _extract_broker_config(data: dict[str, Any]) -> dict[str, Any]:
 
 def _apply_env_overrides(data: dict[str, Any]) -> dict[str, Any]:
     result = dict(data)
-    sections = {"gateway", "etrade", "risk", "logging", "agent", "output", "runtime"}
+    sections = {"gateway", "etrade", "risk", "logging", "agent", "output", "market", "runtime"}
     for key, raw in os.environ.items():
         if key == "BROKER_PROVIDER":
             result["provider"] = raw.strip()
@@ -0,0 +1,273 @@
+"""Local SQLite store of historical bars, filled incrementally from the provider."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import math
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import aiosqlite
+
+from broker_daemon.exceptions import BrokerError, ErrorCode
+from broker_daemon.models.market import Bar
+from broker_daemon.providers import BrokerProvider
+from broker_daemon.providers.pacing import PacingDeferred
+
+BAR_SECONDS = {"1m": 60, "5m": 300, "15m": 900, "1h": 3600, "1d": 86400}
+# Periods count trading days, like IB's "N D" durations; "1y" is calendar time.
+PERIOD_TRADING_DAYS = {"1d": 1, "5d": 5, "30d": 30, "90d": 90}
+PERIOD_CALENDAR_DAYS = {"1y": 365}
+# The still-forming tail of a range is refetched at most this often.
+TAIL_REFRESH_SECONDS = 60
+# Longest span sent in one provider request: IB's "365 D". A day more rounds up to "2 Y".
+MAX_FETCH_SECONDS = 365 * 86_400
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS bars (
+        symbol TEXT NOT NULL,
+        bar TEXT NOT NULL,
+        rth INTEGER NOT NULL,
+        ts INTEGER NOT NULL,
+        open REAL NOT NULL,
+        high REAL NOT NULL,
+        low REAL NOT NULL,
+        close REAL NOT NULL,
+        volume REAL NOT NULL,
+        PRIMARY KEY (symbol, bar, rth, ts)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS coverage (
+        symbol TEXT NOT NULL,
+        bar TEXT NOT NULL,
+        rth INTEGER NOT NULL,
+        start_ts INTEGER NOT NULL,
+        end_ts INTEGER NOT NULL,
+        PRIMARY KEY (symbol, bar, rth, start_ts)
+    ) WITHOUT ROWID
+    """,
+)
+
+_Key = tuple[str, str, int]
+
+
+@dataclass
+class HistoryResult:
+    bars: list[Bar]
+    # Share of the requested time span that was already in the store.
+    hit_ratio: float
+    fetched: list[tuple[datetime, datetime]] = field(default_factory=list)
+
+
+class BarStore:
+    """Historical bars keyed by symbol, bar size and RTH flag, with the time ranges already fetched.
+
+    A request only goes to the provider for the parts of its range the store has not covered
+    yet; those bars are merged in and the covered ranges extended.
+    """
+
+    def __init__(self, path: Path | None, provider: BrokerProvider) -> None:
+        self._path = path
+        self._provider = provider
+        self._conn: aiosqlite.Connection | None = None
+        self._open_lock = asyncio.Lock()
+        self._locks: dict[_Key, asyncio.Lock] = {}
+        self._pending: set[asyncio.Task[None]] = set()
+        self._requests = 0
+        self._full_hits = 0
+        self._seconds_requested = 0
+        self._seconds_served = 0
+        self._bars_fetched = 0
+
+    async def open(self) -> None:
+        async with self._open_lock:
+            if self._conn is not None:
+                return
+            if self._path is not None:
+                self._path.parent.mkdir(parents=True, exist_ok=True)
+            conn = await aiosqlite.connect(str(self._path) if self._path else ":memory:")
+            await conn.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                await conn.execute(statement)
+            await conn.commit()
+            self._conn = conn
+
+    async def close(self) -> None:
+        for task in list(self._pending):
+            task.cancel()
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+    async def history(
+        self,
+        symbol: str,
+        bar: str,
+        rth_only: bool,
+        *,
+        period: str = "30d",
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> HistoryResult:
+        """Bars in [start, end]; without `start`, the `period` before `end` (default now)."""
+        if bar not in BAR_SECONDS:
+            raise BrokerError(ErrorCode.INVALID_ARGS, f"unsupported bar size '{bar}'")
+        now = datetime.now(UTC)
+        end = min(end or now, now)
+        sessions: int | None = None
+        if start is None:
+            start, sessions = _period_start(period, end)
+        if start >= end:
+            raise BrokerError(ErrorCode.INVALID_ARGS, "start must be before end")
+
+        await self.open()
+        key = (symbol.upper(), bar, int(rth_only))
+        lo, hi = int(start.timestamp()), int(end.timestamp())
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            coverage = await self._coverage(key)
+            gaps = _subtract((lo, hi), coverage)
+            # A short gap at the live edge is served from the store until it is worth a round trip.
+            gaps = [(s, e) for s, e in gaps if e - s >= min(BAR_SECONDS[bar], TAIL_REFRESH_SECONDS) or e < hi]
+            stored_ends = {e for _, e in coverage}
+            for gap_lo, gap_hi in gaps:
+                # Where the gap meets stored bars, start one bar early so a bar that was still
+                # forming at the last fetch is replaced; cold ranges are fetched exactly.
+                fetch_lo = gap_lo - BAR_SECONDS[bar] if gap_lo in stored_ends else gap_lo
+                for chunk_lo in range(fetch_lo, gap_hi, MAX_FETCH_SECONDS):
+                    chunk_hi = min(chunk_lo + MAX_FETCH_SECONDS, gap_hi)
+                    covered = (max(chunk_lo, gap_lo), chunk_hi)
+                    try:
+                        fetched = await self._provider.history_range(
+                            key[0], bar, rth_only, _from_ts(chunk_lo), _from_ts(chunk_hi)
+                        )
+                    except PacingDeferred as deferred:
+                        # The fetch stays queued; store its bars when it runs so the retry is a hit.
+                        deferred.result.add_done_callback(functools.partial(self._merge_later, key, covered))
+                        raise
+                    await self._merge(key, fetched, covered)
+            bars = await self._select(key, lo, hi)
+
+        missing = sum(e - s for s, e in gaps)
+        self._requests += 1
+        self._full_hits += not gaps
+        self._seconds_requested += hi - lo
+        self._seconds_served += hi - lo - missing
+        if sessions is not None:
+            bars = _last_sessions(bars, sessions)
+        return HistoryResult(
+            bars=bars,
+            hit_ratio=round(1 - missing / (hi - lo), 4),
+            fetched=[(_from_ts(s), _from_ts(e)) for s, e in gaps],
+        )
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "path": str(self._path) if self._path else None,
+            "requests": self._requests,
+            "full_hits": self._full_hits,
+            "hit_ratio": round(self._full_hits / self._requests, 4) if self._requests else None,
+            "span_hit_ratio": round(self._seconds_served / self._seconds_requested, 4) if self._seconds_requested else None,
+            "bars_fetched": self._bars_fetched,
+        }
+
+    def _merge_later(self, key: _Key, covered: tuple[int, int], result: asyncio.Future[list[Bar]]) -> None:
+        if result.cancelled() or result.exception() is not None or self._conn is None:
+            return
+        task = asyncio.ensure_future(self._merge_locked(key, result.result(), covered))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _merge_locked(self, key: _Key, bars: list[Bar], covered: tuple[int, int]) -> None:
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            if self._conn is not None:
+                await self._merge(key, bars, covered)
+
+    async def _coverage(self, key: _Key) -> list[tuple[int, int]]:
+        assert self._conn is not None
+        cursor = await self._conn.execute(
+            "SELECT start_ts, end_ts FROM coverage WHERE symbol = ? AND bar = ? AND rth = ? ORDER BY start_ts", key
+        )
+        return [(int(s), int(e)) for s, e in await cursor.fetchall()]
+
+    async def _merge(self, key: _Key, bars: list[Bar], covered: tuple[int, int]) -> None:
+        assert self._conn is not None
+        rows = [(*key, _to_ts(b.time), b.open, b.high, b.low, b.close, b.volume) for b in bars]
+        intervals = _union([*await self._coverage(key), covered])
+        await self._conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        await self._conn.execute("DELETE FROM coverage WHERE symbol = ? AND bar = ? AND rth = ?", key)
+        await self._conn.executemany(
+            "INSERT INTO coverage VALUES (?, ?, ?, ?, ?)", [(*key, s, e) for s, e in intervals]
+        )
+        await self._conn.commit()
+        self._bars_fetched += len(rows)
+
+    async def _select(self, key: _Key, lo: int, hi: int) -> list[Bar]:
+        assert self._conn is not None
+        cursor = await self._conn.execute(
+            "SELECT ts, open, high, low, close, volume FROM bars"
+            " WHERE symbol = ? AND bar = ? AND rth = ? AND ts >= ? AND ts <= ? ORDER BY ts",
+            (*key, lo, hi),
+        )
+        return [
+            Bar(symbol=key[0], time=_from_ts(ts), open=o, high=h, low=l, close=c, volume=v)
+            for ts, o, h, l, c, v in await cursor.fetchall()
+        ]
+
+
+def _period_start(period: str, end: datetime) -> tuple[datetime, int | None]:
+    if period in PERIOD_CALENDAR_DAYS:
+        return end - timedelta(days=PERIOD_CALENDAR_DAYS[period]), None
+    if period in PERIOD_TRADING_DAYS:
+        sessions = PERIOD_TRADING_DAYS[period]
+        # Enough calendar days to span that many sessions across weekends and holidays.
+        return end - timedelta(days=math.ceil(sessions * 7 / 5) + 4), sessions
+    raise BrokerError(ErrorCode.INVALID_ARGS, f"unsupported period '{period}'")
+
+
+def _last_sessions(bars: list[Bar], sessions: int) -> list[Bar]:
+    days = sorted({b.time.date() for b in bars})[-sessions:]
+    if not days:
+        return bars
+    return [b for b in bars if b.time.date() >= days[0]]
+
+
+def _union(intervals: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    merged: list[tuple[int, int]] = []
+    for s, e in sorted(intervals):
+        if merged and s <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], e))
+        else:
+            merged.append((s, e))
+    return merged
+
+
+def _subtract(span: tuple[int, int], covered: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    lo, hi = span
+    gaps: list[tuple[int, int]] = []
+    for s, e in covered:
+        if e <= lo or s >= hi:
+            continue
+        if s > lo:
+            gaps.append((lo, s))
+        lo = max(lo, e)
+    if lo < hi:
+        gaps.append((lo, hi))
+    return gaps
+
+
+def _to_ts(value: datetime | date) -> int:
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day, tzinfo=UTC)
+    elif value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return int(value.timestamp())
+
+
+def _from_ts(ts: int) -> datetime:
+    return datetime.fromtimestamp(ts, UTC)
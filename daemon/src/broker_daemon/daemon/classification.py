@@ -0,0 +1,155 @@
+"""Local sector and asset-class classification of symbols."""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import logging
+import sys
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Any
+
+from broker_daemon.models.portfolio import ExposureEntry
+
+logger = logging.getLogger(__name__)
+
+UNCLASSIFIED = "unclassified"
+CLASSIFICATION_GROUPS = {"sector", "asset_class"}
+
+
+class ClassificationTable:
+    """Symbol to sector/asset-class lookup loaded from a CSV file; never calls the broker.
+
+    The file has a `symbol,sector,asset_class` header and one row per symbol. Labels are
+    interned, so thousands of symbols share one string per sector, and lookups are a single
+    dict probe. After `start()` a background task stats the file every `refresh_seconds` and
+    re-reads it in a worker thread when its mtime changes; the request path never touches the
+    file. Reloads swap in new dicts rather than mutating, so callers may hold on to `sectors`.
+    """
+
+    def __init__(self, path: Path | None, *, refresh_seconds: float = 30.0) -> None:
+        self._path = path
+        self._refresh_seconds = refresh_seconds
+        self._sectors: dict[str, str] = {}
+        self._asset_classes: dict[str, str] = {}
+        self._mtime: float | None = None
+        self._version = 0
+        self._refresh_task: asyncio.Task[None] | None = None
+
+    @property
+    def version(self) -> int:
+        """Bumped on every reload so callers can cache derived values."""
+        return self._version
+
+    @property
+    def sectors(self) -> dict[str, str]:
+        return self._sectors
+
+    async def start(self) -> None:
+        await self.refresh()
+        if self._path is not None and self._refresh_seconds > 0:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def refresh(self) -> bool:
+        """Reload in a worker thread if the file changed; True when a new table was swapped in."""
+        if self._path is None:
+            return False
+        mtime = await asyncio.to_thread(_mtime, self._path)
+        if mtime == self._mtime:
+            return False
+        if mtime is None:
+            self._swap({}, {}, None)
+            return True
+        loaded = await asyncio.to_thread(self._read)
+        if loaded is None:
+            return False
+        self._swap(*loaded)
+        return True
+
+    def _read(self) -> tuple[dict[str, str], dict[str, str], float] | None:
+        # Runs in a worker thread: builds new dicts and leaves the table untouched.
+        if self._path is None:
+            return None
+        try:
+            mtime = self._path.stat().st_mtime
+            with self._path.open(encoding="utf-8", newline="") as fh:
+                rows = list(csv.DictReader(fh))
+        except FileNotFoundError:
+            return None
+        except (OSError, csv.Error, UnicodeDecodeError):
+            logger.warning("ignoring unreadable classification table %s", self._path, exc_info=True)
+            return None
+
+        sectors: dict[str, str] = {}
+        asset_classes: dict[str, str] = {}
+        for row in rows:
+            symbol = (row.get("symbol") or "").strip().upper()
+            if not symbol:
+                continue
+            sector = (row.get("sector") or "").strip()
+            asset_class = (row.get("asset_class") or "").strip()
+            if sector:
+                sectors[sys.intern(symbol)] = sys.intern(sector)
+            if asset_class:
+                asset_classes[sys.intern(symbol)] = sys.intern(asset_class)
+        return sectors, asset_classes, mtime
+
+    def _swap(self, sectors: dict[str, str], asset_classes: dict[str, str], mtime: float | None) -> None:
+        self._sectors, self._asset_classes, self._mtime = sectors, asset_classes, mtime
+        self._version += 1
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._refresh_seconds)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("classification refresh failed")
+
+    def sector_values(self, position_values: Mapping[str, float]) -> dict[str, float]:
+        """Signed position value per sector, for symbols that have one."""
+        totals: dict[str, float] = {}
+        for symbol, value in position_values.items():
+            sector = self._sectors.get(symbol)
+            if sector is not None:
+                totals[sector] = totals.get(sector, 0.0) + value
+        return totals
+
+    def group_exposure(self, rows: Iterable[ExposureEntry], by: str) -> list[ExposureEntry]:
+        """Regroup per-symbol exposure rows by sector or asset class."""
+        labels = self._sectors if by == "sector" else self._asset_classes
+        buckets: dict[str, list[float]] = {}
+        for row in rows:
+            bucket = buckets.setdefault(labels.get(row.key.upper(), UNCLASSIFIED), [0.0, 0.0])
+            bucket[0] += row.exposure_value
+            bucket[1] += row.exposure_pct
+        return [
+            ExposureEntry(key=key, exposure_value=value, exposure_pct=pct)
+            for key, (value, pct) in sorted(buckets.items())
+        ]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "path": str(self._path) if self._path else None,
+            "symbols": len(self._sectors.keys() | self._asset_classes.keys()),
+            "sectors": len(set(self._sectors.values())),
+            "asset_classes": len(set(self._asset_classes.values())),
+            "version": self._version,
+        }
+
+
+def _mtime(path: Path) -> float | None:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
@@ -0,0 +1,185 @@
+"""Singleflight coalescing of concurrent provider reads."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from broker_daemon.models.market import Quote
+
+COALESCED_READS = ("positions", "balance", "pnl", "exposure", "trades", "fills", "history", "option_chain")
+
+_UNCOALESCED: ContextVar[bool] = ContextVar("uncoalesced", default=False)
+
+
+@contextmanager
+def uncoalesced() -> Iterator[None]:
+    """Send reads made in this context as their own broker calls instead of joining in-flight ones.
+
+    An in-flight call may have been sent before an event the caller needs reflected, e.g. a
+    reconcile after a fill.
+    """
+    token = _UNCOALESCED.set(True)
+    try:
+        yield
+    finally:
+        _UNCOALESCED.reset(token)
+
+
+class ReadCoalescer:
+    """Lets concurrent identical provider reads share one broker round trip.
+
+    Calls with the same method and arguments join the in-flight call instead of issuing their
+    own. Quote requests are merged by symbol: symbols already being fetched are shared, and the
+    remaining symbols of every caller in the same event-loop turn go out as one batched call.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[tuple[Any, ...], asyncio.Future[Any]] = {}
+        self._calls: Counter[str] = Counter()
+        self._shared: Counter[str] = Counter()
+        self._provider_calls: Counter[str] = Counter()
+        self._quote: Any = None
+        self._quote_inflight: dict[str, asyncio.Future[Quote | None]] = {}
+        self._quote_pending: dict[str, asyncio.Future[Quote | None]] = {}
+        self._quote_groups: list[list[str]] = []
+        self._quote_symbols = 0
+        self._quote_symbols_shared = 0
+
+    def install(self, provider: Any, names: Iterable[str] = COALESCED_READS) -> None:
+        """Wrap `provider`'s read methods in place, like `DaemonMetrics.instrument`."""
+        for name in names:
+            method = getattr(provider, name, None)
+            if method is not None:
+                setattr(provider, name, self._singleflight(name, method))
+        self._quote = getattr(provider, "quote", None)
+        if self._quote is not None:
+
+            @functools.wraps(self._quote)
+            async def _quote(symbols: list[str]) -> list[Quote]:
+                return await self.quote(symbols)
+
+            setattr(provider, "quote", _quote)
+
+    def _singleflight(self, name: str, method: Any) -> Any:
+        @functools.wraps(method)
+        async def _wrapper(*args: Any, **kwargs: Any) -> Any:
+            self._calls[name] += 1
+            if _UNCOALESCED.get():
+                self._provider_calls[name] += 1
+                return await method(*args, **kwargs)
+            key = (name, args, tuple(sorted(kwargs.items())))
+            try:
+                future = self._inflight.get(key)
+            except TypeError:  # unhashable arguments are never shared
+                self._provider_calls[name] += 1
+                return await method(*args, **kwargs)
+            if future is not None:
+                self._shared[name] += 1
+            else:
+                self._provider_calls[name] += 1
+                future = asyncio.ensure_future(method(*args, **kwargs))
+                self._inflight[key] = future
+                future.add_done_callback(lambda _: self._inflight.pop(key, None))
+            # Shielded so one caller giving up does not cancel the call for the others.
+            return await asyncio.shield(future)
+
+        return _wrapper
+
+    async def quote(self, symbols: list[str]) -> list[Quote]:
+        self._calls["quote"] += 1
+        wanted = list(dict.fromkeys(s.upper() for s in symbols))
+        futures: list[asyncio.Future[Quote | None]] = []
+        missing: list[str] = []
+        for sym in wanted:
+            future = self._quote_inflight.get(sym)
+            if future is None:
+                future = asyncio.get_running_loop().create_future()
+                future.add_done_callback(_consume_exception)
+                self._quote_inflight[sym] = self._quote_pending[sym] = future
+                missing.append(sym)
+            else:
+                self._quote_symbols_shared += 1
+            futures.append(future)
+        self._quote_symbols += len(wanted)
+        if missing:
+            if not self._quote_groups:
+                asyncio.get_running_loop().call_soon(self._flush_quotes)
+            self._quote_groups.append(missing)
+        elif wanted:
+            self._shared["quote"] += 1
+        results = await asyncio.gather(*(asyncio.shield(f) for f in futures))
+        return [q for q in results if q is not None]
+
+    def stats(self) -> dict[str, Any]:
+        names = sorted(set(self._calls) | set(self._provider_calls))
+        return {
+            "methods": {
+                name: {
+                    "calls": self._calls[name],
+                    "shared": self._shared[name],
+                    "provider_calls": self._provider_calls[name],
+                }
+                for name in names
+            },
+            "quote_symbols": {"requested": self._quote_symbols, "shared": self._quote_symbols_shared},
+        }
+
+    def _flush_quotes(self) -> None:
+        batch, groups = self._quote_pending, self._quote_groups
+        self._quote_pending, self._quote_groups = {}, []
+        asyncio.ensure_future(self._run_quote_batch(batch, groups))
+
+    async def _run_quote_batch(self, batch: dict[str, asyncio.Future[Quote | None]], groups: list[list[str]]) -> None:
+        try:
+            try:
+                self._provider_calls["quote"] += 1
+                _resolve(batch, await self._quote(list(batch)))
+            except Exception as exc:
+                if len(groups) == 1:
+                    _fail(batch.values(), exc)
+                    return
+                # Merged callers should not fail because of each other's symbols: retry each on its own.
+                for group in groups:
+                    pending = {s: batch[s] for s in group if not batch[s].done()}
+                    if not pending:
+                        continue
+                    try:
+                        self._provider_calls["quote"] += 1
+                        _resolve(pending, await self._quote(list(pending)))
+                    except Exception as group_exc:
+                        _fail(pending.values(), group_exc)
+        except BaseException as exc:
+            _fail(batch.values(), exc)
+            raise
+        finally:
+            for sym, future in batch.items():
+                if self._quote_inflight.get(sym) is future:
+                    del self._quote_inflight[sym]
+
+
+def _resolve(futures: dict[str, asyncio.Future[Quote | None]], quotes: list[Quote]) -> None:
+    by_symbol = {q.symbol.upper(): q for q in quotes}
+    for sym, future in futures.items():
+        if not future.done():
+            future.set_result(by_symbol.get(sym))
+
+
+def _fail(futures: Iterable[asyncio.Future[Any]], exc: BaseException) -> None:
+    for future in futures:
+        if not future.done():
+            if isinstance(exc, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(exc)
+
+
+def _consume_exception(future: asyncio.Future[Any]) -> None:
+    # Every waiter may have been cancelled; don't log "exception was never retrieved".
+    if not future.cancelled():
+        future.exception()
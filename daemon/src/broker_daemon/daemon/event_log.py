@@ -0,0 +1,231 @@
+"""Sequenced event history so reconnecting subscribers can replay what they missed."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import uuid
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any
+
+from broker_daemon.protocol import EventEnvelope, encode_model, frame_payload
+
+_TAIL_BYTES = 64 * 1024
+
+
+@dataclass
+class Replay:
+    """Events a subscriber missed, captured at subscribe time so nothing is lost or duplicated."""
+
+    since_seq: int
+    topics: frozenset[str]
+    frames: list[bytes] = field(default_factory=list)
+    # Events in (since_seq, spill_through] were evicted from memory and are read back from disk.
+    spill_through: int | None = None
+    gap: bool = False
+
+
+def _new_epoch() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class EventLog:
+    """Assigns every broadcast event a daemon-wide sequence number and keeps recent history.
+
+    Each topic has its own ring buffer of `buffer_size` events, so chatty topics cannot push
+    rare ones (fills, risk) out of history. With `spill_path` set, events evicted from memory
+    are appended to an NDJSON file, rotated once it exceeds `spill_max_bytes`, and the
+    sequence resumes from that file after a restart. `epoch` names the sequence: it is new
+    whenever numbering starts over, so a `since_seq` from another epoch is never replayed.
+    """
+
+    def __init__(
+        self,
+        *,
+        buffer_size: int = 1000,
+        spill_path: Path | None = None,
+        spill_max_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        self._buffer_size = max(1, buffer_size)
+        self._buffers: dict[str, deque[tuple[int, bytes, EventEnvelope]]] = {}
+        # Highest sequence evicted from each topic's ring buffer.
+        self._evicted_through: dict[str, int] = {}
+        self._seq = 0
+        self._epoch = _new_epoch()
+        self._spill_path = spill_path
+        self._spill_max_bytes = spill_max_bytes
+        self._spill: IO[str] | None = None
+        self._spill_last_seq = 0
+        self._rotated_last_seq = 0
+        # Highest sequence that no longer exists anywhere, memory or disk.
+        self._lost_through = 0
+        # Events from a previous run are only on disk.
+        self._restored_through = 0
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    @property
+    def epoch(self) -> str:
+        return self._epoch
+
+    def open(self) -> None:
+        if self._spill_path is None:
+            return
+        self._spill_path.parent.mkdir(parents=True, exist_ok=True)
+        rotated = _rotated_path(self._spill_path)
+        rotated_tail = _last_record_in(rotated)
+        tail = _last_record_in(self._spill_path) or rotated_tail
+        self._rotated_last_seq = int(rotated_tail["seq"]) if rotated_tail else 0
+        self._spill_last_seq = int(tail["seq"]) if tail else 0
+        self._seq = self._restored_through = self._spill_last_seq
+        if tail and isinstance(tail.get("epoch"), str):
+            # The sequence continues from disk, so it keeps the previous run's epoch.
+            self._epoch = tail["epoch"]
+        # Anything before the first spilled event of a previous run cannot be replayed.
+        self._lost_through = 0 if self._seq == 0 else _first_seq_in(rotated if rotated.exists() else self._spill_path) - 1
+        self._spill = self._spill_path.open("a", encoding="utf-8")
+
+    def close(self) -> None:
+        if self._spill is None:
+            return
+        # Keep the in-memory tail so a restarted daemon can still replay it.
+        for envelope in sorted((item[2] for buf in self._buffers.values() for item in buf), key=lambda e: e.seq or 0):
+            self._write_spill(envelope)
+        self._buffers.clear()
+        self._spill.close()
+        self._spill = None
+
+    def append(self, topic: str, data: dict[str, Any]) -> tuple[EventEnvelope, bytes]:
+        """Sequence one event and return its envelope with the encoded frame."""
+        self._seq += 1
+        envelope = EventEnvelope(topic=topic, data=data, seq=self._seq, epoch=self._epoch)
+        frame = frame_payload(encode_model(envelope))
+        buf = self._buffers.setdefault(topic, deque())
+        if len(buf) >= self._buffer_size:
+            seq, _, evicted = buf.popleft()
+            self._evicted_through[topic] = seq
+            if self._spill is not None:
+                self._write_spill(evicted)
+        buf.append((self._seq, frame, envelope))
+        return envelope, frame
+
+    def replay(self, since_seq: int, topics: Iterable[str], *, epoch: str | None = None) -> Replay:
+        """Capture in-memory events after `since_seq`; call `load_spill` for any older ones."""
+        wanted = frozenset(topics)
+        replay = Replay(since_seq=since_seq, topics=wanted)
+        if epoch is not None and epoch != self._epoch:
+            # Numbering restarted since the client's last event; its seq means nothing here.
+            replay.gap = True
+            return replay
+        if since_seq > self._seq:
+            # Sequence from a previous daemon run that was not spilled to disk.
+            replay.gap = True
+            return replay
+        items = [item for topic in wanted for item in self._buffers.get(topic, ()) if item[0] > since_seq]
+        items.sort(key=lambda item: item[0])
+        replay.frames = [frame for _, frame, _ in items]
+        evicted = max([self._restored_through, *(self._evicted_through.get(topic, 0) for topic in wanted)])
+        if since_seq < evicted:
+            if self._spill is None:
+                replay.gap = True
+            else:
+                replay.spill_through = evicted
+                replay.gap = since_seq < self._lost_through
+        return replay
+
+    async def load_spill(self, replay: Replay) -> list[bytes]:
+        """All frames for `replay` in sequence order, reading evicted events back from disk."""
+        if replay.spill_through is None or self._spill_path is None:
+            return replay.frames
+        if self._spill is not None:
+            self._spill.flush()
+        envelopes = await asyncio.to_thread(
+            _read_spill,
+            [_rotated_path(self._spill_path), self._spill_path],
+            replay.since_seq,
+            replay.spill_through,
+            replay.topics,
+        )
+        return [frame_payload(encode_model(env)) for env in envelopes] + replay.frames
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "last_seq": self._seq,
+            "epoch": self._epoch,
+            "buffer_size": self._buffer_size,
+            "buffered": {topic: len(buf) for topic, buf in sorted(self._buffers.items())},
+            "spill": str(self._spill_path) if self._spill_path else None,
+            "replayable_from": self._lost_through + 1 if self._spill is not None else None,
+        }
+
+    def _write_spill(self, envelope: EventEnvelope) -> None:
+        assert self._spill is not None and self._spill_path is not None
+        self._spill.write(json.dumps(envelope.model_dump(mode="json"), separators=(",", ":")) + "\n")
+        self._spill_last_seq = envelope.seq or self._spill_last_seq
+        if self._spill.tell() >= self._spill_max_bytes:
+            self._spill.close()
+            self._lost_through = max(self._lost_through, self._rotated_last_seq)
+            self._spill_path.replace(_rotated_path(self._spill_path))
+            self._rotated_last_seq = self._spill_last_seq
+            self._spill = self._spill_path.open("a", encoding="utf-8")
+
+
+def _rotated_path(path: Path) -> Path:
+    return path.with_name(f"{path.name}.1")
+
+
+def _parse_line(line: str) -> dict[str, Any] | None:
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) and isinstance(record.get("seq"), int) else None
+
+
+def _first_seq_in(path: Path) -> int:
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                record = _parse_line(line)
+                if record:
+                    return int(record["seq"])
+    except FileNotFoundError:
+        pass
+    return 1
+
+
+def _last_record_in(path: Path) -> dict[str, Any] | None:
+    try:
+        with path.open("rb") as f:
+            f.seek(0, 2)
+            f.seek(max(0, f.tell() - _TAIL_BYTES))
+            lines = f.read().decode("utf-8", errors="replace").splitlines()
+    except FileNotFoundError:
+        return None
+    for line in reversed(lines):
+        record = _parse_line(line)
+        if record:
+            return record
+    return None
+
+
+def _read_spill(paths: list[Path], since_seq: int, through: int, topics: frozenset[str]) -> list[EventEnvelope]:
+    out: list[EventEnvelope] = []
+    for path in paths:
+        try:
+            f = path.open("r", encoding="utf-8")
+        except FileNotFoundError:
+            continue
+        with f:
+            for line in f:
+                record = _parse_line(line)
+                if record is None or not since_seq < record["seq"] <= through or record.get("topic") not in topics:
+                    continue
+                out.append(EventEnvelope.model_validate(record))
+    out.sort(key=lambda env: env.seq or 0)
+    return out
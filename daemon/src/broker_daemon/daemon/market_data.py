@@ -1,50 +1,400 @@
-"""Market-data cache and polling helpers."""
+"""Market-data cache, live quote streams and polling helpers."""
 
 from __future__ import annotations
 
 import asyncio
-from datetime import UTC, datetime, timedelta
-from typing import AsyncIterator
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
 
 from broker_daemon.models.market import Quote
 from broker_daemon.providers import BrokerProvider
 
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedQuote:
+    quote: Quote
+    hit: bool
+    age_seconds: float
+    # Served past its max age while a background refresh runs.
+    stale: bool = False
+
+
+@dataclass
+class _Stream:
+    watchers: int = 0
+    last_used: float = 0.0
+    ticks: int = 0
+
+
+class QuoteStreams:
+    """Working set of live quote streams kept under the provider's market-data line limit.
+
+    A symbol is streamed while something watches it, or once snapshot requests for it reach
+    `after_requests` within `idle_seconds`. Unwatched streams idle for `idle_seconds` are
+    cancelled by a background sweep (so within 1.5x `idle_seconds` even with no traffic), and
+    when every line is taken the least recently used unwatched stream makes room.
+    """
+
+    def __init__(
+        self,
+        provider: BrokerProvider,
+        on_quote: Callable[[Quote], None],
+        *,
+        max_lines: int = 0,
+        after_requests: int = 0,
+        idle_seconds: float = 300.0,
+    ) -> None:
+        self._provider = provider
+        self._on_quote = on_quote
+        self._max_lines = max_lines
+        self._after_requests = after_requests
+        self._idle_seconds = idle_seconds
+        # Least recently used first.
+        self._streams: OrderedDict[str, _Stream] = OrderedDict()
+        self._demand: dict[str, tuple[int, float]] = {}
+        self._tasks: set[asyncio.Task[Any]] = set()
+        self._reaper: asyncio.Task[None] | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_lines > 0 and bool(self._provider.capabilities.get("streaming"))
+
+    def is_streaming(self, symbol: str) -> bool:
+        return symbol in self._streams
+
+    def watchers(self, symbol: str) -> int:
+        stream = self._streams.get(symbol)
+        return stream.watchers if stream else 0
+
+    def touch(self, symbol: str) -> None:
+        stream = self._streams.get(symbol)
+        if stream is not None:
+            stream.last_used = time.monotonic()
+            self._streams.move_to_end(symbol)
+
+    def record_tick(self, symbol: str) -> None:
+        stream = self._streams.get(symbol)
+        if stream is not None:
+            stream.ticks += 1
+
+    async def acquire(self, symbol: str) -> bool:
+        """Hold a stream open for a watcher; False when streaming is unavailable or all lines are watched."""
+        sym = symbol.upper()
+        if not self.enabled:
+            return False
+        if not await self._open(sym):
+            return False
+        self._streams[sym].watchers += 1
+        return True
+
+    def release(self, symbol: str) -> None:
+        stream = self._streams.get(symbol.upper())
+        if stream is not None and stream.watchers > 0:
+            stream.watchers -= 1
+            stream.last_used = time.monotonic()
+
+    def note_demand(self, symbols: list[str]) -> None:
+        """Count snapshot round trips; symbols requested often enough get a stream in the background."""
+        if not self.enabled or self._after_requests <= 0:
+            return
+        now = time.monotonic()
+        for sym in symbols:
+            if sym in self._streams:
+                continue
+            count, since = self._demand.get(sym, (0, now))
+            if now - since > self._idle_seconds:
+                count, since = 0, now
+            count += 1
+            if count >= self._after_requests:
+                self._demand.pop(sym, None)
+                self._spawn(self._open(sym))
+            else:
+                self._demand[sym] = (count, since)
+        if len(self._demand) > 10 * self._max_lines:
+            self._demand = {s: v for s, v in self._demand.items() if now - v[1] <= self._idle_seconds}
+
+    async def close(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        for task in list(self._tasks):
+            task.cancel()
+        for sym in list(self._streams):
+            await self._cancel(sym)
+
+    def stats(self) -> dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "enabled": self.enabled,
+            "lines": len(self._streams),
+            "max_lines": self._max_lines,
+            "streams": [
+                {
+                    "symbol": sym,
+                    "watchers": s.watchers,
+                    "ticks": s.ticks,
+                    "idle_seconds": round(now - s.last_used, 3),
+                }
+                for sym, s in self._streams.items()
+            ],
+        }
+
+    async def _open(self, sym: str) -> bool:
+        if sym in self._streams:
+            self.touch(sym)
+            return True
+        await self._expire_idle()
+        if len(self._streams) >= self._max_lines and not await self._evict_lru():
+            logger.info("all %s market-data lines are watched; not streaming %s", self._max_lines, sym)
+            return False
+        # Reserve the line before awaiting so concurrent opens cannot overshoot the limit.
+        self._streams[sym] = _Stream(last_used=time.monotonic())
+        try:
+            await self._provider.stream_quote(sym, self._on_quote)
+        except Exception:
+            logger.warning("could not start quote stream for %s", sym, exc_info=True)
+            self._streams.pop(sym, None)
+            return False
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_idle())
+        return True
+
+    async def _reap_idle(self) -> None:
+        # Runs while any line is held; idle lines must not wait for the next request to be released.
+        while self._streams:
+            await asyncio.sleep(max(0.01, self._idle_seconds / 2))
+            try:
+                await self._expire_idle()
+            except Exception:
+                logger.debug("idle quote stream sweep failed", exc_info=True)
+
+    async def _expire_idle(self) -> None:
+        cutoff = time.monotonic() - self._idle_seconds
+        for sym, stream in list(self._streams.items()):
+            if stream.watchers == 0 and stream.last_used < cutoff:
+                await self._cancel(sym)
+
+    async def _evict_lru(self) -> bool:
+        for sym, stream in self._streams.items():
+            if stream.watchers == 0:
+                await self._cancel(sym)
+                return True
+        return False
+
+    async def _cancel(self, sym: str) -> None:
+        if self._streams.pop(sym, None) is None:
+            return
+        try:
+            await self._provider.cancel_quote_stream(sym)
+        except Exception:
+            logger.debug("cancel quote stream failed for %s", sym, exc_info=True)
+
+    def _spawn(self, coro: Any) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
 
 class MarketDataService:
-    def __init__(self, provider: BrokerProvider, cache_ttl_seconds: int = 2) -> None:
+    """Quote cache in front of the provider, fed by live streams, polling and snapshots.
+
+    Entries younger than the TTL are served as is. Entries up to `stale_seconds` past it are
+    served immediately, marked stale, while a background snapshot refreshes them. The cache
+    holds at most `cache_size` symbols, evicting the least recently used.
+    """
+
+    def __init__(
+        self,
+        provider: BrokerProvider,
+        cache_ttl_seconds: float = 2,
+        *,
+        cache_size: int = 5000,
+        stale_seconds: float = 0.0,
+        stream_lines: int = 0,
+        stream_after_requests: int = 0,
+        stream_idle_seconds: float = 300.0,
+        poll_seconds: float = 1.0,
+        on_quote: Callable[[Quote], None] | None = None,
+    ) -> None:
         self._provider = provider
-        self._cache_ttl = timedelta(seconds=cache_ttl_seconds)
-        self._quotes: dict[str, Quote] = {}
-        self._updated_at: dict[str, datetime] = {}
+        self._cache_ttl = cache_ttl_seconds
+        self._cache_size = max(1, cache_size)
+        self._stale_seconds = stale_seconds
+        self._poll_seconds = poll_seconds
+        self._on_quote = on_quote
+        # symbol -> (quote, monotonic time it was received); least recently used first.
+        self._cache: OrderedDict[str, tuple[Quote, float]] = OrderedDict()
+        self._refreshing: set[str] = set()
+        self._refresh_tasks: set[asyncio.Task[None]] = set()
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        # Watched symbols that could not get a stream are polled instead: symbol -> (watchers, task).
+        self._pollers: dict[str, tuple[int, asyncio.Task[None]]] = {}
+        self._streams = QuoteStreams(
+            provider,
+            self._on_stream_quote,
+            max_lines=stream_lines,
+            after_requests=stream_after_requests,
+            idle_seconds=stream_idle_seconds,
+        )
 
-    async def quote(self, symbols: list[str], force_refresh: bool = False) -> list[Quote]:
-        now = datetime.now(UTC)
-        uncached: list[str] = []
+    @property
+    def streams(self) -> QuoteStreams:
+        return self._streams
+
+    async def close(self) -> None:
+        for _, task in self._pollers.values():
+            task.cancel()
+        self._pollers.clear()
+        for refresh in list(self._refresh_tasks):
+            refresh.cancel()
+        await self._streams.close()
+
+    async def watch_symbols(self, symbols: list[str]) -> None:
+        """Start pushing quote updates for `symbols` to `on_quote`: live streams where possible, else polling."""
         for symbol in symbols:
             sym = symbol.upper()
-            cached_at = self._updated_at.get(sym)
-            if force_refresh or cached_at is None or now - cached_at > self._cache_ttl:
-                uncached.append(sym)
+            if await self._streams.acquire(sym):
+                continue
+            watchers, task = self._pollers.get(sym, (0, None))
+            if task is None:
+                task = asyncio.create_task(self._poll(sym))
+            self._pollers[sym] = (watchers + 1, task)
 
-        if uncached:
-            fresh = await self._provider.quote(uncached)
-            for quote in fresh:
-                self._quotes[quote.symbol] = quote
-                self._updated_at[quote.symbol] = now
-
-        result: list[Quote] = []
+    def unwatch_symbols(self, symbols: list[str]) -> None:
         for symbol in symbols:
             sym = symbol.upper()
-            quote = self._quotes.get(sym)
-            if quote is not None:
-                result.append(quote)
-        return result
+            polled = self._pollers.get(sym)
+            if polled is None or self._streams.watchers(sym):
+                self._streams.release(sym)
+                continue
+            watchers, task = polled
+            if watchers <= 1:
+                task.cancel()
+                del self._pollers[sym]
+            else:
+                self._pollers[sym] = (watchers - 1, task)
 
-    async def watch(self, symbol: str, fields: list[str], interval_seconds: float) -> AsyncIterator[dict[str, float | None]]:
-        sym = symbol.upper()
+    async def quote(self, symbols: list[str], force_refresh: bool = False) -> list[Quote]:
+        return [entry.quote for entry in await self.quote_entries(symbols, force_refresh=force_refresh)]
+
+    async def quote_entries(
+        self,
+        symbols: list[str],
+        *,
+        max_age_seconds: float | None = None,
+        force_refresh: bool = False,
+    ) -> list[CachedQuote]:
+        """Quotes for `symbols` with cache provenance; `max_age_seconds` overrides the configured TTL."""
+        ttl = self._cache_ttl if max_age_seconds is None else max_age_seconds
+        now = time.monotonic()
+        wanted = [s.upper() for s in symbols]
+        # Entries are captured here because fetching may evict others from a small cache.
+        served: dict[str, CachedQuote] = {}
+        stale: list[str] = []
+        missing: list[str] = []
+        for sym in dict.fromkeys(wanted):
+            entry = self._cache.get(sym)
+            if force_refresh or entry is None:
+                missing.append(sym)
+                continue
+            quote, received = entry
+            age = now - received
+            if self._streams.is_streaming(sym):
+                # Usually kept current by ticks; a stalled stream still falls back on age below.
+                self._streams.touch(sym)
+            if age > ttl + self._stale_seconds:
+                missing.append(sym)
+                continue
+            elif age > ttl:
+                stale.append(sym)
+            self._cache.move_to_end(sym)
+            served[sym] = CachedQuote(quote, hit=True, age_seconds=age, stale=sym in stale)
+        self._hits += len(served) - len(stale)
+
+        if missing:
+            # Already waiting on the gateway, so refresh stale entries in the same round trip.
+            folded = [sym for sym in stale if sym not in self._refreshing]
+            stale = [sym for sym in stale if sym in self._refreshing]
+            for sym in folded:
+                del served[sym]
+            missing += folded
+            received = time.monotonic()
+            for quote in await self._fetch(missing):
+                served[quote.symbol.upper()] = CachedQuote(quote, hit=False, age_seconds=time.monotonic() - received)
+        elif stale:
+            self._revalidate(stale)
+
+        self._stale_hits += len(stale)
+        self._misses += len(missing)
+        return [served[sym] for sym in wanted if sym in served]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "size": len(self._cache),
+            "max_size": self._cache_size,
+            "ttl_seconds": self._cache_ttl,
+            "stale_seconds": self._stale_seconds,
+            "hits": self._hits,
+            "stale_hits": self._stale_hits,
+            "misses": self._misses,
+            "refreshing": len(self._refreshing),
+        }
+
+    async def _fetch(self, symbols: list[str]) -> list[Quote]:
+        quotes = await self._provider.quote(symbols)
+        received = time.monotonic()
+        for quote in quotes:
+            self._store(quote, received)
+        self._streams.note_demand(symbols)
+        return quotes
+
+    def _revalidate(self, symbols: list[str]) -> None:
+        pending = [sym for sym in symbols if sym not in self._refreshing]
+        if not pending:
+            return
+        self._refreshing.update(pending)
+        task = asyncio.create_task(self._refresh(pending))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def _refresh(self, symbols: list[str]) -> None:
+        try:
+            await self._fetch(symbols)
+        except Exception:
+            logger.debug("background quote refresh failed for %s", symbols, exc_info=True)
+        finally:
+            self._refreshing.difference_update(symbols)
+
+    def _store(self, quote: Quote, received: float) -> None:
+        sym = quote.symbol.upper()
+        self._cache[sym] = (quote, received)
+        self._cache.move_to_end(sym)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    async def _poll(self, sym: str) -> None:
         while True:
-            quotes = await self.quote([sym], force_refresh=True)
-            if quotes:
-                q = quotes[0]
-                yield {field: getattr(q, field, None) for field in fields}
-            await asyncio.sleep(interval_seconds)
+            try:
+                quotes = await self.quote([sym], force_refresh=True)
+                if quotes and self._on_quote:
+                    self._on_quote(quotes[0])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.debug("quote poll failed for %s", sym, exc_info=True)
+            await asyncio.sleep(self._poll_seconds)
+
+    def _on_stream_quote(self, quote: Quote) -> None:
+        sym = quote.symbol.upper()
+        self._store(quote, time.monotonic())
+        self._streams.record_tick(sym)
+        if self._on_quote:
+            self._on_quote(quote)
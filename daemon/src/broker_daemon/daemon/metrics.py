@@ -0,0 +1,190 @@
+"""In-process request metrics: per-command stage latency histograms and counters."""
+
+from __future__ import annotations
+
+import functools
+import math
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+PROVIDER_CALLS = (
+    "quote",
+    "history",
+    "history_range",
+    "option_chain",
+    "positions",
+    "balance",
+    "pnl",
+    "exposure",
+    "place_order",
+    "place_bracket",
+    "cancel_order",
+    "cancel_all",
+    "trades",
+    "fills",
+)
+AUDIT_WRITES = ("log_command", "upsert_order", "log_fill", "log_risk_event", "log_connection_event")
+UNKNOWN_COMMAND = "<unknown>"
+
+# Geometric bucket bounds from 10us to ~100s; each bucket is 25% wider than the last,
+# so reported percentiles are within that relative error.
+_MIN_SECONDS = 10e-6
+_GROWTH = 1.25
+_BUCKETS = 73
+
+
+class LatencyHistogram:
+    __slots__ = ("_counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self._counts = [0] * (_BUCKETS + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        seconds = max(0.0, seconds)
+        if seconds <= _MIN_SECONDS:
+            idx = 0
+        else:
+            idx = min(_BUCKETS, int(math.log(seconds / _MIN_SECONDS, _GROWTH)) + 1)
+        self._counts[idx] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        """Return the upper bound of the bucket holding quantile `q`, capped at the observed max."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for idx, n in enumerate(self._counts):
+            seen += n
+            if seen >= rank:
+                return min(self.max, _MIN_SECONDS * _GROWTH**idx)
+        return self.max
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "p50_ms": round(self.percentile(0.50) * 1000.0, 3),
+            "p99_ms": round(self.percentile(0.99) * 1000.0, 3),
+            "max_ms": round(self.max * 1000.0, 3),
+            "mean_ms": round(self.total / self.count * 1000.0, 3) if self.count else 0.0,
+        }
+
+
+class RequestTrace:
+    """Stage timings accumulated while one request is being served."""
+
+    __slots__ = ("command", "stages", "error_code")
+
+    def __init__(self, command: str) -> None:
+        self.command = command
+        self.stages: dict[str, float] = {}
+        self.error_code: str | None = None
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+
+_current_trace: ContextVar[RequestTrace | None] = ContextVar("broker_request_trace", default=None)
+
+
+class DaemonMetrics:
+    def __init__(self, known_commands: Iterable[str] = ()) -> None:
+        self._known = frozenset(known_commands)
+        self._started = time.monotonic()
+        self._histograms: dict[tuple[str, str], LatencyHistogram] = {}
+        self._requests: Counter[str] = Counter()
+        self._command_errors: Counter[str] = Counter()
+        self._errors: Counter[str] = Counter()
+        self.in_flight = 0
+
+    def _key(self, command: str) -> str:
+        # Bucket unknown names together so arbitrary client input cannot grow the table.
+        return command if not self._known or command in self._known else UNKNOWN_COMMAND
+
+    def observe(self, command: str, stage: str, seconds: float) -> None:
+        key = (self._key(command), stage)
+        hist = self._histograms.get(key)
+        if hist is None:
+            hist = self._histograms[key] = LatencyHistogram()
+        hist.observe(seconds)
+
+    @contextmanager
+    def track(self, command: str, *, decode_seconds: float | None = None) -> Iterator[RequestTrace]:
+        """Account one request; provider and audit calls made inside are attributed to it."""
+        trace = RequestTrace(command)
+        if decode_seconds is not None:
+            trace.add("decode", decode_seconds)
+        token = _current_trace.set(trace)
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            yield trace
+        finally:
+            trace.add("total", time.perf_counter() - started)
+            self.in_flight -= 1
+            _current_trace.reset(token)
+            key = self._key(command)
+            self._requests[key] += 1
+            if trace.error_code:
+                self._command_errors[key] += 1
+                self._errors[trace.error_code] += 1
+            for stage, seconds in trace.stages.items():
+                self.observe(command, stage, seconds)
+
+    def record_error(self, code: str) -> None:
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.error_code = code
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            trace = _current_trace.get()
+            if trace is not None:
+                trace.add(name, time.perf_counter() - started)
+
+    def instrument(self, target: Any, stage: str, names: Iterable[str]) -> None:
+        """Wrap `target`'s coroutine methods so their time counts toward `stage` of the active request."""
+        for name in names:
+            method = getattr(target, name, None)
+            if method is None:
+                continue
+            setattr(target, name, self._timed(method, stage))
+
+    def _timed(self, method: Any, stage: str) -> Any:
+        @functools.wraps(method)
+        async def _wrapper(*args: Any, **kwargs: Any) -> Any:
+            with self.stage(stage):
+                return await method(*args, **kwargs)
+
+        return _wrapper
+
+    def snapshot(self, command: str | None = None) -> dict[str, Any]:
+        commands: dict[str, dict[str, Any]] = {}
+        for (name, stage), hist in sorted(self._histograms.items()):
+            if command is not None and name != command:
+                continue
+            entry = commands.setdefault(
+                name,
+                {"requests": self._requests[name], "errors": self._command_errors[name], "stages": {}},
+            )
+            entry["stages"][stage] = hist.summary()
+        return {
+            "uptime_seconds": round(time.monotonic() - self._started, 3),
+            "requests_total": sum(self._requests.values()),
+            "in_flight": self.in_flight,
+            "errors": dict(sorted(self._errors.items())),
+            "commands": commands,
+        }
@@ -7,8 +7,10 @@ from datetime import UTC, datetime
 from typing import Any, Awaitable, Callable
 
 from broker_daemon.audit.logger import AuditLogger
+from broker_daemon.daemon.classification import ClassificationTable
+from broker_daemon.daemon.portfolio_state import PortfolioState
 from broker_daemon.models.events import Event, EventTopic
-from broker_daemon.models.orders import FillRecord, OrderRecord, OrderRequest, OrderStatus, OrderType
+from broker_daemon.models.orders import FillRecord, OrderRecord, OrderRequest, OrderStatus, OrderType, Side
 from broker_daemon.providers import BrokerProvider
 from broker_daemon.risk.engine import RiskContext, RiskEngine
 
@@ -18,6 +20,12 @@ ACTIVE_STATUSES = {
     OrderStatus.PENDING_SUBMIT,
     OrderStatus.PRE_SUBMITTED,
 }
+TERMINAL_STATUSES = {
+    OrderStatus.FILLED,
+    OrderStatus.CANCELLED,
+    OrderStatus.REJECTED,
+    OrderStatus.INACTIVE,
+}
 
 
 class OrderManager:
@@ -28,13 +36,22 @@ class OrderManager:
         risk: RiskEngine,
         audit: AuditLogger,
         event_cb: Callable[[Event], Awaitable[None]] | None = None,
+        durable_orders: bool = False,
+        portfolio: PortfolioState | None = None,
+        classifications: ClassificationTable | None = None,
     ) -> None:
         self._provider = provider
+        self._portfolio = portfolio or PortfolioState(provider)
         self._risk = risk
         self._audit = audit
         self._event_cb = event_cb
+        # When set, order and risk rows are committed before the order is acknowledged.
+        self._durable_orders = durable_orders
         self._orders: dict[str, OrderRecord] = {}
         self._fills: list[FillRecord] = []
+        self._classifications = classifications
+        # (snapshot version, table version) -> signed value per sector.
+        self._sector_values: tuple[tuple[int, int], dict[str, float]] | None = None
 
     def _infer_order_type(self, req: OrderRequest) -> OrderType:
         if req.limit is not None and req.stop is not None:
@@ -45,35 +62,29 @@ class OrderManager:
             return OrderType.STOP
         return OrderType.MARKET
 
-    async def _risk_context(self) -> RiskContext:
-        balance = await self._provider.balance()
-        nlv = float(balance.net_liquidation or 0.0)
-        positions = await self._provider.positions()
-
-        symbols = [p.symbol for p in positions]
-        quotes = await self._provider.quote(symbols) if symbols else []
-        marks = {
-            q.symbol: (q.last if q.last is not None else q.bid if q.bid is not None else q.ask if q.ask is not None else 0.0)
-            for q in quotes
-        }
-
-        position_values: dict[str, float] = {}
-        for p in positions:
-            mark = marks.get(p.symbol)
-            if mark is None:
-                mark = p.market_price if p.market_price is not None else p.avg_cost
-            position_values[p.symbol] = float(mark) * p.qty
-
-        pnl = await self._provider.pnl()
-        open_orders = len([o for o in self._orders.values() if o.status in ACTIVE_STATUSES])
+    @property
+    def portfolio(self) -> PortfolioState:
+        return self._portfolio
 
-        return RiskContext(
-            nlv=nlv,
-            daily_pnl=pnl.total,
+    async def _risk_context(self, *, force_refresh: bool = False) -> RiskContext:
+        snap = await self._portfolio.snapshot(force_refresh=force_refresh)
+        open_orders = len([o for o in self._orders.values() if o.status in ACTIVE_STATUSES])
+        # Snapshots and classification tables are never mutated in place, so the context can share their dicts.
+        context = RiskContext(
+            nlv=snap.nlv,
+            daily_pnl=snap.daily_pnl,
             open_orders=open_orders,
-            mark_prices=marks,
-            position_values=position_values,
+            mark_prices=snap.mark_prices,
+            position_values=snap.position_values,
         )
+        table = self._classifications
+        if table is not None:
+            key = (snap.version, table.version)
+            if self._sector_values is None or self._sector_values[0] != key:
+                self._sector_values = (key, table.sector_values(snap.position_values))
+            context.sector_by_symbol = table.sectors
+            context.sector_exposure_values = self._sector_values[1]
+        return context
 
     async def place_order(self, request: OrderRequest) -> OrderRecord:
         client_order_id = request.client_order_id or str(uuid.uuid4())
@@ -103,7 +114,12 @@ class OrderManager:
 
         self._orders[client_order_id] = record
         await self._audit.upsert_order(record)
-        await self._audit.log_risk_event("check_passed", {"client_order_id": client_order_id})
+        # Rows commit in queue order, so waiting on the risk row also covers the order row.
+        await self._audit.log_risk_event(
+            "check_passed",
+            {"client_order_id": client_order_id},
+            durable=self._durable_orders,
+        )
 
         await self._emit(
             Event(
@@ -143,7 +159,11 @@ class OrderManager:
             tif=tif,
             client_order_id=client_order_id,
         )
-        await self._audit.log_risk_event("check_passed", {"client_order_id": client_order_id, "type": "bracket"})
+        await self._audit.log_risk_event(
+            "check_passed",
+            {"client_order_id": client_order_id, "type": "bracket"},
+            durable=self._durable_orders,
+        )
         await self._emit(
             Event(
                 topic=EventTopic.ORDERS,
@@ -168,6 +188,8 @@ class OrderManager:
             return
         record = self._orders[client_order_id]
         record.status = _status_from_ib(status)
+        if record.status in TERMINAL_STATUSES:
+            self._portfolio.request_reconcile()
         if record.status == OrderStatus.FILLED:
             record.filled_at = datetime.now(UTC)
             record.fill_qty = float(filled or record.qty)
@@ -176,6 +198,22 @@ class OrderManager:
 
     async def add_fill(self, fill: FillRecord) -> None:
         self._fills.append(fill)
+        record = self._orders.get(fill.client_order_id)
+        if record is not None:
+            signed_qty = abs(fill.qty) if record.side == Side.BUY else -abs(fill.qty)
+            self._portfolio.apply_fill(
+                fill_id=fill.fill_id,
+                symbol=fill.symbol,
+                signed_qty=signed_qty,
+                price=fill.price,
+                executed_at=fill.timestamp,
+            )
+            if not self._provider.capabilities.get("account_push"):
+                # No pushed PnL to move the drawdown breaker; reconcile to pick up the fill's effect.
+                self._portfolio.request_reconcile()
+        else:
+            # Side unknown (order placed outside this daemon); let the broker tell us.
+            self._portfolio.request_reconcile()
         await self._audit.log_fill(fill)
         await self._emit(Event(topic=EventTopic.FILLS, payload=fill.model_dump(mode="json")))
 
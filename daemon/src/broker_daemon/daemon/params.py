@@ -0,0 +1,163 @@
+"""Parameter schemas for daemon protocol commands."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from broker_daemon.models.orders import OrderRequest
+
+AUDIT_PAGE_SIZE = 500
+AUDIT_MAX_PAGE_SIZE = 10_000
+RISK_BATCH_MAX_ORDERS = 5000
+
+
+class CommandParams(BaseModel):
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+
+class MetricsParams(CommandParams):
+    command: str | None = None
+
+
+class QuoteSnapshotParams(CommandParams):
+    symbols: list[str] = Field(default_factory=list)
+    force: bool = False
+    max_age_ms: int | None = Field(default=None, ge=0)
+
+
+class MarketHistoryParams(CommandParams):
+    symbol: str
+    period: str = "30d"
+    bar: str = "1h"
+    rth_only: bool = False
+    # ISO dates or datetimes (UTC unless an offset is given); start overrides period.
+    start: str | None = None
+    end: str | None = None
+
+
+class MarketChainParams(CommandParams):
+    symbol: str
+    expiry: str | None = None
+    strike_range: Any = None
+    type: str | None = None
+    greeks: str = "auto"
+    rate: float | None = None
+    dividend_yield: float | None = None
+    # Annualized vol for contracts with no quote or provider IV to solve from (e.g. IB chains).
+    vol: float | None = Field(default=None, gt=0, le=10)
+
+
+class PositionsParams(CommandParams):
+    symbol: str | None = None
+
+
+class ExposureParams(CommandParams):
+    by: str = "symbol"
+
+
+class RiskCheckBatchParams(CommandParams):
+    orders: list[OrderRequest] = Field(min_length=1, max_length=RISK_BATCH_MAX_ORDERS)
+
+
+class BracketParams(CommandParams):
+    side: str = "buy"
+    symbol: str
+    qty: float
+    entry: float
+    tp: float
+    sl: float
+    tif: str = "DAY"
+
+
+class OrderIdParams(CommandParams):
+    order_id: str
+
+
+class OrdersListParams(CommandParams):
+    status: str = "all"
+    since: str | None = None
+
+
+class CancelAllParams(CommandParams):
+    confirm: bool = False
+    json_mode: bool = False
+
+
+class FillsListParams(CommandParams):
+    symbol: str | None = None
+    since: str | None = None
+
+
+class RiskSetParams(CommandParams):
+    param: str
+    value: Any
+
+
+class RiskOverrideParams(CommandParams):
+    param: str
+    value: Any
+    duration: str = "1h"
+    reason: str = "manual override"
+
+
+class KeepaliveParams(CommandParams):
+    sent_at: Any = None
+
+
+class EventsSubscribeParams(CommandParams):
+    topics: list[str] = Field(default_factory=list)
+    overflow: str | None = None
+    max_queue: int | None = Field(default=None, ge=1, le=100_000)
+    since_seq: int | None = Field(default=None, ge=0)
+    # Epoch of the event `since_seq` came from; a mismatch forces a full resync.
+    epoch: str | None = Field(default=None, max_length=64)
+    symbols: list[str] = Field(default_factory=list)
+    max_rate: float | None = Field(default=None, gt=0, le=1000)
+
+
+class EventsControlParams(CommandParams):
+    """In-band message on an open subscription: change topics, pause, resume or ack."""
+
+    action: str
+    topics: list[str] | None = None
+    symbols: list[str] | None = None
+    max_rate: float | None = Field(default=None, gt=0, le=1000)
+    seq: int | None = Field(default=None, ge=0)
+
+
+class AuditPageParams(CommandParams):
+    since: str | None = None
+    until: str | None = None
+    limit: int = Field(default=AUDIT_PAGE_SIZE, ge=1, le=AUDIT_MAX_PAGE_SIZE)
+    before_id: int | None = None
+    after_id: int | None = None
+
+
+class AuditCommandsParams(AuditPageParams):
+    source: str | None = None
+
+
+class AuditOrdersParams(AuditPageParams):
+    status: str | None = None
+
+
+class AuditRiskParams(AuditPageParams):
+    type: str | None = None
+
+
+class AuditExportParams(CommandParams):
+    output: str
+    format: str = "csv"
+    gzip: bool = False
+    table: str = "orders"
+    since: str | None = None
+    until: str | None = None
+    status: str | None = None
+    source: str | None = None
+    type: str | None = None
+
+
+class BatchParams(CommandParams):
+    requests: Any = None
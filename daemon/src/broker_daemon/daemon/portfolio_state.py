@@ -0,0 +1,270 @@
+"""In-daemon portfolio state kept current from broker events."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field, replace
+from datetime import UTC, datetime
+from typing import Any
+
+from broker_daemon.daemon.coalesce import uncoalesced
+from broker_daemon.models.portfolio import Position
+from broker_daemon.providers import BrokerProvider
+
+logger = logging.getLogger(__name__)
+
+_MAX_SEEN_FILLS = 10_000
+
+
+@dataclass(frozen=True)
+class PortfolioSnapshot:
+    """Immutable view of account state; every change produces a new snapshot with a higher version."""
+
+    version: int = 0
+    nlv: float = 0.0
+    daily_pnl: float = 0.0
+    positions: dict[str, float] = field(default_factory=dict)
+    mark_prices: dict[str, float] = field(default_factory=dict)
+    position_values: dict[str, float] = field(default_factory=dict)
+    refreshed_at: float = 0.0
+    updated_at: float = 0.0
+    # When the broker produced the account values: the request time for polls, the push time otherwise.
+    observed_at: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "version": self.version,
+            "nlv": self.nlv,
+            "daily_pnl": self.daily_pnl,
+            "positions": dict(self.positions),
+            "mark_prices": dict(self.mark_prices),
+            "position_values": dict(self.position_values),
+            "refreshed_age_seconds": round(now - self.refreshed_at, 3) if self.refreshed_at else None,
+            "updated_age_seconds": round(now - self.updated_at, 3) if self.updated_at else None,
+        }
+
+
+class PortfolioState:
+    """Serves risk checks from a cached snapshot instead of four broker round trips.
+
+    The snapshot is seeded from the provider, adjusted in place from fills, and reconciled
+    against the broker periodically and after order-status changes. Reads only hit the
+    broker when no snapshot exists, it is older than `max_age_seconds`, or a refresh is forced.
+
+    Fills and reconciles are ordered by time. A fill executed before the last reconcile was
+    requested is already in the broker's positions and is skipped. A fill that arrives while
+    a reconcile is in flight, and executed after it was requested, is applied again on top
+    of the reconcile's result.
+    """
+
+    def __init__(
+        self,
+        provider: BrokerProvider,
+        *,
+        reconcile_interval_seconds: float = 30.0,
+        max_age_seconds: float = 120.0,
+        on_change: Callable[[PortfolioSnapshot], None] | None = None,
+    ) -> None:
+        self._provider = provider
+        self._reconcile_interval = reconcile_interval_seconds
+        self._max_age = max_age_seconds
+        self._snapshot: PortfolioSnapshot | None = None
+        self._refresh_lock = asyncio.Lock()
+        self._reconcile_task: asyncio.Task[None] | None = None
+        self._reconcile_requested = asyncio.Event()
+        self._seen_fills: dict[str, None] = {}
+        # Wall-clock time the last applied reconcile was requested from the broker.
+        self._reconciled_at: datetime | None = None
+        # Fills seen while a reconcile is in flight: (symbol, signed qty, price, executed at).
+        self._inflight_fills: list[tuple[str, float, float, datetime]] | None = None
+        self._on_change = on_change
+
+    @property
+    def current(self) -> PortfolioSnapshot | None:
+        return self._snapshot
+
+    async def start(self) -> None:
+        try:
+            await self.refresh()
+        except Exception:
+            logger.warning("portfolio seed failed; first risk check will retry", exc_info=True)
+        self._reconcile_task = asyncio.create_task(self._reconcile_loop())
+
+    async def stop(self) -> None:
+        if self._reconcile_task:
+            self._reconcile_task.cancel()
+            try:
+                await self._reconcile_task
+            except asyncio.CancelledError:
+                pass
+            self._reconcile_task = None
+
+    async def snapshot(self, *, force_refresh: bool = False) -> PortfolioSnapshot:
+        snap = self._snapshot
+        if force_refresh or snap is None or time.monotonic() - snap.refreshed_at > self._max_age:
+            # Readers that queue behind an in-flight refresh reuse its result instead of refetching.
+            return await self.refresh(min_version=snap.version if snap else 0)
+        return snap
+
+    async def refresh(self, *, min_version: int | None = None) -> PortfolioSnapshot:
+        """Rebuild the snapshot from the broker; concurrent callers share one refresh."""
+        async with self._refresh_lock:
+            snap = self._snapshot
+            if min_version is not None and snap is not None and snap.version > min_version:
+                return snap
+            requested_at = time.monotonic()
+            requested_wall = datetime.now(UTC)
+            self._inflight_fills = []
+            try:
+                # A client read already in flight may predate a fill; ask the broker afresh.
+                with uncoalesced():
+                    balance, positions, pnl = await asyncio.gather(
+                        self._provider.balance(),
+                        self._provider.positions(),
+                        self._provider.pnl(),
+                    )
+                marks, valuation = await self._marks(positions)
+            finally:
+                inflight, self._inflight_fills = self._inflight_fills, None
+            now = time.monotonic()
+            fresh = PortfolioSnapshot(
+                version=(snap.version if snap else 0) + 1,
+                nlv=float(balance.net_liquidation or 0.0),
+                daily_pnl=float(pnl.total),
+                positions={p.symbol: float(p.qty) for p in positions},
+                mark_prices=marks,
+                position_values={p.symbol: valuation[p.symbol] * float(p.qty) for p in positions},
+                refreshed_at=now,
+                updated_at=now,
+                observed_at=requested_at,
+            )
+            # The broker's answer may predate these executions; carry them over.
+            for symbol, signed_qty, price, executed_at in inflight:
+                if executed_at > requested_wall:
+                    fresh = _with_fill(fresh, symbol, signed_qty, price)
+            self._reconciled_at = requested_wall
+            self._snapshot = fresh
+            self._notify(self._snapshot)
+            return self._snapshot
+
+    def apply_fill(
+        self,
+        *,
+        fill_id: str,
+        symbol: str,
+        signed_qty: float,
+        price: float,
+        executed_at: datetime | None = None,
+    ) -> PortfolioSnapshot | None:
+        """Adjust the cached position for one execution; repeated fill ids are ignored."""
+        snap = self._snapshot
+        if fill_id in self._seen_fills:
+            return snap
+        self._seen_fills[fill_id] = None
+        if len(self._seen_fills) > _MAX_SEEN_FILLS:
+            del self._seen_fills[next(iter(self._seen_fills))]
+        executed_at = executed_at or datetime.now(UTC)
+        if self._reconciled_at is not None and executed_at <= self._reconciled_at:
+            # Already counted in the positions the last reconcile fetched.
+            return snap
+        symbol = symbol.upper()
+        if self._inflight_fills is not None:
+            self._inflight_fills.append((symbol, signed_qty, float(price), executed_at))
+        if snap is None:
+            return None
+        self._snapshot = _with_fill(snap, symbol, signed_qty, price)
+        self._notify(self._snapshot)
+        return self._snapshot
+
+    def apply_account(
+        self, *, nlv: float | None = None, daily_pnl: float | None = None, observed_at: float | None = None
+    ) -> PortfolioSnapshot | None:
+        """Take account values from a broker push or poll without waiting for the next reconcile.
+
+        `observed_at` is the monotonic time the broker produced them; it defaults to now.
+        """
+        snap = self._snapshot
+        if snap is None:
+            return None
+        nlv = snap.nlv if nlv is None else float(nlv)
+        daily_pnl = snap.daily_pnl if daily_pnl is None else float(daily_pnl)
+        if nlv == snap.nlv and daily_pnl == snap.daily_pnl:
+            return snap
+        now = time.monotonic()
+        self._snapshot = replace(
+            snap,
+            version=snap.version + 1,
+            nlv=nlv,
+            daily_pnl=daily_pnl,
+            updated_at=now,
+            observed_at=now if observed_at is None else min(observed_at, now),
+        )
+        self._notify(self._snapshot)
+        return self._snapshot
+
+    def request_reconcile(self) -> None:
+        """Schedule a background refresh, e.g. after an order reaches a terminal state."""
+        self._reconcile_requested.set()
+
+    async def _reconcile_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._reconcile_requested.wait(), timeout=self._reconcile_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._reconcile_requested.clear()
+            if not self._provider.is_connected:
+                continue
+            try:
+                await self.refresh()
+            except Exception:
+                logger.debug("portfolio reconciliation skipped due to transient error", exc_info=True)
+
+    def _notify(self, snap: PortfolioSnapshot) -> None:
+        if self._on_change is None:
+            return
+        try:
+            self._on_change(snap)
+        except Exception:
+            logger.exception("portfolio change listener failed")
+
+    async def _marks(self, positions: list[Position]) -> tuple[dict[str, float], dict[str, float]]:
+        """Quote marks for held symbols, plus per-position valuation prices that fall back to broker marks."""
+        symbols = [p.symbol for p in positions]
+        quotes = await self._provider.quote(symbols) if symbols else []
+        marks = {
+            q.symbol: (q.last if q.last is not None else q.bid if q.bid is not None else q.ask if q.ask is not None else 0.0)
+            for q in quotes
+        }
+        valuation: dict[str, float] = {}
+        for p in positions:
+            mark = marks.get(p.symbol)
+            if mark is None:
+                mark = p.market_price if p.market_price is not None else p.avg_cost
+            valuation[p.symbol] = float(mark)
+        return marks, valuation
+
+
+def _with_fill(snap: PortfolioSnapshot, symbol: str, signed_qty: float, price: float) -> PortfolioSnapshot:
+    qty = snap.positions.get(symbol, 0.0) + signed_qty
+    positions = dict(snap.positions)
+    marks = {**snap.mark_prices, symbol: float(price)}
+    values = dict(snap.position_values)
+    if abs(qty) < 1e-9:
+        positions.pop(symbol, None)
+        values.pop(symbol, None)
+    else:
+        positions[symbol] = qty
+        values[symbol] = qty * float(price)
+    return replace(
+        snap,
+        version=snap.version + 1,
+        positions=positions,
+        mark_prices=marks,
+        position_values=values,
+        updated_at=time.monotonic(),
+    )
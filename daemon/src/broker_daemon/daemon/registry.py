@@ -0,0 +1,190 @@
+"""Table-driven command registry for the daemon protocol."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from difflib import get_close_matches
+from enum import Enum
+from typing import Any
+
+from pydantic import BaseModel
+
+from broker_daemon.exceptions import BrokerError, ErrorCode
+from broker_daemon.protocol import Request
+
+CommandHandler = Callable[[Any, Request, Any], Awaitable[dict[str, Any]]]
+CommandHook = Callable[["CommandSpec", Request, Callable[[], Awaitable[dict[str, Any]]]], Awaitable[dict[str, Any]]]
+
+
+class Concurrency(str, Enum):
+    """How a command may be scheduled relative to other commands."""
+
+    READ = "read"  # no side effects; runs concurrently with other reads
+    WRITE = "write"  # mutates daemon or broker state; ordered inside a batch
+    CONTROL = "control"  # lifecycle/streaming/envelope commands; never batched
+
+
+class EmptyParams(BaseModel):
+    pass
+
+
+@dataclass(frozen=True)
+class CommandSpec:
+    name: str
+    handler: CommandHandler
+    params: type[BaseModel] = EmptyParams
+    capability: str | None = None
+    capability_label: str | None = None
+    concurrency: Concurrency = Concurrency.READ
+    timeout_seconds: float | None = None
+    max_inflight: int | None = None
+
+    @property
+    def batchable(self) -> bool:
+        return self.concurrency != Concurrency.CONTROL
+
+
+class CommandRegistry:
+    def __init__(self) -> None:
+        self._specs: dict[str, CommandSpec] = {}
+
+    def command(
+        self,
+        name: str,
+        *,
+        params: type[BaseModel] = EmptyParams,
+        capability: str | None = None,
+        capability_label: str | None = None,
+        concurrency: Concurrency = Concurrency.READ,
+        timeout_seconds: float | None = None,
+        max_inflight: int | None = None,
+    ) -> Callable[[CommandHandler], CommandHandler]:
+        """Register the decorated `handler(owner, request, params)` for `name`."""
+
+        def _decorator(handler: CommandHandler) -> CommandHandler:
+            if name in self._specs:
+                raise ValueError(f"command '{name}' is already registered")
+            self._specs[name] = CommandSpec(
+                name=name,
+                handler=handler,
+                params=params,
+                capability=capability,
+                capability_label=capability_label,
+                concurrency=concurrency,
+                timeout_seconds=timeout_seconds,
+                max_inflight=max_inflight,
+            )
+            return handler
+
+        return _decorator
+
+    def get(self, name: str) -> CommandSpec | None:
+        return self._specs.get(name)
+
+    def names(self) -> tuple[str, ...]:
+        return tuple(self._specs)
+
+    def specs(self) -> Iterable[CommandSpec]:
+        return self._specs.values()
+
+    def unknown_command_error(self, command: str) -> BrokerError:
+        known = self.names()
+        matches = get_close_matches(command, known, n=3, cutoff=0.45)
+        suggestion = None
+        if matches:
+            suggestion = f"Did you mean: {', '.join(matches)}"
+        return BrokerError(
+            ErrorCode.INVALID_ARGS,
+            f"unknown command '{command}'",
+            details={"known_commands": sorted(known)},
+            suggestion=suggestion,
+        )
+
+
+class CommandDispatcher:
+    """Binds a registry to one daemon instance: validation, capabilities, hooks and limits."""
+
+    def __init__(
+        self,
+        registry: CommandRegistry,
+        owner: Any,
+        *,
+        capabilities: Callable[[], dict[str, bool]],
+    ) -> None:
+        self._registry = registry
+        self._owner = owner
+        self._capabilities = capabilities
+        self._hooks: list[CommandHook] = []
+        self._admission: dict[str, asyncio.Semaphore] = {
+            spec.name: asyncio.Semaphore(spec.max_inflight) for spec in registry.specs() if spec.max_inflight
+        }
+
+    @property
+    def registry(self) -> CommandRegistry:
+        return self._registry
+
+    def add_hook(self, hook: CommandHook) -> None:
+        """Wrap every command; hooks run outermost-first and must await `call_next()`."""
+        self._hooks.append(hook)
+
+    def resolve(self, command: str) -> CommandSpec:
+        spec = self._registry.get(command)
+        if spec is None:
+            raise self._registry.unknown_command_error(command)
+        return spec
+
+    async def dispatch(self, request: Request) -> dict[str, Any]:
+        spec = self.resolve(request.command)
+        params = spec.params.model_validate(request.params)
+        if spec.capability and not self._capabilities().get(spec.capability):
+            label = spec.capability_label or spec.capability
+            raise BrokerError(ErrorCode.INVALID_ARGS, f"provider does not support {label}")
+
+        async def _call() -> dict[str, Any]:
+            return await self._run_limited(spec, request, params)
+
+        call: Callable[[], Awaitable[dict[str, Any]]] = _call
+        for hook in reversed(self._hooks):
+            call = _bind_hook(hook, spec, request, call)
+        return await call()
+
+    async def _run_limited(self, spec: CommandSpec, request: Request, params: BaseModel) -> dict[str, Any]:
+        semaphore = self._admission.get(spec.name)
+        if semaphore is not None and semaphore.locked():
+            raise BrokerError(
+                ErrorCode.RATE_LIMITED,
+                f"too many concurrent '{spec.name}' requests",
+                details={"max_inflight": spec.max_inflight},
+                suggestion="Wait for in-flight requests to finish and retry.",
+            )
+
+        async def _invoke() -> dict[str, Any]:
+            if spec.timeout_seconds is None:
+                return await spec.handler(self._owner, request, params)
+            try:
+                return await asyncio.wait_for(spec.handler(self._owner, request, params), timeout=spec.timeout_seconds)
+            except asyncio.TimeoutError as exc:
+                raise BrokerError(
+                    ErrorCode.TIMEOUT,
+                    f"'{spec.name}' did not complete within {spec.timeout_seconds:g}s",
+                    details={"timeout_seconds": spec.timeout_seconds},
+                ) from exc
+
+        if semaphore is None:
+            return await _invoke()
+        async with semaphore:
+            return await _invoke()
+
+
+def _bind_hook(
+    hook: CommandHook,
+    spec: CommandSpec,
+    request: Request,
+    call_next: Callable[[], Awaitable[dict[str, Any]]],
+) -> Callable[[], Awaitable[dict[str, Any]]]:
+    async def _call() -> dict[str, Any]:
+        return await hook(spec, request, call_next)
+
+    return _call
@@ -0,0 +1,192 @@
+"""Event-driven risk monitor: drawdown, heartbeat and connection-loss breakers."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from broker_daemon.audit.logger import AuditLogger
+from broker_daemon.daemon.metrics import LatencyHistogram
+from broker_daemon.daemon.portfolio_state import PortfolioSnapshot, PortfolioState
+from broker_daemon.models.events import Event, EventTopic
+from broker_daemon.risk.engine import RiskEngine
+from broker_daemon.risk.monitor import ConnectionLossMonitor, HeartbeatMonitor
+
+logger = logging.getLogger(__name__)
+
+EventCallback = Callable[[Event], Awaitable[None]]
+
+
+class RiskMonitor:
+    """Trips the halt from the updates that cause a breach instead of polling the broker.
+
+    Drawdown is checked on every portfolio snapshot change (broker account/PnL pushes, fills,
+    reconciles); heartbeat and connection loss arm a timer for their deadline. The halt itself
+    is applied synchronously; audit rows and risk events follow in a background task. A slow
+    sweep re-runs every check against cached state as a fallback and never calls the broker.
+
+    Breach-to-halt latency is measured from the moment the breach became observable: when the
+    broker produced the account values behind the snapshot (the request time for polls, the
+    push time otherwise), when a limit change made the current values a breach, or when the
+    heartbeat/disconnect deadline passed.
+    """
+
+    def __init__(
+        self,
+        risk: RiskEngine,
+        audit: AuditLogger,
+        portfolio: PortfolioState,
+        *,
+        heartbeat: HeartbeatMonitor,
+        connection_loss: ConnectionLossMonitor,
+        emit: EventCallback,
+        heartbeat_action: str = "warn",
+        fallback_seconds: float = 60.0,
+    ) -> None:
+        self._risk = risk
+        self._audit = audit
+        self._portfolio = portfolio
+        self._heartbeat = heartbeat
+        self._connection_loss = connection_loss
+        self._emit = emit
+        self._heartbeat_action = heartbeat_action
+        self._fallback_seconds = fallback_seconds
+        self._heartbeat_timer: asyncio.TimerHandle | None = None
+        self._connection_timer: asyncio.TimerHandle | None = None
+        self._heartbeat_reported = False
+        self._sweep_task: asyncio.Task[None] | None = None
+        self._pending: set[asyncio.Task[None]] = set()
+        self._latency: dict[str, LatencyHistogram] = {}
+        self._last_trip: dict[str, Any] | None = None
+        self._checks = 0
+        self._sweeps = 0
+
+    async def start(self) -> None:
+        self._sweep_task = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self) -> None:
+        for timer in (self._heartbeat_timer, self._connection_timer):
+            if timer is not None:
+                timer.cancel()
+        self._heartbeat_timer = self._connection_timer = None
+        if self._sweep_task:
+            self._sweep_task.cancel()
+            try:
+                await self._sweep_task
+            except asyncio.CancelledError:
+                pass
+            self._sweep_task = None
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    def on_snapshot(self, snap: PortfolioSnapshot) -> None:
+        self.check_drawdown(snap)
+
+    def on_heartbeat(self) -> None:
+        self._heartbeat.beat()
+        self._heartbeat_reported = False
+        self._heartbeat_timer = self._arm(self._heartbeat_timer, self._heartbeat.seconds_until_timeout(), self.check_heartbeat)
+
+    def on_connected(self) -> None:
+        self._connection_loss.on_connected()
+        if self._connection_timer is not None:
+            self._connection_timer.cancel()
+            self._connection_timer = None
+
+    def on_disconnected(self) -> None:
+        self._connection_loss.on_disconnected()
+        if self._connection_timer is None:
+            self._connection_timer = self._arm(None, self._connection_loss.seconds_until_breach(), self.check_connection)
+
+    def check_drawdown(self, snap: PortfolioSnapshot | None = None, *, breached_at: float | None = None) -> bool:
+        if snap is None:
+            snap = self._portfolio.current
+        if snap is None or self._risk.halted:
+            return False
+        self._checks += 1
+        breached, loss_pct = self._risk.check_drawdown_breaker(snap.daily_pnl, snap.nlv)
+        if not breached:
+            return False
+        details = {"daily_pnl": snap.daily_pnl, "loss_pct": loss_pct, "portfolio_version": snap.version}
+        if breached_at is None:
+            breached_at = snap.observed_at or snap.updated_at or time.monotonic()
+        return self._trip("drawdown_breaker", breached_at, details)
+
+    def check_heartbeat(self) -> bool:
+        remaining = self._heartbeat.seconds_until_timeout()
+        if remaining is None or remaining >= 0:
+            self._heartbeat_timer = self._arm(self._heartbeat_timer, remaining, self.check_heartbeat)
+            return False
+        self._heartbeat_timer = None
+        if self._heartbeat_reported:
+            return False
+        self._heartbeat_reported = True
+        seconds = self._heartbeat.seconds_since_last()
+        breached_at = time.monotonic() + remaining
+        if self._heartbeat_action != "halt" or self._risk.halted:
+            self._spawn(self._audit.log_risk_event("heartbeat_timeout", {"seconds_since_last": seconds}))
+            return False
+        return self._trip("heartbeat_timeout", breached_at, {"seconds_since_last": seconds}, audit_event="heartbeat_timeout")
+
+    def check_connection(self) -> bool:
+        remaining = self._connection_loss.seconds_until_breach()
+        if remaining is None or remaining >= 0:
+            self._connection_timer = self._arm(self._connection_timer, remaining, self.check_connection)
+            return False
+        self._connection_timer = None
+        if self._risk.halted:
+            return False
+        return self._trip("connection_loss", time.monotonic() + remaining, {})
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "checks": self._checks,
+            "fallback_sweeps": self._sweeps,
+            "fallback_seconds": self._fallback_seconds,
+            "breach_to_halt": {reason: hist.summary() for reason, hist in self._latency.items()},
+            "last_trip": self._last_trip,
+        }
+
+    def _trip(self, reason: str, breached_at: float, details: dict[str, Any], *, audit_event: str = "halt") -> bool:
+        self._risk.halt()
+        latency = max(0.0, time.monotonic() - breached_at)
+        self._latency.setdefault(reason, LatencyHistogram()).observe(latency)
+        latency_ms = round(latency * 1000.0, 3)
+        self._last_trip = {"reason": reason, "breach_to_halt_ms": latency_ms, "at": time.time()}
+        logger.warning("risk halt reason=%s breach_to_halt_ms=%s", reason, latency_ms)
+        self._spawn(self._publish(reason, {**details, "breach_to_halt_ms": latency_ms}, audit_event))
+        return True
+
+    async def _publish(self, reason: str, details: dict[str, Any], audit_event: str) -> None:
+        await self._audit.log_risk_event(audit_event, {"reason": reason, **details})
+        await self._emit(Event(topic=EventTopic.RISK, payload={"event": "halt", "reason": reason}))
+
+    def _spawn(self, coro: Awaitable[None]) -> None:
+        task = asyncio.ensure_future(coro)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    @staticmethod
+    def _arm(
+        timer: asyncio.TimerHandle | None, delay: float | None, callback: Callable[[], bool]
+    ) -> asyncio.TimerHandle | None:
+        if timer is not None:
+            timer.cancel()
+        if delay is None:
+            return None
+        # A hair past the deadline so the check sees it as breached.
+        return asyncio.get_running_loop().call_later(max(0.0, delay) + 0.001, callback)
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._fallback_seconds)
+            self._sweeps += 1
+            try:
+                self.check_connection()
+                self.check_heartbeat()
+                self.check_drawdown()
+            except Exception:
+                logger.exception("risk monitor sweep failed")
@@ -4,80 +4,103 @@ from __future__ import annotations
 
 import argparse
 import asyncio
-from difflib import get_close_matches
 import logging
 import os
 import signal
 import time
-from dataclasses import dataclass
+from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
 from pydantic import ValidationError
 
 from broker_daemon.audit.logger import AuditLogger
-from broker_daemon.audit.query import export_rows_to_csv, query_commands, query_orders, query_risk_events
+from broker_daemon.audit.query import (
+    EXPORT_FORMATS,
+    EXPORT_TABLES,
+    export_table,
+    next_cursor,
+    query_commands,
+    query_orders,
+    query_risk_events,
+)
 from broker_daemon.config import AppConfig, load_config
+from broker_daemon.daemon.bar_store import BarStore
+from broker_daemon.daemon.classification import CLASSIFICATION_GROUPS, ClassificationTable
+from broker_daemon.daemon.coalesce import ReadCoalescer
+from broker_daemon.daemon.event_log import EventLog
 from broker_daemon.daemon.market_data import MarketDataService
+from broker_daemon.daemon.metrics import AUDIT_WRITES, PROVIDER_CALLS, DaemonMetrics
 from broker_daemon.daemon.order_manager import OrderManager
+from broker_daemon.daemon.params import (
+    AuditCommandsParams,
+    AuditExportParams,
+    AuditOrdersParams,
+    AuditPageParams,
+    AuditRiskParams,
+    BatchParams,
+    BracketParams,
+    CancelAllParams,
+    EventsControlParams,
+    EventsSubscribeParams,
+    ExposureParams,
+    FillsListParams,
+    KeepaliveParams,
+    MarketChainParams,
+    MarketHistoryParams,
+    MetricsParams,
+    OrderIdParams,
+    OrdersListParams,
+    PositionsParams,
+    QuoteSnapshotParams,
+    RiskCheckBatchParams,
+    RiskOverrideParams,
+    RiskSetParams,
+)
+from broker_daemon.daemon.portfolio_state import PortfolioSnapshot, PortfolioState
+from broker_daemon.daemon.registry import CommandDispatcher, CommandRegistry, CommandSpec, Concurrency, EmptyParams
+from broker_daemon.daemon.risk_monitor import RiskMonitor
+from broker_daemon.daemon.subscribers import OverflowPolicy, Subscriber
 from broker_daemon.exceptions import ErrorCode, BrokerError
 from broker_daemon.models.events import Event, EventTopic
+from broker_daemon.models.market import Quote
 from broker_daemon.models.orders import FillRecord, OrderRequest
+from broker_daemon.pricing import GREEKS_MODES, apply_chain_greeks
 from broker_daemon.protocol import ErrorResponse, EventEnvelope, Request, Response, decode_request, encode_model, frame_payload, read_framed
 from broker_daemon.providers import IBProvider
 from broker_daemon.risk.engine import RiskEngine
+from broker_daemon.risk.state import RiskStateStore
 from broker_daemon.risk.monitor import ConnectionLossMonitor, HeartbeatMonitor
 
 logger = logging.getLogger(__name__)
 
-KNOWN_COMMANDS: tuple[str, ...] = (
-    "daemon.status",
-    "daemon.stop",
-    "quote.snapshot",
-    "market.history",
-    "market.chain",
-    "portfolio.positions",
-    "portfolio.balance",
-    "portfolio.pnl",
-    "portfolio.exposure",
-    "order.place",
-    "order.bracket",
-    "order.status",
-    "orders.list",
-    "order.cancel",
-    "orders.cancel_all",
-    "fills.list",
-    "risk.check",
-    "risk.limits",
-    "risk.set",
-    "risk.halt",
-    "risk.resume",
-    "risk.override",
-    "runtime.keepalive",
-    "events.subscribe",
-    "audit.commands",
-    "audit.orders",
-    "audit.risk",
-    "audit.export",
-)
+COMMANDS = CommandRegistry()
+MAX_BATCH_SIZE = 100
 ORDER_STATUSES = {"active", "filled", "cancelled", "all"}
+EVENT_CONTROL_ACTIONS = ("topics", "pause", "resume", "ack")
 OPTION_TYPES = {"call", "put"}
 
 
-@dataclass
-class Subscriber:
-    writer: asyncio.StreamWriter
-    topics: set[str]
-
-
 class DaemonServer:
     def __init__(self, cfg: AppConfig) -> None:
         self._cfg = cfg
         self._start_monotonic = time.monotonic()
         self._shutdown = asyncio.Event()
 
-        self._audit = AuditLogger(cfg.logging.audit_db)
-        self._risk = RiskEngine(cfg.risk)
+        self._audit = AuditLogger(
+            cfg.logging.audit_db,
+            flush_size=cfg.logging.audit_flush_size,
+            flush_interval_seconds=cfg.logging.audit_flush_interval_ms / 1000.0,
+            queue_size=cfg.logging.audit_queue_size,
+            synchronous=cfg.logging.audit_synchronous,
+            cache_size=cfg.logging.audit_cache_size,
+            mmap_size=cfg.logging.audit_mmap_size,
+            readers=cfg.logging.audit_readers,
+        )
+        self._risk = RiskEngine(
+            cfg.risk,
+            state_store=RiskStateStore(cfg.runtime.risk_state_path) if cfg.runtime.risk_state_path else None,
+        )
         self._heartbeat = HeartbeatMonitor(cfg.agent.heartbeat_timeout_seconds)
         self._connection_loss = ConnectionLossMonitor(threshold_seconds=30)
 
@@ -88,17 +111,64 @@ class DaemonServer:
         else:
             self._provider = IBProvider(cfg.gateway, audit=self._audit, event_cb=self._on_broker_event)
 
-        self._market_data = MarketDataService(self._provider)
+        # Coalescing sits under the timing wrapper so every caller's wait is measured.
+        self._coalescer = ReadCoalescer()
+        self._coalescer.install(self._provider)
+        self._metrics = DaemonMetrics(COMMANDS.names())
+        self._metrics.instrument(self._provider, "provider", PROVIDER_CALLS)
+        self._metrics.instrument(self._audit, "audit", AUDIT_WRITES)
+
+        self._bars = BarStore(cfg.market.bar_store_path, self._provider)
+        self._market_data = MarketDataService(
+            self._provider,
+            cfg.market.quote_cache_ttl_seconds,
+            cache_size=cfg.market.quote_cache_size,
+            stale_seconds=cfg.market.quote_stale_seconds,
+            stream_lines=cfg.market.stream_lines,
+            stream_after_requests=cfg.market.stream_after_requests,
+            stream_idle_seconds=cfg.market.stream_idle_seconds,
+            poll_seconds=cfg.market.quote_poll_seconds,
+            on_quote=self._broadcast_quote,
+        )
+        self._portfolio = PortfolioState(
+            self._provider,
+            reconcile_interval_seconds=cfg.runtime.portfolio_reconcile_seconds,
+            max_age_seconds=cfg.runtime.portfolio_max_age_seconds,
+            on_change=self._on_portfolio_change,
+        )
+        self._risk_monitor = RiskMonitor(
+            self._risk,
+            self._audit,
+            self._portfolio,
+            heartbeat=self._heartbeat,
+            connection_loss=self._connection_loss,
+            emit=self._broadcast_event,
+            heartbeat_action=cfg.agent.on_heartbeat_timeout,
+            fallback_seconds=cfg.runtime.risk_monitor_fallback_seconds,
+        )
+        self._classifications = ClassificationTable(
+            cfg.runtime.classification_path,
+            refresh_seconds=cfg.runtime.classification_refresh_seconds,
+        )
         self._orders = OrderManager(
             provider=self._provider,
             risk=self._risk,
             audit=self._audit,
             event_cb=self._broadcast_event,
+            durable_orders=cfg.logging.audit_sync_orders,
+            portfolio=self._portfolio,
+            classifications=self._classifications,
         )
 
         self._server: asyncio.AbstractServer | None = None
+        self._events = EventLog(
+            buffer_size=cfg.runtime.event_buffer_size,
+            spill_path=cfg.runtime.event_spill_path,
+            spill_max_bytes=cfg.runtime.event_spill_max_bytes,
+        )
         self._subscribers: list[Subscriber] = []
-        self._monitor_task: asyncio.Task[None] | None = None
+        self._sessions: set[asyncio.StreamWriter] = set()
+        self._commands = CommandDispatcher(COMMANDS, self, capabilities=lambda: self._provider.capabilities)
 
     @property
     def socket_path(self) -> Path:
@@ -107,7 +177,14 @@ class DaemonServer:
     async def start(self) -> None:
         self._cfg.ensure_dirs()
         await self._audit.start()
+        # Before the socket opens, so no order is checked against a blank rate or duplicate window.
+        restored = self._risk.restore()
+        if restored:
+            logger.info("restored risk state: %s", restored)
+        await self._classifications.start()
+        self._events.open()
         await self._provider.start()
+        await self._portfolio.start()
 
         if self.socket_path.exists():
             self.socket_path.unlink()
@@ -116,7 +193,7 @@ class DaemonServer:
         os.chmod(self.socket_path, 0o600)
         self._cfg.runtime.pid_file.write_text(str(os.getpid()), encoding="utf-8")
 
-        self._monitor_task = asyncio.create_task(self._monitor_loop())
+        await self._risk_monitor.start()
         await self._audit.log_connection_event("daemon_started", {"socket": str(self.socket_path)})
 
     async def serve(self) -> None:
@@ -132,21 +209,29 @@ class DaemonServer:
 
         self._shutdown.set()
 
-        if self._monitor_task:
-            self._monitor_task.cancel()
-            self._monitor_task = None
+        await self._risk_monitor.stop()
 
         for sub in list(self._subscribers):
-            sub.writer.close()
+            sub.close()
             await _safe_wait_closed(sub.writer)
         self._subscribers.clear()
 
+        for writer in list(self._sessions):
+            writer.close()
+        self._sessions.clear()
+
         if self._server:
             self._server.close()
             await self._server.wait_closed()
             self._server = None
 
+        await self._portfolio.stop()
+        await self._classifications.stop()
+        await self._market_data.close()
+        await self._bars.close()
         await self._provider.stop()
+        self._events.close()
+        self._risk.close()
         await self._audit.log_connection_event("daemon_stopped", {})
         await self._audit.close()
 
@@ -155,342 +240,708 @@ class DaemonServer:
         if self._cfg.runtime.pid_file.exists():
             self._cfg.runtime.pid_file.unlink()
 
+    @property
+    def commands(self) -> CommandDispatcher:
+        return self._commands
+
     def _require_capability(self, capability: str, label: str) -> None:
         if self._provider.capabilities.get(capability):
             return
         raise BrokerError(ErrorCode.INVALID_ARGS, f"provider does not support {label}")
 
     async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
-        request: Request | None = None
-        result_code = 0
-
         try:
             payload = await read_framed(reader)
+            started = time.perf_counter()
             request = decode_request(payload)
-
-            if request.stream and request.command == "events.subscribe":
-                await self._register_subscriber(request, reader, writer)
-                return
-
-            data = await self._dispatch(request)
-            response = Response(request_id=request.request_id, ok=True, data=data)
+            decode_seconds = time.perf_counter() - started
         except asyncio.IncompleteReadError:
             writer.close()
             await _safe_wait_closed(writer)
             return
-        except (ValidationError, KeyError, TypeError, ValueError) as exc:
-            req_id = request.request_id if request else ""
-            err = _invalid_args_error(exc)
-            result_code = err.exit_code
-            response = Response(
-                request_id=req_id,
-                ok=False,
-                error=ErrorResponse.model_validate(err.to_error_payload()),
-            )
-        except BrokerError as exc:
-            result_code = exc.exit_code
-            req_id = request.request_id if request else ""
-            response = Response(
-                request_id=req_id,
-                ok=False,
-                error=ErrorResponse.model_validate(exc.to_error_payload()),
-            )
         except Exception as exc:
-            logger.exception("unhandled daemon error")
-            result_code = 1
-            req_id = request.request_id if request else ""
-            response = Response(
-                request_id=req_id,
-                ok=False,
-                error=ErrorResponse(
-                    code=ErrorCode.INTERNAL_ERROR.value,
-                    message=str(exc),
-                ),
-            )
+            response, _ = _error_response("", exc)
+            await self._write_and_close(writer, response)
+            return
 
-        writer.write(frame_payload(encode_model(response)))
-        await writer.drain()
-        writer.close()
-        await _safe_wait_closed(writer)
+        if request.stream and request.command == "events.subscribe":
+            try:
+                await self._register_subscriber(request, reader, writer)
+            except Exception as exc:
+                response, result_code = _error_response(request.request_id, exc)
+                await self._write_and_close(writer, response)
+                await self._audit.log_command(request.source, request.command, request.params, result_code)
+            return
 
-        if request:
+        if request.session:
+            await self._serve_session(request, reader, writer, decode_seconds=decode_seconds)
+            return
+
+        with self._metrics.track(request.command, decode_seconds=decode_seconds):
+            response, result_code = await self._execute(request)
+            await self._write_and_close(writer, response)
             await self._audit.log_command(request.source, request.command, request.params, result_code)
 
+    async def _serve_session(
+        self,
+        first: Request,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        *,
+        decode_seconds: float | None = None,
+    ) -> None:
+        """Serve many pipelined requests over one connection until the client disconnects.
+
+        Each request runs as its own task and its response is written as soon as it
+        completes, so responses may arrive out of order and are matched by `request_id`.
+        """
+        write_lock = asyncio.Lock()
+        inflight = asyncio.Semaphore(max(1, self._cfg.runtime.session_max_inflight))
+        tasks: set[asyncio.Task[None]] = set()
+        self._sessions.add(writer)
+
+        async def _write(response: Response) -> None:
+            with self._metrics.stage("encode"):
+                payload = frame_payload(encode_model(response))
+            async with write_lock:
+                writer.write(payload)
+                await writer.drain()
+
+        async def _run(request: Request, decode_seconds: float | None) -> None:
+            with self._metrics.track(request.command, decode_seconds=decode_seconds):
+                await _respond(request)
+
+        async def _respond(request: Request) -> None:
+            try:
+                if request.stream:
+                    response, result_code = _error_response(
+                        request.request_id,
+                        BrokerError(
+                            ErrorCode.INVALID_ARGS,
+                            "streaming requests are not supported inside a session",
+                            suggestion="Open a dedicated connection for events.subscribe.",
+                        ),
+                    )
+                else:
+                    response, result_code = await self._execute(request)
+                try:
+                    await _write(response)
+                except (ConnectionError, RuntimeError):
+                    logger.debug("session client went away before response %s", request.request_id)
+                await self._audit.log_command(request.source, request.command, request.params, result_code)
+            finally:
+                inflight.release()
+
+        def _spawn(request: Request, decode_seconds: float | None) -> None:
+            task = asyncio.create_task(_run(request, decode_seconds))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        try:
+            await inflight.acquire()
+            _spawn(first, decode_seconds)
+            while not self._shutdown.is_set():
+                payload = await read_framed(reader)
+                started = time.perf_counter()
+                try:
+                    request = decode_request(payload)
+                except Exception as exc:
+                    response, _ = _error_response("", exc)
+                    await _write(response)
+                    continue
+                await inflight.acquire()
+                _spawn(request, time.perf_counter() - started)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            self._sessions.discard(writer)
+            writer.close()
+            await _safe_wait_closed(writer)
+
+    async def _execute(self, request: Request) -> tuple[Response, int]:
+        with self._metrics.stage("dispatch"):
+            try:
+                data = await self._dispatch(request)
+            except Exception as exc:
+                response, result_code = _error_response(request.request_id, exc)
+                if response.error is not None:
+                    self._metrics.record_error(response.error.code)
+                return response, result_code
+        return Response(request_id=request.request_id, ok=True, data=data), 0
+
+    async def _write_and_close(self, writer: asyncio.StreamWriter, response: Response) -> None:
+        try:
+            with self._metrics.stage("encode"):
+                payload = frame_payload(encode_model(response))
+            writer.write(payload)
+            await writer.drain()
+        except (ConnectionError, RuntimeError):
+            logger.debug("client went away before response %s", response.request_id)
+        writer.close()
+        await _safe_wait_closed(writer)
+
     async def _register_subscriber(
         self,
         request: Request,
         reader: asyncio.StreamReader,
         writer: asyncio.StreamWriter,
     ) -> None:
-        topics = set(str(v).lower() for v in request.params.get("topics", []))
-        if not topics:
-            topics = {e.value for e in EventTopic}
-        invalid_topics = sorted(topics - {e.value for e in EventTopic})
-        if invalid_topics:
-            valid = sorted(e.value for e in EventTopic)
+        params = EventsSubscribeParams.model_validate(request.params)
+        topics = _subscription_topics(params.topics)
+        symbols = _quote_symbols(topics, params.symbols)
+
+        try:
+            policy = OverflowPolicy((params.overflow or self._cfg.runtime.subscriber_overflow).lower())
+        except ValueError as exc:
+            valid = [p.value for p in OverflowPolicy]
             raise BrokerError(
                 ErrorCode.INVALID_ARGS,
-                f"unsupported subscription topic(s): {', '.join(invalid_topics)}",
-                details={"invalid_topics": invalid_topics, "valid_topics": valid},
-                suggestion=f"Use topics from: {', '.join(valid)}",
-            )
+                f"unsupported overflow policy '{params.overflow}'",
+                details={"valid_policies": valid},
+                suggestion=f"Use overflow one of: {', '.join(valid)}",
+            ) from exc
 
-        sub = Subscriber(writer=writer, topics=topics)
+        sub = Subscriber(
+            writer,
+            topics,
+            max_queue=params.max_queue or self._cfg.runtime.subscriber_queue_size,
+            policy=policy,
+            on_close=self._remove_subscriber,
+            symbols=symbols,
+            max_rate=params.max_rate,
+        )
+        # Capture the replay and register in the same step: later events queue behind the replay.
+        replay = (
+            self._events.replay(params.since_seq, topics, epoch=params.epoch) if params.since_seq is not None else None
+        )
         self._subscribers.append(sub)
         await self._audit.log_command(request.source, request.command, request.params, 0)
+        await self._sync_quote_watch(sub)
 
-        response = Response(request_id=request.request_id, ok=True, data={"subscribed": sorted(topics)})
-        writer.write(frame_payload(encode_model(response)))
-        await writer.drain()
-
         try:
-            while not reader.at_eof() and not self._shutdown.is_set():
-                await asyncio.sleep(1)
+            frames = await self._events.load_spill(replay) if replay else []
+            response = Response(
+                request_id=request.request_id,
+                ok=True,
+                data={
+                    "subscribed": sorted(topics),
+                    "symbols": sorted(symbols),
+                    "overflow": policy.value,
+                    "max_queue": sub.max_queue,
+                    "last_seq": self._events.last_seq,
+                    "epoch": self._events.epoch,
+                    "replayed": len(frames),
+                    "replay_gap": replay.gap if replay else False,
+                },
+            )
+            writer.write(frame_payload(encode_model(response)))
+            for frame in frames:
+                writer.write(frame)
+                await writer.drain()
+            await writer.drain()
+        except Exception:
+            sub.close()
+            raise
+        sub.start()
+
+        # Block on the client's side of the socket: EOF means it went away, anything else is a
+        # control message. Closing the subscriber (overflow, shutdown) closes the socket and ends the read.
+        try:
+            while not sub.closed:
+                payload = await read_framed(reader)
+                request_id = ""
+                try:
+                    control = decode_request(payload)
+                    request_id = control.request_id
+                    response = Response(request_id=request_id, ok=True, data=await self._control_subscriber(sub, control))
+                except Exception as exc:
+                    response, _ = _error_response(request_id, exc)
+                sub.send(frame_payload(encode_model(response)))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
         finally:
-            if sub in self._subscribers:
-                self._subscribers.remove(sub)
-            writer.close()
+            sub.close()
             await _safe_wait_closed(writer)
 
-    async def _dispatch(self, request: Request) -> dict[str, Any]:
-        cmd = request.command
-        p = request.params
-
-        if cmd == "daemon.status":
-            return await self._cmd_daemon_status()
-        if cmd == "daemon.stop":
-            asyncio.create_task(self.stop())
-            return {"stopping": True}
-
-        if cmd == "quote.snapshot":
-            symbols = [str(s).upper() for s in p.get("symbols", [])]
-            if not symbols:
-                raise BrokerError(
-                    ErrorCode.INVALID_ARGS,
-                    "symbols is required and must contain at least one item",
-                    suggestion="Example: broker quote AAPL MSFT",
-                )
-            quotes = await self._market_data.quote(symbols, force_refresh=bool(p.get("force", False)))
-            return {"quotes": [q.model_dump(mode="json") for q in quotes]}
-
-        if cmd == "market.history":
-            self._require_capability("history", "historical bars")
-            bars = await self._provider.history(
-                symbol=str(p["symbol"]),
-                period=str(p.get("period", "30d")),
-                bar=str(p.get("bar", "1h")),
-                rth_only=bool(p.get("rth_only", False)),
-            )
-            return {"bars": [b.model_dump(mode="json") for b in bars]}
-
-        if cmd == "market.chain":
-            self._require_capability("option_chain", "option chains")
-            strike_range = _parse_strike_range(p.get("strike_range"))
-            option_type = p.get("type")
-            if option_type is not None and str(option_type).lower() not in OPTION_TYPES:
-                raise BrokerError(
-                    ErrorCode.INVALID_ARGS,
-                    f"unsupported option type '{option_type}'",
-                    details={"valid_types": sorted(OPTION_TYPES)},
-                    suggestion="Use --type call or --type put",
-                )
-            chain = await self._provider.option_chain(
-                symbol=str(p["symbol"]),
-                expiry_prefix=p.get("expiry"),
-                strike_range=strike_range,
-                option_type=str(option_type).lower() if option_type is not None else None,
+    async def _control_subscriber(self, sub: Subscriber, request: Request) -> dict[str, Any]:
+        if request.command != "events.control":
+            raise BrokerError(
+                ErrorCode.INVALID_ARGS,
+                f"'{request.command}' is not accepted on an event subscription",
+                suggestion="Send events.control messages, or open a separate connection for other commands.",
             )
-            return chain.model_dump(mode="json")
-
-        if cmd == "portfolio.positions":
-            positions = await self._provider.positions()
-            symbol = p.get("symbol")
-            if symbol:
-                positions = [x for x in positions if x.symbol.upper() == str(symbol).upper()]
-            return {"positions": [x.model_dump(mode="json") for x in positions]}
-
-        if cmd == "portfolio.balance":
-            return {"balance": (await self._provider.balance()).model_dump(mode="json")}
-
-        if cmd == "portfolio.pnl":
-            return {"pnl": (await self._provider.pnl()).model_dump(mode="json")}
-
-        if cmd == "portfolio.exposure":
-            self._require_capability("exposure", "portfolio exposure")
-            by = str(p.get("by", "symbol"))
-            rows = await self._provider.exposure(by)
-            return {"exposure": [r.model_dump(mode="json") for r in rows], "by": by}
-
-        if cmd == "order.place":
-            req = OrderRequest.model_validate(p)
-            record = await self._orders.place_order(req)
-            return {"order": record.model_dump(mode="json")}
-
-        if cmd == "order.bracket":
-            self._require_capability("bracket_orders", "bracket orders")
-            res = await self._orders.place_bracket(
-                side=str(p.get("side", "buy")),
-                symbol=str(p["symbol"]),
-                qty=float(p["qty"]),
-                entry=float(p["entry"]),
-                tp=float(p["tp"]),
-                sl=float(p["sl"]),
-                tif=str(p.get("tif", "DAY")),
+        params = EventsControlParams.model_validate(request.params)
+        action = params.action.lower()
+        if action == "topics":
+            topics = _subscription_topics(params.topics) if params.topics is not None else sub.topics
+            symbols = _quote_symbols(topics, params.symbols if params.symbols is not None else sorted(sub.symbols))
+            sub.topics, sub.symbols = topics, symbols
+            if params.max_rate is not None:
+                sub.max_rate = params.max_rate
+            await self._sync_quote_watch(sub)
+        elif action == "pause":
+            sub.pause()
+        elif action == "resume":
+            sub.resume()
+        elif action == "ack":
+            if params.seq is None:
+                raise BrokerError(ErrorCode.INVALID_ARGS, "missing required parameter 'seq'")
+            sub.ack(params.seq)
+        else:
+            raise BrokerError(
+                ErrorCode.INVALID_ARGS,
+                f"unsupported control action '{params.action}'",
+                details={"valid_actions": list(EVENT_CONTROL_ACTIONS)},
+                suggestion=f"Use action one of: {', '.join(EVENT_CONTROL_ACTIONS)}",
             )
-            return res
-
-        if cmd == "order.status":
-            order_id = str(p["order_id"])
-            item = await self._orders.order_status(order_id)
-            if item is None:
-                raise BrokerError(ErrorCode.INVALID_ARGS, f"unknown order_id '{order_id}'")
-            return {"order": item}
-
-        if cmd == "orders.list":
-            status = str(p.get("status", "all"))
-            if status.lower() not in ORDER_STATUSES:
-                valid = ", ".join(sorted(ORDER_STATUSES))
-                raise BrokerError(
-                    ErrorCode.INVALID_ARGS,
-                    f"unsupported orders status '{status}'",
-                    details={"valid_statuses": sorted(ORDER_STATUSES)},
-                    suggestion=f"Use --status one of: {valid}",
-                )
-            rows = await self._orders.list_orders(status=status)
-            if since := p.get("since"):
-                rows = [r for r in rows if str(r.get("submitted_at", "")) >= str(since)]
-            return {"orders": rows}
+        return {
+            "action": action,
+            "subscribed": sorted(sub.topics),
+            "symbols": sorted(sub.symbols),
+            "paused": sub.paused,
+            "acked_seq": sub.acked_seq,
+        }
 
-        if cmd == "order.cancel":
-            order_id = str(p["order_id"])
-            return await self._orders.cancel_order(order_id)
+    def _remove_subscriber(self, sub: Subscriber) -> None:
+        if sub in self._subscribers:
+            self._subscribers.remove(sub)
+        self._market_data.unwatch_symbols(sorted(sub.watched_symbols))
+        sub.watched_symbols = set()
 
-        if cmd == "orders.cancel_all":
-            if not bool(p.get("confirm", False)) and not bool(p.get("json_mode", False)):
-                raise BrokerError(
-                    ErrorCode.INVALID_ARGS,
-                    "cancel --all requires --confirm (unless JSON mode)",
-                )
-            self._require_capability("cancel_all", "cancel all")
-            return await self._orders.cancel_all()
-
-        if cmd == "fills.list":
-            symbol = p.get("symbol")
-            rows = await self._orders.list_fills(symbol=symbol)
-            if since := p.get("since"):
-                rows = [r for r in rows if str(r.get("timestamp", "")) >= str(since)]
-            return {"fills": rows}
-
-        if cmd == "risk.check":
-            req = OrderRequest.model_validate(p)
-            context = await self._orders._risk_context()  # noqa: SLF001
-            result = self._risk.check_order(req, context)
-            event_type = "check_passed" if result.ok else "check_failed"
-            await self._audit.log_risk_event(event_type, result.model_dump(mode="json"))
-            return result.model_dump(mode="json")
-
-        if cmd == "risk.limits":
-            return {"limits": self._risk.snapshot().model_dump(mode="json")}
-
-        if cmd == "risk.set":
-            try:
-                snapshot = self._risk.set_limit(str(p["param"]), p["value"])
-            except ValueError as exc:
-                raise BrokerError(ErrorCode.INVALID_ARGS, str(exc)) from exc
-            await self._audit.log_risk_event("set", {"param": p["param"], "value": p["value"]})
-            return {"limits": snapshot.model_dump(mode="json")}
-
-        if cmd == "risk.halt":
-            self._risk.halt()
-            await self._orders.cancel_all()
-            await self._audit.log_risk_event("halt", {"source": request.source})
-            await self._broadcast_event(Event(topic=EventTopic.RISK, payload={"event": "halt"}))
-            return {"halted": True}
-
-        if cmd == "risk.resume":
-            self._risk.resume()
-            await self._audit.log_risk_event("resume", {"source": request.source})
-            await self._broadcast_event(Event(topic=EventTopic.RISK, payload={"event": "resume"}))
-            return {"halted": False}
-
-        if cmd == "risk.override":
-            try:
-                duration = str(p.get("duration", "1h"))
-                seconds = self._risk.parse_duration(duration)
-                override = self._risk.override_limit(
-                    param=str(p["param"]),
-                    value=p["value"],
-                    duration_seconds=seconds,
-                    reason=str(p.get("reason", "manual override")),
-                )
-            except ValueError as exc:
-                raise BrokerError(ErrorCode.INVALID_ARGS, str(exc)) from exc
-            await self._audit.log_risk_event("override", override.model_dump(mode="json"))
-            return {"override": override.model_dump(mode="json")}
-
-        if cmd == "runtime.keepalive":
-            self._heartbeat.beat()
-            sent_at = p.get("sent_at")
-            latency_ms = None
-            if sent_at is not None:
-                try:
-                    latency_ms = max(0.0, (time.time() - float(sent_at)) * 1000.0)
-                except Exception:
-                    latency_ms = None
-            return {
-                "ok": True,
-                "latency_ms": latency_ms,
-                "connected": self._provider.is_connected,
-                "halted": self._risk.halted,
-            }
-
-        if cmd == "audit.commands":
-            rows = await query_commands(self._audit, source=p.get("source"), since=p.get("since"))
-            return {"commands": rows}
-
-        if cmd == "audit.orders":
-            rows = await query_orders(self._audit, status=p.get("status"), since=p.get("since"))
-            return {"orders": rows}
-
-        if cmd == "audit.risk":
-            rows = await query_risk_events(self._audit, event_type=p.get("type"))
-            return {"risk_events": rows}
-
-        if cmd == "audit.export":
-            target = Path(str(p["output"])).expanduser()
-            fmt = str(p.get("format", "csv"))
-            if fmt != "csv":
-                raise BrokerError(ErrorCode.INVALID_ARGS, "only csv export is currently supported")
-
-            table = str(p.get("table", "orders"))
-            if table == "commands":
-                rows = await query_commands(self._audit, source=p.get("source"), since=p.get("since"))
-            elif table == "risk":
-                rows = await query_risk_events(self._audit, event_type=p.get("type"))
-            else:
-                rows = await query_orders(self._audit, status=p.get("status"), since=p.get("since"))
-            export_rows_to_csv(rows, target)
-            return {"output": str(target), "rows": len(rows)}
-
-        raise _unknown_command_error(cmd)
-
-    async def _cmd_daemon_status(self) -> dict[str, Any]:
+    async def _sync_quote_watch(self, sub: Subscriber) -> None:
+        """Hold market-data watches for exactly the symbols a quotes subscriber filters on."""
+        wanted = set(sub.symbols) if EventTopic.QUOTES.value in sub.topics and not sub.closed else set()
+        added, removed = wanted - sub.watched_symbols, sub.watched_symbols - wanted
+        sub.watched_symbols = wanted
+        self._market_data.unwatch_symbols(sorted(removed))
+        await self._market_data.watch_symbols(sorted(added))
+
+    async def _dispatch(self, request: Request) -> dict[str, Any]:
+        return await self._commands.dispatch(request)
+
+    @COMMANDS.command("daemon.status")
+    async def _cmd_daemon_status(self, request: Request, params: EmptyParams) -> dict[str, Any]:
         status = self._provider.status()
         return {
             "uptime_seconds": round(time.monotonic() - self._start_monotonic, 3),
             "connection": status.model_dump(mode="json"),
             "risk_halted": self._risk.halted,
+            "risk_state": self._risk.state_stats(),
+            "risk_monitor": self._risk_monitor.stats(),
+            "classifications": self._classifications.stats(),
+            "portfolio_version": self._portfolio.current.version if self._portfolio.current else None,
+            "sessions": len(self._sessions),
+            "subscribers": len(self._subscribers),
+            "subscriber_stats": [sub.stats() for sub in self._subscribers],
+            "events": self._events.stats(),
+            "quote_streams": self._market_data.streams.stats(),
+            "quote_cache": self._market_data.stats(),
+            "bar_store": self._bars.stats(),
+            "history_pacing": self._provider.pacing_stats(),
             "time_sync_delta_ms": None,
             "socket": str(self.socket_path),
         }
 
+    @COMMANDS.command("daemon.metrics", params=MetricsParams)
+    async def _cmd_daemon_metrics(self, request: Request, params: MetricsParams) -> dict[str, Any]:
+        snapshot = self._metrics.snapshot(command=params.command)
+        snapshot["coalescing"] = self._coalescer.stats()
+        return snapshot
+
+    @COMMANDS.command("daemon.stop", concurrency=Concurrency.CONTROL)
+    async def _cmd_daemon_stop(self, request: Request, params: EmptyParams) -> dict[str, Any]:
+        asyncio.create_task(self.stop())
+        return {"stopping": True}
+
+    @COMMANDS.command("quote.snapshot", params=QuoteSnapshotParams)
+    async def _cmd_quote_snapshot(self, request: Request, params: QuoteSnapshotParams) -> dict[str, Any]:
+        symbols = [s.upper() for s in params.symbols]
+        if not symbols:
+            raise BrokerError(
+                ErrorCode.INVALID_ARGS,
+                "symbols is required and must contain at least one item",
+                suggestion="Example: broker quote AAPL MSFT",
+            )
+        max_age = params.max_age_ms / 1000.0 if params.max_age_ms is not None else None
+        entries = await self._market_data.quote_entries(symbols, max_age_seconds=max_age, force_refresh=params.force)
+        return {
+            "quotes": [e.quote.model_dump(mode="json") for e in entries],
+            "cache": {
+                e.quote.symbol: {"hit": e.hit, "stale": e.stale, "age_ms": round(e.age_seconds * 1000, 1)}
+                for e in entries
+            },
+        }
+
+    @COMMANDS.command("market.history", params=MarketHistoryParams, capability="history", capability_label="historical bars")
+    async def _cmd_market_history(self, request: Request, params: MarketHistoryParams) -> dict[str, Any]:
+        result = await self._bars.history(
+            params.symbol,
+            params.bar,
+            params.rth_only,
+            period=params.period,
+            start=_parse_history_time(params.start, "start"),
+            end=_parse_history_time(params.end, "end"),
+        )
+        return {
+            "bars": [b.model_dump(mode="json") for b in result.bars],
+            "cache": {"hit_ratio": result.hit_ratio, "fetched_ranges": len(result.fetched)},
+        }
+
+    @COMMANDS.command("market.chain", params=MarketChainParams, capability="option_chain", capability_label="option chains")
+    async def _cmd_market_chain(self, request: Request, params: MarketChainParams) -> dict[str, Any]:
+        strike_range = _parse_strike_range(params.strike_range)
+        option_type = params.type
+        if option_type is not None and option_type.lower() not in OPTION_TYPES:
+            raise BrokerError(
+                ErrorCode.INVALID_ARGS,
+                f"unsupported option type '{option_type}'",
+                details={"valid_types": sorted(OPTION_TYPES)},
+                suggestion="Use --type call or --type put",
+            )
+        greeks_mode = params.greeks.lower()
+        if greeks_mode not in GREEKS_MODES:
+            raise BrokerError(
+                ErrorCode.INVALID_ARGS,
+                f"unsupported greeks mode '{params.greeks}'",
+                details={"valid_modes": sorted(GREEKS_MODES)},
+                suggestion="Use --greeks auto, --greeks local or --greeks provider",
+            )
+        chain = await self._provider.option_chain(
+            symbol=params.symbol,
+            expiry_prefix=params.expiry,
+            strike_range=strike_range,
+            option_type=option_type.lower() if option_type is not None else None,
+        )
+        # The chain may be shared with coalesced callers; price a copy.
+        chain = chain.model_copy(deep=True)
+        computed = await asyncio.to_thread(
+            apply_chain_greeks,
+            chain,
+            rate=self._cfg.market.option_rate if params.rate is None else params.rate,
+            dividend_yield=self._cfg.market.option_dividend_yield if params.dividend_yield is None else params.dividend_yield,
+            mode=greeks_mode,
+            vol=params.vol,
+        )
+        return {**chain.model_dump(mode="json"), "greeks": {"mode": greeks_mode, "computed": computed}}
+
+    @COMMANDS.command("portfolio.positions", params=PositionsParams)
+    async def _cmd_portfolio_positions(self, request: Request, params: PositionsParams) -> dict[str, Any]:
+        positions = await self._provider.positions()
+        if params.symbol:
+            positions = [x for x in positions if x.symbol.upper() == params.symbol.upper()]
+        return {"positions": [x.model_dump(mode="json") for x in positions]}
+
+    @COMMANDS.command("portfolio.balance")
+    async def _cmd_portfolio_balance(self, request: Request, params: EmptyParams) -> dict[str, Any]:
+        return {"balance": (await self._provider.balance()).model_dump(mode="json")}
+
+    @COMMANDS.command("portfolio.pnl")
+    async def _cmd_portfolio_pnl(self, request: Request, params: EmptyParams) -> dict[str, Any]:
+        return {"pnl": (await self._provider.pnl()).model_dump(mode="json")}
+
+    @COMMANDS.command("portfolio.exposure", params=ExposureParams, capability="exposure", capability_label="portfolio exposure")
+    async def _cmd_portfolio_exposure(self, request: Request, params: ExposureParams) -> dict[str, Any]:
+        if params.by in CLASSIFICATION_GROUPS:
+            # Brokers report no sector data; group per-symbol exposure through the local table.
+            rows = self._classifications.group_exposure(await self._provider.exposure("symbol"), params.by)
+        else:
+            rows = await self._provider.exposure(params.by)
+        return {"exposure": [r.model_dump(mode="json") for r in rows], "by": params.by}
+
+    @COMMANDS.command("portfolio.refresh", concurrency=Concurrency.WRITE)
+    async def _cmd_portfolio_refresh(self, request: Request, params: EmptyParams) -> dict[str, Any]:
+        snap = await self._portfolio.snapshot(force_refresh=True)
+        return {"portfolio": snap.to_dict()}
+
+    @COMMANDS.command("order.place", params=OrderRequest, concurrency=Concurrency.WRITE)
+    async def _cmd_order_place(self, request: Request, params: OrderRequest) -> dict[str, Any]:
+        record = await self._orders.place_order(params)
+        return {"order": record.model_dump(mode="json")}
+
+    @COMMANDS.command(
+        "order.bracket",
+        params=BracketParams,
+        capability="bracket_orders",
+        capability_label="bracket orders",
+        concurrency=Concurrency.WRITE,
+    )
+    async def _cmd_order_bracket(self, request: Request, params: BracketParams) -> dict[str, Any]:
+        return await self._orders.place_bracket(
+            side=params.side,
+            symbol=params.symbol,
+            qty=params.qty,
+            entry=params.entry,
+            tp=params.tp,
+            sl=params.sl,
+            tif=params.tif,
+        )
+
+    @COMMANDS.command("order.status", params=OrderIdParams)
+    async def _cmd_order_status(self, request: Request, params: OrderIdParams) -> dict[str, Any]:
+        item = await self._orders.order_status(params.order_id)
+        if item is None:
+            raise BrokerError(ErrorCode.INVALID_ARGS, f"unknown order_id '{params.order_id}'")
+        return {"order": item}
+
+    @COMMANDS.command("orders.list", params=OrdersListParams)
+    async def _cmd_orders_list(self, request: Request, params: OrdersListParams) -> dict[str, Any]:
+        status = params.status
+        if status.lower() not in ORDER_STATUSES:
+            valid = ", ".join(sorted(ORDER_STATUSES))
+            raise BrokerError(
+                ErrorCode.INVALID_ARGS,
+                f"unsupported orders status '{status}'",
+                details={"valid_statuses": sorted(ORDER_STATUSES)},
+                suggestion=f"Use --status one of: {valid}",
+            )
+        rows = await self._orders.list_orders(status=status)
+        if since := params.since:
+            rows = [r for r in rows if str(r.get("submitted_at", "")) >= since]
+        return {"orders": rows}
+
+    @COMMANDS.command("order.cancel", params=OrderIdParams, concurrency=Concurrency.WRITE)
+    async def _cmd_order_cancel(self, request: Request, params: OrderIdParams) -> dict[str, Any]:
+        return await self._orders.cancel_order(params.order_id)
+
+    @COMMANDS.command("orders.cancel_all", params=CancelAllParams, concurrency=Concurrency.WRITE)
+    async def _cmd_orders_cancel_all(self, request: Request, params: CancelAllParams) -> dict[str, Any]:
+        if not params.confirm and not params.json_mode:
+            raise BrokerError(
+                ErrorCode.INVALID_ARGS,
+                "cancel --all requires --confirm (unless JSON mode)",
+            )
+        self._require_capability("cancel_all", "cancel all")
+        return await self._orders.cancel_all()
+
+    @COMMANDS.command("fills.list", params=FillsListParams)
+    async def _cmd_fills_list(self, request: Request, params: FillsListParams) -> dict[str, Any]:
+        rows = await self._orders.list_fills(symbol=params.symbol)
+        if since := params.since:
+            rows = [r for r in rows if str(r.get("timestamp", "")) >= since]
+        return {"fills": rows}
+
+    @COMMANDS.command("risk.check", params=OrderRequest, concurrency=Concurrency.WRITE)
+    async def _cmd_risk_check(self, request: Request, params: OrderRequest) -> dict[str, Any]:
+        context = await self._orders._risk_context()  # noqa: SLF001
+        result = self._risk.check_order(params, context)
+        event_type = "check_passed" if result.ok else "check_failed"
+        await self._audit.log_risk_event(event_type, result.model_dump(mode="json"))
+        return result.model_dump(mode="json")
+
+    @COMMANDS.command("risk.check_batch", params=RiskCheckBatchParams, concurrency=Concurrency.WRITE)
+    async def _cmd_risk_check_batch(self, request: Request, params: RiskCheckBatchParams) -> dict[str, Any]:
+        context = await self._orders._risk_context()  # noqa: SLF001
+        result = self._risk.check_batch(params.orders, context)
+        await self._audit.log_risk_event(
+            "batch_check_passed" if result.ok else "batch_check_failed",
+            {"orders": len(params.orders), "passed": result.passed, "failed": result.failed},
+        )
+        return result.model_dump(mode="json")
+
+    @COMMANDS.command("risk.limits")
+    async def _cmd_risk_limits(self, request: Request, params: EmptyParams) -> dict[str, Any]:
+        return {"limits": self._risk.snapshot().model_dump(mode="json")}
+
+    @COMMANDS.command("risk.set", params=RiskSetParams, concurrency=Concurrency.WRITE)
+    async def _cmd_risk_set(self, request: Request, params: RiskSetParams) -> dict[str, Any]:
+        try:
+            snapshot = self._risk.set_limit(params.param, params.value)
+        except ValueError as exc:
+            raise BrokerError(ErrorCode.INVALID_ARGS, str(exc)) from exc
+        await self._audit.log_risk_event("set", {"param": params.param, "value": params.value})
+        # A tighter loss limit can put the current drawdown over it without any new account data.
+        self._risk_monitor.check_drawdown(breached_at=time.monotonic())
+        return {"limits": snapshot.model_dump(mode="json")}
+
+    @COMMANDS.command("risk.halt", concurrency=Concurrency.WRITE)
+    async def _cmd_risk_halt(self, request: Request, params: EmptyParams) -> dict[str, Any]:
+        self._risk.halt()
+        await self._orders.cancel_all()
+        await self._audit.log_risk_event("halt", {"source": request.source})
+        await self._broadcast_event(Event(topic=EventTopic.RISK, payload={"event": "halt"}))
+        return {"halted": True}
+
+    @COMMANDS.command("risk.resume", concurrency=Concurrency.WRITE)
+    async def _cmd_risk_resume(self, request: Request, params: EmptyParams) -> dict[str, Any]:
+        self._risk.resume()
+        await self._audit.log_risk_event("resume", {"source": request.source})
+        await self._broadcast_event(Event(topic=EventTopic.RISK, payload={"event": "resume"}))
+        return {"halted": False}
+
+    @COMMANDS.command("risk.override", params=RiskOverrideParams, concurrency=Concurrency.WRITE)
+    async def _cmd_risk_override(self, request: Request, params: RiskOverrideParams) -> dict[str, Any]:
+        try:
+            seconds = self._risk.parse_duration(params.duration)
+            override = self._risk.override_limit(
+                param=params.param,
+                value=params.value,
+                duration_seconds=seconds,
+                reason=params.reason,
+            )
+        except ValueError as exc:
+            raise BrokerError(ErrorCode.INVALID_ARGS, str(exc)) from exc
+        await self._audit.log_risk_event("override", override.model_dump(mode="json"))
+        self._risk_monitor.check_drawdown(breached_at=time.monotonic())
+        return {"override": override.model_dump(mode="json")}
+
+    @COMMANDS.command("runtime.keepalive", params=KeepaliveParams, concurrency=Concurrency.WRITE)
+    async def _cmd_runtime_keepalive(self, request: Request, params: KeepaliveParams) -> dict[str, Any]:
+        self._risk_monitor.on_heartbeat()
+        latency_ms = None
+        if params.sent_at is not None:
+            try:
+                latency_ms = max(0.0, (time.time() - float(params.sent_at)) * 1000.0)
+            except Exception:
+                latency_ms = None
+        return {
+            "ok": True,
+            "latency_ms": latency_ms,
+            "connected": self._provider.is_connected,
+            "halted": self._risk.halted,
+        }
+
+    @COMMANDS.command("events.subscribe", params=EventsSubscribeParams, concurrency=Concurrency.CONTROL)
+    async def _cmd_events_subscribe(self, request: Request, params: EventsSubscribeParams) -> dict[str, Any]:
+        raise BrokerError(
+            ErrorCode.INVALID_ARGS,
+            "events.subscribe requires a streaming request",
+            suggestion="Send events.subscribe with stream=true on a dedicated connection.",
+        )
+
+    @COMMANDS.command("audit.commands", params=AuditCommandsParams)
+    async def _cmd_audit_commands(self, request: Request, params: AuditCommandsParams) -> dict[str, Any]:
+        rows = await query_commands(self._audit, source=params.source, **_page_kwargs(params))
+        return {"commands": rows, "next_cursor": next_cursor(rows, limit=params.limit, after_id=params.after_id)}
+
+    @COMMANDS.command("audit.orders", params=AuditOrdersParams)
+    async def _cmd_audit_orders(self, request: Request, params: AuditOrdersParams) -> dict[str, Any]:
+        rows = await query_orders(self._audit, status=params.status, **_page_kwargs(params))
+        return {"orders": rows, "next_cursor": next_cursor(rows, limit=params.limit, after_id=params.after_id)}
+
+    @COMMANDS.command("audit.risk", params=AuditRiskParams)
+    async def _cmd_audit_risk(self, request: Request, params: AuditRiskParams) -> dict[str, Any]:
+        rows = await query_risk_events(self._audit, event_type=params.type, **_page_kwargs(params))
+        return {"risk_events": rows, "next_cursor": next_cursor(rows, limit=params.limit, after_id=params.after_id)}
+
+    @COMMANDS.command("audit.export", params=AuditExportParams, concurrency=Concurrency.WRITE, max_inflight=2)
+    async def _cmd_audit_export(self, request: Request, params: AuditExportParams) -> dict[str, Any]:
+        target = Path(params.output).expanduser()
+        fmt = params.format.lower()
+        if fmt not in EXPORT_FORMATS:
+            raise BrokerError(
+                ErrorCode.INVALID_ARGS,
+                f"unsupported export format '{params.format}'",
+                details={"valid_formats": list(EXPORT_FORMATS)},
+                suggestion="Use --format csv or --format ndjson",
+            )
+        if params.table not in EXPORT_TABLES:
+            raise BrokerError(
+                ErrorCode.INVALID_ARGS,
+                f"unsupported export table '{params.table}'",
+                details={"valid_tables": sorted(EXPORT_TABLES)},
+            )
+
+        filter_value = {"commands": params.source, "risk": params.type}.get(params.table, params.status)
+        return await export_table(
+            self._audit,
+            table=params.table,
+            output=target,
+            fmt=fmt,
+            gzip_output=params.gzip,
+            filter_value=filter_value,
+            since=params.since,
+            until=params.until,
+        )
+
+    @COMMANDS.command("batch", params=BatchParams, concurrency=Concurrency.CONTROL)
+    async def _cmd_batch(self, request: Request, params: BatchParams) -> dict[str, Any]:
+        """Run sub-requests in one round trip with per-item results.
+
+        Runs of consecutive read commands execute concurrently; any other command
+        waits for earlier items and completes before later ones start, preserving order.
+        """
+        items = params.requests
+        if not isinstance(items, list) or not items:
+            raise BrokerError(
+                ErrorCode.INVALID_ARGS,
+                "requests is required and must contain at least one item",
+                suggestion='Example: {"requests": [{"command": "portfolio.balance"}]}',
+            )
+        if len(items) > MAX_BATCH_SIZE:
+            raise BrokerError(
+                ErrorCode.INVALID_ARGS,
+                f"batch supports at most {MAX_BATCH_SIZE} requests, got {len(items)}",
+                details={"max_batch_size": MAX_BATCH_SIZE},
+            )
+
+        subrequests: list[tuple[Request, CommandSpec | None]] = []
+        for idx, item in enumerate(items):
+            if not isinstance(item, dict) or not item.get("command"):
+                raise BrokerError(
+                    ErrorCode.INVALID_ARGS,
+                    f"batch item {idx} must be an object with a command",
+                    details={"index": idx},
+                )
+            command = str(item["command"])
+            spec = COMMANDS.get(command)
+            if spec is not None and not spec.batchable:
+                raise BrokerError(
+                    ErrorCode.INVALID_ARGS,
+                    f"command '{command}' cannot run inside a batch",
+                    details={"index": idx, "excluded_commands": sorted(s.name for s in COMMANDS.specs() if not s.batchable)},
+                )
+            sub_params = item.get("params") or {}
+            if not isinstance(sub_params, dict):
+                raise BrokerError(ErrorCode.INVALID_ARGS, f"batch item {idx} params must be an object", details={"index": idx})
+            sub = Request(
+                request_id=str(item.get("request_id") or f"{request.request_id}:{idx}"),
+                command=command,
+                params=sub_params,
+                source=request.source,
+            )
+            subrequests.append((sub, spec))
+
+        results: list[dict[str, Any]] = [{} for _ in subrequests]
+
+        async def _run(idx: int, sub: Request) -> None:
+            with self._metrics.track(sub.command):
+                response, result_code = await self._execute(sub)
+                results[idx] = {"command": sub.command, **response.model_dump(mode="json")}
+                await self._audit.log_command(sub.source, sub.command, sub.params, result_code)
+
+        concurrent: list[tuple[int, Request]] = []
+        for idx, (sub, spec) in enumerate(subrequests):
+            if spec is None or spec.concurrency == Concurrency.READ:
+                concurrent.append((idx, sub))
+                continue
+            if concurrent:
+                await asyncio.gather(*(_run(i, r) for i, r in concurrent))
+                concurrent = []
+            await _run(idx, sub)
+        if concurrent:
+            await asyncio.gather(*(_run(i, r) for i, r in concurrent))
+
+        failed = sum(1 for item in results if not item.get("ok"))
+        return {"results": results, "count": len(results), "failed": failed}
+
     async def _on_broker_event(self, event: Event) -> None:
         if event.topic == EventTopic.CONNECTION:
             label = str(event.payload.get("event", ""))
             if label == "connected":
-                self._connection_loss.on_connected()
+                self._risk_monitor.on_connected()
             if label == "disconnected":
-                self._connection_loss.on_disconnected()
+                self._risk_monitor.on_disconnected()
+
+        if event.topic == EventTopic.PNL:
+            # Measured from when the provider received the push, not when this task got to run.
+            age = max(0.0, time.time() - event.timestamp.timestamp())
+            self._portfolio.apply_account(
+                nlv=_maybe_float(event.payload.get("net_liquidation")),
+                daily_pnl=_maybe_float(event.payload.get("daily_pnl")),
+                observed_at=time.monotonic() - age,
+            )
 
         if event.topic == EventTopic.ORDERS:
             client_order_id = event.payload.get("client_order_id")
@@ -514,70 +965,51 @@ class DaemonServer:
                     symbol=str(symbol),
                     qty=float(event.payload.get("qty") or 0.0),
                     price=float(event.payload.get("price") or 0.0),
+                    # Execution time, so the portfolio can tell whether a reconcile already counted it.
+                    timestamp=_maybe_datetime(event.payload.get("time")) or event.timestamp,
                 )
                 await self._orders.add_fill(fill)
 
         await self._broadcast_event(event)
 
     async def _broadcast_event(self, event: Event) -> None:
+        # Sequenced and retained even with no subscribers so a reconnecting client can replay it.
+        envelope, frame = self._events.append(event.topic.value, event.model_dump(mode="json"))
         if not self._subscribers:
             return
 
-        envelope = EventEnvelope(topic=event.topic.value, data=event.model_dump(mode="json"))
-        payload = frame_payload(encode_model(envelope))
+        # Never awaits the network: each subscriber's writer task drains its own bounded queue.
+        for sub in list(self._subscribers):
+            if event.topic.value in sub.topics:
+                sub.offer(event.topic.value, event.payload, frame, seq=envelope.seq)
 
-        stale: list[Subscriber] = []
+    def _broadcast_quote(self, quote: Quote) -> None:
+        # Quotes are conflated market data, not state changes, so they bypass sequencing and replay.
+        symbol = quote.symbol.upper()
+        frame: bytes | None = None
         for sub in self._subscribers:
-            if event.topic.value not in sub.topics:
+            if symbol not in sub.symbols or EventTopic.QUOTES.value not in sub.topics:
                 continue
-            try:
-                sub.writer.write(payload)
-                await sub.writer.drain()
-            except Exception:
-                stale.append(sub)
-        for sub in stale:
-            if sub in self._subscribers:
-                self._subscribers.remove(sub)
-
-    async def _monitor_loop(self) -> None:
-        while not self._shutdown.is_set():
-            await asyncio.sleep(5)
-
-            if self._connection_loss.breached() and not self._risk.halted:
-                self._risk.halt()
-                await self._audit.log_risk_event("halt", {"reason": "connection_loss"})
-                await self._broadcast_event(Event(topic=EventTopic.RISK, payload={"event": "halt", "reason": "connection_loss"}))
-
-            if self._heartbeat.is_timed_out():
-                seconds = self._heartbeat.seconds_since_last()
-                await self._audit.log_risk_event("heartbeat_timeout", {"seconds_since_last": seconds})
-                if self._cfg.agent.on_heartbeat_timeout == "halt" and not self._risk.halted:
-                    self._risk.halt()
-                    await self._broadcast_event(
-                        Event(topic=EventTopic.RISK, payload={"event": "halt", "reason": "heartbeat_timeout"})
-                    )
+            if frame is None:
+                event = Event(topic=EventTopic.QUOTES, payload=quote.model_dump(mode="json"))
+                frame = frame_payload(encode_model(EventEnvelope(topic=event.topic.value, data=event.model_dump(mode="json"))))
+            sub.offer_quote(symbol, frame)
 
-            if self._provider.is_connected:
-                try:
-                    balance = await self._provider.balance()
-                    pnl = await self._provider.pnl()
-                    nlv = float(balance.net_liquidation or 0.0)
-                    breached, loss_pct = self._risk.check_drawdown_breaker(pnl.total, nlv)
-                    if breached and not self._risk.halted:
-                        self._risk.halt()
-                        await self._audit.log_risk_event(
-                            "halt",
-                            {
-                                "reason": "drawdown_breaker",
-                                "daily_pnl": pnl.total,
-                                "loss_pct": loss_pct,
-                            },
-                        )
-                        await self._broadcast_event(
-                            Event(topic=EventTopic.RISK, payload={"event": "halt", "reason": "drawdown_breaker"})
-                        )
-                except Exception:
-                    logger.debug("drawdown monitor skipped due to transient error", exc_info=True)
+    def _on_portfolio_change(self, snap: PortfolioSnapshot) -> None:
+        self._risk_monitor.on_snapshot(snap)
+
+
+KNOWN_COMMANDS: tuple[str, ...] = COMMANDS.names()
+
+
+def _page_kwargs(params: AuditPageParams) -> dict[str, Any]:
+    return {
+        "since": params.since,
+        "until": params.until,
+        "limit": params.limit,
+        "before_id": params.before_id,
+        "after_id": params.after_id,
+    }
 
 
 def _parse_strike_range(raw: Any) -> tuple[float, float] | None:
@@ -610,17 +1042,43 @@ def _parse_strike_range(raw: Any) -> tuple[float, float] | None:
         ) from exc
 
 
-def _unknown_command_error(command: str) -> BrokerError:
-    matches = get_close_matches(command, KNOWN_COMMANDS, n=3, cutoff=0.45)
-    suggestion = None
-    if matches:
-        suggestion = f"Did you mean: {', '.join(matches)}"
-    return BrokerError(
-        ErrorCode.INVALID_ARGS,
-        f"unknown command '{command}'",
-        details={"known_commands": sorted(KNOWN_COMMANDS)},
-        suggestion=suggestion,
+def _parse_history_time(raw: str | None, field: str) -> datetime | None:
+    if raw is None:
+        return None
+    try:
+        value = datetime.fromisoformat(raw)
+    except ValueError as exc:
+        raise BrokerError(
+            ErrorCode.INVALID_ARGS,
+            f"{field} must be an ISO date or datetime",
+            suggestion="Example: broker history AAPL --bar 1h --start 2024-01-02 --end 2024-01-31T16:00",
+        ) from exc
+    return value if value.tzinfo else value.replace(tzinfo=UTC)
+
+
+def _error_response(request_id: str, exc: Exception) -> tuple[Response, int]:
+    if isinstance(exc, BrokerError):
+        err = exc
+    elif isinstance(exc, (ValidationError, KeyError, TypeError, ValueError)):
+        err = _invalid_args_error(exc)
+    else:
+        logger.exception("unhandled daemon error", exc_info=exc)
+        response = Response(
+            request_id=request_id,
+            ok=False,
+            error=ErrorResponse(code=ErrorCode.INTERNAL_ERROR.value, message=str(exc)),
+        )
+        return response, 1
+    response = Response(
+        request_id=request_id,
+        ok=False,
+        error=ErrorResponse.model_validate(err.to_error_payload()),
     )
+    return response, err.exit_code
+
+
+def _unknown_command_error(command: str) -> BrokerError:
+    return COMMANDS.unknown_command_error(command)
 
 
 def _invalid_args_error(exc: Exception) -> BrokerError:
@@ -633,8 +1091,14 @@ def _invalid_args_error(exc: Exception) -> BrokerError:
         message = f"missing required parameter '{missing}'"
         suggestion = f"Include required parameter `{missing}` and retry."
     elif isinstance(exc, ValidationError):
-        details["validation"] = exc.errors()
+        errors = exc.errors(include_url=False, include_context=False)
+        details["validation"] = errors
         message = "request validation failed"
+        missing = [".".join(str(part) for part in e["loc"]) for e in errors if e["type"] == "missing"]
+        if missing and len(missing) == len(errors):
+            details["missing_param"] = missing[0]
+            message = f"missing required parameter '{missing[0]}'"
+            suggestion = f"Include required parameter `{missing[0]}` and retry."
     return BrokerError(ErrorCode.INVALID_ARGS, message, details=details, suggestion=suggestion)
 
 
@@ -647,6 +1111,46 @@ def _maybe_float(value: Any) -> float | None:
         return None
 
 
+def _subscription_topics(requested: list[str]) -> set[str]:
+    topics = set(str(v).lower() for v in requested)
+    if not topics:
+        # Quotes need a symbol filter, so "everything" means every state-change topic.
+        return {e.value for e in EventTopic if e != EventTopic.QUOTES}
+    invalid_topics = sorted(topics - {e.value for e in EventTopic})
+    if invalid_topics:
+        valid = sorted(e.value for e in EventTopic)
+        raise BrokerError(
+            ErrorCode.INVALID_ARGS,
+            f"unsupported subscription topic(s): {', '.join(invalid_topics)}",
+            details={"invalid_topics": invalid_topics, "valid_topics": valid},
+            suggestion=f"Use topics from: {', '.join(valid)}",
+        )
+    return topics
+
+
+def _quote_symbols(topics: set[str], requested: list[str]) -> set[str]:
+    symbols = {str(v).strip().upper() for v in requested if str(v).strip()}
+    if EventTopic.QUOTES.value in topics and not symbols:
+        raise BrokerError(
+            ErrorCode.INVALID_ARGS,
+            "the quotes topic requires a symbol filter",
+            suggestion="Pass the symbols to watch along with the quotes topic.",
+        )
+    return symbols
+
+
+def _maybe_datetime(value: Any) -> datetime | None:
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=UTC)
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=UTC)
+    return None
+
+
 def _maybe_int(value: Any) -> int | None:
     if value is None:
         return None
@@ -0,0 +1,201 @@
+"""Event subscribers with bounded per-client queues and a dedicated writer task."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from enum import Enum
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_ids = itertools.count(1)
+
+
+class OverflowPolicy(str, Enum):
+    DROP_OLDEST = "drop_oldest"  # discard the oldest queued event to make room
+    CONFLATE = "conflate"  # newer events replace queued ones with the same key; then drop oldest
+    DISCONNECT = "disconnect"  # close the subscription when its queue is full
+
+
+def conflation_key(topic: str, payload: dict[str, Any]) -> str:
+    """Events describing the same order, fill or symbol supersede each other."""
+    for field in ("client_order_id", "fill_id", "symbol"):
+        value = payload.get(field)
+        if value:
+            return f"{topic}:{field}:{value}"
+    return topic
+
+
+class Subscriber:
+    """One streaming client; `offer` never blocks, the writer task drains the queue to the socket."""
+
+    def __init__(
+        self,
+        writer: asyncio.StreamWriter,
+        topics: set[str],
+        *,
+        max_queue: int = 1000,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        on_close: Callable[[Subscriber], None] | None = None,
+        symbols: set[str] | None = None,
+        max_rate: float | None = None,
+    ) -> None:
+        self.id = next(_ids)
+        self.writer = writer
+        self.topics = topics
+        # Quote filter, and the most quote events per second per symbol (None: every tick).
+        self.symbols: set[str] = symbols or set()
+        self.max_rate = max_rate
+        # Symbols this subscriber currently holds a market-data watch on.
+        self.watched_symbols: set[str] = set()
+        self.max_queue = max(1, max_queue)
+        self.policy = policy
+        self.delivered = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.last_lag_seconds = 0.0
+        self.last_seq: int | None = None
+        self.acked_seq: int | None = None
+        self.paused = False
+        self.closed = False
+        self._on_close = on_close
+        self._queue: OrderedDict[Any, tuple[bytes, float, int | None]] = OrderedDict()
+        self._seq = itertools.count()
+        self._ready = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._quote_sent: dict[str, float] = {}
+        self._quote_pending: dict[str, tuple[bytes, asyncio.TimerHandle]] = {}
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._write_loop())
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def offer(self, topic: str, payload: dict[str, Any], frame: bytes, *, seq: int | None = None) -> bool:
+        """Queue `frame` for delivery; returns False if the subscriber is (now) closed."""
+        if self.closed:
+            return False
+        key: Any = conflation_key(topic, payload) if self.policy == OverflowPolicy.CONFLATE else next(self._seq)
+        return self._enqueue(key, frame, seq)
+
+    def offer_quote(self, symbol: str, frame: bytes) -> bool:
+        """Deliver the latest quote for `symbol`, at most `max_rate` times per second.
+
+        Ticks inside the interval replace each other and the newest goes out when it ends;
+        a queued quote is also replaced by a newer one for the same symbol.
+        """
+        if self.closed:
+            return False
+        now = time.monotonic()
+        due = self._quote_sent.get(symbol, 0.0) + (1.0 / self.max_rate if self.max_rate else 0.0)
+        if now >= due and symbol not in self._quote_pending:
+            self._quote_sent[symbol] = now
+            return self._enqueue(("quotes", symbol), frame, None)
+        pending = self._quote_pending.get(symbol)
+        if pending is not None:
+            self._quote_pending[symbol] = (frame, pending[1])
+            self.conflated += 1
+        else:
+            timer = asyncio.get_running_loop().call_later(due - now, self._flush_quote, symbol)
+            self._quote_pending[symbol] = (frame, timer)
+        return True
+
+    def _flush_quote(self, symbol: str) -> None:
+        pending = self._quote_pending.pop(symbol, None)
+        if pending is None or self.closed:
+            return
+        self._quote_sent[symbol] = time.monotonic()
+        self._enqueue(("quotes", symbol), pending[0], None)
+
+    def _enqueue(self, key: Any, frame: bytes, seq: int | None) -> bool:
+        if key in self._queue:
+            del self._queue[key]
+            self.conflated += 1
+        if len(self._queue) >= self.max_queue:
+            if self.policy == OverflowPolicy.DISCONNECT:
+                self.dropped += 1
+                logger.warning("disconnecting subscriber %s after queue overflow", self.id)
+                self.close()
+                return False
+            self._queue.popitem(last=False)
+            self.dropped += 1
+        self._queue[key] = (frame, time.monotonic(), seq)
+        self._ready.set()
+        return True
+
+    def pause(self) -> None:
+        """Hold delivery; events keep queueing under the overflow policy until `resume`."""
+        self.paused = True
+
+    def resume(self) -> None:
+        self.paused = False
+        self._ready.set()
+
+    def ack(self, seq: int) -> None:
+        self.acked_seq = max(seq, self.acked_seq or 0)
+
+    def send(self, frame: bytes) -> None:
+        """Write an out-of-band frame (e.g. a control response) ahead of queued events."""
+        if not self.closed:
+            self.writer.write(frame)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.clear()
+        for _, timer in self._quote_pending.values():
+            timer.cancel()
+        self._quote_pending.clear()
+        if self._task and self._task is not asyncio.current_task():
+            self._task.cancel()
+        self.writer.close()
+        if self._on_close:
+            self._on_close(self)
+
+    def stats(self) -> dict[str, Any]:
+        oldest = next(iter(self._queue.values()), None)
+        lag = time.monotonic() - oldest[1] if oldest else 0.0
+        return {
+            "id": self.id,
+            "topics": sorted(self.topics),
+            "symbols": sorted(self.symbols),
+            "max_rate": self.max_rate,
+            "policy": self.policy.value,
+            "paused": self.paused,
+            "queued": len(self._queue),
+            "max_queue": self.max_queue,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "conflated": self.conflated,
+            "lag_ms": round(lag * 1000.0, 3),
+            "last_delivery_lag_ms": round(self.last_lag_seconds * 1000.0, 3),
+            "last_seq": self.last_seq,
+            "acked_seq": self.acked_seq,
+        }
+
+    async def _write_loop(self) -> None:
+        try:
+            while not self.closed:
+                await self._ready.wait()
+                self._ready.clear()
+                while self._queue and not self.closed and not self.paused:
+                    _, (frame, enqueued, seq) = self._queue.popitem(last=False)
+                    self.writer.write(frame)
+                    await self.writer.drain()
+                    self.delivered += 1
+                    self.last_lag_seconds = time.monotonic() - enqueued
+                    if seq is not None:
+                        self.last_seq = seq
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.debug("subscriber %s went away", self.id, exc_info=True)
+            self.close()
@@ -4,7 +4,7 @@ from broker_daemon.models.events import Event, EventTopic
 from broker_daemon.models.market import Bar, OptionChain, OptionChainEntry, Quote
 from broker_daemon.models.orders import FillRecord, OrderRecord, OrderRequest, OrderStatus, OrderType, Side, TIF
 from broker_daemon.models.portfolio import Balance, ExposureEntry, PnLSummary, Position
-from broker_daemon.models.risk import RiskCheckResult, RiskConfigSnapshot, RiskOverride
+from broker_daemon.models.risk import RiskBatchResult, RiskCheckResult, RiskConfigSnapshot, RiskOverride
 
 __all__ = [
     "Bar",
@@ -22,6 +22,7 @@ __all__ = [
     "PnLSummary",
     "Position",
     "Quote",
+    "RiskBatchResult",
     "RiskCheckResult",
     "RiskConfigSnapshot",
     "RiskOverride",
@@ -16,6 +16,7 @@ class EventTopic(str, Enum):
     PNL = "pnl"
     RISK = "risk"
     CONNECTION = "connection"
+    QUOTES = "quotes"
 
 
 class Event(BaseModel):
@@ -15,6 +15,15 @@ class RiskCheckResult(BaseModel):
     suggestion: str | None = None
 
 
+class RiskBatchResult(BaseModel):
+    ok: bool
+    passed: int
+    failed: int
+    results: list[RiskCheckResult] = Field(default_factory=list)
+    # Position value per symbol after every order that cleared its per-order checks.
+    projected_positions: dict[str, float] = Field(default_factory=dict)
+
+
 class RiskOverride(BaseModel):
     param: str
     value: float
@@ -0,0 +1,6 @@
+"""Option pricing package."""
+
+from broker_daemon.pricing.black_scholes import Greeks, greeks, implied_vol, price
+from broker_daemon.pricing.chain import GREEKS_MODES, apply_chain_greeks
+
+__all__ = ["GREEKS_MODES", "Greeks", "apply_chain_greeks", "greeks", "implied_vol", "price"]
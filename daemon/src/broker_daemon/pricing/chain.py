@@ -0,0 +1,88 @@
+"""Fill option-chain greeks from a local Black-Scholes model."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, time
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from broker_daemon.models.market import OptionChain
+from broker_daemon.pricing.black_scholes import DAYS_PER_YEAR, greeks, implied_vol
+
+GREEKS_MODES = {"auto", "local", "provider"}
+GREEK_FIELDS = ("implied_vol", "delta", "gamma", "theta", "vega")
+
+# US equity options stop trading at the 16:00 New York close on expiry day.
+_EXPIRY_CLOSE = time(16, 0, tzinfo=ZoneInfo("America/New_York"))
+
+
+def apply_chain_greeks(
+    chain: OptionChain,
+    *,
+    rate: float,
+    dividend_yield: float = 0.0,
+    mode: str = "auto",
+    vol: float | None = None,
+    now: datetime | None = None,
+) -> int:
+    """Compute greeks for `chain` in place and return how many entries were filled.
+
+    `auto` fills only fields the provider left empty; `local` replaces provider values for
+    every entry that can be priced. Implied vol comes from the bid/ask mid, then the provider's
+    implied vol, then `vol`. IB chains carry no quotes or IV, so they are priced only with `vol`;
+    entries with no vol source, or chains without an underlying price, are left alone.
+    """
+    if mode == "provider" or not chain.entries or not chain.underlying_price:
+        return 0
+    entries = chain.entries
+    if mode == "auto":
+        entries = [e for e in entries if any(getattr(e, f) is None for f in GREEK_FIELDS)]
+        if not entries:
+            return 0
+
+    now = now or datetime.now(UTC)
+    strike = np.array([e.strike for e in entries], dtype=np.float64)
+    is_call = np.array([e.right.upper().startswith("C") for e in entries])
+    # Chains span a handful of expiries; parse each once.
+    years = {expiry: _years_to_expiry(expiry, now) for expiry in {e.expiry for e in entries}}
+    t = np.array([years[e.expiry] for e in entries], dtype=np.float64)
+    mid = np.array([_mid(e.bid, e.ask) for e in entries], dtype=np.float64)
+    given_iv = np.array([np.nan if e.implied_vol is None else e.implied_vol for e in entries], dtype=np.float64)
+
+    iv = implied_vol(mid, chain.underlying_price, strike, t, rate, dividend_yield, is_call)
+    iv = np.where(np.isnan(iv), given_iv, iv)
+    if vol is not None:
+        iv = np.where(np.isnan(iv), vol, iv)
+    priceable = np.isfinite(iv) & (iv > 0) & (t > 0)
+    if not priceable.any():
+        return 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        g = greeks(chain.underlying_price, strike, np.where(t > 0, t, np.nan), rate, dividend_yield, iv, is_call)
+
+    columns = {
+        name: np.round(column, 6).tolist()
+        for name, column in zip(GREEK_FIELDS, (iv, g.delta, g.gamma, g.theta, g.vega), strict=True)
+    }
+    rows = np.flatnonzero(priceable).tolist()
+    for i in rows:
+        entry = entries[i]
+        for name, column in columns.items():
+            if mode == "local" or getattr(entry, name) is None:
+                setattr(entry, name, column[i])
+    return len(rows)
+
+
+def _mid(bid: float | None, ask: float | None) -> float:
+    if bid is None or ask is None or bid <= 0 or ask < bid:
+        return np.nan
+    return (bid + ask) / 2.0
+
+
+def _years_to_expiry(expiry: str, now: datetime) -> float:
+    try:
+        day = datetime.strptime(expiry.replace("-", "")[:8], "%Y%m%d").date()
+    except ValueError:
+        return np.nan
+    close = datetime.combine(day, _EXPIRY_CLOSE)
+    return (close - now).total_seconds() / (DAYS_PER_YEAR * 86_400)
@@ -22,6 +22,7 @@ class Request(BaseModel):
     command: str
     params: dict[str, Any] = Field(default_factory=dict)
     stream: bool = False
+    session: bool = False
     source: str = "cli"
 
 
@@ -36,6 +37,9 @@ class EventEnvelope(BaseModel):
     request_id: str | None = None
     topic: str
     data: dict[str, Any]
+    seq: int | None = None
+    # Identifies the sequence `seq` belongs to; it changes whenever numbering restarts.
+    epoch: str | None = None
 
 
 def encode_model(model: BaseModel) -> bytes:
@@ -54,6 +58,14 @@ def decode_event(payload: bytes) -> EventEnvelope:
     return EventEnvelope.model_validate(msgpack.unpackb(payload, raw=False, strict_map_key=False))
 
 
+def decode_stream_message(payload: bytes) -> Response | EventEnvelope:
+    """Decode a frame on an event subscription, which carries events and in-band control responses."""
+    message = msgpack.unpackb(payload, raw=False, strict_map_key=False)
+    if isinstance(message, dict) and "topic" in message:
+        return EventEnvelope.model_validate(message)
+    return Response.model_validate(message)
+
+
 def frame_payload(payload: bytes) -> bytes:
     return struct.pack("!I", len(payload)) + payload
 
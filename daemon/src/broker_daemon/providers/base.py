@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from datetime import datetime
 from typing import Any
 
@@ -35,6 +36,7 @@ class BrokerProvider(ABC):
             "streaming": False,
             "cancel_all": False,
             "persistent_auth": False,
+            "account_push": False,
         }
 
     @abstractmethod
@@ -62,9 +64,24 @@ class BrokerProvider(ABC):
     async def quote(self, symbols: list[str]) -> list[Quote]:
         raise NotImplementedError
 
+    async def stream_quote(self, symbol: str, on_quote: Callable[[Quote], None]) -> None:
+        """Push live quotes for `symbol` to `on_quote` until `cancel_quote_stream`; needs the streaming capability."""
+        raise NotImplementedError
+
+    async def cancel_quote_stream(self, symbol: str) -> None:
+        raise NotImplementedError
+
+    def pacing_stats(self) -> dict[str, Any] | None:
+        """Request budget and queue for paced broker calls, when the provider paces any."""
+        return None
+
     async def history(self, symbol: str, period: str, bar: str, rth_only: bool) -> list[Bar]:
         raise NotImplementedError
 
+    async def history_range(self, symbol: str, bar: str, rth_only: bool, start: datetime, end: datetime) -> list[Bar]:
+        """Bars between `start` and `end` (UTC); needs the history capability."""
+        raise NotImplementedError
+
     async def option_chain(
         self,
         symbol: str,
@@ -0,0 +1,114 @@
+"""Persistent cache of qualified broker contracts."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# symbol, secType, exchange, currency
+ContractKey = tuple[str, str, str, str]
+
+
+def contract_key(symbol: str, sec_type: str = "STK", exchange: str = "SMART", currency: str = "USD") -> ContractKey:
+    return (symbol.upper(), sec_type.upper(), exchange.upper(), currency.upper())
+
+
+class ContractCache:
+    """Qualified contracts keyed by symbol/secType/exchange/currency, persisted as JSON.
+
+    Entries are plain field dicts (conId included), so the cache does not depend on the broker
+    library; providers rebuild contract objects from them.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self._path = path
+        self._entries: dict[ContractKey, dict[str, Any]] = {}
+        self._dirty = False
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self) -> None:
+        if self._path is None:
+            return
+        try:
+            raw = json.loads(self._path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            logger.warning("ignoring unreadable contract cache %s", self._path, exc_info=True)
+            return
+        for item in raw.get("contracts", []) if isinstance(raw, dict) else []:
+            try:
+                key = contract_key(*item["key"])
+                fields = dict(item["contract"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if fields.get("conId"):
+                self._entries[key] = fields
+
+    def get(self, key: ContractKey) -> dict[str, Any] | None:
+        fields = self._entries.get(key)
+        if fields is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+        return fields
+
+    def put(self, key: ContractKey, fields: dict[str, Any]) -> None:
+        if not fields.get("conId"):
+            return
+        if self._entries.get(key) != fields:
+            self._entries[key] = fields
+            self._dirty = True
+
+    def invalidate(self, symbol: str, con_id: int | None = None) -> bool:
+        """Drop entries for `symbol` (or just the one with `con_id`); True if anything was removed."""
+        sym = symbol.upper()
+        stale = [
+            key
+            for key, fields in self._entries.items()
+            if key[0] == sym and (not con_id or fields.get("conId") == con_id)
+        ]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            self._dirty = True
+            self._invalidations += len(stale)
+        return bool(stale)
+
+    async def save(self) -> None:
+        if self._path is None or not self._dirty:
+            return
+        self._dirty = False
+        payload = {"contracts": [{"key": list(key), "contract": fields} for key, fields in sorted(self._entries.items())]}
+        try:
+            await asyncio.to_thread(_write_atomic, self._path, json.dumps(payload, separators=(",", ":")))
+        except OSError:
+            self._dirty = True
+            logger.warning("could not write contract cache %s", self._path, exc_info=True)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+            "invalidations": self._invalidations,
+            "path": str(self._path) if self._path else None,
+        }
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
@@ -192,6 +192,7 @@ class ETradeProvider(BrokerProvider):
             "streaming": False,
             "cancel_all": True,
             "persistent_auth": True,
+            "account_push": False,
         }
 
     async def start(self) -> None:
@@ -3,8 +3,10 @@
 from __future__ import annotations
 
 import asyncio
+import dataclasses
 import logging
-from datetime import UTC, datetime
+import math
+from datetime import UTC, datetime, timedelta
 from typing import Any, Awaitable, Callable
 
 from broker_daemon.audit.logger import AuditLogger
@@ -15,11 +17,19 @@ from broker_daemon.models.market import Bar, OptionChain, OptionChainEntry, Quot
 from broker_daemon.models.orders import FillRecord, OrderRequest
 from broker_daemon.models.portfolio import Balance, ExposureEntry, PnLSummary, Position
 from broker_daemon.providers.base import BrokerProvider, ConnectionStatus
+from broker_daemon.providers.contracts import ContractCache, contract_key
+from broker_daemon.providers.pacing import PacingScheduler
 
 logger = logging.getLogger(__name__)
 
 CONNECTIVITY_ERROR_TOKENS = ("not connected", "disconnect", "connection", "socket", "transport")
 VALID_EXPOSURE_GROUPS = {"symbol", "currency", "sector", "asset_class"}
+IB_BAR_SIZES = {"1m": "1 min", "5m": "5 mins", "15m": "15 mins", "1h": "1 hour", "1d": "1 day"}
+# "No security definition has been found for the request": a cached conId no longer resolves.
+CONTRACT_ERROR_CODES = {200}
+# Account values pushed by IB that the daemon's drawdown breaker watches. IB sends these only
+# every few minutes; daily PnL comes from the reqPnL stream instead.
+ACCOUNT_EVENT_TAGS = {"NetLiquidation"}
 
 
 class IBProvider(BrokerProvider):
@@ -41,6 +51,22 @@ class IBProvider(BrokerProvider):
         self._last_error: str | None = None
         self._reconnect_task: asyncio.Task[None] | None = None
         self._listeners_registered = False
+        # Pushed account values keyed "tag:currency", read back with the same currency preference as
+        # the polled summary so USD and BASE updates never overwrite one another.
+        self._account_values: dict[str, float] = {}
+        self._net_liquidation: float | None = None
+        self._last_pnl: tuple[float, float, float] | None = None
+        # Live reqMktData streams by symbol: (contract, ticker, update handler, subscriber callback).
+        self._streams: dict[str, tuple[Any, Any, Callable[..., None], Callable[[Quote], None]]] = {}
+        self._contracts = ContractCache(cfg.contract_cache_path)
+        # Historical bars and option parameters share IB's historical-data pacing budget.
+        self._pacing = PacingScheduler(
+            max_requests=cfg.history_pacing_requests,
+            window_seconds=cfg.history_pacing_window_seconds,
+            dedupe_seconds=cfg.history_dedupe_seconds,
+            max_wait_seconds=cfg.history_max_wait_seconds,
+            label="historical data request",
+        )
 
     @property
     def capabilities(self) -> dict[str, bool]:
@@ -52,9 +78,14 @@ class IBProvider(BrokerProvider):
             "streaming": True,
             "cancel_all": True,
             "persistent_auth": False,
+            "account_push": True,
         }
 
+    def pacing_stats(self) -> dict[str, Any]:
+        return self._pacing.stats()
+
     async def start(self) -> None:
+        self._contracts.load()
         await self.connect()
 
     async def stop(self) -> None:
@@ -64,6 +95,8 @@ class IBProvider(BrokerProvider):
         if self._ib is not None:
             self._ib.disconnect()
             self._ib = None
+        self._streams.clear()
+        await self._pacing.close()
         self._listeners_registered = False
         self._connected_at = None
 
@@ -99,6 +132,8 @@ class IBProvider(BrokerProvider):
             self._connected_at = datetime.now(UTC)
             self._last_error = None
             self._register_event_handlers()
+            self._subscribe_pnl()
+            await self._restore_streams()
             await self._log_connection(
                 "connected",
                 {
@@ -163,8 +198,26 @@ class IBProvider(BrokerProvider):
             self._ib.orderStatusEvent += self._on_order_status
         if hasattr(self._ib, "execDetailsEvent"):
             self._ib.execDetailsEvent += self._on_exec_details
+        if hasattr(self._ib, "errorEvent"):
+            self._ib.errorEvent += self._on_error
+        if hasattr(self._ib, "accountValueEvent"):
+            self._ib.accountValueEvent += self._on_account_value
+        if hasattr(self._ib, "pnlEvent"):
+            self._ib.pnlEvent += self._on_pnl
         self._listeners_registered = True
 
+    def _subscribe_pnl(self) -> None:
+        # Daily PnL streams about once a second, where accountValueEvent lags by minutes.
+        if not self._ib or not hasattr(self._ib, "reqPnL"):
+            return
+        self._last_pnl = None
+        try:
+            accounts = self._ib.managedAccounts()
+            if accounts:
+                self._ib.reqPnL(accounts[0])
+        except Exception:
+            logger.warning("could not subscribe to IB daily PnL", exc_info=True)
+
     def _schedule_reconnect(self) -> None:
         if not self._cfg.auto_reconnect:
             return
@@ -216,9 +269,80 @@ class IBProvider(BrokerProvider):
             "qty": getattr(getattr(fill, "execution", None), "shares", None),
             "price": getattr(getattr(fill, "execution", None), "price", None),
             "fill_id": getattr(getattr(fill, "execution", None), "execId", None),
+            "time": getattr(getattr(fill, "execution", None), "time", None),
         }
         asyncio.create_task(self._event_cb(Event(topic=EventTopic.FILLS, payload=payload)))
 
+    def _on_account_value(self, value: Any) -> None:
+        if not self._event_cb:
+            return
+        tag = getattr(value, "tag", None)
+        currency = getattr(value, "currency", None)
+        if tag not in ACCOUNT_EVENT_TAGS or currency not in ("USD", "BASE"):
+            return
+        try:
+            self._account_values[f"{tag}:{currency}"] = float(value.value)
+        except (TypeError, ValueError):
+            return
+        net_liq = _read_account_value(self._account_values, "NetLiquidation")
+        if net_liq is None or net_liq == self._net_liquidation:
+            return
+        self._net_liquidation = net_liq
+        payload = {"event": "account", "net_liquidation": net_liq}
+        asyncio.create_task(self._event_cb(Event(topic=EventTopic.PNL, payload=payload)))
+
+    def _on_pnl(self, pnl: Any) -> None:
+        if not self._event_cb:
+            return
+        summary = _pnl_summary(pnl)
+        if summary is None:
+            return
+        current = (summary.total, summary.realized, summary.unrealized)
+        if current == self._last_pnl:
+            return
+        self._last_pnl = current
+        payload = {
+            "event": "pnl",
+            "daily_pnl": summary.total,
+            "realized": summary.realized,
+            "unrealized": summary.unrealized,
+        }
+        asyncio.create_task(self._event_cb(Event(topic=EventTopic.PNL, payload=payload)))
+
+    def _on_error(self, req_id: int, error_code: int, error_string: str, contract: Any = None) -> None:
+        symbol = getattr(contract, "symbol", None)
+        if error_code in CONTRACT_ERROR_CODES and symbol:
+            if self._contracts.invalidate(symbol, getattr(contract, "conId", None)):
+                logger.info("dropped cached contract for %s after IB error %s", symbol, error_code)
+                asyncio.create_task(self._contracts.save())
+
+    async def _stock_contracts(self, symbols: list[str]) -> dict[str, Any]:
+        """Qualified SMART/USD stock contracts by symbol; cache misses are qualified in one batch."""
+        assert self._ib is not None
+        ib_mod = __import__("ib_async", fromlist=["Contract", "Stock"])
+        found: dict[str, Any] = {}
+        misses: list[Any] = []
+        for sym in dict.fromkeys(s.upper() for s in symbols):
+            fields = self._contracts.get(contract_key(sym))
+            if fields is not None:
+                found[sym] = ib_mod.Contract.create(**fields)
+            else:
+                misses.append(ib_mod.Stock(sym, "SMART", "USD"))
+        if misses:
+            await self._ib.qualifyContractsAsync(*misses)
+            for contract in misses:
+                if getattr(contract, "conId", 0):
+                    found[contract.symbol] = contract
+                    self._contracts.put(contract_key(contract.symbol), _contract_fields(contract))
+            await self._contracts.save()
+        return found
+
+    async def _stock_contract(self, symbol: str) -> Any:
+        contract = (await self._stock_contracts([symbol])).get(symbol.upper())
+        if contract is None:
+            raise BrokerError(ErrorCode.INVALID_SYMBOL, f"unable to qualify symbol {symbol}")
+        return contract
+
     async def _log_connection(self, event: str, details: dict[str, Any]) -> None:
         logger.info("connection_event=%s details=%s", event, details)
         if self._audit:
@@ -263,35 +387,74 @@ class IBProvider(BrokerProvider):
             await self.ensure_connected()
             assert self._ib is not None
 
-            ib_mod = __import__("ib_async", fromlist=["Stock"])
-            Stock = getattr(ib_mod, "Stock")
-            contracts = [Stock(sym.upper(), "SMART", "USD") for sym in symbols]
             try:
-                await self._ib.qualifyContractsAsync(*contracts)
+                qualified = await self._stock_contracts(symbols)
             except Exception:
-                # Some symbols qualify directly via reqTickers.
-                pass
+                qualified = {}
+            # Some symbols qualify directly via reqTickers.
+            ib_mod = __import__("ib_async", fromlist=["Stock"])
+            contracts = [qualified.get(sym.upper()) or ib_mod.Stock(sym.upper(), "SMART", "USD") for sym in symbols]
 
             tickers = await self._ib.reqTickersAsync(*contracts)
-            out: list[Quote] = []
-            for ticker in tickers:
-                ts = getattr(ticker, "time", None) or datetime.now(UTC)
-                out.append(
-                    Quote(
-                        symbol=ticker.contract.symbol,
-                        bid=_to_float_or_none(getattr(ticker, "bid", None)),
-                        ask=_to_float_or_none(getattr(ticker, "ask", None)),
-                        last=_to_float_or_none(getattr(ticker, "last", None)),
-                        volume=_to_float_or_none(getattr(ticker, "volume", None)),
-                        timestamp=ts,
-                        exchange=getattr(ticker.contract, "exchange", None),
-                        currency=getattr(ticker.contract, "currency", "USD") or "USD",
-                    )
-                )
-            return out
+            return [_ticker_quote(ticker) for ticker in tickers]
         except Exception as exc:
             self._raise_mapped_error("quote", exc, suggestion="Confirm market data permissions and symbol validity.")
 
+    async def stream_quote(self, symbol: str, on_quote: Callable[[Quote], None]) -> None:
+        sym = symbol.upper()
+        if sym in self._streams:
+            return
+        try:
+            await self.ensure_connected()
+            assert self._ib is not None
+
+            contract = await self._stock_contract(sym)
+            self._streams[sym] = self._req_mkt_data(contract, on_quote)
+        except Exception as exc:
+            self._raise_mapped_error(
+                "stream_quote",
+                exc,
+                default_code=ErrorCode.INVALID_SYMBOL,
+                suggestion="Confirm market data permissions and symbol validity.",
+            )
+
+    async def cancel_quote_stream(self, symbol: str) -> None:
+        stream = self._streams.pop(symbol.upper(), None)
+        if stream is None:
+            return
+        contract, ticker, handler, _ = stream
+        ticker.updateEvent -= handler
+        if self._ib is not None and self.is_connected:
+            try:
+                self._ib.cancelMktData(contract)
+            except Exception:
+                logger.debug("cancelMktData failed for %s", symbol, exc_info=True)
+
+    def _req_mkt_data(
+        self, contract: Any, on_quote: Callable[[Quote], None]
+    ) -> tuple[Any, Any, Callable[..., None], Callable[[Quote], None]]:
+        assert self._ib is not None
+
+        def _on_update(ticker: Any) -> None:
+            try:
+                on_quote(_ticker_quote(ticker))
+            except Exception:
+                logger.debug("quote stream callback failed", exc_info=True)
+
+        ticker = self._ib.reqMktData(contract, "", False, False)
+        ticker.updateEvent += _on_update
+        return contract, ticker, _on_update, on_quote
+
+    async def _restore_streams(self) -> None:
+        """Streams die with the gateway connection; re-request them after a reconnect."""
+        for sym, (contract, ticker, handler, on_quote) in list(self._streams.items()):
+            ticker.updateEvent -= handler
+            try:
+                self._streams[sym] = self._req_mkt_data(contract, on_quote)
+            except Exception:
+                logger.warning("could not restore quote stream for %s", sym, exc_info=True)
+                del self._streams[sym]
+
     async def history(self, symbol: str, period: str, bar: str, rth_only: bool) -> list[Bar]:
         try:
             await self.ensure_connected()
@@ -304,31 +467,25 @@ class IBProvider(BrokerProvider):
                 "90d": "90 D",
                 "1y": "1 Y",
             }
-            bar_map = {
-                "1m": "1 min",
-                "5m": "5 mins",
-                "15m": "15 mins",
-                "1h": "1 hour",
-                "1d": "1 day",
-            }
             if period not in duration_map:
                 raise BrokerError(ErrorCode.INVALID_ARGS, f"unsupported period '{period}'")
-            if bar not in bar_map:
+            if bar not in IB_BAR_SIZES:
                 raise BrokerError(ErrorCode.INVALID_ARGS, f"unsupported bar size '{bar}'")
 
-            ib_mod = __import__("ib_async", fromlist=["Stock"])
-            Stock = getattr(ib_mod, "Stock")
-            contract = Stock(symbol.upper(), "SMART", "USD")
-            await self._ib.qualifyContractsAsync(contract)
-            bars = await self._ib.reqHistoricalDataAsync(
-                contract,
-                endDateTime="",
-                durationStr=duration_map[period],
-                barSizeSetting=bar_map[bar],
-                whatToShow="TRADES",
-                useRTH=rth_only,
-                formatDate=1,
-                keepUpToDate=False,
+            contract = await self._stock_contract(symbol)
+            ib = self._ib
+            bars = await self._pacing.run(
+                ("history", contract.conId, period, bar, rth_only),
+                lambda: ib.reqHistoricalDataAsync(
+                    contract,
+                    endDateTime="",
+                    durationStr=duration_map[period],
+                    barSizeSetting=IB_BAR_SIZES[bar],
+                    whatToShow="TRADES",
+                    useRTH=rth_only,
+                    formatDate=1,
+                    keepUpToDate=False,
+                ),
             )
             result: list[Bar] = []
             for row in bars:
@@ -347,6 +504,44 @@ class IBProvider(BrokerProvider):
         except Exception as exc:
             self._raise_mapped_error("history", exc, suggestion="Validate period/bar and confirm historical data permissions.")
 
+    async def history_range(self, symbol: str, bar: str, rth_only: bool, start: datetime, end: datetime) -> list[Bar]:
+        try:
+            await self.ensure_connected()
+            assert self._ib is not None
+
+            if bar not in IB_BAR_SIZES:
+                raise BrokerError(ErrorCode.INVALID_ARGS, f"unsupported bar size '{bar}'")
+            contract = await self._stock_contract(symbol)
+            ib = self._ib
+            bars = await self._pacing.run(
+                ("history_range", contract.conId, bar, rth_only, start, end),
+                lambda: ib.reqHistoricalDataAsync(
+                    contract,
+                    endDateTime=end.astimezone(UTC),
+                    durationStr=_ib_duration(end - start),
+                    barSizeSetting=IB_BAR_SIZES[bar],
+                    whatToShow="TRADES",
+                    useRTH=rth_only,
+                    # Epoch timestamps, so intraday bars come back as UTC datetimes.
+                    formatDate=2,
+                    keepUpToDate=False,
+                ),
+            )
+            return [
+                Bar(
+                    symbol=symbol.upper(),
+                    time=_bar_time(row.date),
+                    open=float(row.open),
+                    high=float(row.high),
+                    low=float(row.low),
+                    close=float(row.close),
+                    volume=float(row.volume),
+                )
+                for row in bars
+            ]
+        except Exception as exc:
+            self._raise_mapped_error("history", exc, suggestion="Validate bar size and confirm historical data permissions.")
+
     async def option_chain(
         self,
         symbol: str,
@@ -358,12 +553,7 @@ class IBProvider(BrokerProvider):
             await self.ensure_connected()
             assert self._ib is not None
 
-            ib_mod = __import__("ib_async", fromlist=["Stock"])
-            Stock = getattr(ib_mod, "Stock")
-            contract = Stock(symbol.upper(), "SMART", "USD")
-            qualified = await self._ib.qualifyContractsAsync(contract)
-            if not qualified:
-                raise BrokerError(ErrorCode.INVALID_SYMBOL, f"unable to qualify symbol {symbol}")
+            contract = await self._stock_contract(symbol)
 
             ticker = (await self._ib.reqTickersAsync(contract))[0]
             market_price_attr = getattr(ticker, "marketPrice", None)
@@ -373,7 +563,11 @@ class IBProvider(BrokerProvider):
                 underlying = _to_float_or_none(market_price_attr)
             if underlying is None:
                 underlying = _to_float_or_none(getattr(ticker, "last", None))
-            chain_rows = await self._ib.reqSecDefOptParamsAsync(symbol.upper(), "", contract.secType, contract.conId)
+            ib = self._ib
+            chain_rows = await self._pacing.run(
+                ("secdef", contract.conId),
+                lambda: ib.reqSecDefOptParamsAsync(symbol.upper(), "", contract.secType, contract.conId),
+            )
             if not chain_rows:
                 return OptionChain(symbol=symbol.upper(), underlying_price=underlying, entries=[])
 
@@ -478,6 +672,12 @@ class IBProvider(BrokerProvider):
             await self.ensure_connected()
             assert self._ib is not None
 
+            # The reqPnL stream carries IB's own daily figure; use it so polls and pushes agree.
+            for live in self._ib.pnl() if hasattr(self._ib, "pnl") else ():
+                summary = _pnl_summary(live)
+                if summary is not None:
+                    return summary
+
             values = await self._ib.accountSummaryAsync()
             by_tag = {f"{v.tag}:{v.currency}": v.value for v in values}
             realized = _read_account_value(by_tag, "RealizedPnL") or 0.0
@@ -524,16 +724,14 @@ class IBProvider(BrokerProvider):
 
             ib_mod = __import__(
                 "ib_async",
-                fromlist=["Stock", "MarketOrder", "LimitOrder", "StopOrder", "StopLimitOrder"],
+                fromlist=["MarketOrder", "LimitOrder", "StopOrder", "StopLimitOrder"],
             )
-            Stock = getattr(ib_mod, "Stock")
             MarketOrder = getattr(ib_mod, "MarketOrder")
             LimitOrder = getattr(ib_mod, "LimitOrder")
             StopOrder = getattr(ib_mod, "StopOrder")
             StopLimitOrder = getattr(ib_mod, "StopLimitOrder")
 
-            contract = Stock(order.symbol.upper(), "SMART", "USD")
-            await self._ib.qualifyContractsAsync(contract)
+            contract = await self._stock_contract(order.symbol)
             action = order.side.value.upper()
             qty = abs(order.qty)
 
@@ -580,10 +778,7 @@ class IBProvider(BrokerProvider):
             await self.ensure_connected()
             assert self._ib is not None
 
-            ib_mod = __import__("ib_async", fromlist=["Stock"])
-            Stock = getattr(ib_mod, "Stock")
-            contract = Stock(symbol.upper(), "SMART", "USD")
-            await self._ib.qualifyContractsAsync(contract)
+            contract = await self._stock_contract(symbol)
 
             bracket_orders = self._ib.bracketOrder(side.upper(), qty, entry, tp, sl)
             order_ids: list[int] = []
@@ -680,6 +875,44 @@ class IBProvider(BrokerProvider):
             self._raise_mapped_error("fills", exc)
 
 
+def _ticker_quote(ticker: Any) -> Quote:
+    return Quote(
+        symbol=ticker.contract.symbol,
+        bid=_to_float_or_none(getattr(ticker, "bid", None)),
+        ask=_to_float_or_none(getattr(ticker, "ask", None)),
+        last=_to_float_or_none(getattr(ticker, "last", None)),
+        volume=_to_float_or_none(getattr(ticker, "volume", None)),
+        timestamp=getattr(ticker, "time", None) or datetime.now(UTC),
+        exchange=getattr(ticker.contract, "exchange", None),
+        currency=getattr(ticker.contract, "currency", "USD") or "USD",
+    )
+
+
+def _bar_time(value: Any) -> datetime:
+    # Daily bars carry a date, intraday bars a datetime.
+    if isinstance(value, datetime):
+        return value
+    return datetime(value.year, value.month, value.day, tzinfo=UTC)
+
+
+def _ib_duration(span: timedelta) -> str:
+    seconds = span.total_seconds()
+    if seconds <= 86_400:
+        return f"{max(60, math.ceil(seconds))} S"
+    days = math.ceil(seconds / 86_400)
+    return f"{days} D" if days <= 365 else f"{math.ceil(days / 365)} Y"
+
+
+def _contract_fields(contract: Any) -> dict[str, Any]:
+    """Scalar, non-default fields of an ib_async Contract; enough to rebuild it with `Contract.create`."""
+    fields: dict[str, Any] = {}
+    for field in dataclasses.fields(contract):
+        value = getattr(contract, field.name)
+        if isinstance(value, (str, int, float, bool)) and value != field.default:
+            fields[field.name] = value
+    return fields
+
+
 def _to_float_or_none(value: Any) -> float | None:
     if value is None:
         return None
@@ -689,7 +922,21 @@ def _to_float_or_none(value: Any) -> float | None:
         return None
 
 
-def _read_account_value(by_tag: dict[str, str], tag: str) -> float | None:
+def _pnl_summary(pnl: Any) -> PnLSummary | None:
+    """Daily PnL from an ib_async PnL object; None until IB has sent a value."""
+    daily = _to_float_or_none(getattr(pnl, "dailyPnL", None))
+    if daily is None or math.isnan(daily):
+        return None
+    realized = _to_float_or_none(getattr(pnl, "realizedPnL", None))
+    unrealized = _to_float_or_none(getattr(pnl, "unrealizedPnL", None))
+    return PnLSummary(
+        realized=0.0 if realized is None or math.isnan(realized) else realized,
+        unrealized=0.0 if unrealized is None or math.isnan(unrealized) else unrealized,
+        total=daily,
+    )
+
+
+def _read_account_value(by_tag: dict[str, Any], tag: str) -> float | None:
     keys = [f"{tag}:USD", f"{tag}:BASE", tag]
     for key in keys:
         if key in by_tag:
@@ -0,0 +1,192 @@
+"""Request pacing for broker APIs with rolling request budgets."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+from broker_daemon.exceptions import BrokerError, ErrorCode
+
+# How long a result is kept for callers that were told to retry after an ETA.
+DEFERRED_RESULT_SECONDS = 120.0
+
+
+class PacingDeferred(BrokerError):
+    """RATE_LIMITED for a request that stays queued; `result` resolves once it has run."""
+
+    def __init__(self, message: str, *, result: asyncio.Future[Any], **kwargs: Any) -> None:
+        super().__init__(ErrorCode.RATE_LIMITED, message, **kwargs)
+        self.result = result
+
+
+@dataclass
+class _Job:
+    key: Hashable
+    factory: Callable[[], Awaitable[Any]]
+    future: asyncio.Future[Any]
+    eta: float
+    finished_at: float | None = None
+    # Some caller was told to come back later, so the result is kept longer.
+    deferred: bool = False
+
+
+class PacingScheduler:
+    """Runs requests under a rolling budget of `max_requests` per `window_seconds`.
+
+    Requests over budget wait in a FIFO queue, each with an estimated start time. Identical
+    requests (same key) share one job while it is queued or running and for `dedupe_seconds`
+    after it finishes, so repeats never spend budget or trip the broker's duplicate check.
+    Callers whose request would start more than `max_wait_seconds` from now get a
+    RATE_LIMITED error carrying the ETA; the job stays queued and a retry after the ETA is
+    served from its result.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_requests: int = 60,
+        window_seconds: float = 600.0,
+        dedupe_seconds: float = 15.0,
+        max_wait_seconds: float = 10.0,
+        label: str = "request",
+    ) -> None:
+        self._max_requests = max(1, max_requests)
+        self._window = window_seconds
+        self._dedupe = dedupe_seconds
+        self._max_wait = max_wait_seconds
+        self._label = label
+        self._starts: deque[float] = deque()
+        self._queue: deque[_Job] = deque()
+        self._jobs: dict[Hashable, _Job] = {}
+        self._wakeup = asyncio.Event()
+        self._dispatcher: asyncio.Task[None] | None = None
+        self._running: set[asyncio.Task[None]] = set()
+        self._deduped = 0
+        self._deferred = 0
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Result of `factory()`, paced and deduplicated by `key`."""
+        now = time.monotonic()
+        self._expire(now)
+        job = self._jobs.get(key)
+        if job is not None:
+            self._deduped += 1
+        else:
+            job = _Job(key, factory, asyncio.get_running_loop().create_future(), eta=now)
+            job.future.add_done_callback(_consume_exception)
+            self._jobs[key] = job
+            self._queue.append(job)
+            self._reschedule(now)
+            self._ensure_dispatcher()
+
+        wait = job.eta - now
+        if not job.future.done() and wait > self._max_wait:
+            self._deferred += 1
+            job.deferred = True
+            raise PacingDeferred(
+                f"{self._label} queued behind broker pacing limits; ETA {wait:.0f} seconds",
+                details={
+                    "queued": True,
+                    "eta_seconds": round(wait, 1),
+                    "position": self._position(job),
+                    "budget": {"max_requests": self._max_requests, "window_seconds": self._window},
+                },
+                suggestion=f"Retry the same request in {wait:.0f}s; the queued result will be returned immediately.",
+                result=job.future,
+            )
+        return await asyncio.shield(job.future)
+
+    async def close(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        for task in list(self._running):
+            task.cancel()
+        for job in self._queue:
+            job.future.cancel()
+        self._queue.clear()
+        self._jobs.clear()
+
+    def stats(self) -> dict[str, Any]:
+        now = time.monotonic()
+        self._expire(now)
+        return {
+            "max_requests": self._max_requests,
+            "window_seconds": self._window,
+            "used": len(self._starts),
+            "queued": len(self._queue),
+            "next_eta_seconds": round(max(0.0, self._queue[0].eta - now), 1) if self._queue else None,
+            "deduped": self._deduped,
+            "deferred": self._deferred,
+        }
+
+    def _expire(self, now: float) -> None:
+        while self._starts and now - self._starts[0] >= self._window:
+            self._starts.popleft()
+        for key, job in list(self._jobs.items()):
+            keep = max(self._dedupe, DEFERRED_RESULT_SECONDS) if job.deferred else self._dedupe
+            if job.finished_at is not None and now - job.finished_at >= keep:
+                del self._jobs[key]
+
+    def _reschedule(self, now: float) -> None:
+        # Project starts in queue order: each job waits for the start `max_requests` before it to age out.
+        timeline = list(self._starts)
+        for job in self._queue:
+            job.eta = now if len(timeline) < self._max_requests else max(now, timeline[-self._max_requests] + self._window)
+            timeline.append(job.eta)
+
+    def _position(self, job: _Job) -> int:
+        try:
+            return self._queue.index(job) + 1
+        except ValueError:
+            return 0
+
+    def _ensure_dispatcher(self) -> None:
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        self._wakeup.set()
+
+    async def _dispatch(self) -> None:
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            now = time.monotonic()
+            self._expire(now)
+            self._reschedule(now)
+            delay = self._queue[0].eta - now
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            job = self._queue.popleft()
+            self._starts.append(now)
+            task = asyncio.create_task(self._execute(job))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _execute(self, job: _Job) -> None:
+        try:
+            result = await job.factory()
+        except BaseException as exc:
+            # Failures are not kept; the next identical request tries again.
+            if self._jobs.get(job.key) is job:
+                del self._jobs[job.key]
+            if not isinstance(exc, Exception):
+                job.future.cancel()
+                raise
+            job.future.set_exception(exc)
+        else:
+            job.future.set_result(result)
+        finally:
+            job.finished_at = time.monotonic()
+
+
+def _consume_exception(future: asyncio.Future[Any]) -> None:
+    # A deferred caller may never await the job; don't log "exception was never retrieved".
+    if not future.cancelled():
+        future.exception()
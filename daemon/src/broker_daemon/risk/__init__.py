@@ -2,5 +2,6 @@
 
 from broker_daemon.risk.engine import RiskContext, RiskEngine
 from broker_daemon.risk.monitor import ConnectionLossMonitor, HeartbeatMonitor
+from broker_daemon.risk.state import RiskStateStore
 
-__all__ = ["ConnectionLossMonitor", "HeartbeatMonitor", "RiskContext", "RiskEngine"]
+__all__ = ["ConnectionLossMonitor", "HeartbeatMonitor", "RiskContext", "RiskEngine", "RiskStateStore"]
@@ -2,16 +2,26 @@
 
 from __future__ import annotations
 
-from collections import deque
+import logging
+import time
 from dataclasses import dataclass, field
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
+import numpy as np
+
 from broker_daemon.config import RiskConfig
 from broker_daemon.exceptions import ErrorCode, BrokerError
 from broker_daemon.models.orders import OrderRequest, Side
-from broker_daemon.models.risk import RiskCheckResult, RiskConfigSnapshot, RiskOverride
+from broker_daemon.models.risk import RiskBatchResult, RiskCheckResult, RiskConfigSnapshot, RiskOverride
 from broker_daemon.risk.limits import coerce_param, config_to_dict, validate_param
+from broker_daemon.risk.state import RiskStateStore
+from broker_daemon.risk.windows import ExpiringKeys, OverrideIndex, SlidingWindowCounter
+
+logger = logging.getLogger(__name__)
+
+# order_rate_limit is per minute.
+RATE_WINDOW_SECONDS = 60
 
 
 @dataclass
@@ -26,35 +36,30 @@ class RiskContext:
 
 
 class RiskEngine:
-    def __init__(self, config: RiskConfig) -> None:
+    def __init__(self, config: RiskConfig, *, state_store: RiskStateStore | None = None) -> None:
         self._limits = config_to_dict(config)
         self._halted = False
-        self._order_times: deque[datetime] = deque()
-        self._duplicate_times: dict[str, datetime] = {}
-        self._overrides: list[RiskOverride] = []
+        self._order_window = SlidingWindowCounter(RATE_WINDOW_SECONDS)
+        self._duplicate_keys = ExpiringKeys()
+        self._overrides = OverrideIndex()
+        # Limits changed at runtime; persisted so they win over the config file after a restart.
+        self._limit_changes: dict[str, Any] = {}
+        self._store = state_store
+        self._restored: dict[str, Any] | None = None
 
     @property
     def halted(self) -> bool:
         return self._halted
 
     def _cleanup_state(self) -> None:
+        # Each structure pops only what expired since the last call.
         now = datetime.now(UTC)
-
-        while self._order_times and (now - self._order_times[0]).total_seconds() > 60:
-            self._order_times.popleft()
-
-        duplicate_window = self._effective_value("duplicate_window_seconds")
-        self._duplicate_times = {
-            key: ts for key, ts in self._duplicate_times.items() if (now - ts).total_seconds() <= duplicate_window
-        }
-
-        self._overrides = [ov for ov in self._overrides if ov.expires_at > now]
+        self._overrides.expire(now)
+        self._duplicate_keys.expire(now, self._effective_value("duplicate_window_seconds"))
 
     def _effective_value(self, param: str) -> Any:
-        for override in reversed(self._overrides):
-            if override.param == param and override.expires_at > datetime.now(UTC):
-                return override.value
-        return self._limits[param]
+        override = self._overrides.get(param, datetime.now(UTC))
+        return override.value if override is not None else self._limits[param]
 
     def snapshot(self) -> RiskConfigSnapshot:
         self._cleanup_state()
@@ -63,7 +68,8 @@ class RiskEngine:
 
     def set_limit(self, param: str, value: Any) -> RiskConfigSnapshot:
         key = validate_param(param)
-        self._limits[key] = coerce_param(key, value)
+        self._limits[key] = self._limit_changes[key] = coerce_param(key, value)
+        self._journal({"t": "limit", "param": key, "value": self._limits[key]})
         return self.snapshot()
 
     def override_limit(self, param: str, value: Any, duration_seconds: int, reason: str) -> RiskOverride:
@@ -72,14 +78,113 @@ class RiskEngine:
         if not isinstance(coerced, (int, float)):
             raise ValueError(f"risk override supports only numeric params, got '{key}'")
         override = RiskOverride.from_duration(param=key, value=float(coerced), reason=reason, seconds=duration_seconds)
-        self._overrides.append(override)
+        self._overrides.add(override)
+        self._journal({"t": "override", **override.model_dump(mode="json")})
         return override
 
     def halt(self) -> None:
-        self._halted = True
+        if not self._halted:
+            self._halted = True
+            self._journal({"t": "halt"})
 
     def resume(self) -> None:
-        self._halted = False
+        if self._halted:
+            self._halted = False
+            self._journal({"t": "resume"})
+
+    def restore(self) -> dict[str, Any]:
+        """Reload persisted state, dropping whatever expired while the daemon was down."""
+        if self._store is None:
+            return {}
+        started = time.perf_counter()
+        records = self._store.load()
+        now = datetime.now(UTC)
+        for record in records:
+            try:
+                self._apply(record, now)
+            except (KeyError, TypeError, ValueError):
+                logger.warning("skipping invalid risk state record %r", record.get("t"))
+        self._cleanup_state()
+        self._compact()
+        self._restored = {
+            "records": len(records),
+            "halted": self._halted,
+            "orders_in_window": self._order_window.count(now),
+            "duplicate_keys": len(self._duplicate_keys),
+            "overrides": len(self._overrides),
+            "limit_changes": sorted(self._limit_changes),
+            "load_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+        return self._restored
+
+    def close(self) -> None:
+        if self._store is not None:
+            self._cleanup_state()
+            self._compact()
+            self._store.close()
+
+    def state_stats(self) -> dict[str, Any] | None:
+        if self._store is None:
+            return None
+        return {**self._store.stats(), "restored": self._restored}
+
+    def _apply(self, record: dict[str, Any], now: datetime) -> None:
+        kind = record["t"]
+        if kind == "snapshot":
+            self._halted = bool(record["halted"])
+            for key, value in record["limits"].items():
+                self._limits[key] = self._limit_changes[key] = coerce_param(key, value)
+            for second, count in record["orders"]:
+                self._order_window.add(datetime.fromtimestamp(second, UTC), int(count))
+            for key, ts in record["duplicates"]:
+                self._duplicate_keys.add(key, datetime.fromtimestamp(ts, UTC))
+            for item in record["overrides"]:
+                self._restore_override(item, now)
+        elif kind == "order":
+            at = datetime.fromtimestamp(record["ts"], UTC)
+            self._order_window.add(at)
+            self._duplicate_keys.add(record["key"], at)
+        elif kind == "halt":
+            self._halted = True
+        elif kind == "resume":
+            self._halted = False
+        elif kind == "limit":
+            key = validate_param(record["param"])
+            self._limits[key] = self._limit_changes[key] = coerce_param(key, record["value"])
+        elif kind == "override":
+            self._restore_override(record, now)
+
+    def _restore_override(self, data: dict[str, Any], now: datetime) -> None:
+        override = RiskOverride.model_validate({k: v for k, v in data.items() if k != "t"})
+        if override.expires_at > now:
+            self._overrides.add(override)
+
+    def _journal(self, record: dict[str, Any]) -> None:
+        if self._store is None:
+            return
+        try:
+            due = self._store.append(record)
+        except OSError:
+            logger.warning("could not persist risk state to %s", self._store.path, exc_info=True)
+            return
+        if due:
+            self._compact()
+
+    def _compact(self) -> None:
+        assert self._store is not None
+        now = datetime.now(UTC)
+        snapshot = {
+            "t": "snapshot",
+            "halted": self._halted,
+            "limits": self._limit_changes,
+            "orders": self._order_window.buckets(now),
+            "duplicates": [[key, ts.timestamp()] for key, ts in self._duplicate_keys.items()],
+            "overrides": [override.model_dump(mode="json") for override in self._overrides.active()],
+        }
+        try:
+            self._store.rewrite([snapshot])
+        except OSError:
+            logger.warning("could not compact risk state %s", self._store.path, exc_info=True)
 
     def assert_order(self, order: OrderRequest, context: RiskContext) -> RiskCheckResult:
         result = self.check_order(order, context)
@@ -116,14 +221,15 @@ class RiskEngine:
 
         now = datetime.now(UTC)
         rate_limit = int(self._effective_value("order_rate_limit"))
-        if len(self._order_times) >= rate_limit:
+        orders_last_minute = self._order_window.count(now)
+        if orders_last_minute >= rate_limit:
             reasons.append(f"order rate limit exceeded ({rate_limit}/minute)")
-            details["orders_last_minute"] = len(self._order_times)
+            details["orders_last_minute"] = orders_last_minute
             details["limit"] = rate_limit
             violation_codes.add(ErrorCode.RATE_LIMITED.value)
 
-        duplicate_key = f"{order.side.value}:{symbol}:{order.qty}:{order.limit}:{order.stop}:{order.tif.value}"
-        if duplicate_key in self._duplicate_times:
+        duplicate_key = _duplicate_key(order, symbol)
+        if duplicate_key in self._duplicate_keys:
             reasons.append("duplicate order detected inside duplicate window")
             details["duplicate_window_seconds"] = self._effective_value("duplicate_window_seconds")
             violation_codes.add(ErrorCode.DUPLICATE_ORDER.value)
@@ -186,10 +292,191 @@ class RiskEngine:
                 suggestion = f"reduce quantity to <= {max_qty}"
             return RiskCheckResult(ok=False, reasons=reasons, details=details, suggestion=suggestion)
 
-        self._order_times.append(now)
-        self._duplicate_times[duplicate_key] = now
+        self._order_window.add(now)
+        self._duplicate_keys.add(duplicate_key, now)
+        # Journaled before the caller sends the order, so a restart cannot forget it.
+        self._journal({"t": "order", "ts": now.timestamp(), "key": duplicate_key})
         return RiskCheckResult(ok=True, reasons=[], details=details)
 
+    def check_batch(self, orders: list[OrderRequest], context: RiskContext) -> RiskBatchResult:
+        """Check `orders` in sequence against one context without recording them.
+
+        Order-independent columns (marks, notionals, symbol lists, order value) are computed with
+        array arithmetic over the whole batch. Each order then sees the cumulative effect of every
+        earlier order that passed all of its checks: projected position and sector values, orders
+        in the rate-limit window, open orders and duplicate keys. The results therefore match
+        calling `check_order` on each order in turn, but nothing is added to the rate-limit or
+        duplicate state, so the same orders can be placed afterwards.
+        """
+        self._cleanup_state()
+        n = len(orders)
+        if n == 0:
+            return RiskBatchResult(ok=True, passed=0, failed=0)
+        if self._halted:
+            halted = RiskCheckResult(
+                ok=False,
+                reasons=["trading is halted"],
+                details={"halted": True, "violation_codes": [ErrorCode.RISK_HALTED.value]},
+            )
+            return RiskBatchResult(ok=False, passed=0, failed=n, results=[halted.model_copy(deep=True) for _ in orders])
+
+        symbols = [order.symbol.upper() for order in orders]
+        names, symbol_idx = _factorize(symbols)
+        side = np.array([1.0 if order.side == Side.BUY else -1.0 for order in orders])
+        qty = np.array([order.qty for order in orders], dtype=np.float64)
+        mark = np.array(
+            [order.limit or order.stop or context.mark_prices.get(sym) or 0.0 for order, sym in zip(orders, symbols)],
+            dtype=np.float64,
+        )
+        notional = np.abs(qty * mark)
+        signed = side * notional
+
+        allowlist = set(self._effective_value("symbol_allowlist"))
+        blocklist = set(self._effective_value("symbol_blocklist"))
+        not_allowed = np.array([bool(allowlist) and name not in allowlist for name in names])[symbol_idx]
+        blocked = np.array([name in blocklist for name in names])[symbol_idx]
+
+        max_order_value = float(self._effective_value("max_order_value"))
+        too_large = (notional > max_order_value) if max_order_value > 0 else np.zeros(n, dtype=bool)
+
+        nlv = float(context.nlv or 0.0)
+        scale = 100.0 / nlv if nlv > 0 else 0.0
+        loss_pct = abs(min(context.daily_pnl, 0.0)) * scale
+        daily_loss_pct = round(loss_pct, 4)
+        rate_limit = int(self._effective_value("order_rate_limit"))
+        max_open_orders = int(self._effective_value("max_open_orders"))
+        max_position_pct = float(self._effective_value("max_position_pct"))
+        max_single_name_pct = float(self._effective_value("max_single_name_pct"))
+        max_sector = float(self._effective_value("max_sector_exposure_pct"))
+        max_daily_loss_pct = float(self._effective_value("max_daily_loss_pct"))
+        loss_breached = loss_pct > max_daily_loss_pct
+
+        sector_of = [context.sector_by_symbol.get(name) or "" for name in names]
+        sectors, sector_of_name = _factorize(sector_of)
+        sector_idx = np.asarray(sector_of_name)[symbol_idx]
+        has_sector = np.array([bool(sector) for sector in sector_of])[symbol_idx]
+
+        # Running totals move only for orders that pass every check, as if each were placed in
+        # turn, so one pass over the precomputed columns carries them.
+        position = [float(context.position_values.get(name, 0.0)) for name in names]
+        sector_value = [float(context.sector_exposure_values.get(sector, 0.0)) for sector in sectors]
+        window = self._order_window.count(datetime.now(UTC))
+        static_fail = (not_allowed | blocked | too_large).tolist()
+        signed_l = signed.tolist()
+        symbol_l = symbol_idx.tolist()
+        sector_idx_l = sector_idx.tolist()
+        has_sector_l = has_sector.tolist()
+        flags: dict[str, list[bool]] = {
+            name: [False] * n
+            for name in ("duplicate", "rate_limited", "too_many_open", "over_position", "over_single_name", "over_sector")
+        }
+        flags.update(not_allowed=not_allowed.tolist(), blocked=blocked.tolist(), too_large=too_large.tolist())
+        orders_last_minute = [0] * n
+        open_orders = [0] * n
+        projected_value = [0.0] * n
+        projected_pct = [0.0] * n
+        projected_sector_pct = [0.0] * n
+        failing_l = [False] * n
+        seen: set[str] = set()
+        accepted = 0
+        for i, (order, sym) in enumerate(zip(orders, symbols)):
+            key = _duplicate_key(order, sym)
+            value = position[symbol_l[i]] + signed_l[i]
+            sector_total = sector_value[sector_idx_l[i]] + signed_l[i]
+            orders_last_minute[i] = window + accepted
+            open_orders[i] = context.open_orders + accepted
+            projected_value[i] = value
+            projected_pct[i] = pct = abs(value) * scale
+            projected_sector_pct[i] = sector_pct = abs(sector_total) * scale
+            checks = (
+                ("duplicate", key in seen or key in self._duplicate_keys),
+                ("rate_limited", orders_last_minute[i] >= rate_limit),
+                ("too_many_open", open_orders[i] >= max_open_orders),
+                ("over_position", pct > max_position_pct),
+                ("over_single_name", pct > max_single_name_pct),
+                ("over_sector", has_sector_l[i] and sector_pct > max_sector),
+            )
+            failed = static_fail[i] or loss_breached
+            for name, hit in checks:
+                if hit:
+                    flags[name][i] = failed = True
+            failing_l[i] = failed
+            if not failed:
+                accepted += 1
+                seen.add(key)
+                position[symbol_l[i]] = value
+                sector_value[sector_idx_l[i]] = sector_total
+
+        notional_l = notional.tolist()
+        value_l = [round(v, 2) for v in projected_value]
+        pct_l = [round(v, 4) for v in projected_pct]
+        sector_pct_l = [round(v, 4) for v in projected_sector_pct]
+        sector_l = [sectors[j] for j in sector_idx_l]
+
+        results: list[RiskCheckResult] = []
+        for i, sym in enumerate(symbols):
+            details: dict[str, Any] = {"notional": notional_l[i]}
+            if nlv > 0:
+                details["projected_position_value"] = value_l[i]
+                details["projected_position_pct"] = pct_l[i]
+                if has_sector_l[i]:
+                    details["sector"] = sector_l[i]
+                    details["projected_sector_pct"] = sector_pct_l[i]
+                details["daily_loss_pct"] = daily_loss_pct
+            if not failing_l[i]:
+                results.append(RiskCheckResult(ok=True, reasons=[], details=details))
+                continue
+
+            reasons: list[str] = []
+            violation_codes: list[str] = []
+            if flags["not_allowed"][i]:
+                reasons.append(f"symbol {sym} is not in allowlist")
+            if flags["blocked"][i]:
+                reasons.append(f"symbol {sym} is in blocklist")
+            if flags["rate_limited"][i]:
+                reasons.append(f"order rate limit exceeded ({rate_limit}/minute)")
+                details["orders_last_minute"] = int(orders_last_minute[i])
+                details["limit"] = rate_limit
+                violation_codes.append(ErrorCode.RATE_LIMITED.value)
+            if flags["duplicate"][i]:
+                reasons.append("duplicate order detected inside duplicate window")
+                details["duplicate_window_seconds"] = self._effective_value("duplicate_window_seconds")
+                violation_codes.append(ErrorCode.DUPLICATE_ORDER.value)
+            if flags["too_large"][i]:
+                reasons.append(f"order notional {notional_l[i]:.2f} exceeds max_order_value {max_order_value:.2f}")
+            if flags["too_many_open"][i]:
+                reasons.append(f"open orders {open_orders[i]} exceed max_open_orders {max_open_orders}")
+            if nlv > 0:
+                if flags["over_position"][i]:
+                    reasons.append(
+                        f"projected position {projected_pct[i]:.2f}% exceeds max_position_pct {max_position_pct:.2f}%"
+                    )
+                if flags["over_single_name"][i]:
+                    reasons.append(
+                        f"projected position {projected_pct[i]:.2f}% exceeds max_single_name_pct {max_single_name_pct:.2f}%"
+                    )
+                if flags["over_sector"][i]:
+                    reasons.append(
+                        f"projected sector exposure {projected_sector_pct[i]:.2f}% exceeds max_sector_exposure_pct {max_sector:.2f}%"
+                    )
+                if loss_pct > max_daily_loss_pct:
+                    reasons.append(f"daily drawdown {loss_pct:.2f}% exceeds max_daily_loss_pct {max_daily_loss_pct:.2f}%")
+            if violation_codes:
+                details["violation_codes"] = sorted(violation_codes)
+            suggestion = None
+            if flags["too_large"][i] and mark[i]:
+                suggestion = f"reduce quantity to <= {int(max_order_value / mark[i])}"
+            results.append(RiskCheckResult(ok=False, reasons=reasons, details=details, suggestion=suggestion))
+
+        passed = n - sum(failing_l)
+        return RiskBatchResult(
+            ok=passed == n,
+            passed=passed,
+            failed=n - passed,
+            results=results,
+            projected_positions={name: round(value, 2) for name, value in zip(names, position)},
+        )
+
     def check_drawdown_breaker(self, daily_pnl: float, nlv: float) -> tuple[bool, float]:
         if nlv <= 0:
             return False, 0.0
@@ -199,7 +486,7 @@ class RiskEngine:
 
     def list_overrides(self) -> list[RiskOverride]:
         self._cleanup_state()
-        return list(self._overrides)
+        return self._overrides.active()
 
     @staticmethod
     def parse_duration(value: str) -> int:
@@ -213,3 +500,14 @@ class RiskEngine:
         if raw.isdigit():
             return int(raw)
         raise ValueError(f"invalid duration '{value}'")
+
+
+def _duplicate_key(order: OrderRequest, symbol: str) -> str:
+    return f"{order.side.value}:{symbol}:{order.qty}:{order.limit}:{order.stop}:{order.tif.value}"
+
+
+def _factorize(values: list[str]) -> tuple[list[str], np.ndarray]:
+    """Distinct values in first-seen order and each value's index into them."""
+    index: dict[str, int] = {}
+    codes = [index.setdefault(value, len(index)) for value in values]
+    return list(index), np.array(codes, dtype=np.intp)
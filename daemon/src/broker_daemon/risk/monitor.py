@@ -24,6 +24,12 @@ class HeartbeatMonitor:
             return False
         return delta > self._timeout_seconds
 
+    def seconds_until_timeout(self) -> float | None:
+        delta = self.seconds_since_last()
+        if delta is None:
+            return None
+        return self._timeout_seconds - delta
+
 
 class ConnectionLossMonitor:
     def __init__(self, threshold_seconds: int = 30) -> None:
@@ -42,3 +48,8 @@ class ConnectionLossMonitor:
             return False
         seconds = (datetime.now(UTC) - self._disconnected_at).total_seconds()
         return seconds > self._threshold_seconds
+
+    def seconds_until_breach(self) -> float | None:
+        if self._disconnected_at is None:
+            return None
+        return self._threshold_seconds - (datetime.now(UTC) - self._disconnected_at).total_seconds()
@@ -0,0 +1,88 @@
+"""Journal of risk-engine state so halts, limits and order windows survive restarts."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import IO, Any
+
+logger = logging.getLogger(__name__)
+
+# Appended records before the journal is rewritten as one snapshot; bounds restore time.
+COMPACT_AFTER_RECORDS = 5000
+
+
+class RiskStateStore:
+    """Append-only NDJSON journal of risk-engine changes.
+
+    Each change is written and flushed before the engine acts on it, so an order accepted just
+    before a crash is still inside the rate and duplicate windows after restart. Every
+    `compact_after` records, and at shutdown, the file is atomically replaced by a single
+    snapshot of the state that is still live.
+    """
+
+    def __init__(self, path: Path, *, compact_after: int = COMPACT_AFTER_RECORDS) -> None:
+        self._path = path
+        self._compact_after = max(1, compact_after)
+        self._file: IO[str] | None = None
+        self._records = 0
+        self._compactions = 0
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def load(self) -> list[dict[str, Any]]:
+        records: list[dict[str, Any]] = []
+        try:
+            with self._path.open(encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A torn final line from a crash mid-write.
+                        logger.warning("skipping unreadable risk state record in %s", self._path)
+                        continue
+                    if isinstance(record, dict):
+                        records.append(record)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            logger.warning("could not read risk state %s", self._path, exc_info=True)
+        return records
+
+    def append(self, record: dict[str, Any]) -> bool:
+        """Write one record; True once the journal is due for compaction."""
+        if self._file is None:
+            self._file = self._open()
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self._records += 1
+        return self._records >= self._compact_after
+
+    def rewrite(self, records: list[dict[str, Any]]) -> None:
+        self.close()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._path.with_name(f"{self._path.name}.tmp")
+        with tmp.open("w", encoding="utf-8") as fh:
+            for record in records:
+                fh.write(json.dumps(record, separators=(",", ":")) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self._path)
+        self._records = len(records)
+        self._compactions += 1
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def stats(self) -> dict[str, Any]:
+        return {"path": str(self._path), "journal_records": self._records, "compactions": self._compactions}
+
+    def _open(self) -> IO[str]:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        return self._path.open("a", encoding="utf-8")
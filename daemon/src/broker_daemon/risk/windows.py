@@ -0,0 +1,130 @@
+"""Sliding-window state for the risk engine with constant amortized cost per check."""
+
+from __future__ import annotations
+
+import heapq
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+
+from broker_daemon.models.risk import RiskOverride
+
+
+class SlidingWindowCounter:
+    """Events in the trailing window, counted in a ring of one-second buckets.
+
+    Recording and counting only clear the buckets that fell out of the window since the last
+    call, so both are O(1) amortized however full the window is. Events are bucketed by wall-clock
+    second and a bucket is dropped only once every event in it is older than the window: one at
+    t=100.9 is still counted at t=160.9 and gone at t=161.0. An event therefore never expires early
+    and may stay counted up to a second longer than an exact timestamp log would keep it.
+    """
+
+    def __init__(self, window_seconds: int = 60) -> None:
+        self._window = max(1, int(window_seconds))
+        # One bucket more than the window: bucket s is cleared only when head - s > window.
+        self._size = self._window + 1
+        self._buckets = [0] * self._size
+        self._head: int | None = None
+        self._total = 0
+
+    def count(self, now: datetime) -> int:
+        self._advance(int(now.timestamp()))
+        return self._total
+
+    def add(self, now: datetime, count: int = 1) -> None:
+        second = self._advance(int(now.timestamp()))
+        self._buckets[second % self._size] += count
+        self._total += count
+
+    def buckets(self, now: datetime) -> list[tuple[int, int]]:
+        """Non-empty (epoch second, count) buckets still inside the window."""
+        head = self._advance(int(now.timestamp()))
+        seconds = range(head - self._window, head + 1)
+        return [(s, self._buckets[s % self._size]) for s in seconds if self._buckets[s % self._size]]
+
+    def _advance(self, second: int) -> int:
+        if self._head is None:
+            self._head = second
+            return second
+        if second <= self._head:
+            # A clock step backwards is counted in the newest bucket.
+            return self._head
+        for s in range(self._head + 1, self._head + 1 + min(second - self._head, self._size)):
+            idx = s % self._size
+            self._total -= self._buckets[idx]
+            self._buckets[idx] = 0
+        self._head = second
+        return second
+
+
+class ExpiringKeys:
+    """Keys seen inside a sliding window, expired oldest-first through a min-heap.
+
+    Re-adding a key leaves its old heap entry behind; it is skipped when popped because the
+    key's timestamp no longer matches.
+    """
+
+    def __init__(self) -> None:
+        self._seen: dict[str, datetime] = {}
+        self._heap: list[tuple[datetime, str]] = []
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._seen
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._seen)
+
+    def items(self) -> Iterator[tuple[str, datetime]]:
+        return iter(self._seen.items())
+
+    def add(self, key: str, now: datetime) -> None:
+        self._seen[key] = now
+        heapq.heappush(self._heap, (now, key))
+
+    def expire(self, now: datetime, window_seconds: float) -> None:
+        cutoff = now - timedelta(seconds=window_seconds)
+        heap = self._heap
+        while heap and heap[0][0] < cutoff:
+            ts, key = heapq.heappop(heap)
+            if self._seen.get(key) == ts:
+                del self._seen[key]
+
+
+class OverrideIndex:
+    """Temporary limit overrides indexed by param; the most recent unexpired one wins."""
+
+    def __init__(self) -> None:
+        self._by_param: dict[str, list[RiskOverride]] = {}
+        self._heap: list[tuple[datetime, int, RiskOverride]] = []
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def add(self, override: RiskOverride) -> None:
+        self._by_param.setdefault(override.param, []).append(override)
+        heapq.heappush(self._heap, (override.expires_at, self._seq, override))
+        self._seq += 1
+
+    def get(self, param: str, now: datetime) -> RiskOverride | None:
+        # Stacked overrides for one param are rare; the list is almost always length one.
+        for override in reversed(self._by_param.get(param, ())):
+            if override.expires_at > now:
+                return override
+        return None
+
+    def expire(self, now: datetime) -> None:
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            _, _, override = heapq.heappop(heap)
+            stack = self._by_param[override.param]
+            stack.remove(override)
+            if not stack:
+                del self._by_param[override.param]
+
+    def active(self) -> list[RiskOverride]:
+        """Unexpired overrides in the order they were added."""
+        return [override for _, _, override in sorted(self._heap, key=lambda entry: entry[1])]
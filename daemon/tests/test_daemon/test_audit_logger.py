@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+
+import aiosqlite
+import pytest
+
+from broker_daemon.audit.logger import AuditLogger, _PendingWrite
+
+
+async def _count(db_path, table: str) -> int:
+    async with aiosqlite.connect(db_path) as conn:
+        async with conn.execute(f"SELECT COUNT(*) FROM {table}") as cursor:
+            row = await cursor.fetchone()
+    return int(row[0])
+
+
+@pytest.mark.asyncio
+async def test_rows_are_group_committed_after_interval(tmp_path) -> None:
+    db = tmp_path / "audit.db"
+    audit = AuditLogger(db, flush_size=1000, flush_interval_seconds=0.2)
+    await audit.start()
+    try:
+        for idx in range(50):
+            await audit.log_command("cli", f"cmd.{idx}", {}, 0)
+        assert await _count(db, "commands") == 0
+
+        await audit.log_risk_event("check_passed", {"n": 1}, durable=True)
+        assert await _count(db, "commands") == 50
+        assert await _count(db, "risk_events") == 1
+    finally:
+        await audit.close()
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_and_queries_see_pending_rows(tmp_path) -> None:
+    db = tmp_path / "audit.db"
+    audit = AuditLogger(db, flush_size=1000, flush_interval_seconds=60)
+    await audit.start()
+    await audit.log_command("cli", "a", {}, 0)
+    rows = await audit.fetch_all("SELECT command FROM commands")
+    assert [r["command"] for r in rows] == ["a"]
+
+    await audit.log_command("cli", "b", {}, 0)
+    await audit.close()
+    assert await _count(db, "commands") == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_group_rolls_back_whole_batch(tmp_path) -> None:
+    db = tmp_path / "audit.db"
+    audit = AuditLogger(db, flush_size=1000, flush_interval_seconds=60)
+    await audit.start()
+    insert = "INSERT INTO commands (timestamp, source, command, arguments, result_code) VALUES (?, ?, ?, ?, ?)"
+    loop = asyncio.get_running_loop()
+    try:
+        done: asyncio.Future[None] = loop.create_future()
+        await audit._commit_batch(  # noqa: SLF001
+            [
+                _PendingWrite(insert, ("t", "cli", "first", "{}", 0)),
+                _PendingWrite("INSERT INTO missing_table VALUES (?)", (1,), done),
+            ]
+        )
+        with pytest.raises(sqlite3.OperationalError):
+            await done
+
+        ok: asyncio.Future[None] = loop.create_future()
+        await audit._commit_batch([_PendingWrite(insert, ("t", "cli", "second", "{}", 0), ok)])  # noqa: SLF001
+        await ok
+    finally:
+        await audit.close()
+    async with aiosqlite.connect(db) as conn:
+        async with conn.execute("SELECT command FROM commands") as cursor:
+            assert [row[0] for row in await cursor.fetchall()] == ["second"]
+
+
+@pytest.mark.asyncio
+async def test_full_queue_applies_backpressure(tmp_path) -> None:
+    audit = AuditLogger(tmp_path / "audit.db", flush_size=2, flush_interval_seconds=0, queue_size=2)
+    await audit.start()
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*(audit.log_command("cli", f"c{i}", {}, 0) for i in range(20))),
+            timeout=5,
+        )
+        assert audit.pending <= 2
+    finally:
+        await audit.close()
+    assert await _count(tmp_path / "audit.db", "commands") == 20
+
+
+@pytest.mark.asyncio
+async def test_wal_mode_and_readers_do_not_block_writer(tmp_path) -> None:
+    db = tmp_path / "audit.db"
+    audit = AuditLogger(db, synchronous="NORMAL", readers=2)
+    await audit.start()
+    try:
+        rows = await audit.fetch_all("PRAGMA journal_mode")
+        assert rows[0]["journal_mode"] == "wal"
+
+        await audit.log_command("cli", "a", {}, 0)
+        scans = [audit.fetch_all("SELECT * FROM commands") for _ in range(4)]
+        write = audit.log_risk_event("check_passed", {}, durable=True)
+        results = await asyncio.gather(*scans, write)
+        assert all(len(r) == 1 for r in results[:4])
+
+        with pytest.raises(Exception):
+            await audit.fetch_all("DELETE FROM commands")
+    finally:
+        await audit.close()
+
+
+@pytest.mark.asyncio
+async def test_migration_adds_indexes_and_keyset_pages(tmp_path) -> None:
+    from broker_daemon.audit.query import next_cursor, query_commands
+
+    audit = AuditLogger(tmp_path / "audit.db")
+    await audit.start()
+    try:
+        version = await audit.fetch_all("PRAGMA user_version")
+        assert version[0]["user_version"] >= 1
+        plan = await audit.fetch_all("EXPLAIN QUERY PLAN SELECT id FROM commands WHERE source = ? ORDER BY id DESC", ("cli",))
+        assert any("idx_commands_source" in row["detail"] for row in plan)
+
+        for idx in range(7):
+            await audit.log_command("cli", f"c{idx}", {}, 0)
+
+        first = await query_commands(audit, limit=3)
+        assert [r["command"] for r in first] == ["c6", "c5", "c4"]
+        cursor = next_cursor(first, limit=3)
+        assert cursor == {"before_id": first[-1]["id"]}
+
+        second = await query_commands(audit, limit=3, **cursor)
+        assert [r["command"] for r in second] == ["c3", "c2", "c1"]
+
+        newer = await query_commands(audit, limit=2, after_id=second[0]["id"])
+        assert [r["command"] for r in newer] == ["c5", "c4"]
+        assert next_cursor(newer, limit=2, after_id=second[0]["id"]) == {"after_id": newer[0]["id"]}
+
+        last = await query_commands(audit, limit=3, before_id=second[-1]["id"])
+        assert next_cursor(last, limit=3) is None
+    finally:
+        await audit.close()
+
+
+@pytest.mark.asyncio
+async def test_export_streams_csv_and_gzipped_ndjson(tmp_path) -> None:
+    import csv
+    import gzip
+    import json
+
+    from broker_daemon.audit.query import export_table
+
+    audit = AuditLogger(tmp_path / "audit.db")
+    await audit.start()
+    try:
+        for idx in range(25):
+            await audit.log_command("cli" if idx % 2 else "sdk", f"c{idx}", {"n": idx}, 0)
+
+        result = await export_table(audit, table="commands", output=tmp_path / "out.csv", filter_value="cli", chunk_size=4)
+        assert result["rows"] == 12
+        with (tmp_path / "out.csv").open(newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 12 and rows[0]["command"] == "c23"
+
+        result = await export_table(
+            audit,
+            table="commands",
+            output=tmp_path / "out.ndjson.gz",
+            fmt="ndjson",
+            gzip_output=True,
+            chunk_size=7,
+        )
+        assert result["rows"] == 25 and result["gzip"] is True
+        with gzip.open(tmp_path / "out.ndjson.gz", "rt", encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        assert [line["command"] for line in lines[:2]] == ["c24", "c23"]
+        assert not list(tmp_path.glob(".*.partial"))
+    finally:
+        await audit.close()
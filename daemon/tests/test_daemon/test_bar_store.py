@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+import types
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import pytest
+
+from broker_daemon.config import GatewayConfig
+from broker_daemon.daemon.bar_store import BarStore
+from broker_daemon.models.market import Bar
+from broker_daemon.providers.ib import IBProvider
+from broker_daemon.providers.pacing import PacingDeferred
+
+
+class _HourlyProvider:
+    def __init__(self) -> None:
+        self.calls: list[tuple[datetime, datetime]] = []
+
+    async def history_range(self, symbol: str, bar: str, rth_only: bool, start: datetime, end: datetime) -> list[Bar]:
+        self.calls.append((start, end))
+        t = start.replace(minute=0, second=0, microsecond=0)
+        bars = []
+        while t <= end:
+            if t >= start:
+                bars.append(Bar(symbol=symbol, time=t, open=1, high=2, low=0.5, close=1.5, volume=100))
+            t += timedelta(hours=1)
+        return bars
+
+
+def _day(d: int, h: int = 0) -> datetime:
+    return datetime(2024, 1, d, h, tzinfo=UTC)
+
+
+@pytest.mark.asyncio
+async def test_only_missing_ranges_are_fetched_and_merged(tmp_path) -> None:
+    provider = _HourlyProvider()
+    store = BarStore(tmp_path / "bars.db", provider)  # type: ignore[arg-type]
+    try:
+        first = await store.history("aapl", "1h", False, start=_day(2), end=_day(3))
+        assert len(first.bars) == 25
+        assert first.hit_ratio == 0
+
+        again = await store.history("AAPL", "1h", False, start=_day(2, 6), end=_day(2, 18))
+        assert again.hit_ratio == 1 and not again.fetched
+        assert len(again.bars) == 13
+
+        wider = await store.history("AAPL", "1h", False, start=_day(1), end=_day(4))
+        assert [(s, e) for s, e in wider.fetched] == [(_day(1), _day(2)), (_day(3), _day(4))]
+        assert wider.hit_ratio == pytest.approx(1 / 3, abs=1e-3)
+        times = [b.time for b in wider.bars]
+        assert times == sorted(set(times)) and len(times) == 73
+        assert len(provider.calls) == 3
+        # Cold ranges start exactly; a gap after stored bars starts one bar early to replace a forming bar.
+        assert [start for start, _ in provider.calls] == [_day(2), _day(1), _day(3) - timedelta(hours=1)]
+    finally:
+        await store.close()
+
+    reopened = BarStore(tmp_path / "bars.db", provider)  # type: ignore[arg-type]
+    try:
+        result = await reopened.history("AAPL", "1h", False, start=_day(1, 12), end=_day(3, 12))
+        assert result.hit_ratio == 1
+        assert len(provider.calls) == 3
+        assert reopened.stats()["full_hits"] == 1
+    finally:
+        await reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_trading_day_periods_cover_whole_sessions() -> None:
+    provider = _HourlyProvider()
+    store = BarStore(None, provider)  # type: ignore[arg-type]
+    try:
+        # The fake trades every day, so the five sessions end on the end date itself.
+        result = await store.history("AAPL", "1h", False, period="5d", end=_day(14, 20))
+        days = sorted({b.time.date() for b in result.bars})
+        assert len(days) == 5
+        assert days[-1].day == 14
+    finally:
+        await store.close()
+
+
+class _PacedProvider(_HourlyProvider):
+    def __init__(self) -> None:
+        super().__init__()
+        self.pending: asyncio.Future[list[Bar]] | None = None
+
+    async def history_range(self, symbol: str, bar: str, rth_only: bool, start: datetime, end: datetime) -> list[Bar]:
+        if self.pending is None:
+            self.pending = asyncio.get_running_loop().create_future()
+            raise PacingDeferred("queued; ETA 30 seconds", result=self.pending, details={"eta_seconds": 30})
+        return await super().history_range(symbol, bar, rth_only, start, end)
+
+
+@pytest.mark.asyncio
+async def test_deferred_fetch_is_stored_when_it_completes() -> None:
+    provider = _PacedProvider()
+    store = BarStore(None, provider)  # type: ignore[arg-type]
+    try:
+        with pytest.raises(PacingDeferred):
+            await store.history("AAPL", "1h", False, start=_day(2), end=_day(3))
+
+        assert provider.pending is not None
+        provider.pending.set_result(await _HourlyProvider().history_range("AAPL", "1h", False, _day(2), _day(3)))
+        await asyncio.sleep(0.01)
+
+        retry = await store.history("AAPL", "1h", False, start=_day(2), end=_day(3))
+        assert retry.hit_ratio == 1
+        assert len(retry.bars) == 25
+        assert provider.calls == []
+    finally:
+        await store.close()
+
+
+class _FakeIB:
+    def __init__(self) -> None:
+        self.durations: list[str] = []
+
+    def isConnected(self) -> bool:
+        return True
+
+    def disconnect(self) -> None:
+        return None
+
+    async def reqHistoricalDataAsync(self, _contract: Any, **kwargs: Any) -> list[Any]:
+        self.durations.append(kwargs["durationStr"])
+        return []
+
+
+@pytest.mark.asyncio
+async def test_cold_year_of_daily_bars_is_one_365_day_ib_request(monkeypatch: pytest.MonkeyPatch) -> None:
+    provider = IBProvider(GatewayConfig())
+    ib = _FakeIB()
+    provider._ib = ib  # noqa: SLF001
+
+    async def _contract(symbol: str) -> Any:
+        return types.SimpleNamespace(conId=265598, symbol=symbol)
+
+    monkeypatch.setattr(provider, "_stock_contract", _contract)
+    store = BarStore(None, provider)
+    try:
+        await store.history("AAPL", "1d", False, period="1y", end=datetime(2024, 6, 3, 20, tzinfo=UTC))
+        assert ib.durations == ["365 D"]
+
+        # Longer explicit ranges are split into year-sized requests instead of rounding up to whole years.
+        start, end = datetime(2022, 1, 3, tzinfo=UTC), datetime(2024, 1, 10, tzinfo=UTC)
+        await store.history("MSFT", "1d", False, start=start, end=end)
+        assert ib.durations[1:] == ["365 D", "365 D", "7 D"]
+    finally:
+        await store.close()
+        await provider.stop()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import aiosqlite
+import pytest
+
+from broker_daemon.config import AppConfig, LoggingConfig, RuntimeConfig
+from broker_daemon.daemon.server import DaemonServer
+from broker_daemon.exceptions import ErrorCode, BrokerError
+from broker_daemon.models.portfolio import Balance, PnLSummary
+from broker_daemon.protocol import Request
+
+
+def _test_config(tmp_path) -> AppConfig:
+    return AppConfig(
+        logging=LoggingConfig(
+            audit_db=tmp_path / "audit.db",
+            log_file=tmp_path / "broker.log",
+        ),
+        runtime=RuntimeConfig(
+            socket_path=tmp_path / "broker.sock",
+            pid_file=tmp_path / "broker-daemon.pid",
+            request_timeout_seconds=5,
+        ),
+    )
+
+
+@pytest.fixture
+async def server(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    srv = DaemonServer(_test_config(tmp_path))
+
+    async def _slow_balance() -> Balance:
+        await asyncio.sleep(0.1)
+        return Balance(net_liquidation=100_000)
+
+    async def _slow_pnl() -> PnLSummary:
+        await asyncio.sleep(0.1)
+        return PnLSummary(total=12.5)
+
+    monkeypatch.setattr(srv._provider, "balance", _slow_balance)  # noqa: SLF001
+    monkeypatch.setattr(srv._provider, "pnl", _slow_pnl)  # noqa: SLF001
+    await srv._audit.start()  # noqa: SLF001
+    yield srv
+    await srv._audit.close()  # noqa: SLF001
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_reads_concurrently_with_per_item_errors(server: DaemonServer, tmp_path) -> None:
+    req = Request(
+        command="batch",
+        params={
+            "requests": [
+                {"command": "portfolio.balance"},
+                {"command": "portfolio.pnl", "request_id": "pnl-1"},
+                {"command": "risk.limits"},
+                {"command": "quote.snapshot", "params": {}},
+            ]
+        },
+    )
+
+    started = time.monotonic()
+    data = await server._dispatch(req)  # noqa: SLF001
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 0.19
+    assert data["count"] == 4
+    assert data["failed"] == 1
+    results = data["results"]
+    assert [r["command"] for r in results] == ["portfolio.balance", "portfolio.pnl", "risk.limits", "quote.snapshot"]
+    assert results[0]["data"]["balance"]["net_liquidation"] == 100_000
+    assert results[1]["request_id"] == "pnl-1"
+    assert results[3]["ok"] is False
+    assert results[3]["error"]["code"] == ErrorCode.INVALID_ARGS.value
+
+    await server._audit.flush()  # noqa: SLF001
+    async with aiosqlite.connect(tmp_path / "audit.db") as conn:
+        async with conn.execute("SELECT command, result_code FROM commands ORDER BY id") as cursor:
+            rows = await cursor.fetchall()
+    assert sorted(row[0] for row in rows) == ["portfolio.balance", "portfolio.pnl", "quote.snapshot", "risk.limits"]
+    assert dict(rows)["quote.snapshot"] == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_rejects_nested_batches(server: DaemonServer) -> None:
+    req = Request(command="batch", params={"requests": [{"command": "batch", "params": {"requests": []}}]})
+
+    with pytest.raises(BrokerError) as exc:
+        await server._dispatch(req)  # noqa: SLF001
+
+    assert exc.value.code == ErrorCode.INVALID_ARGS
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from broker_daemon.config import AppConfig, LoggingConfig, RiskConfig, RuntimeConfig
+from broker_daemon.daemon.classification import UNCLASSIFIED, ClassificationTable
+from broker_daemon.daemon.order_manager import OrderManager
+from broker_daemon.daemon.portfolio_state import PortfolioState
+from broker_daemon.daemon.server import DaemonServer
+from broker_daemon.exceptions import BrokerError, ErrorCode
+from broker_daemon.models.market import Quote
+from broker_daemon.models.orders import OrderRequest
+from broker_daemon.models.portfolio import Balance, ExposureEntry, PnLSummary, Position
+from broker_daemon.protocol import Request
+from broker_daemon.risk.engine import RiskEngine
+
+CSV = "symbol,sector,asset_class\nAAPL,Technology,equity\nmsft,Technology,equity\nXOM,Energy,equity\nSPY,,etf\n"
+
+
+def _write(path: Path, text: str, mtime: float | None = None) -> Path:
+    path.write_text(text, encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+class _FakeProvider:
+    is_connected = True
+
+    async def balance(self) -> Balance:
+        return Balance(net_liquidation=100_000)
+
+    async def positions(self) -> list[Position]:
+        return [Position(symbol="AAPL", qty=100, avg_cost=100.0), Position(symbol="MSFT", qty=50, avg_cost=100.0)]
+
+    async def quote(self, symbols: list[str]) -> list[Quote]:
+        return [Quote(symbol=s, last=100.0) for s in symbols]
+
+    async def pnl(self) -> PnLSummary:
+        return PnLSummary(total=0.0)
+
+    async def place_order(self, _request: OrderRequest, _client_order_id: str) -> dict[str, Any]:
+        return {"ib_order_id": 1, "status": "Submitted"}
+
+
+class _FakeAudit:
+    async def upsert_order(self, _record: Any, *, durable: bool = False) -> None:
+        return None
+
+    async def log_risk_event(self, _event_type: str, _details: dict[str, Any], *, durable: bool = False) -> None:
+        return None
+
+
+@pytest.mark.asyncio
+async def test_table_loads_and_interns_labels(tmp_path: Path) -> None:
+    table = ClassificationTable(_write(tmp_path / "c.csv", CSV))
+
+    assert await table.refresh() is True
+    assert table.sectors == {"AAPL": "Technology", "MSFT": "Technology", "XOM": "Energy"}
+    assert table.sectors["AAPL"] is table.sectors["MSFT"]
+    assert table.sector_values({"AAPL": 1000.0, "MSFT": -400.0, "ZZZ": 5.0}) == {"Technology": 600.0}
+    stats = table.stats()
+    assert (stats["symbols"], stats["sectors"], stats["asset_classes"]) == (4, 2, 2)
+
+
+@pytest.mark.asyncio
+async def test_missing_file_leaves_table_empty(tmp_path: Path) -> None:
+    table = ClassificationTable(tmp_path / "missing.csv")
+
+    assert await table.refresh() is False
+    assert table.sectors == {} and table.version == 0
+
+
+@pytest.mark.asyncio
+async def test_group_exposure_buckets_unclassified_symbols(tmp_path: Path) -> None:
+    table = ClassificationTable(_write(tmp_path / "c.csv", CSV))
+    await table.refresh()
+    rows = [
+        ExposureEntry(key="AAPL", exposure_value=1000.0, exposure_pct=10.0),
+        ExposureEntry(key="MSFT", exposure_value=500.0, exposure_pct=5.0),
+        ExposureEntry(key="XOM", exposure_value=200.0, exposure_pct=2.0),
+        ExposureEntry(key="TSLA", exposure_value=50.0, exposure_pct=0.5),
+    ]
+
+    by_sector = {r.key: r.exposure_value for r in table.group_exposure(rows, "sector")}
+    assert by_sector == {"Energy": 200.0, "Technology": 1500.0, UNCLASSIFIED: 50.0}
+    by_class = {r.key: r.exposure_pct for r in table.group_exposure(rows, "asset_class")}
+    assert by_class == {"equity": 17.0, UNCLASSIFIED: 0.5}
+
+
+@pytest.mark.asyncio
+async def test_refresh_reloads_only_when_file_changes(tmp_path: Path) -> None:
+    path = _write(tmp_path / "c.csv", CSV, mtime=1_000_000)
+    table = ClassificationTable(path, refresh_seconds=0)
+
+    assert await table.refresh() is True
+    assert await table.refresh() is False
+    _write(path, "symbol,sector,asset_class\nAAPL,Hardware,equity\n", mtime=1_000_100)
+    assert await table.refresh() is True
+    assert table.sectors == {"AAPL": "Hardware"} and table.version == 2
+
+    path.unlink()
+    assert await table.refresh() is True
+    assert table.sectors == {}
+
+
+@pytest.mark.asyncio
+async def test_background_task_picks_up_file_changes(tmp_path: Path) -> None:
+    path = _write(tmp_path / "c.csv", CSV, mtime=1_000_000)
+    table = ClassificationTable(path, refresh_seconds=0.01)
+    await table.start()
+    loaded = table.sectors
+    assert loaded["AAPL"] == "Technology"
+
+    _write(path, "symbol,sector,asset_class\nAAPL,Hardware,equity\n", mtime=1_000_100)
+    for _ in range(200):
+        if table.sectors.get("AAPL") == "Hardware":
+            break
+        await asyncio.sleep(0.01)
+    await table.stop()
+
+    assert table.sectors == {"AAPL": "Hardware"} and table.version == 2
+    # The old dict was swapped out, not mutated.
+    assert loaded["AAPL"] == "Technology"
+
+
+@pytest.mark.asyncio
+async def test_sector_limit_is_enforced_from_classification_table(tmp_path: Path) -> None:
+    table = ClassificationTable(_write(tmp_path / "c.csv", CSV))
+    await table.refresh()
+    risk = RiskEngine(
+        RiskConfig(max_position_pct=100, max_single_name_pct=100, max_sector_exposure_pct=20, max_order_value=1_000_000)
+    )
+    manager = OrderManager(
+        provider=_FakeProvider(),
+        risk=risk,
+        audit=_FakeAudit(),
+        portfolio=PortfolioState(_FakeProvider()),
+        classifications=table,
+    )
+
+    context = await manager._risk_context()  # noqa: SLF001
+    assert context.sector_exposure_values == {"Technology": 15_000.0}
+
+    # 15k held in Technology plus 6k more is 21% of a 100k account.
+    with pytest.raises(BrokerError) as exc:
+        await manager.place_order(OrderRequest(side="buy", symbol="MSFT", qty=60, limit=100.0))
+    assert exc.value.code == ErrorCode.RISK_CHECK_FAILED
+    await manager.place_order(OrderRequest(side="buy", symbol="XOM", qty=60, limit=100.0))
+
+
+@pytest.mark.asyncio
+async def test_portfolio_exposure_groups_by_sector_locally(tmp_path: Path) -> None:
+    cfg = AppConfig(
+        logging=LoggingConfig(audit_db=tmp_path / "audit.db", log_file=tmp_path / "broker.log"),
+        runtime=RuntimeConfig(
+            socket_path=tmp_path / "broker.sock",
+            pid_file=tmp_path / "broker-daemon.pid",
+            classification_path=_write(tmp_path / "c.csv", CSV),
+        ),
+    )
+    server = DaemonServer(cfg)
+    await server._classifications.refresh()  # noqa: SLF001
+    requested: list[str] = []
+
+    async def _exposure(by: str) -> list[ExposureEntry]:
+        requested.append(by)
+        return [
+            ExposureEntry(key="AAPL", exposure_value=1000.0, exposure_pct=10.0),
+            ExposureEntry(key="XOM", exposure_value=300.0, exposure_pct=3.0),
+        ]
+
+    server._provider.exposure = _exposure  # type: ignore[method-assign]  # noqa: SLF001
+    response = await server._dispatch(Request(command="portfolio.exposure", params={"by": "sector"}))  # noqa: SLF001
+
+    assert requested == ["symbol"]
+    assert response["exposure"] == [
+        {"key": "Energy", "exposure_value": 300.0, "exposure_pct": 3.0},
+        {"key": "Technology", "exposure_value": 1000.0, "exposure_pct": 10.0},
+    ]
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from broker_daemon.daemon.coalesce import ReadCoalescer, uncoalesced
+from broker_daemon.exceptions import BrokerError, ErrorCode
+from broker_daemon.models.market import Quote
+from broker_daemon.models.portfolio import Balance
+
+
+class _SlowProvider:
+    def __init__(self) -> None:
+        self.balance_calls = 0
+        self.quote_calls: list[list[str]] = []
+
+    async def balance(self) -> Balance:
+        self.balance_calls += 1
+        await asyncio.sleep(0.01)
+        return Balance(net_liquidation=self.balance_calls)
+
+    async def quote(self, symbols: list[str]) -> list[Quote]:
+        self.quote_calls.append(sorted(symbols))
+        await asyncio.sleep(0.01)
+        if "BAD" in symbols:
+            raise BrokerError(ErrorCode.INVALID_SYMBOL, "unknown symbol BAD")
+        return [Quote(symbol=s, last=1.0) for s in symbols]
+
+
+def _install() -> tuple[_SlowProvider, ReadCoalescer]:
+    provider = _SlowProvider()
+    coalescer = ReadCoalescer()
+    coalescer.install(provider)
+    return provider, coalescer
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_reads_share_one_call() -> None:
+    provider, coalescer = _install()
+
+    results = await asyncio.gather(*(provider.balance() for _ in range(5)))
+    assert provider.balance_calls == 1
+    assert {r.net_liquidation for r in results} == {1}
+
+    await provider.balance()
+    assert provider.balance_calls == 2
+    assert coalescer.stats()["methods"]["balance"] == {"calls": 6, "shared": 4, "provider_calls": 2}
+
+
+@pytest.mark.asyncio
+async def test_uncoalesced_reads_do_not_join_a_call_already_in_flight() -> None:
+    provider, coalescer = _install()
+
+    earlier = asyncio.create_task(provider.balance())
+    await asyncio.sleep(0)
+    with uncoalesced():
+        fresh = await provider.balance()
+    await earlier
+
+    assert provider.balance_calls == 2
+    assert fresh.net_liquidation == 2
+    assert coalescer.stats()["methods"]["balance"] == {"calls": 2, "shared": 0, "provider_calls": 2}
+
+
+@pytest.mark.asyncio
+async def test_overlapping_quote_requests_merge_into_one_batch() -> None:
+    provider, coalescer = _install()
+
+    first, second = await asyncio.gather(provider.quote(["AAPL", "MSFT"]), provider.quote(["msft", "TSLA"]))
+    assert provider.quote_calls == [["AAPL", "MSFT", "TSLA"]]
+    assert [q.symbol for q in first] == ["AAPL", "MSFT"]
+    assert [q.symbol for q in second] == ["MSFT", "TSLA"]
+
+    task = asyncio.create_task(provider.quote(["AAPL"]))
+    await asyncio.sleep(0.001)
+    joined = await provider.quote(["AAPL"])
+    await task
+    assert joined[0].symbol == "AAPL"
+    assert len(provider.quote_calls) == 2
+    assert coalescer.stats()["quote_symbols"] == {"requested": 6, "shared": 2}
+
+
+@pytest.mark.asyncio
+async def test_failed_merged_batch_is_retried_per_caller() -> None:
+    provider, _ = _install()
+
+    good, bad = await asyncio.gather(provider.quote(["AAPL"]), provider.quote(["BAD"]), return_exceptions=True)
+    assert [q.symbol for q in good] == ["AAPL"]
+    assert isinstance(bad, BrokerError)
+    assert provider.quote_calls == [["AAPL", "BAD"], ["AAPL"], ["BAD"]]
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from broker_daemon.config import AppConfig, LoggingConfig, RuntimeConfig
+from broker_daemon.daemon.registry import CommandDispatcher, CommandRegistry, Concurrency
+from broker_daemon.daemon.server import COMMANDS, KNOWN_COMMANDS, DaemonServer, _invalid_args_error
+from broker_daemon.exceptions import BrokerError, ErrorCode
+from broker_daemon.protocol import Request
+
+
+def _test_config(tmp_path) -> AppConfig:
+    return AppConfig(
+        logging=LoggingConfig(
+            audit_db=tmp_path / "audit.db",
+            log_file=tmp_path / "broker.log",
+        ),
+        runtime=RuntimeConfig(
+            socket_path=tmp_path / "broker.sock",
+            pid_file=tmp_path / "broker-daemon.pid",
+            request_timeout_seconds=5,
+        ),
+    )
+
+
+def test_known_commands_come_from_registry() -> None:
+    assert set(KNOWN_COMMANDS) == set(COMMANDS.names())
+    assert COMMANDS.get("portfolio.balance").concurrency == Concurrency.READ
+    assert COMMANDS.get("order.place").concurrency == Concurrency.WRITE
+    assert COMMANDS.get("risk.check").concurrency == COMMANDS.get("risk.check_batch").concurrency == Concurrency.WRITE
+    assert not COMMANDS.get("batch").batchable
+
+
+@pytest.mark.asyncio
+async def test_dispatch_reports_missing_param_from_schema(tmp_path) -> None:
+    server = DaemonServer(_test_config(tmp_path))
+
+    with pytest.raises(ValidationError) as exc:
+        await server._dispatch(Request(command="order.status", params={}))  # noqa: SLF001
+
+    error = _invalid_args_error(exc.value)
+    assert error.message == "missing required parameter 'order_id'"
+
+
+@pytest.mark.asyncio
+async def test_dispatch_rejects_unsupported_capability(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    server = DaemonServer(_test_config(tmp_path))
+    monkeypatch.setattr(type(server._provider), "capabilities", property(lambda _: {"history": False}))  # noqa: SLF001
+
+    with pytest.raises(BrokerError) as exc:
+        await server._dispatch(Request(command="market.history", params={"symbol": "AAPL"}))  # noqa: SLF001
+
+    assert exc.value.code == ErrorCode.INVALID_ARGS
+    assert "historical bars" in exc.value.message
+
+
+@pytest.mark.asyncio
+async def test_hooks_wrap_handlers_and_admission_limit_rejects() -> None:
+    registry = CommandRegistry()
+    release = asyncio.Event()
+
+    @registry.command("slow", max_inflight=1)
+    async def _slow(owner, request, params):
+        await release.wait()
+        return {"owner": owner}
+
+    dispatcher = CommandDispatcher(registry, "srv", capabilities=dict)
+    seen: list[str] = []
+
+    async def _hook(spec, request, call_next):
+        seen.append(spec.name)
+        return await call_next()
+
+    dispatcher.add_hook(_hook)
+    first = asyncio.create_task(dispatcher.dispatch(Request(command="slow")))
+    await asyncio.sleep(0)
+    with pytest.raises(BrokerError) as exc:
+        await dispatcher.dispatch(Request(command="slow"))
+    release.set()
+
+    assert exc.value.code == ErrorCode.RATE_LIMITED
+    assert await first == {"owner": "srv"}
+    assert seen == ["slow", "slow"]
@@ -9,6 +9,7 @@ import pytest
 from broker_daemon.config import GatewayConfig
 from broker_daemon.daemon.connection import IBConnectionManager
 from broker_daemon.exceptions import ErrorCode, BrokerError
+from broker_daemon.models.events import Event, EventTopic
 
 
 class _FakeEvent:
@@ -28,6 +29,9 @@ class _FakeIB:
         self.disconnectedEvent = _FakeEvent()
         self.orderStatusEvent = _FakeEvent()
         self.execDetailsEvent = _FakeEvent()
+        self.accountValueEvent = _FakeEvent()
+        self.pnlEvent = _FakeEvent()
+        self.pnl_accounts: list[str] = []
         self.client = types.SimpleNamespace(serverVersion=lambda: 180)
         _FakeIB.instances.append(self)
 
@@ -43,6 +47,9 @@ class _FakeIB:
     def managedAccounts(self) -> list[str]:
         return ["DU123456"]
 
+    def reqPnL(self, account: str) -> None:
+        self.pnl_accounts.append(account)
+
 
 @pytest.mark.asyncio
 async def test_connect_registers_event_handlers_after_reconnect(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -65,6 +72,9 @@ async def test_connect_registers_event_handlers_after_reconnect(monkeypatch: pyt
     assert len(first.disconnectedEvent.handlers) == 1
     assert len(first.orderStatusEvent.handlers) == 1
     assert len(first.execDetailsEvent.handlers) == 1
+    assert len(first.accountValueEvent.handlers) == 1
+    assert len(first.pnlEvent.handlers) == 1
+    assert first.pnl_accounts == ["DU123456"]
 
     await manager.stop()
     assert await manager.connect() is True
@@ -73,6 +83,7 @@ async def test_connect_registers_event_handlers_after_reconnect(monkeypatch: pyt
     assert len(second.disconnectedEvent.handlers) == 1
     assert len(second.orderStatusEvent.handlers) == 1
     assert len(second.execDetailsEvent.handlers) == 1
+    assert second.pnl_accounts == ["DU123456"]
 
 
 @pytest.mark.asyncio
@@ -100,3 +111,49 @@ async def test_exposure_rejects_unknown_group() -> None:
     with pytest.raises(BrokerError) as exc:
         await manager.exposure("invalid-group")
     assert exc.value.code == ErrorCode.INVALID_ARGS
+
+
+@pytest.mark.asyncio
+async def test_account_value_updates_are_pushed_as_pnl_events() -> None:
+    events: list[Event] = []
+
+    async def _collect(event: Event) -> None:
+        events.append(event)
+
+    manager = IBConnectionManager(GatewayConfig(), event_cb=_collect)
+    for tag, currency, value in [
+        ("NetLiquidation", "BASE", "99000"),
+        ("NetLiquidation", "USD", "100000"),
+        # USD is preferred, so a later BASE value does not overwrite it.
+        ("NetLiquidation", "BASE", "98000"),
+        ("BuyingPower", "USD", "400000"),
+        ("NetLiquidation", "EUR", "90000"),
+    ]:
+        manager._on_account_value(types.SimpleNamespace(tag=tag, currency=currency, value=value))  # noqa: SLF001
+    await asyncio.sleep(0)
+
+    assert [e.payload for e in events] == [
+        {"event": "account", "net_liquidation": 99000.0},
+        {"event": "account", "net_liquidation": 100000.0},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_daily_pnl_stream_is_pushed_as_pnl_events() -> None:
+    events: list[Event] = []
+
+    async def _collect(event: Event) -> None:
+        events.append(event)
+
+    manager = IBConnectionManager(GatewayConfig(), event_cb=_collect)
+    nan = float("nan")
+    for daily, realized, unrealized in [(nan, nan, nan), (-1500.0, 200.0, nan), (-1500.0, 200.0, nan), (-1800.0, 200.0, -300.0)]:
+        pnl = types.SimpleNamespace(dailyPnL=daily, realizedPnL=realized, unrealizedPnL=unrealized)
+        manager._on_pnl(pnl)  # noqa: SLF001
+    await asyncio.sleep(0)
+
+    assert [e.topic for e in events] == [EventTopic.PNL, EventTopic.PNL]
+    assert [e.payload for e in events] == [
+        {"event": "pnl", "daily_pnl": -1500.0, "realized": 200.0, "unrealized": 0.0},
+        {"event": "pnl", "daily_pnl": -1800.0, "realized": 200.0, "unrealized": -300.0},
+    ]
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import builtins
+import dataclasses
+import types
+
+import pytest
+
+from broker_daemon.config import GatewayConfig
+from broker_daemon.exceptions import BrokerError, ErrorCode
+from broker_daemon.providers.contracts import ContractCache, contract_key
+from broker_daemon.providers.ib import IBProvider
+
+
+@dataclasses.dataclass
+class _Contract:
+    secType: str = ""
+    conId: int = 0
+    symbol: str = ""
+    exchange: str = ""
+    primaryExchange: str = ""
+    currency: str = ""
+
+    @staticmethod
+    def create(**kwargs: object) -> "_Contract":
+        return _Contract(**kwargs)  # type: ignore[arg-type]
+
+
+def _stock(symbol: str, exchange: str, currency: str) -> _Contract:
+    return _Contract(secType="STK", symbol=symbol, exchange=exchange, currency=currency)
+
+
+class _FakeIB:
+    CON_IDS = {"AAPL": 265598, "MSFT": 272093}
+
+    def __init__(self) -> None:
+        self.qualified: list[list[str]] = []
+
+    def isConnected(self) -> bool:
+        return True
+
+    async def qualifyContractsAsync(self, *contracts: _Contract) -> list[_Contract]:
+        self.qualified.append([c.symbol for c in contracts])
+        for contract in contracts:
+            contract.conId = self.CON_IDS.get(contract.symbol, 0)
+            contract.primaryExchange = "NASDAQ" if contract.conId else ""
+        return [c for c in contracts if c.conId]
+
+
+@pytest.fixture
+def fake_ib_async(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake_module = types.SimpleNamespace(Contract=_Contract, Stock=_stock)
+    original_import = builtins.__import__
+
+    def _fake_import(name: str, *args: object, **kwargs: object) -> object:
+        if name == "ib_async":
+            return fake_module
+        return original_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", _fake_import)
+
+
+def _provider(tmp_path) -> tuple[IBProvider, _FakeIB]:
+    provider = IBProvider(GatewayConfig(contract_cache_path=tmp_path / "contracts.json"))
+    provider._contracts.load()  # noqa: SLF001
+    ib = _FakeIB()
+    provider._ib = ib  # noqa: SLF001
+    return provider, ib
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("fake_ib_async")
+async def test_misses_are_batch_qualified_and_reused_after_restart(tmp_path) -> None:
+    provider, ib = _provider(tmp_path)
+
+    contracts = await provider._stock_contracts(["aapl", "MSFT"])  # noqa: SLF001
+    assert ib.qualified == [["AAPL", "MSFT"]]
+    assert contracts["AAPL"].conId == 265598
+
+    restarted, restarted_ib = _provider(tmp_path)
+    contract = await restarted._stock_contract("AAPL")  # noqa: SLF001
+    assert restarted_ib.qualified == []
+    assert contract == _Contract(secType="STK", conId=265598, symbol="AAPL", exchange="SMART", primaryExchange="NASDAQ", currency="USD")
+
+    with pytest.raises(BrokerError) as exc_info:
+        await restarted._stock_contract("NOPE")  # noqa: SLF001
+    assert exc_info.value.code == ErrorCode.INVALID_SYMBOL
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("fake_ib_async")
+async def test_no_security_definition_error_invalidates_entry(tmp_path) -> None:
+    provider, ib = _provider(tmp_path)
+    await provider._stock_contracts(["AAPL"])  # noqa: SLF001
+
+    provider._on_error(7, 200, "No security definition has been found", _Contract(symbol="AAPL", conId=265598))  # noqa: SLF001
+    await provider._stock_contracts(["AAPL"])  # noqa: SLF001
+    assert ib.qualified == [["AAPL"], ["AAPL"]]
+
+
+@pytest.mark.asyncio
+async def test_cache_ignores_unqualified_and_unreadable_entries(tmp_path) -> None:
+    path = tmp_path / "contracts.json"
+    path.write_text("not json", encoding="utf-8")
+    cache = ContractCache(path)
+    cache.load()
+    assert len(cache) == 0
+
+    cache.put(contract_key("AAPL"), {"symbol": "AAPL", "conId": 0})
+    cache.put(contract_key("MSFT"), {"symbol": "MSFT", "conId": 272093})
+    await cache.save()
+
+    reloaded = ContractCache(path)
+    reloaded.load()
+    assert reloaded.get(contract_key("msft")) == {"symbol": "MSFT", "conId": 272093}
+    assert reloaded.get(contract_key("AAPL")) is None
+    assert reloaded.stats()["hits"] == 1
@@ -46,6 +46,18 @@ async def test_dispatch_rejects_invalid_chain_type(tmp_path) -> None:
     assert "option type" in exc.value.message
 
 
+@pytest.mark.asyncio
+async def test_dispatch_rejects_invalid_chain_greeks_mode(tmp_path) -> None:
+    server = DaemonServer(_test_config(tmp_path))
+    req = Request(command="market.chain", params={"symbol": "AAPL", "greeks": "exact"})
+
+    with pytest.raises(BrokerError) as exc:
+        await server._dispatch(req)  # noqa: SLF001
+
+    assert exc.value.code == ErrorCode.INVALID_ARGS
+    assert exc.value.details["valid_modes"] == ["auto", "local", "provider"]
+
+
 @pytest.mark.asyncio
 async def test_dispatch_rejects_invalid_order_status_filter(tmp_path) -> None:
     server = DaemonServer(_test_config(tmp_path))
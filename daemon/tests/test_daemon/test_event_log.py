@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from broker_daemon.config import AppConfig, LoggingConfig, RuntimeConfig
+from broker_daemon.daemon.event_log import EventLog
+from broker_daemon.daemon.server import DaemonServer
+from broker_daemon.models.events import Event, EventTopic
+from broker_daemon.protocol import Request, decode_event, decode_response, encode_model, frame_payload, read_framed
+
+
+def _seqs(frames: list[bytes]) -> list[int]:
+    return [decode_event(frame[4:]).seq for frame in frames]
+
+
+@pytest.mark.asyncio
+async def test_replay_returns_missed_events_for_requested_topics_in_order() -> None:
+    log = EventLog(buffer_size=10)
+    for i in range(6):
+        log.append("orders" if i % 2 else "fills", {"n": i})
+
+    replay = log.replay(2, {"orders", "fills"})
+    assert _seqs(await log.load_spill(replay)) == [3, 4, 5, 6]
+    assert not replay.gap
+
+    only_orders = log.replay(0, {"orders"})
+    assert _seqs(only_orders.frames) == [2, 4, 6]
+
+
+def test_replay_reports_gap_once_ring_buffer_evicted_missed_events() -> None:
+    log = EventLog(buffer_size=2)
+    for i in range(5):
+        log.append("orders", {"n": i})
+    log.append("risk", {"event": "halt"})
+
+    assert log.replay(1, {"orders"}).gap
+    assert not log.replay(3, {"orders"}).gap
+    # Rare topics keep their own history regardless of chatty ones.
+    assert _seqs(log.replay(0, {"risk"}).frames) == [6]
+    # A sequence from an earlier daemon run cannot be trusted.
+    assert log.replay(99, {"orders"}).gap
+
+
+@pytest.mark.asyncio
+async def test_spill_replays_evicted_events_and_survives_restart(tmp_path) -> None:
+    spill = tmp_path / "events.ndjson"
+    log = EventLog(buffer_size=2, spill_path=spill)
+    log.open()
+    for i in range(6):
+        log.append("fills", {"n": i})
+
+    replay = log.replay(0, {"fills"})
+    assert replay.spill_through == 4 and not replay.gap
+    assert _seqs(await log.load_spill(replay)) == [1, 2, 3, 4, 5, 6]
+    log.close()
+
+    restarted = EventLog(buffer_size=2, spill_path=spill)
+    restarted.open()
+    assert restarted.last_seq == 6
+    restarted.append("fills", {"n": 6})
+    assert _seqs(await restarted.load_spill(restarted.replay(4, {"fills"}))) == [5, 6, 7]
+    # The sequence continued from disk, so it is still the same epoch.
+    assert restarted.epoch == log.epoch
+    assert decode_event(restarted.replay(6, {"fills"}).frames[0][4:]).epoch == log.epoch
+    restarted.close()
+
+
+def test_replay_from_another_epoch_is_a_gap_even_when_seq_is_in_range() -> None:
+    previous = EventLog(buffer_size=10)
+    previous.append("fills", {"n": 0})
+    previous.append("fills", {"n": 1})
+
+    current = EventLog(buffer_size=10)
+    for i in range(5):
+        current.append("fills", {"n": i})
+
+    assert current.epoch != previous.epoch
+    stale = current.replay(2, {"fills"}, epoch=previous.epoch)
+    assert stale.gap and stale.frames == []
+    same = current.replay(2, {"fills"}, epoch=current.epoch)
+    assert not same.gap and _seqs(same.frames) == [3, 4, 5]
+
+
+@pytest.mark.asyncio
+async def test_subscribe_since_seq_replays_before_live_events(tmp_path) -> None:
+    server = DaemonServer(
+        AppConfig(
+            logging=LoggingConfig(audit_db=tmp_path / "audit.db", log_file=tmp_path / "broker.log"),
+            runtime=RuntimeConfig(socket_path=tmp_path / "broker.sock", pid_file=tmp_path / "broker-daemon.pid"),
+        )
+    )
+    await server._audit.start()  # noqa: SLF001
+    unix = await asyncio.start_unix_server(server._handle_client, path=str(server.socket_path))  # noqa: SLF001
+
+    for i in range(3):
+        await server._broadcast_event(Event(topic=EventTopic.FILLS, payload={"fill_id": f"f{i}"}))  # noqa: SLF001
+
+    reader, writer = await asyncio.open_unix_connection(str(server.socket_path))
+    req = Request(command="events.subscribe", params={"topics": ["fills"], "since_seq": 1}, stream=True)
+    writer.write(frame_payload(encode_model(req)))
+    await writer.drain()
+
+    ack = decode_response(await read_framed(reader))
+    assert ack.ok and ack.data["replayed"] == 2 and ack.data["last_seq"] == 3
+    assert ack.data["epoch"] == server._events.epoch  # noqa: SLF001
+
+    await server._broadcast_event(Event(topic=EventTopic.FILLS, payload={"fill_id": "f3"}))  # noqa: SLF001
+    events = [decode_event(await asyncio.wait_for(read_framed(reader), 1)) for _ in range(3)]
+    assert [e.seq for e in events] == [2, 3, 4]
+    assert events[-1].data["payload"]["fill_id"] == "f3"
+
+    writer.close()
+    for sub in list(server._subscribers):  # noqa: SLF001
+        sub.close()
+    unix.close()
+    await unix.wait_closed()
+    await server._audit.close()  # noqa: SLF001
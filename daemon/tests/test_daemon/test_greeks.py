@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+import numpy as np
+import pytest
+
+from broker_daemon.models.market import OptionChain, OptionChainEntry
+from broker_daemon.pricing import apply_chain_greeks, greeks, implied_vol, price
+
+
+def test_greeks_match_reference_values() -> None:
+    g = greeks(100.0, 100.0, 1.0, 0.05, 0.0, 0.2, True)
+    assert float(g.price) == pytest.approx(10.4506, abs=1e-4)
+    assert float(g.delta) == pytest.approx(0.6368, abs=1e-4)
+    assert float(g.gamma) == pytest.approx(0.018762, abs=1e-5)
+    assert float(g.vega) == pytest.approx(0.37524, abs=1e-4)
+    assert float(g.theta) == pytest.approx(-6.414 / 365, abs=1e-4)
+
+    put = greeks(100.0, 100.0, 1.0, 0.05, 0.0, 0.2, False)
+    assert float(put.price) == pytest.approx(5.5735, abs=1e-4)
+    assert float(put.delta) == pytest.approx(0.6368 - 1, abs=1e-4)
+
+
+def test_put_call_parity_with_dividends() -> None:
+    strike = np.linspace(50, 150, 101)
+    call = price(100.0, strike, 0.5, 0.03, 0.02, 0.3, True)
+    put = price(100.0, strike, 0.5, 0.03, 0.02, 0.3, False)
+    parity = 100.0 * np.exp(-0.02 * 0.5) - strike * np.exp(-0.03 * 0.5)
+    np.testing.assert_allclose(call - put, parity, atol=1e-5)
+
+
+def test_implied_vol_round_trips_a_large_chain() -> None:
+    rng = np.random.default_rng(7)
+    n = 10_000
+    strike = rng.uniform(60, 140, n)
+    t = rng.uniform(2 / 365, 2.0, n)
+    vol = rng.uniform(0.05, 1.5, n)
+    is_call = rng.random(n) < 0.5
+    px = price(100.0, strike, t, 0.04, 0.01, vol, is_call)
+
+    solved = implied_vol(px, 100.0, strike, t, 0.04, 0.01, is_call)
+    # Contracts worth (almost) only intrinsic value carry no vol information.
+    informative = px - price(100.0, strike, t, 0.04, 0.01, 1e-4, is_call) > 1e-3
+    assert informative.sum() > n * 0.9
+    np.testing.assert_allclose(solved[informative], vol[informative], rtol=1e-4)
+
+
+def test_implied_vol_is_nan_outside_arbitrage_bounds() -> None:
+    iv = implied_vol([0.0, 150.0, 32.0], 100.0, [100.0, 100.0, 70.0], 0.5, 0.0, 0.0, True)
+    assert np.isnan(iv[0]) and np.isnan(iv[1])
+    assert iv[2] > 0
+
+
+def _chain() -> OptionChain:
+    return OptionChain(
+        symbol="AAPL",
+        underlying_price=100.0,
+        entries=[
+            OptionChainEntry(symbol="AAPL", right="C", strike=100, expiry="2025-01-17", bid=4.9, ask=5.1),
+            OptionChainEntry(
+                symbol="AAPL", right="P", strike=95, expiry="20250117", implied_vol=0.3, delta=-0.25, gamma=None
+            ),
+            OptionChainEntry(symbol="AAPL", right="C", strike=120, expiry="2025-01-17"),
+            OptionChainEntry(symbol="AAPL", right="C", strike=90, expiry="2024-12-01", bid=10, ask=11),
+        ],
+    )
+
+
+def test_auto_mode_fills_only_missing_greeks() -> None:
+    chain = _chain()
+    filled = apply_chain_greeks(chain, rate=0.04, now=datetime(2024, 12, 17, 21, tzinfo=UTC))
+    call, put, unpriced, expired = chain.entries
+
+    assert filled == 2
+    assert call.implied_vol is not None and 0.1 < call.implied_vol < 1
+    assert call.delta == pytest.approx(0.5, abs=0.05)
+    assert put.implied_vol == 0.3 and put.delta == -0.25
+    assert put.gamma is not None and put.gamma > 0
+    assert unpriced.delta is None and expired.delta is None
+
+
+def test_local_mode_replaces_provider_greeks() -> None:
+    chain = _chain()
+    apply_chain_greeks(chain, rate=0.04, mode="local", now=datetime(2024, 12, 17, 21, tzinfo=UTC))
+    put = chain.entries[1]
+    assert put.implied_vol == 0.3
+    assert put.delta != -0.25 and -0.5 < put.delta < 0
+
+    untouched = _chain()
+    assert apply_chain_greeks(untouched, rate=0.04, mode="provider") == 0
+    assert untouched == _chain()
+
+
+def test_ib_chain_without_quotes_or_iv_is_priced_from_vol_input() -> None:
+    # IBProvider.option_chain builds entries from secdef params only: no bid, ask or IV.
+    def _ib_chain() -> OptionChain:
+        return OptionChain(
+            symbol="AAPL",
+            underlying_price=100.0,
+            entries=[
+                OptionChainEntry(symbol="AAPL", right=right, strike=strike, expiry="2025-01-17")
+                for strike in (90.0, 100.0, 110.0)
+                for right in ("C", "P")
+            ],
+        )
+
+    now = datetime(2024, 12, 17, 21, tzinfo=UTC)
+    assert apply_chain_greeks(_ib_chain(), rate=0.04, now=now) == 0
+
+    for mode in ("auto", "local"):
+        chain = _ib_chain()
+        assert apply_chain_greeks(chain, rate=0.04, mode=mode, vol=0.25, now=now) == 6
+        assert all(e.implied_vol == 0.25 and e.gamma is not None and e.gamma > 0 for e in chain.entries)
+        atm_call, atm_put = chain.entries[2], chain.entries[3]
+        assert atm_call.delta == pytest.approx(0.5, abs=0.05)
+        assert atm_call.delta - atm_put.delta == pytest.approx(1.0, abs=1e-3)
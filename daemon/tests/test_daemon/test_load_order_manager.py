@@ -49,10 +49,10 @@ class _FakeConnection:
 
 
 class _FakeAudit:
-    async def upsert_order(self, _record: Any) -> None:
+    async def upsert_order(self, _record: Any, *, durable: bool = False) -> None:
         return None
 
-    async def log_risk_event(self, _event_type: str, _details: dict[str, Any]) -> None:
+    async def log_risk_event(self, _event_type: str, _details: dict[str, Any], *, durable: bool = False) -> None:
         return None
 
     async def log_fill(self, _fill: Any) -> None:
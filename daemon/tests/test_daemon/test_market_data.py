@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+
+import pytest
+
+from broker_daemon.daemon.market_data import MarketDataService
+from broker_daemon.models.market import Quote
+
+
+class _StreamingProvider:
+    capabilities = {"streaming": True}
+
+    def __init__(self) -> None:
+        self.snapshot_calls: list[list[str]] = []
+        self.callbacks: dict[str, Callable[[Quote], None]] = {}
+        self.cancelled: list[str] = []
+
+    async def quote(self, symbols: list[str]) -> list[Quote]:
+        self.snapshot_calls.append(list(symbols))
+        return [Quote(symbol=s, last=100.0) for s in symbols]
+
+    async def stream_quote(self, symbol: str, on_quote: Callable[[Quote], None]) -> None:
+        self.callbacks[symbol] = on_quote
+
+    async def cancel_quote_stream(self, symbol: str) -> None:
+        self.cancelled.append(symbol)
+        self.callbacks.pop(symbol, None)
+
+    def tick(self, symbol: str, last: float) -> None:
+        self.callbacks[symbol](Quote(symbol=symbol, last=last))
+
+
+def _service(provider: _StreamingProvider, **kwargs) -> MarketDataService:
+    return MarketDataService(provider, cache_ttl_seconds=0, **kwargs)  # type: ignore[arg-type]
+
+
+@pytest.mark.asyncio
+async def test_repeated_demand_opens_stream_and_ticks_serve_snapshots() -> None:
+    provider = _StreamingProvider()
+    svc = _service(provider, stream_lines=10, stream_after_requests=2)
+
+    await svc.quote(["AAPL"])
+    await svc.quote(["AAPL"])
+    await asyncio.sleep(0)
+    assert svc.streams.is_streaming("AAPL")
+
+    provider.tick("AAPL", 101.5)
+    calls = len(provider.snapshot_calls)
+    (entry,) = await svc.quote_entries(["aapl"], max_age_seconds=60)
+    assert entry.quote.last == 101.5 and entry.hit
+    assert len(provider.snapshot_calls) == calls
+    assert svc.streams.stats()["streams"][0]["ticks"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stalled_stream_falls_back_to_snapshot_past_max_age() -> None:
+    provider = _StreamingProvider()
+    svc = _service(provider, stream_lines=10)
+    assert await svc.streams.acquire("AAPL")
+    provider.tick("AAPL", 101.5)
+    await asyncio.sleep(0.02)
+
+    (entry,) = await svc.quote_entries(["AAPL"], max_age_seconds=0.01)
+    assert not entry.hit and entry.quote.last == 100.0
+    assert provider.snapshot_calls == [["AAPL"]]
+    await svc.close()
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_keeps_watched_streams_under_line_limit() -> None:
+    provider = _StreamingProvider()
+    svc = _service(provider, stream_lines=2)
+
+    assert await svc.streams.acquire("MSFT")
+    assert await svc.streams.acquire("AAPL")
+    svc.streams.release("AAPL")
+
+    # AAPL is the only unwatched line, so it makes room.
+    assert await svc.streams.acquire("NVDA")
+    assert provider.cancelled == ["AAPL"]
+    # Every line is now watched; no further streams open.
+    assert not await svc.streams.acquire("TSLA")
+    assert sorted(provider.callbacks) == ["MSFT", "NVDA"]
+
+
+@pytest.mark.asyncio
+async def test_idle_unwatched_streams_are_cancelled() -> None:
+    provider = _StreamingProvider()
+    svc = _service(provider, stream_lines=5, stream_idle_seconds=0.01)
+
+    assert await svc.streams.acquire("AAPL")
+    svc.streams.release("AAPL")
+    await asyncio.sleep(0.02)
+    assert await svc.streams.acquire("MSFT")
+    assert provider.cancelled == ["AAPL"]
+    await svc.close()
+    assert provider.callbacks == {}
+
+
+@pytest.mark.asyncio
+async def test_idle_streams_are_released_without_further_traffic() -> None:
+    provider = _StreamingProvider()
+    svc = _service(provider, stream_lines=5, stream_idle_seconds=0.02)
+
+    assert await svc.streams.acquire("AAPL")
+    assert await svc.streams.acquire("MSFT")
+    svc.streams.release("AAPL")
+    await asyncio.sleep(0.1)
+
+    assert provider.cancelled == ["AAPL"]
+    assert svc.streams.is_streaming("MSFT")
+    await svc.close()
+
+
+@pytest.mark.asyncio
+async def test_stale_quotes_are_served_immediately_and_refreshed_in_background() -> None:
+    provider = _StreamingProvider()
+    svc = MarketDataService(provider, cache_ttl_seconds=10, stale_seconds=60)  # type: ignore[arg-type]
+
+    (first,) = await svc.quote_entries(["AAPL"])
+    assert not first.hit
+
+    (cached,) = await svc.quote_entries(["AAPL"])
+    assert cached.hit and not cached.stale
+    assert len(provider.snapshot_calls) == 1
+
+    await asyncio.sleep(0.01)
+    (stale,) = await svc.quote_entries(["AAPL"], max_age_seconds=0.005)
+    assert stale.hit and stale.stale
+    assert stale.age_seconds >= 0.005
+    await asyncio.sleep(0)
+    assert provider.snapshot_calls == [["AAPL"], ["AAPL"]]
+    assert svc.stats()["stale_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_is_bounded_by_lru() -> None:
+    provider = _StreamingProvider()
+    svc = MarketDataService(provider, cache_ttl_seconds=60, cache_size=2)  # type: ignore[arg-type]
+
+    await svc.quote(["AAPL", "MSFT"])
+    await svc.quote(["AAPL"])
+    await svc.quote(["TSLA"])
+    assert svc.stats()["size"] == 2
+
+    entries = await svc.quote_entries(["AAPL", "MSFT"])
+    assert [e.hit for e in entries] == [True, False]
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from broker_daemon.config import AppConfig, LoggingConfig, RuntimeConfig
+from broker_daemon.daemon.metrics import UNKNOWN_COMMAND, DaemonMetrics, LatencyHistogram
+from broker_daemon.daemon.server import DaemonServer
+from broker_daemon.models.portfolio import Balance
+from broker_daemon.protocol import Request
+
+
+def _test_config(tmp_path) -> AppConfig:
+    return AppConfig(
+        logging=LoggingConfig(
+            audit_db=tmp_path / "audit.db",
+            log_file=tmp_path / "broker.log",
+        ),
+        runtime=RuntimeConfig(
+            socket_path=tmp_path / "broker.sock",
+            pid_file=tmp_path / "broker-daemon.pid",
+            request_timeout_seconds=5,
+        ),
+    )
+
+
+def test_histogram_percentiles_are_bucket_bounded() -> None:
+    hist = LatencyHistogram()
+    for _ in range(98):
+        hist.observe(0.001)
+    hist.observe(0.5)
+    hist.observe(0.5)
+
+    assert 0.001 <= hist.percentile(0.50) < 0.00125
+    assert hist.percentile(0.99) == 0.5
+    assert hist.summary()["count"] == 100
+
+
+def test_unknown_commands_share_one_bucket() -> None:
+    metrics = DaemonMetrics(["daemon.status"])
+    for name in ("nope.one", "nope.two"):
+        with metrics.track(name):
+            metrics.record_error("INVALID_ARGS")
+
+    snap = metrics.snapshot()
+    assert list(snap["commands"]) == [UNKNOWN_COMMAND]
+    assert snap["commands"][UNKNOWN_COMMAND]["errors"] == 2
+    assert snap["errors"] == {"INVALID_ARGS": 2}
+
+
+@pytest.mark.asyncio
+async def test_daemon_metrics_splits_provider_and_audit_time(tmp_path) -> None:
+    server = DaemonServer(_test_config(tmp_path))
+    provider = server._provider  # noqa: SLF001
+
+    async def _slow_balance() -> Balance:
+        await asyncio.sleep(0.02)
+        return Balance(net_liquidation=1)
+
+    provider.balance = _slow_balance
+    server._metrics.instrument(provider, "provider", ["balance"])  # noqa: SLF001
+    await server._audit.start()  # noqa: SLF001
+    try:
+        for _ in range(3):
+            req = Request(command="portfolio.balance")
+            with server._metrics.track(req.command):  # noqa: SLF001
+                _, code = await server._execute(req)  # noqa: SLF001
+                await server._audit.log_command(req.source, req.command, req.params, code)  # noqa: SLF001
+        with server._metrics.track("quote.snapshot"):  # noqa: SLF001
+            await server._execute(Request(command="quote.snapshot", params={}))  # noqa: SLF001
+
+        data = await server._dispatch(Request(command="daemon.metrics"))  # noqa: SLF001
+    finally:
+        await server._audit.close()  # noqa: SLF001
+
+    balance = data["commands"]["portfolio.balance"]
+    assert balance["requests"] == 3
+    assert set(balance["stages"]) == {"dispatch", "provider", "audit", "total"}
+    assert balance["stages"]["provider"]["p50_ms"] >= 15
+    assert data["errors"] == {"INVALID_ARGS": 1}
+    assert data["commands"]["quote.snapshot"]["errors"] == 1
+    assert data["requests_total"] == 4
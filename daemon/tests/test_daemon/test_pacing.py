@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from broker_daemon.exceptions import ErrorCode
+from broker_daemon.providers.pacing import PacingDeferred, PacingScheduler
+
+
+def _counting_factory(calls: list[str], name: str):
+    async def _run() -> str:
+        calls.append(name)
+        return name
+
+    return lambda: _run()
+
+
+@pytest.mark.asyncio
+async def test_requests_over_budget_wait_for_the_window() -> None:
+    pacing = PacingScheduler(max_requests=2, window_seconds=0.2, max_wait_seconds=1)
+    calls: list[str] = []
+    started = time.monotonic()
+    try:
+        results = await asyncio.gather(*(pacing.run(n, _counting_factory(calls, n)) for n in ("a", "b", "c")))
+    finally:
+        await pacing.close()
+    assert results == ["a", "b", "c"]
+    assert time.monotonic() - started >= 0.19
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_share_one_call_within_dedupe_window() -> None:
+    pacing = PacingScheduler(dedupe_seconds=0.05)
+    calls: list[str] = []
+    try:
+        assert await asyncio.gather(pacing.run("k", _counting_factory(calls, "x")), pacing.run("k", _counting_factory(calls, "y"))) == ["x", "x"]
+        assert await pacing.run("k", _counting_factory(calls, "z")) == "x"
+        await asyncio.sleep(0.06)
+        assert await pacing.run("k", _counting_factory(calls, "z")) == "z"
+    finally:
+        await pacing.close()
+    assert calls == ["x", "z"]
+    assert pacing.stats()["deduped"] == 2
+
+
+@pytest.mark.asyncio
+async def test_long_waits_are_deferred_with_an_eta_and_keep_running() -> None:
+    pacing = PacingScheduler(max_requests=1, window_seconds=5, max_wait_seconds=0.1)
+    calls: list[str] = []
+    try:
+        await pacing.run("first", _counting_factory(calls, "first"))
+        with pytest.raises(PacingDeferred) as exc_info:
+            await pacing.run("second", _counting_factory(calls, "second"))
+        err = exc_info.value
+        assert err.code == ErrorCode.RATE_LIMITED
+        assert err.details["queued"] is True
+        assert 4 < err.details["eta_seconds"] <= 5
+        assert err.details["position"] == 1
+        assert not err.result.done()
+        assert pacing.stats()["queued"] == 1
+    finally:
+        await pacing.close()
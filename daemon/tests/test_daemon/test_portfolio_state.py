@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import pytest
+
+from broker_daemon.config import RiskConfig
+from broker_daemon.daemon.coalesce import ReadCoalescer
+from broker_daemon.daemon.order_manager import OrderManager
+from broker_daemon.daemon.portfolio_state import PortfolioState
+from broker_daemon.models.market import Quote
+from broker_daemon.models.orders import FillRecord, OrderRequest
+from broker_daemon.models.portfolio import Balance, PnLSummary, Position
+from broker_daemon.risk.engine import RiskEngine
+
+
+class _FakeProvider:
+    is_connected = True
+
+    def __init__(self, *, account_push: bool = True) -> None:
+        self.calls = 0
+        self.qty = 10.0
+        self.capabilities = {"account_push": account_push}
+        self.gate: asyncio.Event | None = None
+
+    async def balance(self) -> Balance:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.gate is not None:
+            await self.gate.wait()
+        return Balance(net_liquidation=100_000)
+
+    async def positions(self) -> list[Position]:
+        self.calls += 1
+        return [Position(symbol="AAPL", qty=self.qty, avg_cost=90.0)]
+
+    async def quote(self, symbols: list[str]) -> list[Quote]:
+        self.calls += 1
+        return [Quote(symbol=s, last=100.0) for s in symbols]
+
+    async def pnl(self) -> PnLSummary:
+        self.calls += 1
+        return PnLSummary(total=-50.0)
+
+    async def place_order(self, _request: OrderRequest, _client_order_id: str) -> dict[str, Any]:
+        return {"ib_order_id": 1, "status": "Submitted"}
+
+
+class _FakeAudit:
+    async def upsert_order(self, _record: Any, *, durable: bool = False) -> None:
+        return None
+
+    async def log_risk_event(self, _event_type: str, _details: dict[str, Any], *, durable: bool = False) -> None:
+        return None
+
+    async def log_fill(self, _fill: Any) -> None:
+        return None
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_seeded_once_and_shared_by_concurrent_readers() -> None:
+    provider = _FakeProvider()
+    state = PortfolioState(provider)
+
+    snaps = await asyncio.gather(*(state.snapshot() for _ in range(10)))
+
+    assert provider.calls == 4
+    assert {s.version for s in snaps} == {1}
+    assert snaps[0].position_values == {"AAPL": 1000.0}
+    assert snaps[0].daily_pnl == -50.0
+
+    forced = await state.snapshot(force_refresh=True)
+    assert forced.version == 2 and provider.calls == 8
+
+
+@pytest.mark.asyncio
+async def test_fills_update_positions_without_broker_round_trips() -> None:
+    provider = _FakeProvider()
+    state = PortfolioState(provider)
+    risk = RiskEngine(RiskConfig(max_position_pct=100, max_single_name_pct=100, max_order_value=1_000_000))
+    manager = OrderManager(provider=provider, risk=risk, audit=_FakeAudit(), portfolio=state)
+
+    record = await manager.place_order(OrderRequest(side="sell", symbol="AAPL", qty=4, limit=101.0))
+    calls = provider.calls
+    fill = FillRecord(fill_id="f1", client_order_id=record.client_order_id, ib_order_id=1, symbol="AAPL", qty=4, price=101.0)
+    await manager.add_fill(fill)
+    await manager.add_fill(fill)
+
+    context = await manager._risk_context()  # noqa: SLF001
+    assert provider.calls == calls
+    assert context.position_values == {"AAPL": 6 * 101.0}
+    assert state.current is not None and state.current.version == 2
+
+
+@pytest.mark.asyncio
+async def test_fills_request_a_reconcile_only_without_account_push() -> None:
+    for account_push in (True, False):
+        provider = _FakeProvider(account_push=account_push)
+        state = PortfolioState(provider)
+        risk = RiskEngine(RiskConfig(max_position_pct=100, max_single_name_pct=100, max_order_value=1_000_000))
+        manager = OrderManager(provider=provider, risk=risk, audit=_FakeAudit(), portfolio=state)
+        record = await manager.place_order(OrderRequest(side="sell", symbol="AAPL", qty=4, limit=101.0))
+        fill = FillRecord(fill_id="f1", client_order_id=record.client_order_id, ib_order_id=1, symbol="AAPL", qty=4, price=101.0)
+
+        await manager.add_fill(fill)
+
+        assert state._reconcile_requested.is_set() is not account_push  # noqa: SLF001
+
+
+@pytest.mark.asyncio
+async def test_late_fill_already_in_reconciled_positions_is_not_counted_twice() -> None:
+    provider = _FakeProvider()
+    state = PortfolioState(provider)
+    await state.refresh()
+
+    executed_at = datetime.now(UTC)
+    # The FILLED status triggered a reconcile that already sees the sale of 4.
+    provider.qty = 6.0
+    await state.refresh()
+    state.apply_fill(fill_id="f1", symbol="AAPL", signed_qty=-4, price=100.0, executed_at=executed_at)
+
+    assert state.current is not None and state.current.positions == {"AAPL": 6.0}
+
+
+@pytest.mark.asyncio
+async def test_fills_during_a_reconcile_are_reapplied_on_its_result() -> None:
+    provider = _FakeProvider()
+    state = PortfolioState(provider)
+    await state.refresh()
+
+    provider.gate = asyncio.Event()
+    before_request = datetime.now(UTC) - timedelta(seconds=1)
+    # The broker's answer counts the earlier sale of 2 but not the sale of 4 that lands mid-request.
+    provider.qty = 8.0
+    refresh = asyncio.create_task(state.refresh())
+    await asyncio.sleep(0.02)
+    state.apply_fill(fill_id="old", symbol="AAPL", signed_qty=-2, price=100.0, executed_at=before_request)
+    state.apply_fill(fill_id="new", symbol="AAPL", signed_qty=-4, price=100.0)
+    provider.gate.set()
+    snap = await refresh
+
+    assert snap.positions == {"AAPL": 4.0}
+    assert snap.position_values == {"AAPL": 400.0}
+
+
+class _SlowPositionsProvider(_FakeProvider):
+    async def positions(self) -> list[Position]:
+        self.calls += 1
+        qty = self.qty  # what the broker holds when the request is sent
+        await asyncio.sleep(0.02)
+        return [Position(symbol="AAPL", qty=qty, avg_cost=90.0)]
+
+
+@pytest.mark.asyncio
+async def test_reconcile_does_not_reuse_a_client_read_sent_before_a_fill() -> None:
+    provider = _SlowPositionsProvider()
+    ReadCoalescer().install(provider)
+    state = PortfolioState(provider)
+    await state.refresh()
+
+    client_read = asyncio.create_task(provider.positions())
+    await asyncio.sleep(0.001)
+    provider.qty = 15.0  # the fill lands at the broker after the client's read went out
+    snap = await state.refresh()
+
+    assert snap.positions == {"AAPL": 15.0}
+    assert (await client_read)[0].qty == 10.0
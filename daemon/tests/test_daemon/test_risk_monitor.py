@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+import pytest
+
+from broker_daemon.config import RiskConfig
+from broker_daemon.daemon.portfolio_state import PortfolioState
+from broker_daemon.daemon.risk_monitor import RiskMonitor
+from broker_daemon.models.events import Event, EventTopic
+from broker_daemon.models.market import Quote
+from broker_daemon.models.portfolio import Balance, PnLSummary, Position
+from broker_daemon.risk.engine import RiskEngine
+from broker_daemon.risk.monitor import ConnectionLossMonitor, HeartbeatMonitor
+
+
+class _FakeProvider:
+    is_connected = True
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.daily_pnl = 0.0
+        self.delay = 0.0
+
+    async def balance(self) -> Balance:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return Balance(net_liquidation=100_000)
+
+    async def positions(self) -> list[Position]:
+        self.calls += 1
+        return []
+
+    async def quote(self, symbols: list[str]) -> list[Quote]:
+        return []
+
+    async def pnl(self) -> PnLSummary:
+        self.calls += 1
+        return PnLSummary(total=self.daily_pnl)
+
+
+class _FakeAudit:
+    def __init__(self) -> None:
+        self.events: list[tuple[str, dict[str, Any]]] = []
+
+    async def log_risk_event(self, event_type: str, details: dict[str, Any], *, durable: bool = False) -> None:
+        self.events.append((event_type, details))
+
+
+def _monitor(
+    *,
+    heartbeat_timeout: int = 300,
+    connection_threshold: int = 30,
+    heartbeat_action: str = "halt",
+) -> tuple[RiskMonitor, PortfolioState, RiskEngine, _FakeAudit, list[Event], _FakeProvider]:
+    provider = _FakeProvider()
+    risk = RiskEngine(RiskConfig(max_daily_loss_pct=2.0))
+    audit = _FakeAudit()
+    events: list[Event] = []
+
+    async def _emit(event: Event) -> None:
+        events.append(event)
+
+    holder: dict[str, RiskMonitor] = {}
+    portfolio = PortfolioState(
+        provider,
+        reconcile_interval_seconds=60.0,
+        on_change=lambda snap: holder["monitor"].on_snapshot(snap),
+    )
+    monitor = RiskMonitor(
+        risk,
+        audit,  # type: ignore[arg-type]
+        portfolio,
+        heartbeat=HeartbeatMonitor(heartbeat_timeout),
+        connection_loss=ConnectionLossMonitor(threshold_seconds=connection_threshold),
+        emit=_emit,
+        heartbeat_action=heartbeat_action,
+    )
+    holder["monitor"] = monitor
+    return monitor, portfolio, risk, audit, events, provider
+
+
+@pytest.mark.asyncio
+async def test_pushed_pnl_trips_drawdown_breaker_without_polling() -> None:
+    monitor, portfolio, risk, audit, events, provider = _monitor()
+    await portfolio.refresh()
+    calls = provider.calls
+
+    portfolio.apply_account(daily_pnl=-1_000.0)
+    assert risk.halted is False
+    portfolio.apply_account(daily_pnl=-2_500.0)
+    assert risk.halted is True
+    await monitor.stop()
+
+    assert provider.calls == calls
+    event_type, details = audit.events[-1]
+    assert event_type == "halt" and details["reason"] == "drawdown_breaker"
+    assert details["loss_pct"] == pytest.approx(2.5)
+    assert events[-1].topic == EventTopic.RISK and events[-1].payload["reason"] == "drawdown_breaker"
+    stats = monitor.stats()
+    assert stats["breach_to_halt"]["drawdown_breaker"]["count"] == 1
+    assert stats["last_trip"]["breach_to_halt_ms"] < 1_000
+
+
+@pytest.mark.asyncio
+async def test_breach_to_halt_is_measured_from_when_the_broker_produced_the_values() -> None:
+    monitor, portfolio, risk, _, _, provider = _monitor()
+    await portfolio.refresh()
+    portfolio.apply_account(daily_pnl=-2_500.0, observed_at=time.monotonic() - 2.0)
+    assert risk.halted is True
+    assert monitor.stats()["last_trip"]["breach_to_halt_ms"] >= 2_000
+    await monitor.stop()
+
+    # A polled breach counts the broker round trip, not just the time after the reply.
+    monitor, portfolio, risk, _, _, provider = _monitor()
+    provider.daily_pnl, provider.delay = -2_500.0, 0.05
+    await portfolio.refresh()
+    assert risk.halted is True
+    assert monitor.stats()["last_trip"]["breach_to_halt_ms"] >= 50
+    await monitor.stop()
+
+
+@pytest.mark.asyncio
+async def test_reconcile_requested_between_intervals_trips_breaker() -> None:
+    # Without account push, fills and finished orders request a reconcile; that is the drawdown source.
+    monitor, portfolio, risk, audit, _, provider = _monitor()
+    await portfolio.start()
+    provider.daily_pnl = -2_500.0
+    portfolio.request_reconcile()
+    for _ in range(100):
+        if risk.halted:
+            break
+        await asyncio.sleep(0.01)
+    await portfolio.stop()
+    await monitor.stop()
+
+    assert risk.halted is True
+    assert audit.events[-1][1]["reason"] == "drawdown_breaker"
+
+
+@pytest.mark.asyncio
+async def test_tighter_limit_is_checked_against_current_snapshot() -> None:
+    monitor, portfolio, risk, _, _, _ = _monitor()
+    await portfolio.refresh()
+    portfolio.apply_account(daily_pnl=-1_500.0)
+    assert monitor.check_drawdown() is False
+
+    risk.set_limit("max_daily_loss_pct", 1.0)
+    assert monitor.check_drawdown() is True
+    await monitor.stop()
+
+
+@pytest.mark.asyncio
+async def test_connection_loss_halts_at_deadline_unless_reconnected() -> None:
+    monitor, _, risk, audit, _, _ = _monitor(connection_threshold=0)
+
+    monitor.on_disconnected()
+    monitor.on_connected()
+    await asyncio.sleep(0.02)
+    assert risk.halted is False
+
+    monitor.on_disconnected()
+    await asyncio.sleep(0.02)
+    assert risk.halted is True
+    await monitor.stop()
+    assert audit.events[-1][1]["reason"] == "connection_loss"
+    assert monitor.stats()["breach_to_halt"]["connection_loss"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_timeout_warns_once_or_halts() -> None:
+    monitor, _, risk, audit, _, _ = _monitor(heartbeat_timeout=0, heartbeat_action="warn")
+    monitor.on_heartbeat()
+    await asyncio.sleep(0.02)
+    monitor.check_heartbeat()
+    await monitor.stop()
+    assert risk.halted is False
+    assert [e for e, _ in audit.events] == ["heartbeat_timeout"]
+
+    monitor, _, risk, audit, events, _ = _monitor(heartbeat_timeout=0, heartbeat_action="halt")
+    monitor.on_heartbeat()
+    await asyncio.sleep(0.02)
+    await monitor.stop()
+    assert risk.halted is True
+    assert audit.events[-1][0] == "heartbeat_timeout"
+    assert events[-1].payload == {"event": "halt", "reason": "heartbeat_timeout"}
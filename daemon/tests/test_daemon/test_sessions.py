@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from broker_daemon.config import AppConfig, LoggingConfig, RuntimeConfig
+from broker_daemon.daemon.server import DaemonServer
+from broker_daemon.protocol import Request, decode_response, encode_model, frame_payload, read_framed
+
+
+def _test_config(tmp_path) -> AppConfig:
+    return AppConfig(
+        logging=LoggingConfig(
+            audit_db=tmp_path / "audit.db",
+            log_file=tmp_path / "broker.log",
+        ),
+        runtime=RuntimeConfig(
+            socket_path=tmp_path / "broker.sock",
+            pid_file=tmp_path / "broker-daemon.pid",
+            request_timeout_seconds=5,
+        ),
+    )
+
+
+async def _start(tmp_path, monkeypatch: pytest.MonkeyPatch) -> tuple[DaemonServer, asyncio.AbstractServer]:
+    server = DaemonServer(_test_config(tmp_path))
+
+    async def _fake_dispatch(request: Request) -> dict[str, Any]:
+        delay = float(request.params.get("delay", 0.0))
+        await asyncio.sleep(delay)
+        return {"command": request.command, "delay": delay}
+
+    monkeypatch.setattr(server, "_dispatch", _fake_dispatch)
+    await server._audit.start()  # noqa: SLF001
+    unix = await asyncio.start_unix_server(server._handle_client, path=str(server.socket_path))  # noqa: SLF001
+    return server, unix
+
+
+async def _shutdown(server: DaemonServer, unix: asyncio.AbstractServer) -> None:
+    for _ in range(100):
+        if not server._sessions:  # noqa: SLF001
+            break
+        await asyncio.sleep(0.01)
+    unix.close()
+    await unix.wait_closed()
+    await server._audit.close()  # noqa: SLF001
+
+
+@pytest.mark.asyncio
+async def test_session_pipelines_requests_and_matches_by_request_id(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    server, unix = await _start(tmp_path, monkeypatch)
+    reader, writer = await asyncio.open_unix_connection(str(server.socket_path))
+
+    slow = Request(command="portfolio.balance", params={"delay": 0.2}, session=True)
+    fast = Request(command="risk.limits", params={"delay": 0.0}, session=True)
+    writer.write(frame_payload(encode_model(slow)) + frame_payload(encode_model(fast)))
+    await writer.drain()
+
+    first = decode_response(await read_framed(reader))
+    second = decode_response(await read_framed(reader))
+    assert first.request_id == fast.request_id
+    assert second.request_id == slow.request_id
+    assert second.data == {"command": "portfolio.balance", "delay": 0.2}
+
+    third = Request(command="daemon.status", session=True)
+    writer.write(frame_payload(encode_model(third)))
+    await writer.drain()
+    assert decode_response(await read_framed(reader)).request_id == third.request_id
+
+    writer.close()
+    await _shutdown(server, unix)
+
+    rows = await _audit_commands(tmp_path)
+    assert sorted(rows) == ["daemon.status", "portfolio.balance", "risk.limits"]
+
+
+@pytest.mark.asyncio
+async def test_one_shot_requests_still_close_after_response(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    server, unix = await _start(tmp_path, monkeypatch)
+    reader, writer = await asyncio.open_unix_connection(str(server.socket_path))
+
+    req = Request(command="daemon.status")
+    writer.write(frame_payload(encode_model(req)))
+    await writer.drain()
+
+    response = decode_response(await read_framed(reader))
+    assert response.ok is True
+    assert await reader.read() == b""
+
+    writer.close()
+    await _shutdown(server, unix)
+
+
+async def _audit_commands(tmp_path) -> list[str]:
+    import aiosqlite
+
+    async with aiosqlite.connect(tmp_path / "audit.db") as conn:
+        async with conn.execute("SELECT command FROM commands") as cursor:
+            return [row[0] for row in await cursor.fetchall()]
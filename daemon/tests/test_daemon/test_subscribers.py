@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from broker_daemon.config import AppConfig, LoggingConfig, MarketConfig, RuntimeConfig
+from broker_daemon.daemon.server import DaemonServer
+from broker_daemon.daemon.subscribers import OverflowPolicy, Subscriber
+from broker_daemon.models.events import Event, EventTopic
+from broker_daemon.models.market import Quote
+from broker_daemon.protocol import (
+    EventEnvelope,
+    Request,
+    Response,
+    decode_response,
+    decode_stream_message,
+    encode_model,
+    frame_payload,
+    read_framed,
+)
+
+
+class _StalledWriter:
+    """Accepts writes but never finishes draining until released."""
+
+    def __init__(self) -> None:
+        self.frames: list[bytes] = []
+        self.release = asyncio.Event()
+        self.closed = False
+
+    def write(self, data: bytes) -> None:
+        self.frames.append(data)
+
+    async def drain(self) -> None:
+        await self.release.wait()
+
+    def close(self) -> None:
+        self.closed = True
+
+
+async def _offer_all(sub: Subscriber, events: list[tuple[str, dict]]) -> None:
+    # The first event is picked up by the writer task, which then stalls in drain().
+    await asyncio.sleep(0)
+    for i, (topic, payload) in enumerate(events):
+        sub.offer(topic, payload, repr(payload).encode())
+        if i == 0:
+            await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_keeps_newest_and_counts_drops() -> None:
+    writer = _StalledWriter()
+    sub = Subscriber(writer, {"orders"}, max_queue=3, policy=OverflowPolicy.DROP_OLDEST)  # type: ignore[arg-type]
+    sub.start()
+    await _offer_all(sub, [("orders", {"n": i}) for i in range(10)])
+
+    # The writer task took the first frame and is stuck in drain; the queue holds the newest three.
+    assert writer.frames == [b"{'n': 0}"]
+    assert sub.queued == 3
+    assert sub.dropped == 6
+
+    writer.release.set()
+    await asyncio.sleep(0.01)
+    assert writer.frames[1:] == [b"{'n': 7}", b"{'n': 8}", b"{'n': 9}"]
+    assert sub.stats()["delivered"] == 4
+    sub.close()
+
+
+@pytest.mark.asyncio
+async def test_conflate_replaces_queued_event_for_same_key() -> None:
+    writer = _StalledWriter()
+    sub = Subscriber(writer, {"orders"}, max_queue=10, policy=OverflowPolicy.CONFLATE)  # type: ignore[arg-type]
+    sub.start()
+    await _offer_all(
+        sub,
+        [
+            ("orders", {"client_order_id": "blocker"}),
+            ("orders", {"client_order_id": "a", "status": "Submitted"}),
+            ("orders", {"client_order_id": "b", "status": "Submitted"}),
+            ("orders", {"client_order_id": "a", "status": "Filled"}),
+        ],
+    )
+    assert sub.queued == 2 and sub.conflated == 1
+
+    writer.release.set()
+    await asyncio.sleep(0.01)
+    assert b"'status': 'Filled'" in writer.frames[-1]
+    sub.close()
+
+
+@pytest.mark.asyncio
+async def test_disconnect_policy_closes_slow_subscriber() -> None:
+    writer = _StalledWriter()
+    closed: list[Subscriber] = []
+    sub = Subscriber(
+        writer,  # type: ignore[arg-type]
+        {"fills"},
+        max_queue=2,
+        policy=OverflowPolicy.DISCONNECT,
+        on_close=closed.append,
+    )
+    sub.start()
+    await _offer_all(sub, [("fills", {"n": i}) for i in range(5)])
+
+    assert sub.closed and writer.closed
+    assert closed == [sub]
+    assert sub.offer("fills", {}, b"x") is False
+
+
+async def _start_server(tmp_path) -> tuple[DaemonServer, asyncio.AbstractServer]:
+    server = DaemonServer(
+        AppConfig(
+            logging=LoggingConfig(audit_db=tmp_path / "audit.db", log_file=tmp_path / "broker.log"),
+            runtime=RuntimeConfig(socket_path=tmp_path / "broker.sock", pid_file=tmp_path / "broker-daemon.pid"),
+        )
+    )
+    await server._audit.start()  # noqa: SLF001
+    unix = await asyncio.start_unix_server(server._handle_client, path=str(server.socket_path))  # noqa: SLF001
+    return server, unix
+
+
+async def _subscribe(server: DaemonServer, topics: list[str]) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    reader, writer = await asyncio.open_unix_connection(str(server.socket_path))
+    writer.write(frame_payload(encode_model(Request(command="events.subscribe", params={"topics": topics}, stream=True))))
+    await writer.drain()
+    assert decode_response(await read_framed(reader)).ok
+    return reader, writer
+
+
+async def _control(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, **params: object) -> Response:
+    writer.write(frame_payload(encode_model(Request(command="events.control", params=params))))
+    await writer.drain()
+    message = decode_stream_message(await asyncio.wait_for(read_framed(reader), 1))
+    assert isinstance(message, Response)
+    return message
+
+
+@pytest.mark.asyncio
+async def test_subscriber_is_removed_as_soon_as_client_disconnects(tmp_path) -> None:
+    server, unix = await _start_server(tmp_path)
+    _, writer = await _subscribe(server, ["orders"])
+    assert len(server._subscribers) == 1  # noqa: SLF001
+
+    writer.close()
+    for _ in range(50):
+        if not server._subscribers:  # noqa: SLF001
+            break
+        await asyncio.sleep(0.01)
+    assert server._subscribers == []  # noqa: SLF001
+
+    unix.close()
+    await unix.wait_closed()
+    await server._audit.close()  # noqa: SLF001
+
+
+@pytest.mark.asyncio
+async def test_control_messages_retarget_pause_resume_and_ack(tmp_path) -> None:
+    server, unix = await _start_server(tmp_path)
+    reader, writer = await _subscribe(server, ["orders"])
+
+    retarget = await _control(reader, writer, action="topics", topics=["fills"])
+    assert retarget.ok and retarget.data["subscribed"] == ["fills"]
+
+    assert (await _control(reader, writer, action="pause")).data["paused"] is True
+    await server._broadcast_event(Event(topic=EventTopic.ORDERS, payload={"client_order_id": "o1"}))  # noqa: SLF001
+    await server._broadcast_event(Event(topic=EventTopic.FILLS, payload={"fill_id": "f1"}))  # noqa: SLF001
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(read_framed(reader), 0.1)
+
+    resumed = await _control(reader, writer, action="resume")
+    assert resumed.data["paused"] is False
+    event = decode_stream_message(await asyncio.wait_for(read_framed(reader), 1))
+    assert isinstance(event, EventEnvelope) and event.topic == "fills"
+
+    acked = await _control(reader, writer, action="ack", seq=event.seq)
+    assert acked.data["acked_seq"] == event.seq
+    assert server._subscribers[0].stats()["acked_seq"] == event.seq  # noqa: SLF001
+
+    bad = await _control(reader, writer, action="rewind")
+    assert not bad.ok and bad.error is not None and bad.error.code == "INVALID_ARGS"
+
+    writer.close()
+    for sub in list(server._subscribers):  # noqa: SLF001
+        sub.close()
+    unix.close()
+    await unix.wait_closed()
+    await server._audit.close()  # noqa: SLF001
+
+
+@pytest.mark.asyncio
+async def test_quotes_are_conflated_to_max_rate_per_symbol() -> None:
+    writer = _StalledWriter()
+    writer.release.set()
+    sub = Subscriber(writer, {"quotes"}, symbols={"AAPL"}, max_rate=20)  # type: ignore[arg-type]
+    sub.start()
+
+    for i in range(5):
+        sub.offer_quote("AAPL", f"aapl-{i}".encode())
+    await asyncio.sleep(0.01)
+    # The first tick goes out at once; the rest collapse into the newest, sent when the 50ms interval ends.
+    assert writer.frames == [b"aapl-0"]
+    await asyncio.sleep(0.06)
+    assert writer.frames == [b"aapl-0", b"aapl-4"]
+    assert sub.conflated == 3
+    sub.close()
+
+
+@pytest.mark.asyncio
+async def test_quotes_topic_pushes_watched_symbols_only(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    server = DaemonServer(
+        AppConfig(
+            logging=LoggingConfig(audit_db=tmp_path / "audit.db", log_file=tmp_path / "broker.log"),
+            market=MarketConfig(stream_lines=0, quote_poll_seconds=0.05),
+            runtime=RuntimeConfig(socket_path=tmp_path / "broker.sock", pid_file=tmp_path / "broker-daemon.pid"),
+        )
+    )
+
+    async def _quote(symbols: list[str]) -> list[Quote]:
+        return [Quote(symbol=s, last=10.0) for s in symbols]
+
+    monkeypatch.setattr(server._provider, "quote", _quote)  # noqa: SLF001
+    await server._audit.start()  # noqa: SLF001
+    unix = await asyncio.start_unix_server(server._handle_client, path=str(server.socket_path))  # noqa: SLF001
+
+    reader, writer = await asyncio.open_unix_connection(str(server.socket_path))
+    missing = Request(command="events.subscribe", params={"topics": ["quotes"]}, stream=True)
+    writer.write(frame_payload(encode_model(missing)))
+    await writer.drain()
+    assert decode_response(await read_framed(reader)).error.code == "INVALID_ARGS"  # type: ignore[union-attr]
+
+    reader, writer = await asyncio.open_unix_connection(str(server.socket_path))
+    req = Request(command="events.subscribe", params={"topics": ["quotes"], "symbols": ["aapl"]}, stream=True)
+    writer.write(frame_payload(encode_model(req)))
+    await writer.drain()
+    assert decode_response(await read_framed(reader)).data["symbols"] == ["AAPL"]  # type: ignore[index]
+
+    server._broadcast_quote(Quote(symbol="MSFT", last=1.0))  # noqa: SLF001
+    event = decode_stream_message(await asyncio.wait_for(read_framed(reader), 1))
+    assert isinstance(event, EventEnvelope) and event.topic == "quotes"
+    assert event.data["payload"]["symbol"] == "AAPL" and event.seq is None
+
+    writer.close()
+    for _ in range(50):
+        if not server._subscribers:  # noqa: SLF001
+            break
+        await asyncio.sleep(0.01)
+    assert server._market_data._pollers == {}  # noqa: SLF001
+    unix.close()
+    await unix.wait_closed()
+    await server._audit.close()  # noqa: SLF001
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+from dataclasses import replace
+
 from broker_daemon.config import RiskConfig
-from broker_daemon.models.orders import OrderRequest
+from broker_daemon.models.orders import OrderRequest, Side
 from broker_daemon.risk.engine import RiskContext, RiskEngine
 
 
@@ -34,3 +36,107 @@ def test_override_changes_effective_limit() -> None:
     snapshot = engine.snapshot()
 
     assert snapshot.max_order_value == 5000
+
+
+def test_batch_matches_scalar_checks_for_independent_orders() -> None:
+    cfg = RiskConfig(max_order_value=20_000, max_position_pct=10, max_single_name_pct=15, symbol_blocklist=["GME"])
+    ctx = RiskContext(nlv=100_000, daily_pnl=-500, position_values={"AAPL": 4_000}, mark_prices={"MSFT": 400})
+    orders = [
+        OrderRequest(side="buy", symbol="AAPL", qty=50, limit=100),
+        OrderRequest(side="buy", symbol="MSFT", qty=10),
+        OrderRequest(side="sell", symbol="NVDA", qty=300, limit=100),
+        OrderRequest(side="buy", symbol="GME", qty=1, limit=20),
+    ]
+
+    batch = RiskEngine(cfg).check_batch(orders, ctx)
+    scalar = [RiskEngine(cfg).check_order(order, ctx) for order in orders]
+
+    assert [r.ok for r in batch.results] == [r.ok for r in scalar] == [True, True, False, False]
+    assert [r.reasons for r in batch.results] == [r.reasons for r in scalar]
+    assert [r.suggestion for r in batch.results] == [r.suggestion for r in scalar]
+    assert batch.passed == 2 and batch.failed == 2 and batch.ok is False
+
+
+def test_batch_orders_see_cumulative_positions_without_recording_state() -> None:
+    engine = RiskEngine(RiskConfig(max_position_pct=10, max_sector_exposure_pct=9, order_rate_limit=4))
+    ctx = RiskContext(
+        nlv=100_000,
+        sector_by_symbol={"AAPL": "tech", "MSFT": "tech"},
+        sector_exposure_values={"tech": 2_000},
+    )
+    orders = [
+        OrderRequest(side="buy", symbol="AAPL", qty=60, limit=100),
+        OrderRequest(side="buy", symbol="AAPL", qty=50, limit=100),
+        OrderRequest(side="sell", symbol="AAPL", qty=50, limit=100),
+        OrderRequest(side="buy", symbol="MSFT", qty=20, limit=100),
+        OrderRequest(side="buy", symbol="MSFT", qty=20, limit=100),
+        OrderRequest(side="buy", symbol="XOM", qty=10, limit=100),
+    ]
+
+    result = engine.check_batch(orders, ctx)
+
+    assert [r.ok for r in result.results] == [True, False, True, True, False, True]
+    assert result.results[1].details["projected_position_pct"] == 11.0
+    # The rejected second AAPL order moves nothing: tech is at 3,000 before MSFT adds 2,000.
+    assert result.results[3].details["projected_sector_pct"] == 5.0
+    assert any("duplicate" in reason for reason in result.results[4].reasons)
+    assert result.projected_positions == {"AAPL": 1_000.0, "MSFT": 2_000.0, "XOM": 1_000.0}
+
+    # Nothing was recorded: the same orders can still be placed.
+    assert engine.check_order(orders[0], ctx).ok is True
+
+
+def test_batch_matches_sequential_check_order_across_reject_reasons() -> None:
+    cfg = RiskConfig(
+        order_rate_limit=5,
+        max_position_pct=10,
+        max_single_name_pct=10,
+        max_sector_exposure_pct=12,
+        max_order_value=8_000,
+        symbol_blocklist=["GME"],
+    )
+    ctx = RiskContext(
+        nlv=100_000,
+        position_values={"AAPL": 3_000, "MSFT": 2_000},
+        sector_by_symbol={"AAPL": "tech", "MSFT": "tech"},
+        sector_exposure_values={"tech": 5_000},
+    )
+    orders = [
+        OrderRequest(side="buy", symbol="AAPL", qty=300, limit=100),
+        OrderRequest(side="buy", symbol="AAPL", qty=10, limit=100),
+        OrderRequest(side="buy", symbol="GME", qty=1, limit=20),
+        OrderRequest(side="buy", symbol="MSFT", qty=70, limit=100),
+        OrderRequest(side="buy", symbol="MSFT", qty=20, limit=100),
+        OrderRequest(side="buy", symbol="AAPL", qty=10, limit=100),
+        OrderRequest(side="sell", symbol="AAPL", qty=10, limit=100),
+        OrderRequest(side="buy", symbol="XOM", qty=10, limit=100),
+        OrderRequest(side="buy", symbol="XOM", qty=11, limit=100),
+        OrderRequest(side="buy", symbol="XOM", qty=12, limit=100),
+    ]
+
+    batch = RiskEngine(cfg).check_batch(orders, ctx)
+    # Place the orders one at a time, applying each accepted order to the context.
+    sequential_engine = RiskEngine(cfg)
+    positions = dict(ctx.position_values)
+    sectors = dict(ctx.sector_exposure_values)
+    open_orders = ctx.open_orders
+    sequential = []
+    for order in orders:
+        step = replace(ctx, open_orders=open_orders, position_values=dict(positions), sector_exposure_values=dict(sectors))
+        result = sequential_engine.check_order(order, step)
+        sequential.append(result)
+        if result.ok:
+            signed = order.qty * (order.limit or 0.0) * (1 if order.side == Side.BUY else -1)
+            positions[order.symbol] = positions.get(order.symbol, 0.0) + signed
+            if order.symbol in ctx.sector_by_symbol:
+                sector = ctx.sector_by_symbol[order.symbol]
+                sectors[sector] = sectors.get(sector, 0.0) + signed
+            open_orders += 1
+
+    assert [r.ok for r in batch.results] == [r.ok for r in sequential]
+    assert [r.reasons for r in batch.results] == [r.reasons for r in sequential]
+    assert [r.ok for r in batch.results] == [False, True, False, False, True, False, True, True, True, False]
+    reasons = " ".join(reason for r in batch.results for reason in r.reasons)
+    for kind in ("max_order_value", "blocklist", "max_sector_exposure_pct", "duplicate", "rate limit"):
+        assert kind in reasons
+    assert batch.projected_positions == {"AAPL": 3_000.0, "GME": 0.0, "MSFT": 4_000.0, "XOM": 2_100.0}
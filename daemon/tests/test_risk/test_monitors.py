@@ -13,11 +13,13 @@ def test_heartbeat_monitor_timeout_behavior() -> None:
     assert monitor.is_timed_out() is False
     monitor._last_heartbeat = datetime.now(UTC) - timedelta(seconds=11)  # noqa: SLF001
     assert monitor.is_timed_out() is True
+    assert monitor.seconds_until_timeout() < 0
 
 
 def test_connection_loss_monitor_breach_behavior() -> None:
     monitor = ConnectionLossMonitor(threshold_seconds=30)
     assert monitor.breached() is False
+    assert monitor.seconds_until_breach() is None
 
     monitor.on_disconnected()
     monitor._disconnected_at = datetime.now(UTC) - timedelta(seconds=31)  # noqa: SLF001
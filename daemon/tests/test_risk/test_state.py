@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from broker_daemon.config import RiskConfig
+from broker_daemon.models.orders import OrderRequest
+from broker_daemon.risk.engine import RiskContext, RiskEngine
+from broker_daemon.risk.state import RiskStateStore
+
+CFG = RiskConfig(order_rate_limit=5, duplicate_window_seconds=60, max_order_value=100_000)
+
+
+def _order(qty: float) -> OrderRequest:
+    return OrderRequest(side="buy", symbol="AAPL", qty=qty, limit=10)
+
+
+def test_restart_mid_burst_keeps_windows_halt_and_limits(tmp_path) -> None:
+    path = tmp_path / "risk-state.ndjson"
+    engine = RiskEngine(CFG, state_store=RiskStateStore(path))
+    engine.restore()
+    for qty in (1, 2, 3):
+        assert engine.check_order(_order(qty), RiskContext()).ok
+    engine.set_limit("max_order_value", 5000)
+    engine.override_limit("max_open_orders", 3, duration_seconds=3600, reason="test")
+    engine.halt()
+    # No close(): the daemon crashed.
+
+    restarted = RiskEngine(CFG, state_store=RiskStateStore(path))
+    info = restarted.restore()
+    assert info["orders_in_window"] == 3 and info["duplicate_keys"] == 3
+    assert restarted.halted
+    snapshot = restarted.snapshot()
+    assert snapshot.max_order_value == 5000 and snapshot.max_open_orders == 3
+
+    restarted.resume()
+    duplicate = restarted.check_order(_order(2), RiskContext())
+    assert not duplicate.ok and "duplicate" in duplicate.reasons[0]
+    assert restarted.check_order(_order(4), RiskContext()).ok
+    assert restarted.check_order(_order(5), RiskContext()).ok
+    limited = restarted.check_order(_order(6), RiskContext())
+    assert limited.details["orders_last_minute"] == 5
+
+
+def test_journal_is_compacted_and_survives_a_torn_write(tmp_path) -> None:
+    path = tmp_path / "risk-state.ndjson"
+    engine = RiskEngine(RiskConfig(order_rate_limit=1000), state_store=RiskStateStore(path, compact_after=10))
+    engine.restore()
+    for qty in range(1, 26):
+        engine.check_order(_order(qty), RiskContext())
+    assert len(path.read_text().splitlines()) <= 10
+
+    with path.open("a") as fh:
+        fh.write('{"t":"order","ts":')
+    restarted = RiskEngine(RiskConfig(order_rate_limit=1000), state_store=RiskStateStore(path))
+    assert restarted.restore()["orders_in_window"] == 25
+
+    restarted.close()
+    assert len(path.read_text().splitlines()) == 1
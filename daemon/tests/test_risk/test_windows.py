@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+from broker_daemon.models.risk import RiskOverride
+from broker_daemon.risk.windows import ExpiringKeys, OverrideIndex, SlidingWindowCounter
+
+T0 = datetime(2024, 1, 2, 15, 30, tzinfo=UTC)
+
+
+def _at(seconds: float) -> datetime:
+    return T0 + timedelta(seconds=seconds)
+
+
+def test_sliding_window_counter_drops_events_as_they_age_out() -> None:
+    counter = SlidingWindowCounter(60)
+    for i in range(30):
+        counter.add(_at(i))
+    assert counter.count(_at(30)) == 30
+    assert counter.count(_at(70)) == 20
+    # A jump past the whole window clears every bucket.
+    assert counter.count(_at(1000)) == 0
+    counter.add(_at(1000))
+    counter.add(_at(999))
+    assert counter.count(_at(1000)) == 2
+
+
+def test_sliding_window_counter_never_expires_an_event_early() -> None:
+    counter = SlidingWindowCounter(60)
+    counter.add(_at(0))
+    assert counter.count(_at(59.99)) == 1
+    # Bucketed by second, so an event may linger up to a second past the window.
+    assert counter.count(_at(60.5)) == 1
+    assert counter.count(_at(61)) == 0
+
+    counter = SlidingWindowCounter(60)
+    counter.add(_at(100.9))
+    assert counter.count(_at(100.9 + 59.99)) == 1
+    assert counter.count(_at(160.0)) == 1
+    assert [s - int(T0.timestamp()) for s, _ in counter.buckets(_at(160.5))] == [100]
+    assert counter.count(_at(100.9 + 60.5)) == 0
+    assert counter.count(_at(100.9 + 61)) == 0
+
+
+def test_expiring_keys_keep_the_latest_timestamp() -> None:
+    keys = ExpiringKeys()
+    keys.add("a", _at(0))
+    keys.add("b", _at(5))
+    keys.add("a", _at(8))
+
+    keys.expire(_at(12), 10)
+    assert "a" in keys and "b" in keys
+
+    keys.expire(_at(16), 10)
+    assert "a" in keys and "b" not in keys
+
+    keys.expire(_at(19), 10)
+    assert len(keys) == 0
+
+
+def test_override_index_prefers_latest_active_override() -> None:
+    index = OverrideIndex()
+    long = RiskOverride(param="max_order_value", value=1000, reason="a", created_at=T0, expires_at=_at(3600))
+    short = RiskOverride(param="max_order_value", value=5000, reason="b", created_at=_at(1), expires_at=_at(60))
+    other = RiskOverride(param="max_open_orders", value=3, reason="c", created_at=_at(2), expires_at=_at(30))
+    for override in (long, short, other):
+        index.add(override)
+
+    assert index.get("max_order_value", _at(10)) is short
+    assert index.active() == [long, short, other]
+
+    index.expire(_at(60))
+    assert index.get("max_order_value", _at(60)) is long
+    assert index.get("max_open_orders", _at(60)) is None
+    assert index.active() == [long]
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Benchmark local option-chain greeks: vectorized implied vol and greeks on large chains."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+BROKER_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BROKER_ROOT / "daemon" / "src"))
+
+from broker_daemon.models.market import OptionChain, OptionChainEntry
+from broker_daemon.pricing import apply_chain_greeks, greeks, implied_vol, price
+
+SPOT = 100.0
+RATE = 0.04
+DIVIDEND_YIELD = 0.01
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local Black-Scholes greeks benchmark")
+    parser.add_argument("--sizes", type=str, default="10000,50000,100000", help="Comma-separated chain sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per size (median is reported)")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for the synthetic chain")
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    return parser.parse_args()
+
+
+def _synthetic_chain(n: int, rng: np.random.Generator, now: datetime) -> OptionChain:
+    strike = np.round(rng.uniform(50, 150, n), 1)
+    days = rng.integers(1, 730, n)
+    vol = rng.uniform(0.1, 0.9, n)
+    is_call = rng.random(n) < 0.5
+    mid = price(SPOT, strike, days / 365.0, RATE, DIVIDEND_YIELD, vol, is_call)
+    today = now.date()
+    entries = [
+        OptionChainEntry(
+            symbol="BENCH",
+            right="C" if is_call[i] else "P",
+            strike=float(strike[i]),
+            expiry=(today + timedelta(days=int(days[i]))).isoformat(),
+            bid=round(float(mid[i]) * 0.99, 4),
+            ask=round(float(mid[i]) * 1.01, 4),
+        )
+        for i in range(n)
+    ]
+    return OptionChain(symbol="BENCH", underlying_price=SPOT, entries=entries)
+
+
+def _timed(fn: Any, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _bench(n: int, args: argparse.Namespace) -> dict[str, Any]:
+    rng = np.random.default_rng(args.seed)
+    now = datetime.combine(date.today(), datetime.min.time(), tzinfo=UTC)
+    strike = rng.uniform(50, 150, n)
+    t = rng.uniform(1 / 365, 2.0, n)
+    vol = rng.uniform(0.1, 0.9, n)
+    is_call = rng.random(n) < 0.5
+    px = price(SPOT, strike, t, RATE, DIVIDEND_YIELD, vol, is_call)
+
+    iv_ms = _timed(lambda: implied_vol(px, SPOT, strike, t, RATE, DIVIDEND_YIELD, is_call), args.repeat)
+    greeks_ms = _timed(lambda: greeks(SPOT, strike, t, RATE, DIVIDEND_YIELD, vol, is_call), args.repeat)
+
+    chain = _synthetic_chain(n, rng, now)
+    # Fresh copies are made up front so only pricing and writing back is timed.
+    copies = iter([chain.model_copy(deep=True) for _ in range(args.repeat)])
+    chain_ms = _timed(
+        lambda: apply_chain_greeks(next(copies), rate=RATE, dividend_yield=DIVIDEND_YIELD, mode="local", now=now),
+        args.repeat,
+    )
+    return {
+        "contracts": n,
+        "implied_vol_ms": round(iv_ms, 2),
+        "greeks_ms": round(greeks_ms, 2),
+        "chain_ms": round(chain_ms, 2),
+        "chain_us_per_contract": round(chain_ms * 1000 / n, 3),
+    }
+
+
+def main() -> None:
+    args = _parse_args()
+    results = [_bench(int(size), args) for size in args.sizes.split(",") if size.strip()]
+    if args.json:
+        print(json.dumps(results, separators=(",", ":")))
+        return
+    for row in results:
+        print(
+            f"contracts={row['contracts']} implied_vol_ms={row['implied_vol_ms']} greeks_ms={row['greeks_ms']} "
+            f"chain_ms={row['chain_ms']} chain_us_per_contract={row['chain_us_per_contract']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
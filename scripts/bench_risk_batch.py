@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Benchmark batch pre-trade risk checks against one check_order call per order."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+BROKER_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BROKER_ROOT / "daemon" / "src"))
+
+from broker_daemon.config import RiskConfig
+from broker_daemon.models.orders import OrderRequest
+from broker_daemon.risk.engine import RiskContext, RiskEngine
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Risk check_batch vs check_order benchmark")
+    parser.add_argument("--sizes", type=str, default="200,500,2000", help="Comma-separated batch sizes")
+    parser.add_argument("--symbols", type=int, default=100, help="Distinct symbols in the synthetic portfolio")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per size (median is reported)")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    return parser.parse_args()
+
+
+def _fixture(n: int, args: argparse.Namespace) -> tuple[RiskConfig, RiskContext, list[OrderRequest]]:
+    rng = random.Random(args.seed)
+    symbols = [f"SYM{i:03d}" for i in range(args.symbols)]
+    sectors = ["tech", "energy", "health", "financials", "industrials"]
+    context = RiskContext(
+        nlv=10_000_000,
+        daily_pnl=-25_000,
+        open_orders=10,
+        mark_prices={s: rng.uniform(10, 500) for s in symbols},
+        position_values={s: rng.uniform(-200_000, 400_000) for s in symbols},
+        sector_by_symbol={s: rng.choice(sectors) for s in symbols},
+    )
+    for sym, value in context.position_values.items():
+        sector = context.sector_by_symbol[sym]
+        context.sector_exposure_values[sector] = context.sector_exposure_values.get(sector, 0.0) + value
+    orders = [
+        OrderRequest(side=rng.choice(["buy", "sell"]), symbol=rng.choice(symbols), qty=rng.randint(1, 500))
+        for _ in range(n)
+    ]
+    # Rebalancing batches must not trip the per-minute and open-order limits.
+    config = RiskConfig(order_rate_limit=n + 1, max_open_orders=n + 100, max_order_value=250_000)
+    return config, context, orders
+
+
+def _timed(fn: Any, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _scalar(config: RiskConfig, context: RiskContext, orders: list[OrderRequest]) -> None:
+    # A fresh engine per run so state recorded by earlier runs does not trip the rate limit.
+    engine = RiskEngine(config)
+    for order in orders:
+        engine.check_order(order, context)
+
+
+def _bench(n: int, args: argparse.Namespace) -> dict[str, Any]:
+    config, context, orders = _fixture(n, args)
+    engine = RiskEngine(config)
+    batch_ms = _timed(lambda: engine.check_batch(orders, context), args.repeat)
+    scalar_ms = _timed(lambda: _scalar(config, context, orders), args.repeat)
+    return {
+        "orders": n,
+        "batch_ms": round(batch_ms, 3),
+        "scalar_ms": round(scalar_ms, 3),
+        "speedup": round(scalar_ms / batch_ms, 2) if batch_ms else None,
+    }
+
+
+def main() -> None:
+    args = _parse_args()
+    results = [_bench(int(size), args) for size in args.sizes.split(",") if size.strip()]
+    if args.json:
+        print(json.dumps(results, separators=(",", ":")))
+        return
+    for row in results:
+        print(f"orders={row['orders']} batch_ms={row['batch_ms']} scalar_ms={row['scalar_ms']} speedup={row['speedup']}")
+
+
+if __name__ == "__main__":
+    main()
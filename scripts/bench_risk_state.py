@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: per-check risk engine cost as the rate and duplicate windows fill up."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+BROKER_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BROKER_ROOT / "daemon" / "src"))
+
+from broker_daemon.config import RiskConfig
+from broker_daemon.models.orders import OrderRequest
+from broker_daemon.risk.engine import RiskContext, RiskEngine
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Risk engine per-check cost vs. window fill")
+    parser.add_argument("--fills", type=str, default="0,1000,10000,50000", help="Orders already inside the windows")
+    parser.add_argument("--overrides", type=int, default=20, help="Active overrides on the engine")
+    parser.add_argument("--checks", type=int, default=2000, help="Timed checks per fill level")
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    return parser.parse_args()
+
+
+def _order(i: int) -> OrderRequest:
+    # Distinct quantities make every duplicate key unique, so the duplicate window keeps growing.
+    return OrderRequest(side="buy", symbol="AAPL", qty=1 + i, limit=1.0)
+
+
+def _bench(fill: int, args: argparse.Namespace) -> dict[str, Any]:
+    engine = RiskEngine(
+        RiskConfig(
+            order_rate_limit=10_000_000,
+            duplicate_window_seconds=3600,
+            max_open_orders=10_000_000,
+            max_order_value=0,
+            max_position_pct=1e9,
+            max_single_name_pct=1e9,
+        )
+    )
+    for i in range(args.overrides):
+        engine.override_limit("max_order_value", 0, duration_seconds=3600 + i, reason="bench")
+    context = RiskContext(nlv=1e12)
+    for i in range(fill):
+        engine.check_order(_order(i), context)
+
+    orders = [_order(fill + i) for i in range(args.checks)]
+    start = time.perf_counter()
+    for order in orders:
+        engine.check_order(order, context)
+    elapsed = time.perf_counter() - start
+    return {"filled": fill, "checks": args.checks, "us_per_check": round(elapsed / args.checks * 1e6, 2)}
+
+
+def main() -> None:
+    args = _parse_args()
+    results = [_bench(int(fill), args) for fill in args.fills.split(",") if fill.strip()]
+    if args.json:
+        print(json.dumps(results, separators=(",", ":")))
+        return
+    for row in results:
+        print(f"filled={row['filled']} checks={row['checks']} us_per_check={row['us_per_check']}")
+
+
+if __name__ == "__main__":
+    main()
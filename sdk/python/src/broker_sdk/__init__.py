@@ -1,6 +1,6 @@
 """Python SDK public package surface."""
 
-from broker_sdk.client import Client
+from broker_sdk.client import Client, EventStream
 from broker_sdk.types import (
     EVENT_TOPICS,
     AUDIT_SOURCES,
@@ -12,6 +12,8 @@ from broker_sdk.types import (
     BarSize,
     ExposureGroupBy,
     EXPOSURE_GROUPS,
+    GreeksMode,
+    GREEKS_MODES,
     HistoryPeriod,
     HISTORY_PERIODS,
     OptionType,
@@ -28,6 +30,7 @@ from broker_sdk.types import (
 
 __all__ = [
     "Client",
+    "EventStream",
     "EVENT_TOPICS",
     "EventTopic",
     "AUDIT_SOURCES",
@@ -38,6 +41,8 @@ __all__ = [
     "BarSize",
     "ExposureGroupBy",
     "EXPOSURE_GROUPS",
+    "GreeksMode",
+    "GREEKS_MODES",
     "HistoryPeriod",
     "HISTORY_PERIODS",
     "OptionType",
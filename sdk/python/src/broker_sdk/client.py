@@ -10,7 +10,16 @@ from typing import Any, Literal
 
 from broker_daemon.config import load_config
 from broker_daemon.exceptions import ErrorCode, BrokerError
-from broker_daemon.protocol import Request, Response, decode_event, decode_response, encode_model, frame_payload, read_framed
+from broker_daemon.protocol import (
+    EventEnvelope,
+    Request,
+    Response,
+    decode_response,
+    decode_stream_message,
+    encode_model,
+    frame_payload,
+    read_framed,
+)
 from broker_sdk.types import (
     AuditSource,
     AuditTable,
@@ -18,6 +27,7 @@ from broker_sdk.types import (
     EventTopic,
     ExposureGroupBy,
     HistoryPeriod,
+    GreeksMode,
     OptionType,
     OrderSide,
     OrderStatusFilter,
@@ -32,28 +42,41 @@ class Client:
     All operations route through `broker-daemon`, so risk checks and audit logging are always enforced.
     """
 
-    def __init__(self, socket_path: str | Path | None = None, timeout_seconds: int | None = None) -> None:
+    def __init__(
+        self,
+        socket_path: str | Path | None = None,
+        timeout_seconds: int | None = None,
+        *,
+        session: bool = True,
+    ) -> None:
         cfg = load_config()
         self._socket_path = Path(socket_path).expanduser() if socket_path else cfg.runtime.socket_path
         self._timeout = timeout_seconds or cfg.runtime.request_timeout_seconds
+        self._use_session = session
+        self._session: _Session | None = None
+        self._session_lock = asyncio.Lock()
 
     async def __aenter__(self) -> "Client":
         return self
 
     async def __aexit__(self, *_: object) -> None:
-        return None
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the shared daemon session, if one is open."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
 
     async def _request(self, command: str, params: dict[str, Any] | None = None, *, source: str = "sdk") -> Any:
+        if self._use_session:
+            req = Request(command=command, params=params or {}, source=source, session=True)
+            session = await self._ensure_session()
+            response = await session.send(req, timeout=self._timeout)
+            return _unwrap_response(response)
+
         req = Request(command=command, params=params or {}, source=source)
-        try:
-            reader, writer = await asyncio.open_unix_connection(str(self._socket_path))
-        except FileNotFoundError as exc:
-            raise BrokerError(
-                ErrorCode.DAEMON_NOT_RUNNING,
-                "broker-daemon socket not found",
-                details={"socket_path": str(self._socket_path)},
-                suggestion="Start the daemon with `broker daemon start`.",
-            ) from exc
+        reader, writer = await self._open_connection()
 
         writer.write(frame_payload(encode_model(req)))
         await writer.drain()
@@ -63,12 +86,7 @@ class Client:
         except asyncio.TimeoutError as exc:
             writer.close()
             await _safe_wait_closed(writer)
-            raise BrokerError(
-                ErrorCode.TIMEOUT,
-                "request timed out waiting for daemon response",
-                details={"timeout_seconds": self._timeout},
-                suggestion="Retry or increase runtime.request_timeout_seconds in config.",
-            ) from exc
+            raise _timeout_error(self._timeout) from exc
 
         writer.close()
         await _safe_wait_closed(writer)
@@ -76,11 +94,16 @@ class Client:
         response = decode_response(payload)
         return _unwrap_response(response)
 
-    async def subscribe_events(self, topics: Iterable[EventTopic]) -> AsyncIterator[dict[str, Any]]:
-        """Stream daemon events for the requested topic list."""
-        req = Request(command="events.subscribe", params={"topics": list(topics)}, stream=True, source="sdk")
+    async def _ensure_session(self) -> "_Session":
+        async with self._session_lock:
+            if self._session is None or self._session.closed:
+                reader, writer = await self._open_connection()
+                self._session = _Session(reader, writer)
+            return self._session
+
+    async def _open_connection(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
         try:
-            reader, writer = await asyncio.open_unix_connection(str(self._socket_path))
+            return await asyncio.open_unix_connection(str(self._socket_path))
         except FileNotFoundError as exc:
             raise BrokerError(
                 ErrorCode.DAEMON_NOT_RUNNING,
@@ -89,41 +112,136 @@ class Client:
                 suggestion="Start the daemon with `broker daemon start`.",
             ) from exc
 
-        writer.write(frame_payload(encode_model(req)))
-        await writer.drain()
-
-        first = decode_response(await read_framed(reader))
-        _unwrap_response(first)
+    async def subscribe(
+        self,
+        topics: Iterable[EventTopic],
+        *,
+        overflow: Literal["drop_oldest", "conflate", "disconnect"] | None = None,
+        max_queue: int | None = None,
+        since_seq: int | None = None,
+        epoch: str | None = None,
+        symbols: Iterable[str] | None = None,
+        max_rate: float | None = None,
+    ) -> "EventStream":
+        """Open an event subscription that can be retargeted, paused, resumed and acked in-band.
+
+        `overflow` and `max_queue` override the daemon's per-subscriber queue policy for this stream.
+        Pass the `seq` of the last event seen as `since_seq`, with the stream's `epoch`, to replay what was
+        missed while disconnected; if the daemon's sequence restarted, `replay_gap` is set and nothing is replayed.
+        The `quotes` topic needs `symbols`; `max_rate` caps quote events per second per symbol.
+        """
+        params: dict[str, Any] = {"topics": list(topics)}
+        if symbols is not None:
+            params["symbols"] = list(symbols)
+        if max_rate is not None:
+            params["max_rate"] = max_rate
+        if since_seq is not None:
+            params["since_seq"] = since_seq
+        if epoch is not None:
+            params["epoch"] = epoch
+        if overflow is not None:
+            params["overflow"] = overflow
+        if max_queue is not None:
+            params["max_queue"] = max_queue
+        req = Request(command="events.subscribe", params=params, stream=True, source="sdk")
+        reader, writer = await self._open_connection()
 
         try:
-            while True:
-                payload = await read_framed(reader)
-                event = decode_event(payload)
-                yield event.model_dump(mode="json")
-        except asyncio.IncompleteReadError:
-            return
-        finally:
+            writer.write(frame_payload(encode_model(req)))
+            await writer.drain()
+            first = decode_response(await read_framed(reader))
+            subscription = _unwrap_response(first)
+        except BaseException:
             writer.close()
             await _safe_wait_closed(writer)
+            raise
+        return EventStream(reader, writer, subscription, timeout_seconds=self._timeout)
+
+    async def subscribe_events(
+        self,
+        topics: Iterable[EventTopic],
+        *,
+        overflow: Literal["drop_oldest", "conflate", "disconnect"] | None = None,
+        max_queue: int | None = None,
+        since_seq: int | None = None,
+        epoch: str | None = None,
+        symbols: Iterable[str] | None = None,
+        max_rate: float | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream daemon events for the requested topic list; see `subscribe` for the options."""
+        stream = await self.subscribe(
+            topics,
+            overflow=overflow,
+            max_queue=max_queue,
+            since_seq=since_seq,
+            epoch=epoch,
+            symbols=symbols,
+            max_rate=max_rate,
+        )
+        try:
+            async for event in stream:
+                yield event
+        finally:
+            await stream.close()
+
+    async def batch(self, requests: Iterable[tuple[str, dict[str, Any]] | dict[str, Any]]) -> dict[str, Any]:
+        """Run several commands in one daemon round trip.
+
+        Items are `(command, params)` tuples or `{"command": ..., "params": ...}` dicts. The result
+        holds one entry per item, in order, each with its own `ok`, `data` and `error`.
+        """
+        items: list[dict[str, Any]] = []
+        for item in requests:
+            if isinstance(item, tuple):
+                command, params = item
+                items.append({"command": command, "params": params or {}})
+            else:
+                items.append(dict(item))
+        return await self._request("batch", {"requests": items})
 
     async def daemon_status(self) -> dict[str, Any]:
         """Fetch daemon runtime and IB connection status."""
         return await self._request("daemon.status")
 
+    async def daemon_metrics(self, command: str | None = None) -> dict[str, Any]:
+        """Fetch per-command latency histograms (p50/p99 per stage) and request/error counters."""
+        params: dict[str, Any] = {}
+        if command:
+            params["command"] = command
+        return await self._request("daemon.metrics", params)
+
     async def daemon_stop(self) -> dict[str, Any]:
         """Request graceful daemon shutdown."""
         return await self._request("daemon.stop")
 
-    async def quote(self, *symbols: str) -> list[dict[str, Any]]:
-        """Return snapshot quotes for one or more symbols."""
-        data = await self._request("quote.snapshot", {"symbols": list(symbols)})
+    async def quote(self, *symbols: str, max_age_ms: int | None = None) -> list[dict[str, Any]]:
+        """Return snapshot quotes for one or more symbols.
+
+        `max_age_ms` accepts cached quotes up to that age instead of the daemon's configured TTL.
+        """
+        params: dict[str, Any] = {"symbols": list(symbols)}
+        if max_age_ms is not None:
+            params["max_age_ms"] = max_age_ms
+        data = await self._request("quote.snapshot", params)
         return data.get("quotes", [])
 
-    async def history(self, symbol: str, period: HistoryPeriod, bar: BarSize, rth_only: bool = False) -> list[dict[str, Any]]:
-        data = await self._request(
-            "market.history",
-            {"symbol": symbol, "period": period, "bar": bar, "rth_only": rth_only},
-        )
+    async def history(
+        self,
+        symbol: str,
+        period: HistoryPeriod,
+        bar: BarSize,
+        rth_only: bool = False,
+        *,
+        start: str | None = None,
+        end: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Historical bars; `start`/`end` are ISO dates or datetimes and `start` overrides `period`."""
+        params: dict[str, Any] = {"symbol": symbol, "period": period, "bar": bar, "rth_only": rth_only}
+        if start is not None:
+            params["start"] = start
+        if end is not None:
+            params["end"] = end
+        data = await self._request("market.history", params)
         return data.get("bars", [])
 
     async def chain(
@@ -132,14 +250,25 @@ class Client:
         expiry: str | None = None,
         strike_range: str | None = None,
         option_type: OptionType | None = None,
+        *,
+        greeks: GreeksMode = "auto",
+        rate: float | None = None,
+        dividend_yield: float | None = None,
+        vol: float | None = None,
     ) -> dict[str, Any]:
-        params: dict[str, Any] = {"symbol": symbol}
+        params: dict[str, Any] = {"symbol": symbol, "greeks": greeks}
         if expiry:
             params["expiry"] = expiry
         if strike_range:
             params["strike_range"] = strike_range
         if option_type:
             params["type"] = option_type
+        if rate is not None:
+            params["rate"] = rate
+        if dividend_yield is not None:
+            params["dividend_yield"] = dividend_yield
+        if vol is not None:
+            params["vol"] = vol
         return await self._request("market.chain", params)
 
     async def order(
@@ -229,6 +358,10 @@ class Client:
     async def exposure(self, by: ExposureGroupBy = "symbol") -> dict[str, Any]:
         return await self._request("portfolio.exposure", {"by": by})
 
+    async def portfolio_refresh(self) -> dict[str, Any]:
+        """Force the daemon to rebuild its cached portfolio snapshot used by risk checks."""
+        return await self._request("portfolio.refresh")
+
     async def risk_check(
         self,
         *,
@@ -251,6 +384,14 @@ class Client:
             params["stop"] = stop
         return await self._request("risk.check", params)
 
+    async def risk_check_batch(self, orders: list[dict[str, Any]]) -> dict[str, Any]:
+        """Check orders in sequence, each seeing the projected positions of the ones before it.
+
+        Each order takes the same fields as `risk_check`. Nothing is recorded against the rate
+        limit or duplicate window, so the orders can be placed afterwards.
+        """
+        return await self._request("risk.check_batch", {"orders": orders})
+
     async def risk_limits(self) -> dict[str, Any]:
         return await self._request("risk.limits")
 
@@ -272,24 +413,48 @@ class Client:
     async def keepalive(self) -> dict[str, Any]:
         return await self._request("runtime.keepalive", {"sent_at": time.time()})
 
-    async def audit_commands(self, source: AuditSource | None = None, since: str | None = None) -> dict[str, Any]:
-        params: dict[str, Any] = {}
+    async def audit_commands(
+        self,
+        source: AuditSource | None = None,
+        since: str | None = None,
+        *,
+        until: str | None = None,
+        limit: int | None = None,
+        before_id: int | None = None,
+        after_id: int | None = None,
+    ) -> dict[str, Any]:
+        """Query one page of command audit rows, newest first; pass `next_cursor` back to page on."""
+        params = _page_params(since, until, limit, before_id, after_id)
         if source:
             params["source"] = source
-        if since:
-            params["since"] = since
         return await self._request("audit.commands", params)
 
-    async def audit_orders(self, status: OrderStatusFilter | None = None, since: str | None = None) -> dict[str, Any]:
-        params: dict[str, Any] = {}
+    async def audit_orders(
+        self,
+        status: OrderStatusFilter | None = None,
+        since: str | None = None,
+        *,
+        until: str | None = None,
+        limit: int | None = None,
+        before_id: int | None = None,
+        after_id: int | None = None,
+    ) -> dict[str, Any]:
+        params = _page_params(since, until, limit, before_id, after_id)
         if status:
             params["status"] = status
-        if since:
-            params["since"] = since
         return await self._request("audit.orders", params)
 
-    async def audit_risk(self, event_type: str | None = None) -> dict[str, Any]:
-        params: dict[str, Any] = {}
+    async def audit_risk(
+        self,
+        event_type: str | None = None,
+        *,
+        since: str | None = None,
+        until: str | None = None,
+        limit: int | None = None,
+        before_id: int | None = None,
+        after_id: int | None = None,
+    ) -> dict[str, Any]:
+        params = _page_params(since, until, limit, before_id, after_id)
         if event_type:
             params["type"] = event_type
         return await self._request("audit.risk", params)
@@ -299,15 +464,22 @@ class Client:
         *,
         output: str,
         table: AuditTable = "orders",
-        fmt: Literal["csv"] = "csv",
+        fmt: Literal["csv", "ndjson"] = "csv",
         since: str | None = None,
         status: OrderStatusFilter | None = None,
         source: AuditSource | None = None,
         event_type: str | None = None,
+        until: str | None = None,
+        gzip: bool = False,
     ) -> dict[str, Any]:
+        """Stream matching audit rows to `output` on the daemon host; returns the row count."""
         params: dict[str, Any] = {"output": output, "table": table, "format": fmt}
+        if gzip:
+            params["gzip"] = True
         if since:
             params["since"] = since
+        if until:
+            params["until"] = until
         if status:
             params["status"] = status
         if source:
@@ -317,6 +489,221 @@ class Client:
         return await self._request("audit.export", params)
 
 
+def _page_params(
+    since: str | None,
+    until: str | None,
+    limit: int | None,
+    before_id: int | None,
+    after_id: int | None,
+) -> dict[str, Any]:
+    pairs = (("since", since), ("until", until), ("limit", limit), ("before_id", before_id), ("after_id", after_id))
+    return {key: value for key, value in pairs if value is not None}
+
+
+class EventStream:
+    """An open event subscription; iterate it for events.
+
+    Control calls travel over the same connection and are answered in-band, so a
+    subscription can change topics or pause without reconnecting. The reader never waits on
+    the consumer: when `buffer_size` events are waiting, the oldest is dropped and counted in
+    `dropped`, so control responses are never stuck behind unread events.
+    """
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        subscription: dict[str, Any],
+        *,
+        timeout_seconds: float,
+        buffer_size: int = 1000,
+    ) -> None:
+        self.subscription = subscription
+        self.last_seq: int | None = None
+        # Pass back with `last_seq` when resubscribing.
+        self.epoch: str | None = subscription.get("epoch")
+        self._reader = reader
+        self._writer = writer
+        self._timeout = timeout_seconds
+        self._events: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue(maxsize=buffer_size)
+        self._pending: dict[str, asyncio.Future[Response]] = {}
+        self._closed = False
+        self.dropped = 0
+        self._read_task = asyncio.create_task(self._read_loop())
+
+    def __aiter__(self) -> "EventStream":
+        return self
+
+    async def __anext__(self) -> dict[str, Any]:
+        if self._closed and self._events.empty():
+            raise StopAsyncIteration
+        event = await self._events.get()
+        if event is None:
+            raise StopAsyncIteration
+        self.last_seq = event.get("seq", self.last_seq)
+        self.epoch = event.get("epoch") or self.epoch
+        return event
+
+    async def set_topics(
+        self,
+        topics: Iterable[EventTopic] | None = None,
+        *,
+        symbols: Iterable[str] | None = None,
+        max_rate: float | None = None,
+    ) -> dict[str, Any]:
+        """Change topics and/or the quote symbol filter; omitted arguments keep their current value."""
+        params: dict[str, Any] = {}
+        if topics is not None:
+            params["topics"] = list(topics)
+        if symbols is not None:
+            params["symbols"] = list(symbols)
+        if max_rate is not None:
+            params["max_rate"] = max_rate
+        return await self._control("topics", **params)
+
+    async def pause(self) -> dict[str, Any]:
+        return await self._control("pause")
+
+    async def resume(self) -> dict[str, Any]:
+        return await self._control("resume")
+
+    async def ack(self, seq: int | None = None) -> dict[str, Any]:
+        """Acknowledge events up to `seq` (default: the last one yielded)."""
+        return await self._control("ack", seq=self.last_seq if seq is None else seq)
+
+    async def close(self) -> None:
+        self._closed = True
+        self._read_task.cancel()
+        self._writer.close()
+        await _safe_wait_closed(self._writer)
+        self._fail_pending()
+
+    async def _control(self, action: str, **params: Any) -> dict[str, Any]:
+        if self._closed:
+            raise _connection_lost_error()
+        req = Request(command="events.control", params={"action": action, **params}, source="sdk")
+        future: asyncio.Future[Response] = asyncio.get_running_loop().create_future()
+        self._pending[req.request_id] = future
+        try:
+            self._writer.write(frame_payload(encode_model(req)))
+            await self._writer.drain()
+            return _unwrap_response(await asyncio.wait_for(future, timeout=self._timeout))
+        except asyncio.TimeoutError as exc:
+            raise _timeout_error(self._timeout) from exc
+        except ConnectionError as exc:
+            raise _connection_lost_error() from exc
+        finally:
+            self._pending.pop(req.request_id, None)
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                message = decode_stream_message(await read_framed(self._reader))
+                if isinstance(message, EventEnvelope):
+                    self._offer(message.model_dump(mode="json"))
+                    continue
+                future = self._pending.get(message.request_id)
+                if future is not None and not future.done():
+                    future.set_result(message)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._closed = True
+            self._fail_pending()
+            self._offer(None)
+
+    def _offer(self, event: dict[str, Any] | None) -> None:
+        if self._events.full():
+            self._events.get_nowait()
+            self.dropped += 1
+        self._events.put_nowait(event)
+
+    def _fail_pending(self) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(_connection_lost_error())
+        self._pending.clear()
+
+
+class _Session:
+    """One persistent daemon connection multiplexing requests by `request_id`."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._write_lock = asyncio.Lock()
+        self._pending: dict[str, asyncio.Future[Response]] = {}
+        self._closed = False
+        self._read_task = asyncio.create_task(self._read_loop())
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    async def send(self, request: Request, *, timeout: float) -> Response:
+        if self._closed:
+            raise _connection_lost_error()
+        future: asyncio.Future[Response] = asyncio.get_running_loop().create_future()
+        self._pending[request.request_id] = future
+        try:
+            async with self._write_lock:
+                self._writer.write(frame_payload(encode_model(request)))
+                await self._writer.drain()
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError as exc:
+            raise _timeout_error(timeout) from exc
+        except ConnectionError as exc:
+            self._fail_pending()
+            raise _connection_lost_error() from exc
+        finally:
+            self._pending.pop(request.request_id, None)
+
+    async def close(self) -> None:
+        self._closed = True
+        self._read_task.cancel()
+        self._writer.close()
+        await _safe_wait_closed(self._writer)
+        self._fail_pending()
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                response = decode_response(await read_framed(self._reader))
+                future = self._pending.get(response.request_id)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            # Older daemons answer one request and hang up; the next call reconnects.
+            self._closed = True
+            self._fail_pending()
+
+    def _fail_pending(self) -> None:
+        self._closed = True
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(_connection_lost_error())
+        self._pending.clear()
+
+
+def _timeout_error(timeout: float) -> BrokerError:
+    return BrokerError(
+        ErrorCode.TIMEOUT,
+        "request timed out waiting for daemon response",
+        details={"timeout_seconds": timeout},
+        suggestion="Retry or increase runtime.request_timeout_seconds in config.",
+    )
+
+
+def _connection_lost_error() -> BrokerError:
+    return BrokerError(
+        ErrorCode.DAEMON_NOT_RUNNING,
+        "connection to broker-daemon was lost",
+        suggestion="Check `broker daemon status` and retry.",
+    )
+
+
 def _unwrap_response(response: Response) -> Any:
     if response.ok:
         return response.data
@@ -9,9 +9,10 @@ TIME_IN_FORCE_VALUES = ("DAY", "GTC", "IOC")
 HISTORY_PERIODS = ("1d", "5d", "30d", "90d", "1y")
 BAR_SIZES = ("1m", "5m", "15m", "1h", "1d")
 OPTION_TYPES = ("call", "put")
+GREEKS_MODES = ("auto", "local", "provider")
 ORDER_STATUS_FILTERS = ("active", "filled", "cancelled", "all")
 EXPOSURE_GROUPS = ("sector", "asset_class", "currency", "symbol")
-EVENT_TOPICS = ("orders", "fills", "positions", "pnl", "risk", "connection")
+EVENT_TOPICS = ("orders", "fills", "positions", "pnl", "risk", "connection", "quotes")
 AUDIT_TABLES = ("orders", "commands", "risk")
 AUDIT_SOURCES = ("cli", "sdk", "ts_sdk")
 RISK_PARAMS = (
@@ -32,9 +33,10 @@ TimeInForce: TypeAlias = Literal["DAY", "GTC", "IOC"]
 HistoryPeriod: TypeAlias = Literal["1d", "5d", "30d", "90d", "1y"]
 BarSize: TypeAlias = Literal["1m", "5m", "15m", "1h", "1d"]
 OptionType: TypeAlias = Literal["call", "put"]
+GreeksMode: TypeAlias = Literal["auto", "local", "provider"]
 OrderStatusFilter: TypeAlias = Literal["active", "filled", "cancelled", "all"]
 ExposureGroupBy: TypeAlias = Literal["sector", "asset_class", "currency", "symbol"]
-EventTopic: TypeAlias = Literal["orders", "fills", "positions", "pnl", "risk", "connection"]
+EventTopic: TypeAlias = Literal["orders", "fills", "positions", "pnl", "risk", "connection", "quotes"]
 AuditTable: TypeAlias = Literal["orders", "commands", "risk"]
 AuditSource: TypeAlias = Literal["cli", "sdk", "ts_sdk"]
 RiskParam: TypeAlias = Literal[
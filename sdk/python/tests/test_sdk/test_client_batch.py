@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from broker_sdk import Client
+
+
+@pytest.mark.asyncio
+async def test_batch_accepts_tuples_and_dicts(fake_home, monkeypatch: pytest.MonkeyPatch) -> None:
+    _ = fake_home
+    client = Client(session=False)
+    sent: list[tuple[str, dict[str, Any]]] = []
+
+    async def _fake_request(command: str, params: dict[str, Any] | None = None, *, source: str = "sdk") -> Any:
+        _ = source
+        sent.append((command, params or {}))
+        return {"results": [], "count": 0, "failed": 0}
+
+    monkeypatch.setattr(client, "_request", _fake_request)
+    await client.batch([("quote.snapshot", {"symbols": ["AAPL"]}), {"command": "portfolio.balance"}])
+
+    assert sent == [
+        (
+            "batch",
+            {
+                "requests": [
+                    {"command": "quote.snapshot", "params": {"symbols": ["AAPL"]}},
+                    {"command": "portfolio.balance"},
+                ]
+            },
+        )
+    ]
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from broker_daemon.config import AppConfig, LoggingConfig, RuntimeConfig
+from broker_daemon.daemon.server import DaemonServer
+from broker_daemon.models.events import Event, EventTopic
+from broker_sdk import Client
+
+
+@pytest.mark.asyncio
+async def test_event_stream_controls_subscription_in_band(tmp_path, fake_home) -> None:
+    _ = fake_home
+    server = DaemonServer(
+        AppConfig(
+            logging=LoggingConfig(audit_db=tmp_path / "audit.db", log_file=tmp_path / "broker.log"),
+            runtime=RuntimeConfig(socket_path=tmp_path / "broker.sock", pid_file=tmp_path / "broker-daemon.pid"),
+        )
+    )
+    await server._audit.start()  # noqa: SLF001
+    unix = await asyncio.start_unix_server(server._handle_client, path=str(server.socket_path))  # noqa: SLF001
+
+    client = Client(socket_path=server.socket_path, timeout_seconds=5)
+    stream = await client.subscribe(["orders"])
+    assert stream.subscription["subscribed"] == ["orders"]
+
+    await server._broadcast_event(Event(topic=EventTopic.ORDERS, payload={"client_order_id": "o1"}))  # noqa: SLF001
+    first = await asyncio.wait_for(stream.__anext__(), 1)
+    assert first["data"]["payload"]["client_order_id"] == "o1"
+    assert (await stream.ack())["acked_seq"] == first["seq"]
+
+    assert (await stream.set_topics(["fills"]))["subscribed"] == ["fills"]
+    await server._broadcast_event(Event(topic=EventTopic.ORDERS, payload={"client_order_id": "o2"}))  # noqa: SLF001
+    await server._broadcast_event(Event(topic=EventTopic.FILLS, payload={"fill_id": "f1"}))  # noqa: SLF001
+    second = await asyncio.wait_for(stream.__anext__(), 1)
+    assert second["topic"] == "fills" and stream.last_seq == second["seq"]
+    assert stream.epoch == server._events.epoch  # noqa: SLF001
+
+    await stream.close()
+    unix.close()
+    await unix.wait_closed()
+    await server._audit.close()  # noqa: SLF001
+
+
+@pytest.mark.asyncio
+async def test_control_calls_answer_while_event_buffer_is_full(tmp_path, fake_home) -> None:
+    _ = fake_home
+    server = DaemonServer(
+        AppConfig(
+            logging=LoggingConfig(audit_db=tmp_path / "audit.db", log_file=tmp_path / "broker.log"),
+            runtime=RuntimeConfig(socket_path=tmp_path / "broker.sock", pid_file=tmp_path / "broker-daemon.pid"),
+        )
+    )
+    await server._audit.start()  # noqa: SLF001
+    unix = await asyncio.start_unix_server(server._handle_client, path=str(server.socket_path))  # noqa: SLF001
+
+    client = Client(socket_path=server.socket_path, timeout_seconds=5)
+    stream = await client.subscribe(["fills"])
+    stream._events = asyncio.Queue(maxsize=2)  # noqa: SLF001
+    for i in range(5):
+        await server._broadcast_event(Event(topic=EventTopic.FILLS, payload={"fill_id": f"f{i}"}))  # noqa: SLF001
+
+    for _ in range(100):
+        if stream.dropped == 3:
+            break
+        await asyncio.sleep(0.01)
+    assert stream.dropped == 3
+    # The buffer is full and unread; the control response must still get through.
+    assert (await asyncio.wait_for(stream.pause(), 2))["action"] == "pause"
+    newest = [(await stream.__anext__())["data"]["payload"]["fill_id"] for _ in range(2)]
+    assert newest == ["f3", "f4"]
+
+    await stream.close()
+    unix.close()
+    await unix.wait_closed()
+    await server._audit.close()  # noqa: SLF001
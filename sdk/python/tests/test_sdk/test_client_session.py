@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from broker_daemon.protocol import Response, decode_request, encode_model, frame_payload, read_framed
+from broker_sdk import Client
+
+
+@pytest.mark.asyncio
+async def test_client_reuses_one_session_for_concurrent_requests(tmp_path, fake_home) -> None:
+    _ = fake_home
+    socket_path = tmp_path / "s.sock"
+    connections = 0
+
+    async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        nonlocal connections
+        connections += 1
+        lock = asyncio.Lock()
+
+        async def _answer(payload: bytes) -> None:
+            request = decode_request(payload)
+            assert request.session is True
+            # Answer the first request last to exercise out-of-order delivery.
+            await asyncio.sleep(0.1 if request.command == "portfolio.balance" else 0.0)
+            response = Response(request_id=request.request_id, ok=True, data={"command": request.command})
+            async with lock:
+                writer.write(frame_payload(encode_model(response)))
+                await writer.drain()
+
+        tasks = []
+        try:
+            while True:
+                tasks.append(asyncio.create_task(_answer(await read_framed(reader))))
+        except asyncio.IncompleteReadError:
+            await asyncio.gather(*tasks)
+            writer.close()
+
+    server = await asyncio.start_unix_server(_handle, path=str(socket_path))
+    async with Client(socket_path=socket_path, timeout_seconds=5) as client:
+        balance, limits = await asyncio.gather(client.balance(), client.risk_limits())
+        status = await client.daemon_status()
+
+    server.close()
+    await server.wait_closed()
+
+    assert balance == {"command": "portfolio.balance"}
+    assert limits == {"command": "risk.limits"}
+    assert status == {"command": "daemon.status"}
+    assert connections == 1
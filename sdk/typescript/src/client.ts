@@ -4,8 +4,8 @@ import { loadConfig } from "./config.js";
 import { ErrorCode, BrokerError } from "./errors.js";
 import {
   FramedReader,
-  decodeEvent,
   decodeResponse,
+  decodeStreamFrame,
   encodeRequest,
   makeRequest,
   unwrapResponse
@@ -18,22 +18,31 @@ import type {
 } from "./types.js";
 import type {
   EventTopic,
+  EventsControlParams,
+  EventsSubscribeOptions,
   KeepaliveResponse,
   AuditSource,
   AuditTable,
   AuditCommandsResponse,
+  AuditExportFormat,
   AuditExportResponse,
   AuditOrdersResponse,
+  AuditPageParams,
   AuditRiskResponse,
   BarSize,
+  BatchItem,
+  BatchResponse,
   BracketInput,
+  DaemonMetricsResponse,
   DaemonStatusResponse,
   DaemonStopResponse,
   ExposureGroupBy,
   FillsListResponse,
   HistoryPeriod,
+  MarketHistoryOptions,
   MarketHistoryResponse,
   OptionType,
+  OptionChainOptions,
   OptionChainResponse,
   OrderBracketResponse,
   OrderCancelResponse,
@@ -47,7 +56,10 @@ import type {
   PortfolioExposureResponse,
   PortfolioPnLResponse,
   PortfolioPositionsResponse,
+  PortfolioRefreshResponse,
+  QuoteSnapshotOptions,
   QuoteSnapshotResponse,
+  RiskBatchResult,
   RiskCheckInput,
   RiskCheckResult,
   RiskHaltResponse,
@@ -110,20 +122,30 @@ export class Client {
     }
   }
 
-  async *subscribeEvents(topics: EventTopic[]): AsyncGenerator<EventEnvelope, void, unknown> {
+  async *subscribeEvents(
+    topics: EventTopic[],
+    options: EventsSubscribeOptions = {},
+    controller?: EventStreamController
+  ): AsyncGenerator<EventEnvelope, void, unknown> {
     const socket = await this.openSocket();
     const reader = new FramedReader(socket);
-    const req = makeRequest("events.subscribe", { topics }, true, this.source);
+    const req = makeRequest("events.subscribe", compactParams({ topics, ...options }), true, this.source);
 
     socket.write(encodeRequest(req));
 
     const first = decodeResponse(await reader.nextFrame(this.timeoutMs));
     unwrapResponse<CommandResult<"events.subscribe">>(first);
+    controller?.attach(socket, this.source);
 
     try {
       while (true) {
-        const frame = await reader.nextFrame();
-        yield decodeEvent(frame);
+        const frame = decodeStreamFrame(await reader.nextFrame());
+        if ("topic" in frame) {
+          yield frame;
+        } else {
+          // Control acknowledgements carry no event; failed control messages surface here.
+          unwrapResponse(frame);
+        }
       }
     } catch (error) {
       if (
@@ -134,15 +156,24 @@ export class Client {
       }
       throw error;
     } finally {
+      controller?.detach();
       socket.end();
       socket.destroy();
     }
   }
 
+  async batch(requests: BatchItem[]): Promise<BatchResponse> {
+    return this.request("batch", { requests });
+  }
+
   async daemonStatus(): Promise<DaemonStatusResponse> {
     return this.request("daemon.status", {});
   }
 
+  async daemonMetrics(command?: string): Promise<DaemonMetricsResponse> {
+    return this.request("daemon.metrics", command ? { command } : {});
+  }
+
   async daemonStop(): Promise<DaemonStopResponse> {
     return this.request("daemon.stop", {});
   }
@@ -151,6 +182,10 @@ export class Client {
     return this.request("quote.snapshot", { symbols });
   }
 
+  async quoteSnapshot(symbols: string[], options: QuoteSnapshotOptions = {}): Promise<QuoteSnapshotResponse> {
+    return this.request("quote.snapshot", { symbols, ...options });
+  }
+
   async history(symbol: string, period: HistoryPeriod, bar: BarSize, rthOnly = false): Promise<MarketHistoryResponse> {
     return this.request("market.history", {
       symbol,
@@ -160,8 +195,23 @@ export class Client {
     });
   }
 
-  async chain(symbol: string, expiry?: string, strikeRange?: string, optionType?: OptionType): Promise<OptionChainResponse> {
-    const params: CommandParams<"market.chain"> = { symbol };
+  async historyRange(
+    symbol: string,
+    bar: BarSize,
+    options: MarketHistoryOptions & { period?: HistoryPeriod } = {}
+  ): Promise<MarketHistoryResponse> {
+    const { period = "30d", ...rest } = options;
+    return this.request("market.history", { symbol, period, bar, ...rest });
+  }
+
+  async chain(
+    symbol: string,
+    expiry?: string,
+    strikeRange?: string,
+    optionType?: OptionType,
+    options: Pick<OptionChainOptions, "greeks" | "rate" | "dividend_yield" | "vol"> = {}
+  ): Promise<OptionChainResponse> {
+    const params: CommandParams<"market.chain"> = { symbol, ...options };
     if (expiry) {
       params.expiry = expiry;
     }
@@ -190,6 +240,10 @@ export class Client {
     return this.request("portfolio.exposure", { by });
   }
 
+  async portfolioRefresh(): Promise<PortfolioRefreshResponse> {
+    return this.request("portfolio.refresh", {});
+  }
+
   async order(input: OrderInput): Promise<OrderPlaceResponse> {
     const params: CommandParams<"order.place"> = {
       side: input.side,
@@ -268,6 +322,10 @@ export class Client {
     return this.request("risk.check", params);
   }
 
+  async riskCheckBatch(orders: RiskCheckInput[]): Promise<RiskBatchResult> {
+    return this.request("risk.check_batch", { orders: orders.map((order) => ({ tif: "DAY" as const, ...order })) });
+  }
+
   async riskLimits(): Promise<RiskLimitsResponse> {
     return this.request("risk.limits", {});
   }
@@ -304,8 +362,8 @@ export class Client {
     });
   }
 
-  async auditCommands(source?: AuditSource, since?: string): Promise<AuditCommandsResponse> {
-    const params: CommandParams<"audit.commands"> = {};
+  async auditCommands(source?: AuditSource, since?: string, page: AuditPageParams = {}): Promise<AuditCommandsResponse> {
+    const params: CommandParams<"audit.commands"> = { ...page };
     if (source) {
       params.source = source;
     }
@@ -315,8 +373,8 @@ export class Client {
     return this.request("audit.commands", params);
   }
 
-  async auditOrders(status?: OrderStatusFilter, since?: string): Promise<AuditOrdersResponse> {
-    const params: CommandParams<"audit.orders"> = {};
+  async auditOrders(status?: OrderStatusFilter, since?: string, page: AuditPageParams = {}): Promise<AuditOrdersResponse> {
+    const params: CommandParams<"audit.orders"> = { ...page };
     if (status) {
       params.status = status;
     }
@@ -326,8 +384,8 @@ export class Client {
     return this.request("audit.orders", params);
   }
 
-  async auditRisk(type?: string): Promise<AuditRiskResponse> {
-    const params: CommandParams<"audit.risk"> = {};
+  async auditRisk(type?: string, page: AuditPageParams & { since?: string } = {}): Promise<AuditRiskResponse> {
+    const params: CommandParams<"audit.risk"> = { ...page };
     if (type) {
       params.type = type;
     }
@@ -337,8 +395,10 @@ export class Client {
   async auditExport(input: {
     output: string;
     table?: AuditTable;
-    format?: "csv";
+    format?: AuditExportFormat;
+    gzip?: boolean;
     since?: string;
+    until?: string;
     status?: OrderStatusFilter;
     source?: AuditSource;
     type?: string;
@@ -347,7 +407,9 @@ export class Client {
       output: input.output,
       table: input.table ?? "orders",
       format: input.format ?? "csv",
+      gzip: input.gzip,
       since: input.since,
+      until: input.until,
       status: input.status,
       source: input.source,
       type: input.type
@@ -377,6 +439,48 @@ export async function buildClient(options: ClientOptions = {}): Promise<Client>
   return Client.fromConfig(options);
 }
 
+/**
+ * Adjusts an open `subscribeEvents` stream in-band, without reconnecting.
+ * Pass it as the third argument to `subscribeEvents`; it is usable once the subscription is acknowledged.
+ */
+export class EventStreamController {
+  private socket: net.Socket | null = null;
+  private source = "ts";
+
+  attach(socket: net.Socket, source: string): void {
+    this.socket = socket;
+    this.source = source;
+  }
+
+  detach(): void {
+    this.socket = null;
+  }
+
+  setTopics(topics?: EventTopic[], symbols?: string[], maxRate?: number): void {
+    this.send({ action: "topics", topics, symbols, max_rate: maxRate });
+  }
+
+  pause(): void {
+    this.send({ action: "pause" });
+  }
+
+  resume(): void {
+    this.send({ action: "resume" });
+  }
+
+  ack(seq: number): void {
+    this.send({ action: "ack", seq });
+  }
+
+  private send(params: EventsControlParams): void {
+    if (!this.socket) {
+      throw new BrokerError(ErrorCode.INVALID_ARGS, "event stream is not open");
+    }
+    const req = makeRequest("events.control", compactParams({ ...params }), false, this.source);
+    this.socket.write(encodeRequest(req));
+  }
+}
+
 export async function loadClientConfig(): Promise<AppConfig> {
   return loadConfig();
 }
@@ -1,21 +1,29 @@
 import type { JsonValue } from "./types.js";
 import type {
   EventTopic,
+  EventsSubscribeOptions,
+  EventsSubscribeResponse,
   KeepaliveResponse,
   AuditSource,
   AuditCommandsResponse,
+  AuditExportFormat,
   AuditExportResponse,
   AuditTable,
   AuditOrdersResponse,
+  AuditPageParams,
   AuditRiskResponse,
   BarSize,
+  BatchItem,
+  BatchResponse,
+  DaemonMetricsResponse,
   DaemonStatusResponse,
   DaemonStopResponse,
   ExposureGroupBy,
   FillsListResponse,
   HistoryPeriod,
+  MarketHistoryOptions,
   MarketHistoryResponse,
-  OptionType,
+  OptionChainOptions,
   OptionChainResponse,
   OrderBracketResponse,
   OrderCancelResponse,
@@ -29,8 +37,12 @@ import type {
   PortfolioExposureResponse,
   PortfolioPnLResponse,
   PortfolioPositionsResponse,
+  PortfolioRefreshResponse,
+  QuoteSnapshotOptions,
   QuoteSnapshotResponse,
   RiskParam,
+  RiskBatchResult,
+  RiskCheckInput,
   RiskCheckResult,
   RiskHaltResponse,
   RiskLimitsResponse,
@@ -48,29 +60,22 @@ export interface CommandSpec<Params, Result> {
 export interface CommandMap {
   "daemon.status": CommandSpec<Record<string, never>, DaemonStatusResponse>;
   "daemon.stop": CommandSpec<Record<string, never>, DaemonStopResponse>;
-  "quote.snapshot": CommandSpec<{ symbols: string[]; force?: boolean }, QuoteSnapshotResponse>;
+  "daemon.metrics": CommandSpec<{ command?: string }, DaemonMetricsResponse>;
+  "quote.snapshot": CommandSpec<{ symbols: string[] } & QuoteSnapshotOptions, QuoteSnapshotResponse>;
   "market.history": CommandSpec<
     {
       symbol: string;
       period: HistoryPeriod;
       bar: BarSize;
-      rth_only?: boolean;
-    },
+    } & MarketHistoryOptions,
     MarketHistoryResponse
   >;
-  "market.chain": CommandSpec<
-    {
-      symbol: string;
-      expiry?: string;
-      strike_range?: string;
-      type?: OptionType;
-    },
-    OptionChainResponse
-  >;
+  "market.chain": CommandSpec<{ symbol: string } & OptionChainOptions, OptionChainResponse>;
   "portfolio.positions": CommandSpec<{ symbol?: string }, PortfolioPositionsResponse>;
   "portfolio.balance": CommandSpec<Record<string, never>, PortfolioBalanceResponse>;
   "portfolio.pnl": CommandSpec<Record<string, never>, PortfolioPnLResponse>;
   "portfolio.exposure": CommandSpec<{ by?: ExposureGroupBy }, PortfolioExposureResponse>;
+  "portfolio.refresh": CommandSpec<Record<string, never>, PortfolioRefreshResponse>;
   "order.place": CommandSpec<
     {
       side: OrderSide;
@@ -111,6 +116,7 @@ export interface CommandMap {
     },
     RiskCheckResult
   >;
+  "risk.check_batch": CommandSpec<{ orders: RiskCheckInput[] }, RiskBatchResult>;
   "risk.limits": CommandSpec<Record<string, never>, RiskLimitsResponse>;
   "risk.set": CommandSpec<{ param: RiskParam; value: JsonValue }, RiskSetResponse>;
   "risk.halt": CommandSpec<Record<string, never>, RiskHaltResponse>;
@@ -125,22 +131,25 @@ export interface CommandMap {
     RiskOverrideResponse
   >;
   "runtime.keepalive": CommandSpec<{ sent_at?: number }, KeepaliveResponse>;
-  "audit.commands": CommandSpec<{ source?: AuditSource; since?: string }, AuditCommandsResponse>;
-  "audit.orders": CommandSpec<{ status?: OrderStatusFilter; since?: string }, AuditOrdersResponse>;
-  "audit.risk": CommandSpec<{ type?: string }, AuditRiskResponse>;
+  "audit.commands": CommandSpec<{ source?: AuditSource; since?: string } & AuditPageParams, AuditCommandsResponse>;
+  "audit.orders": CommandSpec<{ status?: OrderStatusFilter; since?: string } & AuditPageParams, AuditOrdersResponse>;
+  "audit.risk": CommandSpec<{ type?: string; since?: string } & AuditPageParams, AuditRiskResponse>;
   "audit.export": CommandSpec<
     {
       output: string;
       table?: AuditTable;
-      format?: "csv";
+      format?: AuditExportFormat;
+      gzip?: boolean;
       since?: string;
+      until?: string;
       status?: OrderStatusFilter;
       source?: AuditSource;
       type?: string;
     },
     AuditExportResponse
   >;
-  "events.subscribe": CommandSpec<{ topics: EventTopic[] }, { subscribed: string[] }>;
+  "events.subscribe": CommandSpec<{ topics: EventTopic[] } & EventsSubscribeOptions, EventsSubscribeResponse>;
+  batch: CommandSpec<{ requests: BatchItem[] }, BatchResponse>;
 }
 
 export type CommandName = keyof CommandMap;
@@ -1,18 +1,21 @@
-export { Client, buildClient, loadClientConfig } from "./client.js";
+export { Client, EventStreamController, buildClient, loadClientConfig } from "./client.js";
 export type { ClientOptions } from "./client.js";
 export { loadConfig, resolveJsonMode } from "./config.js";
 export { ErrorCode, BrokerError } from "./errors.js";
 export {
   EVENT_TOPICS,
+  EVENT_CONTROL_ACTIONS,
   AUDIT_SOURCES,
   AUDIT_TABLES,
   BAR_SIZES,
   EXPOSURE_GROUPS,
   HISTORY_PERIODS,
   OPTION_TYPES,
+  GREEKS_MODES,
   ORDER_SIDES,
   ORDER_STATUS_FILTERS,
   RISK_PARAMS,
+  SUBSCRIBER_OVERFLOW_POLICIES,
   TIME_IN_FORCE_VALUES
 } from "./sdk-types.js";
 
@@ -42,20 +45,35 @@ export type {
 
 export type {
   EventTopic,
+  EventControlAction,
+  EventsControlParams,
+  EventsControlResponse,
+  EventsSubscribeOptions,
+  EventsSubscribeResponse,
   KeepaliveResponse,
   AuditSource,
   AuditTable,
   AuditCommandsResponse,
   AuditCommandsRow,
+  AuditExportFormat,
   AuditExportResponse,
   AuditOrdersResponse,
   AuditOrdersRow,
+  AuditCursor,
+  AuditPageParams,
   AuditRiskResponse,
   AuditRiskRow,
   Balance,
   BarSize,
   Bar,
+  BatchItem,
+  BatchItemResult,
+  BatchResponse,
   BracketInput,
+  CoalescedReadStats,
+  CoalescingMetrics,
+  CommandMetrics,
+  DaemonMetricsResponse,
   DaemonStatusResponse,
   DaemonStopResponse,
   ExposureGroupBy,
@@ -64,9 +82,14 @@ export type {
   FillRecord,
   FillsListResponse,
   HistoryPeriod,
+  LatencySummary,
+  MarketHistoryOptions,
   MarketHistoryResponse,
+  MetricsStage,
   OptionType,
+  GreeksMode,
   OptionChainEntry,
+  OptionChainOptions,
   OptionChainResponse,
   OrderStatusFilter,
   OrderBracketResponse,
@@ -83,10 +106,15 @@ export type {
   PortfolioExposureResponse,
   PortfolioPnLResponse,
   PortfolioPositionsResponse,
+  PortfolioRefreshResponse,
+  PortfolioSnapshot,
   Position,
   Quote,
+  QuoteCacheEntry,
+  QuoteSnapshotOptions,
   QuoteSnapshotResponse,
   RiskParam,
+  RiskBatchResult,
   RiskCheckInput,
   RiskCheckResult,
   RiskConfigSnapshot,
@@ -96,5 +124,6 @@ export type {
   RiskOverrideResponse,
   RiskResumeResponse,
   RiskSetResponse,
+  SubscriberOverflowPolicy,
   TimeInForce
 } from "./sdk-types.js";
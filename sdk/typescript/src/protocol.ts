@@ -53,7 +53,9 @@ function parseEventEnvelope(value: unknown): EventEnvelope {
   return {
     request_id: obj.request_id ? String(obj.request_id) : undefined,
     topic: String(obj.topic ?? ""),
-    data: (obj.data as Record<string, JsonValue>) ?? {}
+    data: (obj.data as Record<string, JsonValue>) ?? {},
+    seq: typeof obj.seq === "number" ? obj.seq : null,
+    epoch: typeof obj.epoch === "string" ? obj.epoch : null
   };
 }
 
@@ -61,6 +63,15 @@ export function decodeResponse(payload: Buffer): ResponseEnvelope {
   return parseResponseEnvelope(decode(payload));
 }
 
+/** Frames on an event subscription are either events or in-band control responses. */
+export function decodeStreamFrame(payload: Buffer): EventEnvelope | ResponseEnvelope {
+  const value = decode(payload);
+  if (value && typeof value === "object" && "topic" in value) {
+    return parseEventEnvelope(value);
+  }
+  return parseResponseEnvelope(value);
+}
+
 export function decodeEvent(payload: Buffer): EventEnvelope {
   return parseEventEnvelope(decode(payload));
 }
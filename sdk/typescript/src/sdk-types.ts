@@ -1,13 +1,16 @@
-import type { JsonValue } from "./types.js";
+import type { ErrorResponse, JsonValue } from "./types.js";
 
 export const ORDER_SIDES = ["buy", "sell"] as const;
 export const TIME_IN_FORCE_VALUES = ["DAY", "GTC", "IOC"] as const;
 export const HISTORY_PERIODS = ["1d", "5d", "30d", "90d", "1y"] as const;
 export const BAR_SIZES = ["1m", "5m", "15m", "1h", "1d"] as const;
 export const OPTION_TYPES = ["call", "put"] as const;
+export const GREEKS_MODES = ["auto", "local", "provider"] as const;
 export const ORDER_STATUS_FILTERS = ["active", "filled", "cancelled", "all"] as const;
 export const EXPOSURE_GROUPS = ["sector", "asset_class", "currency", "symbol"] as const;
-export const EVENT_TOPICS = ["orders", "fills", "positions", "pnl", "risk", "connection"] as const;
+export const EVENT_TOPICS = ["orders", "fills", "positions", "pnl", "risk", "connection", "quotes"] as const;
+export const EVENT_CONTROL_ACTIONS = ["topics", "pause", "resume", "ack"] as const;
+export const SUBSCRIBER_OVERFLOW_POLICIES = ["drop_oldest", "conflate", "disconnect"] as const;
 export const AUDIT_TABLES = ["orders", "commands", "risk"] as const;
 export const AUDIT_SOURCES = ["cli", "sdk", "ts_sdk"] as const;
 export const RISK_PARAMS = [
@@ -28,9 +31,12 @@ export type TimeInForce = (typeof TIME_IN_FORCE_VALUES)[number];
 export type HistoryPeriod = (typeof HISTORY_PERIODS)[number];
 export type BarSize = (typeof BAR_SIZES)[number];
 export type OptionType = (typeof OPTION_TYPES)[number];
+export type GreeksMode = (typeof GREEKS_MODES)[number];
 export type OrderStatusFilter = (typeof ORDER_STATUS_FILTERS)[number];
 export type ExposureGroupBy = (typeof EXPOSURE_GROUPS)[number];
 export type EventTopic = (typeof EVENT_TOPICS)[number];
+export type EventControlAction = (typeof EVENT_CONTROL_ACTIONS)[number];
+export type SubscriberOverflowPolicy = (typeof SUBSCRIBER_OVERFLOW_POLICIES)[number];
 export type AuditTable = (typeof AUDIT_TABLES)[number];
 export type AuditSource = (typeof AUDIT_SOURCES)[number];
 export type RiskParam = (typeof RISK_PARAMS)[number];
@@ -70,10 +76,21 @@ export interface OptionChainEntry {
   vega?: number | null;
 }
 
+export interface OptionChainOptions {
+  expiry?: string;
+  strike_range?: string;
+  type?: OptionType;
+  greeks?: GreeksMode;
+  rate?: number;
+  dividend_yield?: number;
+  vol?: number;
+}
+
 export interface OptionChainResponse {
   symbol: string;
   underlying_price: number | null;
   entries: OptionChainEntry[];
+  greeks: { mode: GreeksMode; computed: number };
 }
 
 export interface Position {
@@ -147,6 +164,14 @@ export interface RiskCheckResult {
   suggestion?: string | null;
 }
 
+export interface RiskBatchResult {
+  ok: boolean;
+  passed: number;
+  failed: number;
+  results: RiskCheckResult[];
+  projected_positions: Record<string, number>;
+}
+
 export interface RiskConfigSnapshot {
   max_position_pct: number;
   max_order_value: number;
@@ -169,6 +194,42 @@ export interface RiskOverride {
   expires_at: string;
 }
 
+export interface LatencySummary {
+  count: number;
+  p50_ms: number;
+  p99_ms: number;
+  max_ms: number;
+  mean_ms: number;
+}
+
+export type MetricsStage = "decode" | "dispatch" | "provider" | "audit" | "encode" | "total";
+
+export interface CommandMetrics {
+  requests: number;
+  errors: number;
+  stages: Partial<Record<MetricsStage, LatencySummary>>;
+}
+
+export interface CoalescedReadStats {
+  calls: number;
+  shared: number;
+  provider_calls: number;
+}
+
+export interface CoalescingMetrics {
+  methods: Record<string, CoalescedReadStats>;
+  quote_symbols: { requested: number; shared: number };
+}
+
+export interface DaemonMetricsResponse {
+  uptime_seconds: number;
+  requests_total: number;
+  in_flight: number;
+  errors: Record<string, number>;
+  commands: Record<string, CommandMetrics>;
+  coalescing: CoalescingMetrics;
+}
+
 export interface DaemonStatusResponse {
   uptime_seconds: number;
   connection: {
@@ -182,6 +243,7 @@ export interface DaemonStatusResponse {
     last_error: string | null;
   };
   risk_halted: boolean;
+  portfolio_version: number | null;
   time_sync_delta_ms: number | null;
   socket: string;
 }
@@ -190,12 +252,31 @@ export interface DaemonStopResponse {
   stopping: boolean;
 }
 
+export interface QuoteCacheEntry {
+  hit: boolean;
+  stale: boolean;
+  age_ms: number;
+}
+
+export interface QuoteSnapshotOptions {
+  force?: boolean;
+  max_age_ms?: number;
+}
+
 export interface QuoteSnapshotResponse {
   quotes: Quote[];
+  cache: Record<string, QuoteCacheEntry>;
+}
+
+export interface MarketHistoryOptions {
+  rth_only?: boolean;
+  start?: string;
+  end?: string;
 }
 
 export interface MarketHistoryResponse {
   bars: Bar[];
+  cache: { hit_ratio: number; fetched_ranges: number };
 }
 
 export interface PortfolioPositionsResponse {
@@ -210,6 +291,21 @@ export interface PortfolioPnLResponse {
   pnl: PnLSummary;
 }
 
+export interface PortfolioSnapshot {
+  version: number;
+  nlv: number;
+  daily_pnl: number;
+  positions: Record<string, number>;
+  mark_prices: Record<string, number>;
+  position_values: Record<string, number>;
+  refreshed_age_seconds: number | null;
+  updated_age_seconds: number | null;
+}
+
+export interface PortfolioRefreshResponse {
+  portfolio: PortfolioSnapshot;
+}
+
 export interface PortfolioExposureResponse {
   exposure: ExposureEntry[];
   by: string;
@@ -274,7 +370,17 @@ export interface KeepaliveResponse {
   halted: boolean;
 }
 
+export interface AuditPageParams {
+  until?: string;
+  limit?: number;
+  before_id?: number;
+  after_id?: number;
+}
+
+export type AuditCursor = { before_id: number } | { after_id: number };
+
 export interface AuditCommandsRow {
+  id: number;
   timestamp: string;
   source: string;
   command: string;
@@ -303,6 +409,7 @@ export interface AuditOrdersRow {
 }
 
 export interface AuditRiskRow {
+  id: number;
   timestamp: string;
   event_type: string;
   details: string;
@@ -310,19 +417,48 @@ export interface AuditRiskRow {
 
 export interface AuditCommandsResponse {
   commands: AuditCommandsRow[];
+  next_cursor: AuditCursor | null;
 }
 
 export interface AuditOrdersResponse {
   orders: AuditOrdersRow[];
+  next_cursor: AuditCursor | null;
 }
 
 export interface AuditRiskResponse {
   risk_events: AuditRiskRow[];
+  next_cursor: AuditCursor | null;
 }
 
+export type AuditExportFormat = "csv" | "ndjson";
+
 export interface AuditExportResponse {
   output: string;
   rows: number;
+  format: AuditExportFormat;
+  gzip: boolean;
+  bytes: number;
+  elapsed_ms: number;
+}
+
+export interface BatchItem {
+  command: string;
+  params?: Record<string, JsonValue>;
+  request_id?: string;
+}
+
+export interface BatchItemResult {
+  command: string;
+  request_id: string;
+  ok: boolean;
+  data?: JsonValue;
+  error?: ErrorResponse | null;
+}
+
+export interface BatchResponse {
+  results: BatchItemResult[];
+  count: number;
+  failed: number;
 }
 
 export interface EventPayload {
@@ -359,3 +495,40 @@ export interface RiskCheckInput {
   stop?: number;
   tif?: TimeInForce;
 }
+
+export interface EventsSubscribeOptions {
+  overflow?: SubscriberOverflowPolicy;
+  max_queue?: number;
+  since_seq?: number;
+  /** Epoch of the event `since_seq` came from; a mismatch means a full resync (`replay_gap`). */
+  epoch?: string;
+  symbols?: string[];
+  max_rate?: number;
+}
+
+export interface EventsSubscribeResponse {
+  subscribed: EventTopic[];
+  symbols: string[];
+  overflow: SubscriberOverflowPolicy;
+  max_queue: number;
+  last_seq: number;
+  epoch: string;
+  replayed: number;
+  replay_gap: boolean;
+}
+
+export interface EventsControlParams {
+  action: EventControlAction;
+  topics?: EventTopic[];
+  symbols?: string[];
+  max_rate?: number;
+  seq?: number;
+}
+
+export interface EventsControlResponse {
+  action: EventControlAction;
+  subscribed: EventTopic[];
+  symbols: string[];
+  paused: boolean;
+  acked_seq: number | null;
+}
@@ -30,6 +30,8 @@ export interface EventEnvelope {
   request_id?: string | null;
   topic: string;
   data: Record<string, JsonValue>;
+  seq?: number | null;
+  epoch?: string | null;
 }
 
 export interface GatewayConfig {